@@ -95,6 +95,14 @@ class Settings(BaseSettings):
     # 速率限制
     RATE_LIMIT_ENABLED: bool = Field(default=True)
     DEFAULT_RATE_LIMIT: int = Field(default=100)  # 每分钟请求数
+    # 数据源限流额度通过 Redis 在 API、调度任务与 Worker 进程间共享
+    RATE_LIMIT_DISTRIBUTED: bool = Field(default=True)
+    RATE_LIMIT_BULK_SHARE: float = Field(default=0.7, ge=0.1, le=1.0, description="批量同步任务可使用的数据源额度比例")
+    AKSHARE_RATE_LIMIT_PER_MINUTE: int = Field(
+        default=0, ge=0,
+        description="AKShare接口调用上限（次/分钟，所有进程合计）；0 表示不限，由 TA_AKSHARE_HOST_RATES 按主机限速"
+    )
+    BAOSTOCK_RATE_LIMIT_PER_MINUTE: int = Field(default=600, ge=1, description="BaoStock接口调用上限（次/分钟，所有进程合计）")
 
     # 日志配置
     LOG_LEVEL: str = Field(default="INFO")
@@ -182,6 +190,20 @@ class Settings(BaseSettings):
         description="自动检测Tushare rt_k接口权限，付费用户自动切换到高频模式（5秒）"
     )
 
+    # 行情增量入库与变更流
+    QUOTES_FULL_REFRESH_SECONDS: int = Field(
+        default=1800,
+        description="增量入库时的全量重写周期（秒），用于纠正其他写入方造成的偏差；0 表示每次全量写入"
+    )
+    QUOTES_CHANGE_STREAM_ENABLED: bool = Field(default=True, description="将每次采集的变更行情发布到 Redis Stream")
+    QUOTES_CHANGE_STREAM_KEY: str = Field(default="quotes:changes", description="行情变更 Redis Stream 键名")
+    QUOTES_CHANGE_STREAM_MAXLEN: int = Field(default=1000, description="行情变更 Stream 保留的最大条目数（近似裁剪）")
+
+    # 日内分钟K线（由行情采集快照聚合）
+    INTRADAY_BARS_ENABLED: bool = Field(default=True, description="将每次行情采集聚合为日内分钟K线")
+    INTRADAY_BAR_PERIODS: str = Field(default="1,5,15", description="分钟K线周期，逗号分隔（支持 1/5/15/30/60）")
+    INTRADAY_BAR_RETENTION_DAYS: int = Field(default=30, ge=1, description="分钟K线保留天数（TTL 索引自动清理）")
+
     # Tushare基础配置
     TUSHARE_TOKEN: str = Field(default="", description="Tushare API Token")
     TUSHARE_ENABLED: bool = Field(default=True, description="启用Tushare数据源")
@@ -196,8 +218,11 @@ class Settings(BaseSettings):
     TUSHARE_QUOTES_SYNC_CRON: str = Field(default="*/5 9-15 * * 1-5")  # 交易时间每5分钟
     TUSHARE_HISTORICAL_SYNC_ENABLED: bool = Field(default=True)
     TUSHARE_HISTORICAL_SYNC_CRON: str = Field(default="0 16 * * 1-5")  # 工作日16点
+    TUSHARE_HISTORICAL_SYNC_BY_TRADE_DATE: bool = Field(default=True, description="增量同步按交易日拉取全市场截面（否则逐股票同步）")
     TUSHARE_FINANCIAL_SYNC_ENABLED: bool = Field(default=True)
     TUSHARE_FINANCIAL_SYNC_CRON: str = Field(default="0 3 * * 0")  # 周日凌晨3点
+    TUSHARE_FINANCIAL_SYNC_BY_PERIOD: bool = Field(default=False, description="按报告期拉取全市场财务数据（需要VIP接口权限，否则逐股票同步）")
+    TUSHARE_FINANCIAL_SYNC_PERIODS: int = Field(default=2, ge=1, le=20, description="按报告期同步时刷新最近的报告期数量")
     TUSHARE_STATUS_CHECK_ENABLED: bool = Field(default=True)
     TUSHARE_STATUS_CHECK_CRON: str = Field(default="0 * * * *")  # 每小时
 
@@ -230,6 +255,11 @@ class Settings(BaseSettings):
     # 默认60天：可覆盖MA60等所有常用技术指标（MA5/10/20/60, MACD, RSI, BOLL）
     MARKET_ANALYST_LOOKBACK_DAYS: int = Field(default=60, ge=5, le=365, description="市场分析回溯天数（用于技术分析）")
 
+    # ==================== 技术指标快照配置 ====================
+
+    # 日线同步完成后为每只股票的最新交易日预计算技术指标（stock_indicators_daily）
+    INDICATOR_SNAPSHOT_ENABLED: bool = Field(default=True, description="日线同步后预计算技术指标快照")
+
     # ==================== BaoStock统一数据同步配置 ====================
 
     # BaoStock统一数据同步总开关
@@ -249,6 +279,7 @@ class Settings(BaseSettings):
     BAOSTOCK_INIT_HISTORICAL_DAYS: int = Field(default=365, ge=1, le=3650, description="初始化历史数据天数")
     BAOSTOCK_INIT_BATCH_SIZE: int = Field(default=50, ge=10, le=500, description="初始化批处理大小")
     BAOSTOCK_INIT_AUTO_START: bool = Field(default=False, description="应用启动时自动检查并初始化数据")
+    BAOSTOCK_SYNC_SESSIONS: int = Field(default=1, ge=1, le=8, description="同步/初始化使用的BaoStock并行会话数（>1时每个会话一个子进程）")
 
     # 数据目录配置
     TRADINGAGENTS_DATA_DIR: str = Field(default="./data")
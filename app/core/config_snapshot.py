@@ -0,0 +1,286 @@
+"""
+进程内配置快照
+数据源优先级与系统设置在热路径上被频繁读取（每次行情/数据调用），这里在进程内维护一份只读快照：
+- 启动时加载一次，热路径读取不产生任何 I/O
+- 通过 MongoDB 变更流（change stream）感知 system_configs / datasource_groupings 的修改；
+  单机版 mongod 不支持变更流时回退为定期轮询版本指纹
+- config_service 写入配置后通过 Redis pub/sub 广播失效通知，其他进程收到后重新加载
+- 未启动监听的进程（如独立 Worker）按轮询间隔懒刷新
+快照对象不可变（字典为 MappingProxyType、列表为 tuple），调用方可安全共享。
+"""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 配置失效通知的 Redis 频道
+CONFIG_INVALIDATION_CHANNEL = "config:invalidate"
+
+# 轮询间隔（秒）：单机 mongod 的轮询周期，以及未启动监听的进程的懒刷新周期
+CONFIG_POLL_INTERVAL_SECONDS = 30.0
+
+# 变更流不可用（非副本集）的错误码
+_CHANGE_STREAM_UNSUPPORTED_CODES = {40573, 40324}
+
+_WATCHED_COLLECTIONS = ("system_configs", "datasource_groupings")
+
+
+def _freeze(value: Any) -> Any:
+    """递归转换为不可变结构"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items() if k != "_id"})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """配置快照（只读）"""
+
+    version: int = -1
+    data_source_configs: Tuple[Mapping[str, Any], ...] = ()
+    datasource_groupings: Tuple[Mapping[str, Any], ...] = ()
+    system_settings: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    loaded_at: float = 0.0
+
+    @classmethod
+    def from_documents(cls, config_doc: Optional[Dict[str, Any]], groupings: List[Dict[str, Any]]) -> "ConfigSnapshot":
+        config_doc = config_doc or {}
+        data_source_configs = sorted(
+            config_doc.get("data_source_configs") or [],
+            key=lambda ds: ds.get("priority", 0) or 0,
+            reverse=True,
+        )
+        groupings = sorted(groupings or [], key=lambda g: g.get("priority", 0) or 0, reverse=True)
+        return cls(
+            version=int(config_doc.get("version", -1) or -1),
+            data_source_configs=_freeze(data_source_configs),
+            datasource_groupings=_freeze(groupings),
+            system_settings=_freeze(config_doc.get("system_settings") or {}),
+            loaded_at=time.monotonic(),
+        )
+
+    def enabled_data_sources(self, market_category: Optional[str] = None) -> Tuple[Mapping[str, Any], ...]:
+        """启用的数据源配置（按优先级降序），可按市场分类过滤"""
+        result = []
+        for ds in self.data_source_configs:
+            if not ds.get("enabled", True):
+                continue
+            market_categories = ds.get("market_categories") or ()
+            if market_categories and market_category and market_category not in market_categories:
+                continue
+            result.append(ds)
+        return tuple(result)
+
+    def source_priority(self, market_category_id: Optional[str]) -> Tuple[str, ...]:
+        """某市场分类下启用的数据源名称（来自 datasource_groupings，按优先级降序）"""
+        return tuple(
+            g.get("data_source_name")
+            for g in self.datasource_groupings
+            if g.get("enabled", True) and g.get("market_category_id") == market_category_id
+        )
+
+
+class ConfigSnapshotStore:
+    """配置快照的持有者与刷新器"""
+
+    def __init__(self, poll_interval: float = CONFIG_POLL_INTERVAL_SECONDS):
+        self.poll_interval = poll_interval
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._lock = threading.Lock()
+        self._tasks: List[asyncio.Task] = []
+        self._watching = False
+
+    # ---- 读取 ----
+
+    def get(self) -> ConfigSnapshot:
+        """获取当前快照；热路径上只在首次使用或（未监听时）轮询周期到期时加载"""
+        snapshot = self._snapshot
+        if snapshot is not None and (self._watching or time.monotonic() - snapshot.loaded_at < self.poll_interval):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or (not self._watching and time.monotonic() - snapshot.loaded_at >= self.poll_interval):
+                snapshot = self._snapshot = self._load_sync(snapshot)
+        return snapshot
+
+    def invalidate(self) -> None:
+        """丢弃当前快照，下次读取时重新加载"""
+        self._snapshot = None
+
+    # ---- 加载 ----
+
+    @staticmethod
+    def _config_query() -> Dict[str, Any]:
+        return {"is_active": True}
+
+    def _load_sync(self, previous: Optional[ConfigSnapshot]) -> ConfigSnapshot:
+        try:
+            from app.core.database import get_mongo_db_sync
+            db = get_mongo_db_sync()
+            config_doc = db.system_configs.find_one(self._config_query(), sort=[("version", -1)])
+            groupings = list(db.datasource_groupings.find({}))
+            return ConfigSnapshot.from_documents(config_doc, groupings)
+        except Exception as e:
+            logger.warning(f"⚠️ [配置快照] 加载失败，继续使用上一份快照: {e}")
+            return self._keep(previous)
+
+    async def reload(self) -> ConfigSnapshot:
+        """异步重新加载快照"""
+        try:
+            from app.core.database import get_mongo_db
+            db = get_mongo_db()
+            config_doc = await db.system_configs.find_one(self._config_query(), sort=[("version", -1)])
+            groupings = await db.datasource_groupings.find({}).to_list(length=None)
+            snapshot = ConfigSnapshot.from_documents(config_doc, groupings)
+        except Exception as e:
+            logger.warning(f"⚠️ [配置快照] 重新加载失败，继续使用上一份快照: {e}")
+            snapshot = self._keep(self._snapshot)
+        self._snapshot = snapshot
+        logger.debug(f"🔄 [配置快照] 已加载: version={snapshot.version}, 数据源={len(snapshot.data_source_configs)}")
+        return snapshot
+
+    @staticmethod
+    def _keep(previous: Optional[ConfigSnapshot]) -> ConfigSnapshot:
+        """加载失败时保留旧快照并重置时间戳，避免每次调用都重试"""
+        base = previous or ConfigSnapshot()
+        return ConfigSnapshot(
+            version=base.version,
+            data_source_configs=base.data_source_configs,
+            datasource_groupings=base.datasource_groupings,
+            system_settings=base.system_settings,
+            loaded_at=time.monotonic(),
+        )
+
+    # ---- 监听 ----
+
+    async def start(self) -> None:
+        """加载快照并启动变更监听（变更流/轮询 + Redis 失效通知）"""
+        await self.reload()
+        if self._tasks:
+            return
+        self._watching = True
+        self._tasks = [
+            asyncio.create_task(self._watch_changes(), name="config-snapshot-watch"),
+            asyncio.create_task(self._listen_invalidations(), name="config-snapshot-pubsub"),
+        ]
+        logger.info("✅ [配置快照] 已启动配置变更监听")
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        self._watching = False
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def _watch_changes(self) -> None:
+        """优先使用变更流，单机 mongod 回退到轮询"""
+        from pymongo.errors import OperationFailure
+        from app.core.database import get_mongo_db
+
+        pipeline = [{"$match": {"ns.coll": {"$in": list(_WATCHED_COLLECTIONS)}}}]
+        while True:
+            try:
+                async with get_mongo_db().watch(pipeline) as stream:
+                    logger.info("👀 [配置快照] 使用 MongoDB 变更流监听配置修改")
+                    async for _ in stream:
+                        await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in _CHANGE_STREAM_UNSUPPORTED_CODES:
+                    logger.info("ℹ️ [配置快照] MongoDB 不支持变更流（非副本集），改为轮询配置版本")
+                    await self._poll_changes()
+                    return
+                logger.warning(f"⚠️ [配置快照] 变更流中断，稍后重连: {e}")
+            except Exception as e:
+                logger.warning(f"⚠️ [配置快照] 变更流中断，稍后重连: {e}")
+            await asyncio.sleep(self.poll_interval)
+            await self.reload()
+
+    async def _fingerprint(self) -> Tuple[Any, ...]:
+        from app.core.database import get_mongo_db
+        db = get_mongo_db()
+        config_doc = await db.system_configs.find_one(
+            self._config_query(), {"version": 1, "updated_at": 1}, sort=[("version", -1)]
+        )
+        latest_grouping = await db.datasource_groupings.find_one(
+            {}, {"updated_at": 1}, sort=[("updated_at", -1)]
+        )
+        grouping_count = await db.datasource_groupings.count_documents({})
+        return (
+            (config_doc or {}).get("_id"),
+            (config_doc or {}).get("version"),
+            (config_doc or {}).get("updated_at"),
+            (latest_grouping or {}).get("updated_at"),
+            grouping_count,
+        )
+
+    async def _poll_changes(self) -> None:
+        fingerprint = None
+        while True:
+            try:
+                current = await self._fingerprint()
+                if fingerprint is not None and current != fingerprint:
+                    await self.reload()
+                fingerprint = current
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"[配置快照] 轮询配置版本失败: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _listen_invalidations(self) -> None:
+        """订阅其他进程广播的失效通知"""
+        try:
+            from app.core.database import get_redis_client
+            redis = get_redis_client()
+        except Exception:
+            logger.debug("[配置快照] Redis 未初始化，跳过失效通知订阅")
+            return
+
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(CONFIG_INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ [配置快照] 失效通知订阅中断，稍后重连: {e}")
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+            await asyncio.sleep(self.poll_interval)
+
+
+config_snapshot_store = ConfigSnapshotStore()
+
+
+def get_config_snapshot() -> ConfigSnapshot:
+    """获取当前配置快照（热路径使用，无 I/O）"""
+    return config_snapshot_store.get()
+
+
+async def publish_config_invalidation() -> None:
+    """配置写入后调用：刷新本进程快照，并通知其他进程"""
+    snapshot = await config_snapshot_store.reload()
+    try:
+        from app.core.database import get_redis_client
+        await get_redis_client().publish(CONFIG_INVALIDATION_CHANNEL, str(snapshot.version))
+    except Exception as e:
+        logger.debug(f"[配置快照] 发布失效通知失败（其他进程将按变更流/轮询刷新）: {e}")
@@ -22,6 +22,8 @@ mongo_client: Optional[AsyncIOMotorClient] = None
 mongo_db: Optional[AsyncIOMotorDatabase] = None
 redis_client: Optional[Redis] = None
 redis_pool: Optional[ConnectionPool] = None
+# Redis 客户端所属的事件循环（线程池中的其他事件循环需要把命令投递到该循环执行）
+redis_loop: Optional[asyncio.AbstractEventLoop] = None
 
 # 同步 MongoDB 连接（用于非异步上下文）
 _sync_mongo_client: Optional[MongoClient] = None
@@ -189,7 +191,7 @@ db_manager = DatabaseManager()
 
 async def init_database():
     """初始化数据库连接"""
-    global mongo_client, mongo_db, redis_client, redis_pool
+    global mongo_client, mongo_db, redis_client, redis_pool, redis_loop
 
     try:
         mongo_enabled = os.getenv("MONGODB_ENABLED", "true").lower() == "true"
@@ -206,6 +208,7 @@ async def init_database():
             await db_manager.init_redis()
             redis_client = db_manager.redis_client
             redis_pool = db_manager.redis_pool
+            redis_loop = asyncio.get_running_loop()
         else:
             logger.info("⏭️ 跳过Redis初始化 (REDIS_ENABLED=false)")
 
@@ -371,6 +374,13 @@ async def create_database_indexes(db):
         await market_quotes.create_index([("amount", -1)])
         await market_quotes.create_index([("updated_at", -1)])
 
+        # analysis_reports 的索引（报告列表：键集分页、市场/股票筛选、关键词检索）
+        analysis_reports = db["analysis_reports"]
+        await analysis_reports.create_index([("created_at", -1), ("_id", -1)])
+        await analysis_reports.create_index([("market_type", 1), ("created_at", -1), ("_id", -1)])
+        await analysis_reports.create_index([("stock_symbol", 1), ("created_at", -1), ("_id", -1)])
+        await analysis_reports.create_index([("search_ngrams", 1)])
+
         logger.info("✅ 数据库索引创建完成")
 
     except Exception as e:
@@ -379,7 +389,7 @@ async def create_database_indexes(db):
 
 async def close_database():
     """关闭数据库连接"""
-    global mongo_client, mongo_db, redis_client, redis_pool
+    global mongo_client, mongo_db, redis_client, redis_pool, redis_loop
 
     await db_manager.close_connections()
 
@@ -388,6 +398,7 @@ async def close_database():
     mongo_db = None
     redis_client = None
     redis_pool = None
+    redis_loop = None
 
 
 def get_mongo_client() -> AsyncIOMotorClient:
@@ -435,6 +446,11 @@ def get_redis_client() -> Redis:
     return redis_client
 
 
+def get_redis_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """获取Redis客户端所属的事件循环，未初始化时返回 None"""
+    return redis_loop
+
+
 async def get_database_health() -> dict:
     """获取数据库健康状态"""
     return await db_manager.health_check()
@@ -3,10 +3,16 @@
 用于控制API调用频率，避免超过数据源的限流限制
 """
 import asyncio
+import functools
+import math
+import threading
 import time
 import logging
+import uuid
 from collections import deque
-from typing import Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -97,7 +103,229 @@ class RateLimiter:
         logger.info(f"🔄 {self.name} 统计信息已重置")
 
 
-class TushareRateLimiter(RateLimiter):
+# 优先级通道：交互式分析请求可用全部额度，批量同步任务只能使用部分额度，且在有交互式请求等待时主动让出
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+
+# 当前调用所在的优先级通道：数据源提供器内部获取许可时使用，默认交互式；
+# 批量同步任务通过 bulk_lane / priority_lane 切换（asyncio 子任务与 to_thread 会继承该值）
+_current_priority: ContextVar[str] = ContextVar("rate_limit_priority", default=PRIORITY_INTERACTIVE)
+
+
+def current_priority() -> str:
+    """当前上下文的优先级通道"""
+    return _current_priority.get()
+
+
+@contextmanager
+def priority_lane(priority: str):
+    """在上下文内切换优先级通道"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def bulk_lane(func):
+    """装饰批量同步协程：其中经由数据源提供器发起的接口调用都走批量通道"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with priority_lane(PRIORITY_BULK):
+            return await func(*args, **kwargs)
+    return wrapper
+
+# 分布式滑动窗口
+# KEYS[1]=调用记录ZSET KEYS[2]=交互式等待者ZSET
+# ARGV: time_window, lane_limit, lane, member, waiter_id, waiter_ttl
+# 返回 0=已获得许可 -1=批量通道让行 >0=建议等待毫秒数
+# 使用 Redis 服务端时间，避免各进程时钟偏差
+DISTRIBUTED_ACQUIRE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local lane = ARGV[3]
+local waiter_ttl = tonumber(ARGV[6])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now - waiter_ttl)
+if lane == 'bulk' and redis.call('ZCARD', KEYS[2]) > 0 then
+    return -1
+end
+local count = redis.call('ZCARD', KEYS[1])
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], math.ceil(window * 1000) + 1000)
+    if lane ~= 'bulk' then
+        redis.call('ZREM', KEYS[2], ARGV[5])
+    end
+    return 0
+end
+if lane ~= 'bulk' then
+    redis.call('ZADD', KEYS[2], now, ARGV[5])
+    redis.call('PEXPIRE', KEYS[2], math.ceil(waiter_ttl * 1000) + 1000)
+end
+local oldest = redis.call('ZRANGE', KEYS[1], count - limit, count - limit, 'WITHSCORES')
+return math.max(1, math.ceil((tonumber(oldest[2]) + window - now) * 1000))
+"""
+
+
+class DistributedRateLimiter(RateLimiter):
+    """
+    Redis分布式滑动窗口速率限制器
+
+    API进程、调度任务与分析Worker共享同一份额度（按 key 区分数据源）。
+    分析流程在线程池的独立事件循环中调用时，限流脚本投递到 Redis 客户端所属的事件循环执行。
+    Redis 未初始化或不可用时回退到进程内滑动窗口（线程安全，批量通道同样只能使用 bulk_share 部分额度）。
+    """
+
+    KEY_PREFIX = "rate_limit:"
+    BULK_YIELD_SECONDS = 0.2  # 批量通道让行后的重试间隔
+    WAITER_TTL_SECONDS = 5.0  # 交互式等待标记的有效期（等待期间持续续期）
+
+    def __init__(
+        self,
+        max_calls: int,
+        time_window: float,
+        name: str = "RateLimiter",
+        key: Optional[str] = None,
+        bulk_share: float = 0.7,
+        distributed: bool = True,
+    ):
+        """
+        Args:
+            max_calls: 时间窗口内最大调用次数（所有进程合计）
+            time_window: 时间窗口大小（秒）
+            name: 限制器名称（用于日志）
+            key: Redis 键名后缀，默认使用 name
+            bulk_share: 批量通道可使用的额度比例（0-1），其余额度留给交互式请求
+            distributed: 是否启用 Redis 共享额度
+        """
+        super().__init__(max_calls=max_calls, time_window=time_window, name=name)
+        self.key = key or name
+        self.bulk_share = min(1.0, max(0.0, bulk_share))
+        self.distributed = distributed
+        self._script = None
+        self._script_owner = None
+        self._script_loop = None
+        self._local_lock = threading.Lock()
+        self.lane_calls: Dict[str, int] = {PRIORITY_INTERACTIVE: 0, PRIORITY_BULK: 0}
+        self.backend = "redis" if distributed else "local"
+
+    def _lane_limit(self, priority: str) -> int:
+        if priority == PRIORITY_BULK:
+            return max(1, math.floor(self.max_calls * self.bulk_share))
+        return self.max_calls
+
+    def _get_script(self):
+        """获取当前 Redis 客户端上的限流脚本，Redis 未初始化时返回 None"""
+        if not self.distributed:
+            return None
+        try:
+            from app.core.database import get_redis_client, get_redis_loop
+            redis = get_redis_client()
+        except Exception:
+            return None
+        if self._script_owner is not redis:
+            self._script = redis.register_script(DISTRIBUTED_ACQUIRE_LUA)
+            self._script_owner = redis
+            self._script_loop = get_redis_loop()
+        return self._script
+
+    async def _run_script(self, script, keys, args):
+        """执行限流脚本；当前事件循环不是 Redis 客户端所属的循环时，投递到所属循环执行"""
+        owner = self._script_loop
+        if owner is None or owner is asyncio.get_running_loop():
+            return await script(keys=keys, args=args)
+        if owner.is_closed() or not owner.is_running():
+            raise RuntimeError("Redis事件循环未运行")
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(script(keys=keys, args=args), owner))
+
+    async def _acquire_local(self, priority: str) -> None:
+        """进程内滑动窗口（线程锁只保护记录，等待时不持锁，可在多个事件循环中并发使用）"""
+        lane_limit = self._lane_limit(priority)
+        waited = 0.0
+        while True:
+            with self._local_lock:
+                now = time.time()
+                while self.calls and self.calls[0] <= now - self.time_window:
+                    self.calls.popleft()
+                if len(self.calls) < lane_limit:
+                    self.calls.append(now)
+                    self.total_calls += 1
+                    self.lane_calls[priority] = self.lane_calls.get(priority, 0) + 1
+                    if waited > 0:
+                        self.total_waits += 1
+                        self.total_wait_time += waited
+                    return
+                delay = self.calls[len(self.calls) - lane_limit] + self.time_window - now + 0.01
+            waited += delay
+            logger.debug(f"⏳ {self.name}[{priority}] 达到速率限制，等待 {delay:.2f}秒")
+            await asyncio.sleep(delay)
+
+    async def acquire(self, priority: Optional[str] = None):
+        """
+        获取调用许可
+
+        Args:
+            priority: 优先级通道，interactive（交互式分析）或 bulk（批量同步）；
+                      None 时使用当前上下文的通道（默认 interactive，见 bulk_lane）
+        """
+        priority = priority or current_priority()
+        script = self._get_script()
+        if script is None:
+            self.backend = "local"
+            await self._acquire_local(priority)
+            return
+
+        keys = [f"{self.KEY_PREFIX}{self.key}", f"{self.KEY_PREFIX}{self.key}:interactive_waiters"]
+        waiter_id = uuid.uuid4().hex
+        lane_limit = self._lane_limit(priority)
+        waited = 0.0
+        while True:
+            try:
+                result = int(await self._run_script(script, keys, [
+                    self.time_window, lane_limit, priority, uuid.uuid4().hex, waiter_id, self.WAITER_TTL_SECONDS,
+                ]))
+            except Exception as e:
+                logger.warning(f"⚠️ {self.name} Redis限流失败，回退到进程内限流: {e}")
+                self.backend = "local"
+                await self._acquire_local(priority)
+                return
+
+            if result == 0:
+                break
+            if result < 0:
+                delay = self.BULK_YIELD_SECONDS
+            else:
+                delay = result / 1000 + 0.01
+                if priority != PRIORITY_BULK:
+                    # 等待期间需要续期等待标记，批量通道才会持续让行
+                    delay = min(delay, self.WAITER_TTL_SECONDS / 2)
+            waited += delay
+            logger.debug(f"⏳ {self.name}[{priority}] 达到共享速率限制，等待 {delay:.2f}秒")
+            await asyncio.sleep(delay)
+
+        self.backend = "redis"
+        self.total_calls += 1
+        self.lane_calls[priority] = self.lane_calls.get(priority, 0) + 1
+        if waited > 0:
+            self.total_waits += 1
+            self.total_wait_time += waited
+
+    def get_stats(self) -> dict:
+        """获取统计信息（调用次数为本进程数据）"""
+        stats: Dict[str, Any] = super().get_stats()
+        stats.update({
+            "backend": self.backend,
+            "key": self.key,
+            "bulk_share": self.bulk_share,
+            "lane_calls": dict(self.lane_calls),
+        })
+        return stats
+
+
+class TushareRateLimiter(DistributedRateLimiter):
     """
     Tushare专用速率限制器
     
@@ -113,13 +341,14 @@ class TushareRateLimiter(RateLimiter):
         "vip": {"max_calls": 800, "time_window": 60},       # VIP用户: 800次/分钟
     }
     
-    def __init__(self, tier: str = "standard", safety_margin: float = 0.8):
+    def __init__(self, tier: str = "standard", safety_margin: float = 0.8, **kwargs):
         """
         初始化Tushare速率限制器
         
         Args:
             tier: 积分等级 (free/basic/standard/premium/vip)
             safety_margin: 安全边际（0-1），实际限制为理论限制的百分比
+            **kwargs: 传给 DistributedRateLimiter 的参数（bulk_share、distributed）
         """
         if tier not in self.TIER_LIMITS:
             logger.warning(f"⚠️ 未知的Tushare积分等级: {tier}，使用默认值 'standard'")
@@ -134,7 +363,9 @@ class TushareRateLimiter(RateLimiter):
         super().__init__(
             max_calls=max_calls,
             time_window=time_window,
-            name=f"TushareRateLimiter({tier})"
+            name=f"TushareRateLimiter({tier})",
+            key="tushare",
+            **kwargs
         )
         
         self.tier = tier
@@ -144,69 +375,98 @@ class TushareRateLimiter(RateLimiter):
                    f"{max_calls}次/{time_window}秒 (安全边际: {safety_margin*100:.0f}%)")
 
 
-class AKShareRateLimiter(RateLimiter):
+class AKShareRateLimiter(DistributedRateLimiter):
     """
     AKShare专用速率限制器
     
     AKShare没有明确的限流规则，使用保守的限流策略
     """
     
-    def __init__(self, max_calls: int = 60, time_window: float = 60):
+    def __init__(self, max_calls: int = 60, time_window: float = 60, **kwargs):
         """
         初始化AKShare速率限制器
         
         Args:
             max_calls: 时间窗口内最大调用次数（默认60次/分钟）
             time_window: 时间窗口大小（秒）
+            **kwargs: 传给 DistributedRateLimiter 的参数（bulk_share、distributed）
         """
         super().__init__(
             max_calls=max_calls,
             time_window=time_window,
-            name="AKShareRateLimiter"
+            name="AKShareRateLimiter",
+            key="akshare",
+            **kwargs
         )
 
 
-class BaoStockRateLimiter(RateLimiter):
+class BaoStockRateLimiter(DistributedRateLimiter):
     """
     BaoStock专用速率限制器
     
     BaoStock没有明确的限流规则，使用保守的限流策略
     """
     
-    def __init__(self, max_calls: int = 100, time_window: float = 60):
+    def __init__(self, max_calls: int = 100, time_window: float = 60, **kwargs):
         """
         初始化BaoStock速率限制器
         
         Args:
             max_calls: 时间窗口内最大调用次数（默认100次/分钟）
             time_window: 时间窗口大小（秒）
+            **kwargs: 传给 DistributedRateLimiter 的参数（bulk_share、distributed）
         """
         super().__init__(
             max_calls=max_calls,
             time_window=time_window,
-            name="BaoStockRateLimiter"
+            name="BaoStockRateLimiter",
+            key="baostock",
+            **kwargs
         )
 
 
+def _distributed_options() -> dict:
+    """从应用配置读取分布式限流参数"""
+    from app.core.config import settings
+    return {
+        "distributed": bool(getattr(settings, "RATE_LIMIT_DISTRIBUTED", True)),
+        "bulk_share": float(getattr(settings, "RATE_LIMIT_BULK_SHARE", 0.7)),
+    }
+
+
 # 全局速率限制器实例
 _tushare_limiter: Optional[TushareRateLimiter] = None
 _akshare_limiter: Optional[AKShareRateLimiter] = None
 _baostock_limiter: Optional[BaoStockRateLimiter] = None
 
 
-def get_tushare_rate_limiter(tier: str = "standard", safety_margin: float = 0.8) -> TushareRateLimiter:
-    """获取Tushare速率限制器（单例）"""
+def get_tushare_rate_limiter(tier: Optional[str] = None, safety_margin: Optional[float] = None) -> TushareRateLimiter:
+    """获取Tushare速率限制器（单例），未指定参数时读取 TUSHARE_TIER / TUSHARE_RATE_LIMIT_SAFETY_MARGIN"""
     global _tushare_limiter
     if _tushare_limiter is None:
-        _tushare_limiter = TushareRateLimiter(tier=tier, safety_margin=safety_margin)
+        from app.core.config import settings
+        if tier is None:
+            tier = getattr(settings, "TUSHARE_TIER", "standard")
+        if safety_margin is None:
+            safety_margin = float(getattr(settings, "TUSHARE_RATE_LIMIT_SAFETY_MARGIN", 0.8))
+        _tushare_limiter = TushareRateLimiter(tier=tier, safety_margin=safety_margin, **_distributed_options())
     return _tushare_limiter
 
 
-def get_akshare_rate_limiter() -> AKShareRateLimiter:
-    """获取AKShare速率限制器（单例）"""
+def get_akshare_rate_limiter() -> Optional[AKShareRateLimiter]:
+    """
+    获取AKShare速率限制器（单例）
+
+    AKSHARE_RATE_LIMIT_PER_MINUTE 为 0（默认）时返回 None：AKShare 的 HTTP 请求已由
+    TA_AKSHARE_HOST_RATES 按主机限速（见 akshare_http），不再叠加一层按调用次数的限流
+    """
     global _akshare_limiter
     if _akshare_limiter is None:
-        _akshare_limiter = AKShareRateLimiter()
+        from app.core.config import settings
+        max_calls = int(getattr(settings, "AKSHARE_RATE_LIMIT_PER_MINUTE", 0))
+        if max_calls <= 0:
+            return None
+        _akshare_limiter = AKShareRateLimiter(max_calls=max_calls, **_distributed_options())
     return _akshare_limiter
 
 
@@ -214,10 +474,24 @@ def get_baostock_rate_limiter() -> BaoStockRateLimiter:
     """获取BaoStock速率限制器（单例）"""
     global _baostock_limiter
     if _baostock_limiter is None:
-        _baostock_limiter = BaoStockRateLimiter()
+        from app.core.config import settings
+        _baostock_limiter = BaoStockRateLimiter(
+            max_calls=int(getattr(settings, "BAOSTOCK_RATE_LIMIT_PER_MINUTE", 600)), **_distributed_options()
+        )
     return _baostock_limiter
 
 
+def get_rate_limiter(source: str) -> Optional[DistributedRateLimiter]:
+    """按数据源名称（tushare/akshare/baostock）获取速率限制器，未知数据源返回 None"""
+    getters = {
+        "tushare": get_tushare_rate_limiter,
+        "akshare": get_akshare_rate_limiter,
+        "baostock": get_baostock_rate_limiter,
+    }
+    getter = getters.get(source)
+    return getter() if getter else None
+
+
 def reset_all_limiters():
     """重置所有速率限制器"""
     global _tushare_limiter, _akshare_limiter, _baostock_limiter
@@ -230,6 +230,13 @@ async def lifespan(app: FastAPI):
 
     await init_db()
 
+    # 加载配置快照并监听配置变更（数据源优先级等热路径配置不再逐次查询数据库）
+    from app.core.config_snapshot import config_snapshot_store
+    try:
+        await config_snapshot_store.start()
+    except Exception as e:
+        logger.warning(f"⚠️ 配置快照监听启动失败，将按轮询间隔刷新: {e}")
+
     # Demo/preview startup fast path: skip heavy scheduler/data-sync initialization so
     # the service can pass platform health checks quickly (e.g., Railway).
     import os
@@ -245,6 +252,7 @@ async def lifespan(app: FastAPI):
                 user_service.close()
             except Exception as e:
                 logger.warning(f"UserService cleanup error: {e}")
+            await config_snapshot_store.stop()
             await close_db()
             logger.info("TradingAgents FastAPI backend stopped (minimal startup mode)")
         return
@@ -616,6 +624,7 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"UserService cleanup error: {e}")
 
+        await config_snapshot_store.stop()
         await close_db()
         logger.info("TradingAgents FastAPI backend stopped")
 
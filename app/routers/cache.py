@@ -40,7 +40,9 @@ async def get_cache_stats(current_user: dict = Depends(get_current_user)):
                 "maxSize": 1024 * 1024 * 1024,  # 1GB
                 "stockDataCount": stats.get('stock_data_count', 0),
                 "newsDataCount": stats.get('news_count', 0),
-                "analysisDataCount": stats.get('fundamentals_count', 0)
+                "analysisDataCount": stats.get('fundamentals_count', 0),
+                # 进程内 L1 缓存的命中/未命中/淘汰计数（文件缓存模式下为 None）
+                "l1Cache": stats.get('l1_cache')
             },
             message="获取缓存统计成功"
         )
@@ -14,6 +14,14 @@ from pydantic import BaseModel
 from .auth_db import get_current_user
 from ..core.database import get_mongo_db
 from ..utils.timezone import to_config_tz
+from ..utils.report_search import (
+    build_keyset_query,
+    build_keyword_query,
+    combine_queries,
+    encode_cursor,
+    find_report_page,
+    report_count_cache,
+)
 import logging
 
 logger = logging.getLogger("webapi")
@@ -125,6 +133,7 @@ async def get_reports_list(
     start_date: Optional[str] = Query(None, description="开始日期"),
     end_date: Optional[str] = Query(None, description="结束日期"),
     stock_code: Optional[str] = Query(None, description="股票代码"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor），传入时忽略 page"),
     user: dict = Depends(get_current_user)
 ):
     """获取分析报告列表"""
@@ -136,13 +145,9 @@ async def get_reports_list(
         # 构建查询条件
         query = {}
 
-        # 搜索关键词
-        if search_keyword:
-            query["$or"] = [
-                {"stock_symbol": {"$regex": search_keyword, "$options": "i"}},
-                {"analysis_id": {"$regex": search_keyword, "$options": "i"}},
-                {"summary": {"$regex": search_keyword, "$options": "i"}}
-            ]
+        # 搜索关键词（检索词元索引，见 app/utils/report_search.py）
+        if search_keyword and search_keyword.strip():
+            query.update(build_keyword_query(search_keyword))
 
         # 市场筛选
         if market_filter:
@@ -163,15 +168,28 @@ async def get_reports_list(
 
         logger.info(f"📊 查询条件: {query}")
 
-        # 计算总数
-        total = await db.analysis_reports.count_documents(query)
+        # 计算总数（无过滤时为估算值，有过滤时短期缓存）
+        total = await report_count_cache.count(db.analysis_reports, query)
 
-        # 分页查询
-        skip = (page - 1) * page_size
-        cursor = db.analysis_reports.find(query).sort("created_at", -1).skip(skip).limit(page_size)
+        # 分页查询：传入游标时按 (created_at, _id) 键集分页，否则兼容旧的页码分页
+        if cursor:
+            try:
+                page_query = combine_queries(query, build_keyset_query(cursor))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            skip = 0
+        else:
+            page_query = query
+            skip = (page - 1) * page_size
+
+        # 多取一条用于判断是否还有下一页
+        docs = await find_report_page(db.analysis_reports, page_query, skip, page_size + 1)
+        has_more = len(docs) > page_size
+        docs = docs[:page_size]
+        next_cursor = encode_cursor(docs[-1].get("created_at"), docs[-1]["_id"]) if has_more else None
 
         reports = []
-        async for doc in cursor:
+        for doc in docs:
             # 转换为前端需要的格式
             stock_code = doc.get("stock_symbol", "")
             # 🔥 优先使用MongoDB中保存的股票名称，如果没有则查询
@@ -212,7 +230,7 @@ async def get_reports_list(
                 "analysts": doc.get("analysts", []),
                 "research_depth": doc.get("research_depth", 1),
                 "summary": doc.get("summary", ""),
-                "file_size": len(str(doc.get("reports", {}))),  # 估算大小
+                "file_size": doc.get("report_size", 0),  # 报告内容大小（字节）
                 "source": doc.get("source", "unknown"),
                 "task_id": doc.get("task_id", "")
             }
@@ -226,11 +244,15 @@ async def get_reports_list(
                 "reports": reports,
                 "total": total,
                 "page": page,
-                "page_size": page_size
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+                "has_more": has_more
             },
             "message": "报告列表获取成功"
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ 获取报告列表失败: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -412,6 +434,8 @@ async def delete_report(
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="报告不存在")
 
+        report_count_cache.invalidate()
+
         logger.info(f"✅ 报告删除成功: {report_id}")
 
         return {
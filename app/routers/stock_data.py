@@ -2,6 +2,7 @@
 股票数据API路由 - 基于扩展数据模型
 提供标准化的股票数据访问接口
 """
+from datetime import datetime
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi import status
@@ -340,6 +341,64 @@ async def get_market_summary(
         )
 
 
+@router.get("/intraday/{symbol}")
+async def get_intraday_bars(
+    symbol: str,
+    period: int = Query(1, description="K线周期（分钟），支持 1/5/15/30/60，需在 INTRADAY_BAR_PERIODS 中启用"),
+    start: Optional[datetime] = Query(None, description="开始时间（ISO格式，含）"),
+    end: Optional[datetime] = Query(None, description="结束时间（ISO格式，含）"),
+    limit: int = Query(240, ge=1, le=2000, description="最多返回的K线数量（取最近的K线）"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    获取日内分钟K线（由行情采集快照聚合，直接读取本地存储）
+
+    Args:
+        symbol: 股票代码 (6位A股代码)
+        period: K线周期（分钟）
+
+    Returns:
+        dict: {
+            "success": True,
+            "data": {
+                "symbol": "000001",
+                "period": 5,
+                "bars": [{"time": "2025-01-02T09:35:00+08:00", "open": ..., "high": ..., "low": ...,
+                          "close": ..., "volume": ..., "amount": ...}]
+            },
+            "message": "获取成功"
+        }
+    """
+    from app.services.intraday_bar_service import get_intraday_bar_service
+
+    service = get_intraday_bar_service()
+    if period not in service.periods:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的K线周期: {period}，可用周期: {list(service.periods)}"
+        )
+
+    try:
+        code = symbol.strip().split(".")[0].zfill(6)
+        bars = await service.get_bars(code, period=period, start=start, end=end, limit=limit)
+
+        return {
+            "success": True,
+            "data": {
+                "symbol": code,
+                "period": period,
+                "bars": bars
+            },
+            "message": "获取成功" if bars else "暂无日内K线数据"
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取日内K线失败: {str(e)}"
+        )
+
+
 @router.get("/sync-status/quotes")
 async def get_quotes_sync_status(
     current_user: dict = Depends(get_current_user)
@@ -28,6 +28,17 @@ def _zfill_code(code: str) -> str:
         return str(code)
 
 
+def _enabled_a_share_sources() -> List[str]:
+    """启用的A股数据源（按优先级降序），来自进程内配置快照"""
+    from app.core.config_snapshot import get_config_snapshot
+
+    enabled_sources = [
+        str(ds.get('type', '')).lower() for ds in get_config_snapshot().enabled_data_sources()
+        if str(ds.get('type', '')).lower() in ['tushare', 'akshare', 'baostock']
+    ]
+    return enabled_sources or ['tushare', 'akshare', 'baostock']
+
+
 def _detect_market_and_code(code: str) -> Tuple[str, str]:
     """
     检测股票代码的市场类型并标准化代码
@@ -121,19 +132,8 @@ async def get_quote(
     else:
         logger.info(f"  ❌ 未找到数据")
 
-    # 🔥 基础信息 - 按数据源优先级查询
-    from app.core.unified_config import UnifiedConfigManager
-    config = UnifiedConfigManager()
-    data_source_configs = await config.get_data_source_configs_async()
-
-    # 提取启用的数据源，按优先级排序
-    enabled_sources = [
-        ds.type.lower() for ds in data_source_configs
-        if ds.enabled and ds.type.lower() in ['tushare', 'akshare', 'baostock']
-    ]
-
-    if not enabled_sources:
-        enabled_sources = ['tushare', 'akshare', 'baostock']
+    # 🔥 基础信息 - 按数据源优先级查询（配置快照，无数据库访问）
+    enabled_sources = _enabled_a_share_sources()
 
     # 按优先级查询基础信息
     b = None
@@ -292,19 +292,8 @@ async def get_fundamentals(
     # 🔥 按数据源优先级查询，而不是按时间戳，避免混用不同数据源的数据
     financial_data = None
     try:
-        # 获取数据源优先级配置
-        from app.core.unified_config import UnifiedConfigManager
-        config = UnifiedConfigManager()
-        data_source_configs = await config.get_data_source_configs_async()
-
-        # 提取启用的数据源，按优先级排序
-        enabled_sources = [
-            ds.type.lower() for ds in data_source_configs
-            if ds.enabled and ds.type.lower() in ['tushare', 'akshare', 'baostock']
-        ]
-
-        if not enabled_sources:
-            enabled_sources = ['tushare', 'akshare', 'baostock']
+        # 获取数据源优先级配置（配置快照，无数据库访问）
+        enabled_sources = _enabled_a_share_sources()
 
         # 按数据源优先级查询财务数据
         for data_source in enabled_sources:
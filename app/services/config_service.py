@@ -41,6 +41,14 @@ class ConfigService:
 
     # ==================== 市场分类管理 ====================
 
+    async def _notify_config_changed(self):
+        """配置写入后刷新进程内配置快照并通知其他进程"""
+        try:
+            from app.core.config_snapshot import publish_config_invalidation
+            await publish_config_invalidation()
+        except Exception as e:
+            logger.warning(f"⚠️ 配置快照刷新通知失败: {e}")
+
     async def get_market_categories(self) -> List[MarketCategory]:
         """获取所有市场分类"""
         try:
@@ -197,6 +205,7 @@ class ConfigService:
                 return False
 
             await groupings_collection.insert_one(grouping.model_dump())
+            await self._notify_config_changed()
             return True
         except Exception as e:
             print(f"❌ 添加数据源到分类失败: {e}")
@@ -212,6 +221,8 @@ class ConfigService:
                 "data_source_name": data_source_name,
                 "market_category_id": category_id
             })
+            if result.deleted_count > 0:
+                await self._notify_config_changed()
             return result.deleted_count > 0
         except Exception as e:
             print(f"❌ 从分类中移除数据源失败: {e}")
@@ -280,6 +291,8 @@ class ConfigService:
                     else:
                         logger.warning(f"⚠️ [优先级同步] 未找到匹配的数据源配置: {data_source_name}")
 
+            if result.modified_count > 0:
+                await self._notify_config_changed()
             return result.modified_count > 0
         except Exception as e:
             logger.error(f"❌ 更新数据源分组关系失败: {e}")
@@ -352,6 +365,7 @@ class ConfigService:
             else:
                 print(f"⚠️ [优先级同步] 未找到激活的系统配置")
 
+            await self._notify_config_changed()
             return True
         except Exception as e:
             print(f"❌ 更新分类数据源排序失败: {e}")
@@ -561,6 +575,7 @@ class ConfigService:
                 # 暂时跳过统一配置同步，避免冲突
                 # unified_config.sync_to_legacy_format(config)
 
+                await self._notify_config_changed()
                 return True
             else:
                 print("❌ 配置保存验证失败")
@@ -1335,50 +1350,38 @@ class ConfigService:
                     }
 
             elif ds_type == "baostock":
-                # BaoStock 不需要 API Key，直接测试登录
+                # BaoStock 不需要 API Key，通过共享会话池测试（会话未登录时自动登录，不影响其他调用方的登录态）
                 try:
-                    import baostock as bs
-                    # 测试登录
-                    lg = bs.login()
-
-                    if lg.error_code == '0':
-                        # 登录成功，测试获取数据
-                        try:
-                            # 获取交易日历（轻量级测试）
-                            rs = bs.query_trade_dates(start_date="2024-01-01", end_date="2024-01-01")
-
-                            if rs.error_code == '0':
-                                response_time = time.time() - start_time
-                                bs.logout()
-                                return {
-                                    "success": True,
-                                    "message": f"成功连接到 BaoStock 数据源",
-                                    "response_time": response_time,
-                                    "details": {
-                                        "type": ds_type,
-                                        "test_result": "登录成功，获取交易日历成功"
-                                    }
-                                }
-                            else:
-                                bs.logout()
-                                return {
-                                    "success": False,
-                                    "message": f"BaoStock 数据获取失败: {rs.error_msg}",
-                                    "response_time": time.time() - start_time,
-                                    "details": None
-                                }
-                        except Exception as e:
-                            bs.logout()
-                            return {
-                                "success": False,
-                                "message": f"BaoStock 数据获取异常: {str(e)}",
-                                "response_time": time.time() - start_time,
-                                "details": None
+                    import baostock  # noqa: F401
+                    from tradingagents.dataflows.providers.china.baostock_session import (
+                        BaoStockQueryError,
+                        get_baostock_session_pool,
+                    )
+                    try:
+                        # 获取交易日历（轻量级测试）
+                        await get_baostock_session_pool().query(
+                            "query_trade_dates", start_date="2024-01-01", end_date="2024-01-01"
+                        )
+                        return {
+                            "success": True,
+                            "message": f"成功连接到 BaoStock 数据源",
+                            "response_time": time.time() - start_time,
+                            "details": {
+                                "type": ds_type,
+                                "test_result": "登录成功，获取交易日历成功"
                             }
-                    else:
+                        }
+                    except BaoStockQueryError as e:
+                        return {
+                            "success": False,
+                            "message": f"BaoStock 数据获取失败: {e.error_msg}",
+                            "response_time": time.time() - start_time,
+                            "details": None
+                        }
+                    except Exception as e:
                         return {
                             "success": False,
-                            "message": f"BaoStock 登录失败: {lg.error_msg}",
+                            "message": f"BaoStock 数据获取异常: {str(e)}",
                             "response_time": time.time() - start_time,
                             "details": None
                         }
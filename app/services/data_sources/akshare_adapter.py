@@ -206,14 +206,16 @@ class AKShareAdapter(DataSourceAdapter):
             return None
 
         try:
-            import akshare as ak  # type: ignore
+            from tradingagents.dataflows.cache.spot_snapshot import (
+                A_SHARE_SPOT_EM, A_SHARE_SPOT_SINA, get_spot_snapshot,
+            )
 
-            # 根据 source 参数选择接口
+            # 根据 source 参数选择接口（进程级全市场快照，刷新周期内共享）
             if source == "sina":
-                df = ak.stock_zh_a_spot()  # 新浪财经接口
+                df = get_spot_snapshot(A_SHARE_SPOT_SINA).get_frame()  # 新浪财经接口
                 logger.info("使用 AKShare 新浪财经接口获取实时行情")
             else:  # 默认使用东方财富
-                df = ak.stock_zh_a_spot_em()  # 东方财富接口
+                df = get_spot_snapshot(A_SHARE_SPOT_EM).get_frame()  # 东方财富接口
                 logger.info("使用 AKShare 东方财富接口获取实时行情")
 
             if df is None or getattr(df, "empty", True):
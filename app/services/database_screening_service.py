@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from app.core.database import get_mongo_db
+from app.services.indicator_snapshot_service import COLLECTION_NAME as INDICATOR_COLLECTION, INDICATOR_FIELDS
 # from app.models.screening import ScreeningCondition  # 避免循环导入
 
 logger = logging.getLogger(__name__)
@@ -53,6 +54,9 @@ class DatabaseScreeningService:
             "volume": "volume",                # 成交量
         }
         
+        # 技术指标字段（从 stock_indicators_daily 最新快照下推查询）
+        self.indicator_fields = set(INDICATOR_FIELDS)
+
         # 支持的操作符
         self.operators = {
             ">": "$gt",
@@ -77,12 +81,20 @@ class DatabaseScreeningService:
         Returns:
             bool: 是否可以处理
         """
+        has_snapshots = None
         for condition in conditions:
             field = condition.get("field") if isinstance(condition, dict) else condition.field
             operator = condition.get("operator") if isinstance(condition, dict) else condition.operator
             
+            # 技术指标字段需要已有指标快照
+            if field in self.indicator_fields and field not in self.basic_fields:
+                if has_snapshots is None:
+                    has_snapshots = await self._has_indicator_snapshots()
+                if not has_snapshots:
+                    logger.debug(f"字段 {field} 暂无指标快照，不支持数据库筛选")
+                    return False
             # 检查字段是否支持
-            if field not in self.basic_fields:
+            elif field not in self.basic_fields:
                 logger.debug(f"字段 {field} 不支持数据库筛选")
                 return False
             
@@ -143,12 +155,22 @@ class DatabaseScreeningService:
                 source = enabled_sources[0] if enabled_sources else 'tushare'
                 logger.info(f"✅ [database_screening] 最终使用的数据源: {source}")
 
+            # 技术指标条件下推到指标快照集合，其余条件查询视图
+            indicator_conditions = [c for c in conditions if self._condition_field(c) in self.indicator_fields
+                                    and self._condition_field(c) not in self.basic_fields]
+            basic_conditions = [c for c in conditions if c not in indicator_conditions]
+
             # 构建查询条件（现在视图已包含实时行情数据，可以直接查询所有字段）
-            query = await self._build_query(conditions)
+            query = await self._build_query(basic_conditions)
 
             # 🔥 添加数据源筛选
             query["source"] = source
 
+            snapshots: Dict[str, Dict[str, Any]] = {}
+            if indicator_conditions:
+                snapshots = await self._query_indicator_snapshots(indicator_conditions, source)
+                query["code"] = {"$in": list(snapshots.keys())}
+
             logger.info(f"📋 数据库查询条件: {query}")
 
             # 构建排序条件
@@ -173,6 +195,9 @@ class DatabaseScreeningService:
             async for doc in cursor:
                 # 转换结果格式
                 result = self._format_result(doc)
+                snap = snapshots.get(doc.get("code"))
+                if snap:
+                    result.update({f: snap[f] for f in INDICATOR_FIELDS if snap.get(f) is not None})
                 results.append(result)
                 codes.append(doc.get("code"))
 
@@ -188,6 +213,60 @@ class DatabaseScreeningService:
             logger.error(f"❌ 数据库筛选失败: {e}")
             raise Exception(f"数据库筛选失败: {str(e)}")
     
+    @staticmethod
+    def _condition_field(condition: Any) -> Optional[str]:
+        return condition.get("field") if isinstance(condition, dict) else condition.field
+
+    async def _has_indicator_snapshots(self) -> bool:
+        """指标快照集合中是否已有数据"""
+        try:
+            db = get_mongo_db()
+            return await db[INDICATOR_COLLECTION].find_one({}, {"_id": 1}) is not None
+        except Exception as e:
+            logger.warning(f"⚠️ 检查指标快照失败: {e}")
+            return False
+
+    async def _query_indicator_snapshots(
+        self,
+        conditions: List[Dict[str, Any]],
+        source: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        在最新交易日的指标快照上执行技术指标条件
+
+        Args:
+            conditions: 技术指标条件（字段均在 indicator_fields 中）
+            source: 数据源
+
+        Returns:
+            Dict[str, Dict]: {股票代码: 快照}，仅包含满足全部条件的股票
+        """
+        db = get_mongo_db()
+        collection = db[INDICATOR_COLLECTION]
+
+        latest = await collection.find_one({"data_source": source}, {"trade_date": 1}, sort=[("trade_date", -1)])
+        if not latest:
+            logger.warning(f"⚠️ [database_screening] 数据源 {source} 没有指标快照")
+            return {}
+
+        query = {"data_source": source, "trade_date": latest["trade_date"]}
+        for condition in conditions:
+            field = self._condition_field(condition)
+            operator = condition.get("operator") if isinstance(condition, dict) else condition.operator
+            value = condition.get("value") if isinstance(condition, dict) else condition.value
+            if operator == "between" and isinstance(value, list) and len(value) == 2:
+                query.setdefault(field, {}).update({"$gte": value[0], "$lte": value[1]})
+            elif operator in (">", "<", ">=", "<=", "==", "!="):
+                query.setdefault(field, {})[self.operators[operator]] = value
+
+        logger.info(f"📋 指标快照查询条件: {query}")
+        projection = {"_id": 0, "symbol": 1, **{f: 1 for f in INDICATOR_FIELDS}}
+        snapshots = {}
+        async for doc in collection.find(query, projection):
+            snapshots[doc.pop("symbol")] = doc
+        logger.info(f"✅ 指标快照命中 {len(snapshots)} 只股票（{latest['trade_date']}）")
+        return snapshots
+
     async def _build_query(self, conditions: List[Dict[str, Any]]) -> Dict[str, Any]:
         """构建MongoDB查询条件"""
         query = {}
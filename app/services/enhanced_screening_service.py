@@ -3,6 +3,7 @@
 结合数据库优化和传统筛选方式，提供高效的股票筛选功能
 """
 
+import asyncio
 import logging
 import time
 from typing import Any, Dict, List, Optional, Tuple
@@ -65,9 +66,11 @@ class EnhancedScreeningService:
             analysis = self._analyze_conditions(conditions)
 
             # 决定使用哪种筛选方式
+            # 技术指标条件在已有指标快照时也可下推到数据库
             if (use_database_optimization and
                 analysis["can_use_database"] and
-                not analysis["needs_technical_indicators"]):
+                (not analysis["needs_technical_indicators"]
+                 or await self.db_service.can_handle_conditions(conditions))):
 
                 # 使用数据库优化筛选
                 result = await self._screen_with_database(
@@ -197,8 +200,8 @@ class EnhancedScreeningService:
             order_by=order_by
         )
 
-        # 执行传统筛选
-        result = self.traditional_service.run(traditional_conditions, params)
+        # 执行传统筛选（全市场面板计算为同步阻塞操作，放到线程池避免阻塞事件循环）
+        result = await asyncio.to_thread(self.traditional_service.run, traditional_conditions, params)
 
         return result
 
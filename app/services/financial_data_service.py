@@ -161,6 +161,58 @@ class FinancialDataService:
             logger.error(f"❌ 保存财务数据失败 {symbol}: {e}")
             return 0
     
+    async def save_financial_data_batch(
+        self,
+        financial_data_by_symbol: Dict[str, Dict[str, Any]],
+        data_source: str,
+        market: str = "CN",
+        batch_size: int = 1000
+    ) -> int:
+        """
+        批量保存多只股票的财务数据（按报告期全市场同步使用）
+
+        Args:
+            financial_data_by_symbol: {股票代码: 财务数据字典}
+            data_source: 数据源 (tushare/akshare/baostock)
+            market: 市场类型 (CN/HK/US)
+            batch_size: 每次 bulk_write 的操作数
+
+        Returns:
+            写入（新增或更新）的记录数量
+        """
+        if self.db is None:
+            await self.initialize()
+
+        collection = self.db[self.collection_name]
+        operations = []
+        for symbol, financial_data in financial_data_by_symbol.items():
+            data_item = self._standardize_financial_data(
+                symbol, financial_data, data_source, market,
+                financial_data.get("report_period"), financial_data.get("report_type", "quarterly")
+            )
+            if not data_item or not data_item.get("report_period"):
+                continue
+            operations.append(ReplaceOne(
+                filter={
+                    "symbol": data_item["symbol"],
+                    "report_period": data_item["report_period"],
+                    "data_source": data_item["data_source"]
+                },
+                replacement=data_item,
+                upsert=True
+            ))
+
+        saved = 0
+        for i in range(0, len(operations), batch_size):
+            try:
+                result = await collection.bulk_write(operations[i:i + batch_size], ordered=False)
+                saved += result.upserted_count + result.modified_count
+            except Exception as e:
+                logger.error(f"❌ 批量保存财务数据失败 (第{i // batch_size + 1}批): {e}")
+
+        logger.info(f"✅ 批量保存财务数据完成: {saved}/{len(operations)}条记录 (数据源: {data_source})")
+        return saved
+
     async def get_financial_data(
         self,
         symbol: str,
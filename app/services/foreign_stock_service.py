@@ -238,8 +238,7 @@ class ForeignStockService:
 
     async def _get_source_priority(self, market: str) -> List[str]:
         """
-        从数据库获取数据源优先级（统一方法）
-        🔥 复用 UnifiedStockService 的实现
+        从配置快照获取数据源优先级（统一方法，热路径无数据库访问）
         """
         market_category_map = {
             "CN": "a_shares",
@@ -250,18 +249,13 @@ class ForeignStockService:
         market_category_id = market_category_map.get(market)
 
         try:
-            # 从 datasource_groupings 集合查询
-            groupings = await self.db.datasource_groupings.find({
-                "market_category_id": market_category_id,
-                "enabled": True
-            }).sort("priority", -1).to_list(length=None)
-
-            if groupings:
-                priority_list = [g["data_source_name"] for g in groupings]
-                logger.info(f"📊 [{market}数据源优先级] 从数据库读取: {priority_list}")
+            from app.core.config_snapshot import get_config_snapshot
+            priority_list = list(get_config_snapshot().source_priority(market_category_id))
+            if priority_list:
+                logger.debug(f"📊 [{market}数据源优先级] 从配置快照读取: {priority_list}")
                 return priority_list
         except Exception as e:
-            logger.warning(f"⚠️ [{market}数据源优先级] 从数据库读取失败: {e}，使用默认顺序")
+            logger.warning(f"⚠️ [{market}数据源优先级] 读取配置快照失败: {e}，使用默认顺序")
 
         # 默认优先级
         default_priority = {
@@ -7,6 +7,7 @@ import asyncio
 import logging
 from datetime import datetime, date
 from typing import Dict, Any, List, Optional, Union
+import numpy as np
 import pandas as pd
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
@@ -14,6 +15,10 @@ from app.core.database import get_database
 
 logger = logging.getLogger(__name__)
 
+# 每次 bulk_write 的操作数与并发批次数
+BULK_WRITE_BATCH_SIZE = 1000
+BULK_WRITE_CONCURRENCY = 4
+
 
 class HistoricalDataService:
     """统一历史数据管理服务"""
@@ -104,18 +109,7 @@ class HistoricalDataService:
             # ⏱️ 性能监控：单位转换
             convert_start = datetime.now()
             # 🔥 在 DataFrame 层面做单位转换（向量化操作，比逐行快得多）
-            if data_source == "tushare":
-                # 成交额：千元 -> 元
-                if 'amount' in data.columns:
-                    data['amount'] = data['amount'] * 1000
-                elif 'turnover' in data.columns:
-                    data['turnover'] = data['turnover'] * 1000
-
-                # 成交量：手 -> 股
-                if 'volume' in data.columns:
-                    data['volume'] = data['volume'] * 100
-                elif 'vol' in data.columns:
-                    data['vol'] = data['vol'] * 100
+            self._convert_units(data, data_source)
 
             # 🔥 港股/美股数据：添加 pre_close 字段（从前一天的 close 获取）
             if market in ["HK", "US"] and 'pre_close' not in data.columns and 'close' in data.columns:
@@ -125,64 +119,22 @@ class HistoricalDataService:
 
             convert_duration = (datetime.now() - convert_start).total_seconds()
 
-            # ⏱️ 性能监控：构建操作列表
+            # ⏱️ 性能监控：构建文档（列式标准化，避免逐行 iterrows）
             prepare_start = datetime.now()
-            # 准备批量操作
-            operations = []
-            saved_count = 0
-            batch_size = 200  # 进一步减小批量大小，避免超时（从500改为200）
-
-            for date_index, row in data.iterrows():
-                try:
-                    # 标准化数据（传递日期索引）
-                    doc = self._standardize_record(symbol, row, data_source, market, period, date_index)
-
-                    # 创建upsert操作
-                    filter_doc = {
-                        "symbol": doc["symbol"],
-                        "trade_date": doc["trade_date"],
-                        "data_source": doc["data_source"],
-                        "period": doc["period"]
-                    }
-
-                    from pymongo import ReplaceOne
-                    operations.append(ReplaceOne(
-                        filter=filter_doc,
-                        replacement=doc,
-                        upsert=True
-                    ))
-
-                    # 批量执行（每200条）
-                    if len(operations) >= batch_size:
-                        batch_write_start = datetime.now()
-                        batch_saved = await self._execute_bulk_write_with_retry(symbol, operations)
-                        batch_write_duration = (datetime.now() - batch_write_start).total_seconds()
-                        logger.debug(f"   批量写入 {len(operations)} 条，耗时 {batch_write_duration:.2f}秒")
-                        saved_count += batch_saved
-                        operations = []
-
-                except Exception as e:
-                    # 获取日期信息用于错误日志
-                    date_str = str(date_index) if hasattr(date_index, '__str__') else 'unknown'
-                    logger.error(f"❌ 处理记录失败 {symbol} {date_str}: {e}")
-                    continue
-
+            documents = self._standardize_frame(data, data_source, market, period, symbol=symbol)
+            operations = self._build_upsert_operations(documents)
             prepare_duration = (datetime.now() - prepare_start).total_seconds()
 
-            # ⏱️ 性能监控：最后一批写入
-            final_write_start = datetime.now()
-            # 执行剩余操作
-            if operations:
-                saved_count += await self._execute_bulk_write_with_retry(
-                    symbol, operations
-                )
-            final_write_duration = (datetime.now() - final_write_start).total_seconds()
+            # ⏱️ 性能监控：批量写入（无序、多批并发）
+            write_start = datetime.now()
+            saved_count = await self._bulk_write_concurrently(symbol, operations)
+            write_duration = (datetime.now() - write_start).total_seconds()
 
             total_duration = (datetime.now() - total_start).total_seconds()
             logger.info(
                 f"✅ {symbol} 历史数据保存完成: {saved_count}条记录，"
                 f"总耗时 {total_duration:.2f}秒 "
-                f"(转换: {convert_duration:.3f}秒, 准备: {prepare_duration:.2f}秒, 最后写入: {final_write_duration:.2f}秒)"
+                f"(转换: {convert_duration:.3f}秒, 准备: {prepare_duration:.3f}秒, 写入: {write_duration:.2f}秒)"
             )
             return saved_count
             
@@ -190,6 +142,235 @@ class HistoricalDataService:
             logger.error(f"❌ 保存历史数据失败 {symbol}: {e}")
             return 0
 
+    def _convert_units(self, data: pd.DataFrame, data_source: str) -> None:
+        """Tushare 单位转换（原地修改）：成交额 千元 -> 元，成交量 手 -> 股"""
+        if data_source != "tushare":
+            return
+
+        # 成交额：千元 -> 元
+        if 'amount' in data.columns:
+            data['amount'] = data['amount'] * 1000
+        elif 'turnover' in data.columns:
+            data['turnover'] = data['turnover'] * 1000
+
+        # 成交量：手 -> 股
+        if 'volume' in data.columns:
+            data['volume'] = data['volume'] * 100
+        elif 'vol' in data.columns:
+            data['vol'] = data['vol'] * 100
+
+    async def save_cross_section(
+        self,
+        data: pd.DataFrame,
+        data_source: str,
+        market: str = "CN",
+        period: str = "daily",
+        batch_size: int = None
+    ) -> int:
+        """
+        批量保存全市场截面数据（同一交易日的多只股票）
+
+        Args:
+            data: 截面数据DataFrame，必须包含 symbol 列
+            data_source: 数据源
+            market: 市场类型
+            period: 数据周期
+            batch_size: 每次 bulk_write 的操作数，默认 BULK_WRITE_BATCH_SIZE
+
+        Returns:
+            保存的记录数量
+        """
+        if self.collection is None:
+            await self.initialize()
+
+        if data is None or data.empty or 'symbol' not in data.columns:
+            logger.warning("⚠️ 截面数据为空或缺少 symbol 列，跳过保存")
+            return 0
+
+        start = datetime.now()
+        self._convert_units(data, data_source)
+        documents = self._standardize_frame(data, data_source, market, period)
+        operations = self._build_upsert_operations(documents)
+        saved_count = await self._bulk_write_concurrently("cross_section", operations, batch_size=batch_size)
+
+        duration = (datetime.now() - start).total_seconds()
+        logger.info(f"✅ 截面数据保存完成: {saved_count}/{len(documents)}条记录，耗时 {duration:.2f}秒")
+        return saved_count
+
+    @staticmethod
+    def _build_upsert_operations(documents: List[Dict[str, Any]]) -> List:
+        """按唯一键 (symbol, trade_date, data_source, period) 构建 upsert 操作"""
+        from pymongo import ReplaceOne
+
+        return [
+            ReplaceOne(
+                filter={
+                    "symbol": doc["symbol"],
+                    "trade_date": doc["trade_date"],
+                    "data_source": doc["data_source"],
+                    "period": doc["period"]
+                },
+                replacement=doc,
+                upsert=True
+            )
+            for doc in documents
+        ]
+
+    async def _bulk_write_concurrently(
+        self,
+        symbol: str,
+        operations: List,
+        batch_size: int = None,
+        concurrency: int = None
+    ) -> int:
+        """将操作切分为较大的无序批次，并发执行 bulk_write"""
+        if not operations:
+            return 0
+
+        batch_size = batch_size or BULK_WRITE_BATCH_SIZE
+        semaphore = asyncio.Semaphore(concurrency or BULK_WRITE_CONCURRENCY)
+
+        async def _write(batch: List) -> int:
+            async with semaphore:
+                return await self._execute_bulk_write_with_retry(symbol, batch)
+
+        results = await asyncio.gather(*[
+            _write(operations[i:i + batch_size])
+            for i in range(0, len(operations), batch_size)
+        ])
+        return sum(results)
+
+    @staticmethod
+    def _coalesce(data: pd.DataFrame, *columns: str) -> Optional[pd.Series]:
+        """
+        按列优先级取值，等价于逐行的 row.get(a) or row.get(b)
+
+        前一列为空、0 或空字符串时取后一列（后一列不存在时为空）；所有列都不存在时返回 None
+        """
+        if not any(column in data.columns for column in columns):
+            return None
+
+        result = data[columns[0]] if columns[0] in data.columns else None
+        for column in columns[1:]:
+            series = data[column] if column in data.columns else None
+            if result is None:
+                result = series
+                continue
+            falsy = result.isna() | ~result.astype(bool)
+            result = result.where(~falsy, series if series is not None else np.nan)
+        return result
+
+    @staticmethod
+    def _to_float(series: Optional[pd.Series], length: int) -> pd.Series:
+        """列式安全转换为浮点数，无法转换的值为 NaN"""
+        if series is None:
+            return pd.Series([float('nan')] * length, dtype='float64')
+        return pd.to_numeric(series, errors='coerce').astype('float64').reset_index(drop=True)
+
+    def _format_date_series(self, data: pd.DataFrame) -> pd.Series:
+        """列式计算 trade_date：优先 date/trade_date 列，其次日期索引，否则当天"""
+        values = self._coalesce(data.reset_index(drop=True), 'date', 'trade_date')
+        if values is None:
+            if isinstance(data.index, pd.DatetimeIndex):
+                return pd.Series(data.index.strftime('%Y-%m-%d'), dtype=object)
+            return pd.Series([self._format_date(None)] * len(data), dtype=object)
+
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values.dt.strftime('%Y-%m-%d').astype(object)
+        # 字符串/日期对象混合：对去重后的值逐个格式化
+        mapping = {value: self._format_date(value) for value in pd.unique(values)}
+        return values.map(mapping).astype(object)
+
+    def _standardize_frame(
+        self,
+        data: pd.DataFrame,
+        data_source: str,
+        market: str,
+        period: str = "daily",
+        symbol: str = None
+    ) -> List[Dict[str, Any]]:
+        """
+        列式标准化整张 DataFrame，结果与逐行调用 _standardize_record 一致
+
+        Args:
+            data: 历史数据（单位转换已完成）
+            symbol: 股票代码；为 None 时使用 data 的 symbol 列（截面数据）
+
+        Returns:
+            文档列表
+        """
+        n = len(data)
+        now = datetime.utcnow()
+        trade_dates = self._format_date_series(data)
+        # 统一为位置索引，避免重复日期索引（截面数据）影响列间对齐
+        data = data.reset_index(drop=True)
+
+        if symbol is not None:
+            symbols = pd.Series([symbol] * n, dtype=object)
+            full_symbols = pd.Series([self._get_full_symbol(symbol, market)] * n, dtype=object)
+        else:
+            symbols = data['symbol'].astype(str).reset_index(drop=True)
+            full_symbol_map = {code: self._get_full_symbol(code, market) for code in pd.unique(symbols)}
+            full_symbols = symbols.map(full_symbol_map)
+
+        frame = pd.DataFrame({
+            "symbol": symbols,
+            "code": symbols,
+            "full_symbol": full_symbols,
+            "trade_date": trade_dates,
+        })
+
+        for field, columns in (
+            ("open", ('open',)),
+            ("high", ('high',)),
+            ("low", ('low',)),
+            ("close", ('close',)),
+            ("pre_close", ('pre_close', 'preclose')),
+            ("volume", ('volume', 'vol')),
+            ("amount", ('amount', 'turnover')),
+        ):
+            frame[field] = self._to_float(self._coalesce(data, *columns), n)
+
+        # 计算涨跌数据（close 与 pre_close 均有效时计算，否则沿用原始字段）
+        computable = frame["close"].fillna(0).ne(0) & frame["pre_close"].fillna(0).ne(0)
+        change = (frame["close"] - frame["pre_close"]).round(4)
+        pct_chg = (change / frame["pre_close"] * 100).round(4)
+        frame["change"] = change.where(computable, self._to_float(self._coalesce(data, 'change'), n))
+        frame["pct_chg"] = pct_chg.where(
+            computable, self._to_float(self._coalesce(data, 'pct_chg', 'change_percent'), n)
+        )
+
+        # 可选字段：仅在源数据包含对应列时写入
+        for field, columns in (
+            ("turnover_rate", ('turnover_rate', 'turn')),
+            ("volume_ratio", ('volume_ratio',)),
+            ("pe", ('pe',)),
+            ("pb", ('pb',)),
+            ("ps", ('ps',)),
+            ("adjustflag", ('adjustflag', 'adj_factor')),
+            ("tradestatus", ('tradestatus',)),
+            ("isST", ('isST',)),
+        ):
+            values = self._coalesce(data, *columns)
+            if values is not None:
+                frame[field] = self._to_float(values, n)
+
+        # NaN -> None，再一次性转换为记录
+        frame = frame.astype(object).where(frame.notna(), None)
+        documents = frame.to_dict("records")
+
+        constants = {
+            "market": market,
+            "period": period,
+            "data_source": data_source,
+            "created_at": now,
+            "updated_at": now,
+            "version": 1
+        }
+        for doc in documents:
+            doc.update(constants)
+        return documents
+
     async def _execute_bulk_write_with_retry(
         self,
         symbol: str,
@@ -448,6 +629,34 @@ class HistoricalDataService:
             logger.error(f"❌ 获取最新日期失败 {symbol}: {e}")
             return None
     
+    async def get_latest_trade_date(self, data_source: str, period: str = "daily") -> Optional[str]:
+        """获取某数据源全市场的最新数据日期"""
+        if self.collection is None:
+            await self.initialize()
+
+        try:
+            result = await self.collection.find_one(
+                {"data_source": data_source, "period": period},
+                {"trade_date": 1},
+                sort=[("trade_date", -1)]
+            )
+            return result["trade_date"] if result else None
+
+        except Exception as e:
+            logger.error(f"❌ 获取全市场最新日期失败 {data_source}: {e}")
+            return None
+
+    async def get_synced_symbols(self, data_source: str, period: str = "daily") -> List[str]:
+        """获取某数据源已有历史数据的股票代码"""
+        if self.collection is None:
+            await self.initialize()
+
+        try:
+            return await self.collection.distinct("symbol", {"data_source": data_source, "period": period})
+        except Exception as e:
+            logger.error(f"❌ 获取已同步股票列表失败 {data_source}: {e}")
+            return []
+
     async def get_data_statistics(self) -> Dict[str, Any]:
         """获取数据统计信息"""
         if self.collection is None:
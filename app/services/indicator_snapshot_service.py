@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+技术指标日快照服务
+日线同步完成后，为每只股票的最新交易日计算一次 MA/EMA/MACD/RSI/BOLL/ATR/KDJ，
+写入 stock_indicators_daily，供数据库筛选下推和数据层直接读取。
+
+增量更新只处理新增的一根K线：
+- 递推类指标（EMA/MACD/RSI/KDJ）从上一交易日快照保存的递推状态推进一步
+- 窗口类指标（MA/BOLL/ATR、KDJ 的 RSV）只需要最近60根K线
+没有可用的上一日快照（新股、首次运行、中间缺日）的股票按完整回溯窗口重算。
+日线为前复权价格，除权除息后整段历史会按新的价格基准重写；上一日快照保存的收盘价
+与日线库中上一根K线不一致时，递推状态已失效，同样按完整回溯窗口重算。
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pymongo import ReplaceOne
+
+from app.core.database import get_mongo_db
+from app.services.screening.panel_utils import build_bar_panel, last_trade_dates
+from tradingagents.tools.analysis.indicators import (
+    STANDARD_SPECS,
+    compute_panel,
+    ewm_panel,
+    rolling_panel,
+)
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "stock_indicators_daily"
+
+# 完整重算的回溯窗口（约150根日线，与筛选服务一致）与增量所需窗口（覆盖 MA60）
+FULL_LOOKBACK_DAYS = 220
+INCREMENTAL_WINDOW_DAYS = 100
+WRITE_BATCH_SIZE = 1000
+# 上一日快照收盘价与日线库中上一根K线收盘价的相对偏差超过该值，视为复权基准已变化
+REBASE_TOLERANCE = 1e-4
+
+BAR_FIELDS = ["open", "high", "low", "close", "vol", "amount"]
+INDICATOR_FIELDS = [
+    "ma5", "ma10", "ma20", "ma60",
+    "ema12", "ema26",
+    "dif", "dea", "macd_hist",
+    "rsi14",
+    "boll_mid", "boll_upper", "boll_lower",
+    "atr14",
+    "kdj_k", "kdj_d", "kdj_j",
+]
+SNAPSHOT_FIELDS = ["close", "pct_chg", "vol", "amount"] + INDICATOR_FIELDS
+# 递推状态：推进一根K线所需的全部上一时刻取值
+STATE_FIELDS = ["ema12", "ema26", "dea", "rsi14_avg_gain", "rsi14_avg_loss", "kdj_k", "kdj_d"]
+
+FULL_SPECS = STANDARD_SPECS
+# 增量更新时按窗口重算的指标（递推类指标从上一日状态推进）
+WINDOW_SPECS = [spec for spec in STANDARD_SPECS if spec.name in ("ma", "boll", "atr")]
+
+
+def _alpha(span: int) -> float:
+    return 2.0 / (span + 1)
+
+
+def compute_full_snapshots(bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    按完整K线序列计算每只股票最新一根K线的指标快照
+
+    Args:
+        bars: 长表（symbol, trade_date, open, high, low, close, vol, amount）
+
+    Returns:
+        index=symbol 的 DataFrame，列为 SNAPSHOT_FIELDS 与 state_* 递推状态
+    """
+    panel = compute_panel(build_bar_panel(bars, BAR_FIELDS), FULL_SPECS)
+    close = panel["close"]
+    delta = close.diff()
+    avg_gain = ewm_panel(delta.where(delta > 0, 0), 1 / 14.0)
+    avg_loss = ewm_panel(-delta.where(delta < 0, 0), 1 / 14.0)
+
+    latest = pd.DataFrame({f: panel[f].iloc[-1] for f in SNAPSHOT_FIELDS})
+    state = pd.DataFrame({
+        "ema12": panel["ema12"].iloc[-1],
+        "ema26": panel["ema26"].iloc[-1],
+        "dea": panel["dea"].iloc[-1],
+        "rsi14_avg_gain": avg_gain.iloc[-1],
+        "rsi14_avg_loss": avg_loss.iloc[-1],
+        # RSV 无效时 KDJ 沿用上一次的有效值（初值 50）
+        "kdj_k": panel["kdj_k"].ffill().iloc[-1].fillna(50.0),
+        "kdj_d": panel["kdj_d"].ffill().iloc[-1].fillna(50.0),
+    })
+    return latest.join(state.add_prefix("state_"))
+
+
+def advance_snapshots(prev_state: pd.DataFrame, window_bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    用上一交易日的递推状态推进一根K线
+
+    Args:
+        prev_state: index=symbol，列为 STATE_FIELDS（上一根K线收盘后的状态）
+        window_bars: 最近一段K线（长表），每只股票的最后一根是新增K线，至少覆盖 MA60 所需窗口
+
+    Returns:
+        与 compute_full_snapshots 同结构的 DataFrame
+    """
+    panel = compute_panel(build_bar_panel(window_bars, BAR_FIELDS), WINDOW_SPECS)
+    close = panel["close"].iloc[-1]
+    prev_close = panel["close"].iloc[-2] if len(panel["close"]) >= 2 else close * np.nan
+    st = prev_state.reindex(close.index)
+
+    ema12 = (1 - _alpha(12)) * st["ema12"] + _alpha(12) * close
+    ema26 = (1 - _alpha(26)) * st["ema26"] + _alpha(26) * close
+    dif = ema12 - ema26
+    dea = (1 - _alpha(9)) * st["dea"] + _alpha(9) * dif
+
+    delta = close - prev_close
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    avg_gain = (1 - 1 / 14.0) * st["rsi14_avg_gain"] + gain / 14.0
+    avg_loss = (1 - 1 / 14.0) * st["rsi14_avg_loss"] + loss / 14.0
+    rsi14 = 100 - (100 / (1 + avg_gain / avg_loss.replace(0, np.nan)))
+
+    lowest = rolling_panel(panel["low"], 9, 9, "min").iloc[-1]
+    highest = rolling_panel(panel["high"], 9, 9, "max").iloc[-1]
+    rsv = ((close - lowest) / (highest - lowest) * 100).replace([np.inf, -np.inf], np.nan)
+    k_next = (1 - 1 / 3.0) * st["kdj_k"] + rsv / 3.0
+    d_next = (1 - 1 / 3.0) * st["kdj_d"] + k_next / 3.0
+    valid = rsv.notna()
+    kdj_k = k_next.where(valid)
+    kdj_d = d_next.where(valid)
+
+    latest = pd.DataFrame({f: panel[f].iloc[-1] for f in ["close", "pct_chg", "vol", "amount",
+                                                           "ma5", "ma10", "ma20", "ma60",
+                                                           "boll_mid", "boll_upper", "boll_lower", "atr14"]})
+    latest = latest.assign(
+        ema12=ema12, ema26=ema26, dif=dif, dea=dea, macd_hist=dif - dea, rsi14=rsi14,
+        kdj_k=kdj_k, kdj_d=kdj_d, kdj_j=3 * kdj_k - 2 * kdj_d,
+    )[SNAPSHOT_FIELDS]
+    state = pd.DataFrame({
+        "ema12": ema12,
+        "ema26": ema26,
+        "dea": dea,
+        "rsi14_avg_gain": avg_gain,
+        "rsi14_avg_loss": avg_loss,
+        "kdj_k": k_next.where(valid, st["kdj_k"]),
+        "kdj_d": d_next.where(valid, st["kdj_d"]),
+    })
+    return latest.join(state.add_prefix("state_"))
+
+
+def _clean(v: Any) -> Optional[float]:
+    if v is None or (isinstance(v, float) and np.isnan(v)):
+        return None
+    return float(v)
+
+
+class IndicatorSnapshotService:
+    """技术指标日快照服务"""
+
+    def __init__(self):
+        self.db = None
+        self.collection = None
+        self.quotes = None
+
+    async def initialize(self):
+        """初始化数据库连接"""
+        try:
+            self.db = get_mongo_db()
+            self.collection = self.db[COLLECTION_NAME]
+            self.quotes = self.db.stock_daily_quotes
+            await self._ensure_indexes()
+            logger.info("✅ 技术指标快照服务初始化成功")
+        except Exception as e:
+            logger.error(f"❌ 技术指标快照服务初始化失败: {e}")
+            raise
+
+    async def _ensure_indexes(self):
+        """确保必要的索引存在"""
+        try:
+            # 1. 唯一索引：股票代码+交易日期+数据源（用于 upsert 与单股查询）
+            await self.collection.create_index([
+                ("symbol", 1),
+                ("trade_date", -1),
+                ("data_source", 1),
+            ], unique=True, name="symbol_date_source_unique", background=True)
+
+            # 2. 截面查询：数据源+交易日期（筛选下推时先定位到最新交易日）
+            await self.collection.create_index([
+                ("data_source", 1),
+                ("trade_date", -1),
+            ], name="source_date_index", background=True)
+        except Exception as e:
+            logger.warning(f"⚠️ 创建指标快照索引时出现警告（可能已存在）: {e}")
+
+    async def get_latest_trade_date(self, data_source: str) -> Optional[str]:
+        """指标快照中某数据源的最新交易日"""
+        doc = await self.collection.find_one(
+            {"data_source": data_source}, {"trade_date": 1}, sort=[("trade_date", -1)]
+        )
+        return doc.get("trade_date") if doc else None
+
+    async def update_snapshots(self, data_source: str = "tushare", trade_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        为最新交易日（或指定交易日）有K线的股票更新指标快照
+
+        Args:
+            data_source: 数据源（与 stock_daily_quotes.data_source 一致）
+            trade_date: 交易日 YYYY-MM-DD，默认取日线库中该数据源的最新交易日
+
+        Returns:
+            统计信息 {trade_date, incremental, full, saved}
+        """
+        stats = {"trade_date": trade_date, "incremental": 0, "full": 0, "saved": 0}
+        if trade_date is None:
+            doc = await self.quotes.find_one(
+                {"data_source": data_source, "period": "daily"}, {"trade_date": 1}, sort=[("trade_date", -1)]
+            )
+            trade_date = doc.get("trade_date") if doc else None
+            stats["trade_date"] = trade_date
+        if not trade_date:
+            logger.info(f"ℹ️ [{data_source}] 日线库中没有数据，跳过指标快照")
+            return stats
+
+        window = await self._load_bars(data_source, trade_date, INCREMENTAL_WINDOW_DAYS)
+        if window.empty:
+            return stats
+        dates = last_trade_dates(window, 2)
+        todays = dates.index[dates[0] == trade_date]
+        prev_dates = dates.loc[todays, 1].dropna()
+        closes = window.set_index(["symbol", "trade_date"])["close"]
+        prev_closes = pd.Series(
+            [closes.get((symbol, day)) for symbol, day in prev_dates.items()], index=prev_dates.index, dtype=float
+        )
+
+        prev_state = await self._load_states(data_source, prev_dates, prev_closes)
+        incremental = [s for s in todays if s in prev_state.index]
+        full = [s for s in todays if s not in prev_state.index]
+
+        frames: List[pd.DataFrame] = []
+        if incremental:
+            frames.append(advance_snapshots(
+                prev_state.loc[incremental],
+                window[window["symbol"].isin(incremental)],
+            ))
+        if full:
+            lookback = await self._load_bars(data_source, trade_date, FULL_LOOKBACK_DAYS, symbols=full)
+            if not lookback.empty:
+                frames.append(compute_full_snapshots(lookback).reindex(full).dropna(subset=["close"]))
+
+        stats["incremental"] = len(incremental)
+        stats["full"] = len(full)
+        if frames:
+            stats["saved"] = await self._save(pd.concat(frames), trade_date, data_source)
+
+        logger.info(
+            f"✅ [{data_source}] 指标快照更新完成: {trade_date}, "
+            f"增量 {stats['incremental']} 只, 重算 {stats['full']} 只, 写入 {stats['saved']} 条"
+        )
+        return stats
+
+    async def _load_bars(
+        self,
+        data_source: str,
+        trade_date: str,
+        lookback_days: int,
+        symbols: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """从 stock_daily_quotes 加载 [trade_date - lookback_days, trade_date] 的日线长表"""
+        start = (datetime.strptime(trade_date, "%Y-%m-%d") - timedelta(days=lookback_days)).strftime("%Y-%m-%d")
+        query: Dict[str, Any] = {
+            "data_source": data_source,
+            "period": "daily",
+            "trade_date": {"$gte": start, "$lte": trade_date},
+        }
+        if symbols is not None:
+            query["symbol"] = {"$in": list(symbols)}
+        projection = {"_id": 0, "symbol": 1, "trade_date": 1, "open": 1, "high": 1,
+                      "low": 1, "close": 1, "volume": 1, "amount": 1}
+        docs = await self.quotes.find(query, projection).to_list(length=None)
+        return pd.DataFrame(docs).rename(columns={"volume": "vol"})
+
+    async def _load_states(self, data_source: str, prev_dates: pd.Series, prev_closes: pd.Series) -> pd.DataFrame:
+        """
+        加载每只股票上一根K线对应日期的快照递推状态
+
+        日期不匹配、或快照收盘价与日线库中上一根K线收盘价不一致（复权基准已变化）的股票视为不可增量。
+
+        Args:
+            prev_dates: index=symbol，上一根K线的交易日
+            prev_closes: index=symbol，日线库中上一根K线的收盘价
+        """
+        if prev_dates.empty:
+            return pd.DataFrame(columns=STATE_FIELDS)
+        cursor = self.collection.find(
+            {
+                "data_source": data_source,
+                "trade_date": {"$in": sorted(set(prev_dates))},
+                "symbol": {"$in": list(prev_dates.index)},
+            },
+            {"_id": 0, "symbol": 1, "trade_date": 1, "close": 1, "state": 1},
+        )
+        rows = {}
+        rebased = []
+        async for doc in cursor:
+            symbol = doc.get("symbol")
+            state = doc.get("state") or {}
+            if prev_dates.get(symbol) != doc.get("trade_date"):
+                continue
+            if any(state.get(f) is None for f in STATE_FIELDS):
+                continue
+            snapshot_close = doc.get("close")
+            bar_close = prev_closes.get(symbol)
+            if snapshot_close is None or bar_close is None or np.isnan(bar_close) \
+                    or abs(snapshot_close - bar_close) > REBASE_TOLERANCE * max(abs(bar_close), 1e-9):
+                rebased.append(symbol)
+                continue
+            rows[symbol] = {f: state[f] for f in STATE_FIELDS}
+        if rebased:
+            logger.info(f"🔁 {len(rebased)} 只股票上一日快照收盘价与日线不一致（复权基准已变化），按完整窗口重算")
+        return pd.DataFrame.from_dict(rows, orient="index", columns=STATE_FIELDS)
+
+    async def _save(self, snapshots: pd.DataFrame, trade_date: str, data_source: str) -> int:
+        """批量 upsert 快照文档"""
+        now = datetime.utcnow()
+        operations = []
+        for symbol, row in zip(snapshots.index, snapshots.to_dict("records")):
+            doc = {
+                "symbol": symbol,
+                "trade_date": trade_date,
+                "data_source": data_source,
+                "period": "daily",
+                **{f: _clean(row.get(f)) for f in SNAPSHOT_FIELDS},
+                "state": {f: _clean(row.get(f"state_{f}")) for f in STATE_FIELDS},
+                "updated_at": now,
+            }
+            operations.append(ReplaceOne(
+                {"symbol": symbol, "trade_date": trade_date, "data_source": data_source},
+                doc,
+                upsert=True,
+            ))
+
+        saved = 0
+        for i in range(0, len(operations), WRITE_BATCH_SIZE):
+            result = await self.collection.bulk_write(operations[i:i + WRITE_BATCH_SIZE], ordered=False)
+            saved += result.upserted_count + result.modified_count
+        return saved
+
+
+# 全局服务实例
+_indicator_snapshot_service: Optional[IndicatorSnapshotService] = None
+
+
+async def get_indicator_snapshot_service() -> IndicatorSnapshotService:
+    """获取技术指标快照服务实例"""
+    global _indicator_snapshot_service
+    if _indicator_snapshot_service is None:
+        _indicator_snapshot_service = IndicatorSnapshotService()
+        await _indicator_snapshot_service.initialize()
+    return _indicator_snapshot_service
+
+
+async def run_indicator_snapshot_update(data_source: str, trade_date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """日线同步后的流水线阶段：更新指标快照（失败只记录日志，不影响同步任务结果）"""
+    from app.core.config import settings
+
+    if not getattr(settings, "INDICATOR_SNAPSHOT_ENABLED", True):
+        return None
+    try:
+        service = await get_indicator_snapshot_service()
+        return await service.update_snapshots(data_source=data_source, trade_date=trade_date)
+    except Exception as e:
+        logger.error(f"❌ [{data_source}] 指标快照更新失败: {e}")
+        return None
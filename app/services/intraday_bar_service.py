@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+日内分钟K线服务
+market_quotes 每只股票只保留最新快照，这里把每次行情采集的快照聚合为 1/5/15 分钟 OHLCV K线，
+写入 stock_intraday_bars，供日内K线查询与分析直接读取本地数据。
+
+聚合方式：
+- 采集时刻向下取整到周期起点作为K线时间，同一根K线用 upsert 合并：
+  首个快照定开盘价（$setOnInsert），$max/$min 更新最高/最低，最新快照覆盖收盘价
+- 行情中的成交量/成交额是当日累计值，K线记录本根K线之前最后一次累计值（*_base）与最新累计值（*_end），
+  查询时相减得到本根K线的成交量/成交额；进程内没有上一笔累计值时（当天首次采集、重启后）以当前值为基准
+- 只聚合本次发生变化的股票（未变化即无成交，不产生K线）
+- 按 bar_time 的 TTL 索引自动清理过期数据
+
+说明：需要按K线 upsert 合并快照，MongoDB 时间序列集合不支持此类更新（且 4.4 不支持时间序列集合），
+因此使用普通集合 + (code, period, bar_time) 唯一索引。
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pymongo import UpdateOne
+
+from app.core.database import get_mongo_db
+from app.utils.timezone import ensure_timezone, to_config_tz
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "stock_intraday_bars"
+
+# 支持的K线周期（分钟），需能整除60
+SUPPORTED_PERIODS = (1, 5, 15, 30, 60)
+DEFAULT_PERIODS = (1, 5, 15)
+WRITE_BATCH_SIZE = 5000
+
+
+def parse_periods(spec: str) -> Tuple[int, ...]:
+    """解析 "1,5,15" 形式的周期配置，忽略不支持的周期"""
+    periods = []
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            period = int(item)
+        except ValueError:
+            logger.warning(f"⚠️ 忽略无效的K线周期: {item}")
+            continue
+        if period not in SUPPORTED_PERIODS:
+            logger.warning(f"⚠️ 忽略不支持的K线周期: {period}（支持 {SUPPORTED_PERIODS}）")
+            continue
+        if period not in periods:
+            periods.append(period)
+    return tuple(sorted(periods)) or DEFAULT_PERIODS
+
+
+def bar_start(tick_time: datetime, period: int) -> datetime:
+    """采集时刻所在K线的起始时间"""
+    minute = tick_time.minute - tick_time.minute % period if period < 60 else 0
+    return tick_time.replace(minute=minute, second=0, microsecond=0)
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if number != number else number
+
+
+class IntradayBarService:
+    """日内分钟K线聚合与查询"""
+
+    def __init__(self, periods: Sequence[int] = DEFAULT_PERIODS, retention_days: int = 30):
+        self.periods = tuple(periods)
+        self.retention_days = retention_days
+        # code -> (最近一次的累计成交量, 累计成交额, 交易日)
+        self._last_totals: Dict[str, Tuple[Optional[float], Optional[float], str]] = {}
+
+    async def ensure_indexes(self) -> None:
+        coll = get_mongo_db()[COLLECTION_NAME]
+        try:
+            await coll.create_index([("code", 1), ("period", 1), ("bar_time", 1)], unique=True)
+            await coll.create_index("bar_time", expireAfterSeconds=self.retention_days * 86400)
+        except Exception as e:
+            logger.warning(f"创建分钟K线索引失败（忽略）: {e}")
+
+    def build_operations(self, quotes: Dict[str, Dict[str, Any]], trade_date: str, tick_time: datetime) -> List[UpdateOne]:
+        """将一次采集的快照转换为各周期K线的 upsert 操作，并推进进程内的累计量基准"""
+        ops: List[UpdateOne] = []
+        buckets = [(period, bar_start(tick_time, period)) for period in self.periods]
+        for code, quote in quotes.items():
+            price = _number(quote.get("close"))
+            if price is None or price <= 0:
+                continue
+            volume = _number(quote.get("volume"))
+            amount = _number(quote.get("amount"))
+
+            last = self._last_totals.get(code)
+            if last is not None and last[2] == trade_date:
+                volume_base = last[0] if last[0] is not None else volume
+                amount_base = last[1] if last[1] is not None else amount
+            else:
+                volume_base, amount_base = volume, amount
+            self._last_totals[code] = (volume, amount, trade_date)
+
+            for period, bar_time in buckets:
+                ops.append(UpdateOne(
+                    {"code": code, "period": period, "bar_time": bar_time},
+                    {
+                        "$setOnInsert": {
+                            "trade_date": trade_date,
+                            "open": price,
+                            "volume_base": volume_base,
+                            "amount_base": amount_base,
+                        },
+                        "$max": {"high": price},
+                        "$min": {"low": price},
+                        "$set": {
+                            "close": price,
+                            "volume_end": volume,
+                            "amount_end": amount,
+                            "updated_at": tick_time,
+                        },
+                    },
+                    upsert=True,
+                ))
+        return ops
+
+    async def record_tick(self, quotes: Dict[str, Dict[str, Any]], trade_date: str, tick_time: datetime) -> int:
+        """
+        聚合一次行情采集
+
+        Args:
+            quotes: {6位代码: {close, volume, amount, ...}}，通常只包含本次发生变化的股票
+            trade_date: 交易日
+            tick_time: 采集时刻（带时区）
+
+        Returns:
+            int: 写入的K线操作数
+        """
+        ops = self.build_operations(quotes, trade_date, tick_time)
+        if not ops:
+            return 0
+        coll = get_mongo_db()[COLLECTION_NAME]
+        for i in range(0, len(ops), WRITE_BATCH_SIZE):
+            await coll.bulk_write(ops[i:i + WRITE_BATCH_SIZE], ordered=False)
+        logger.debug(f"📊 分钟K线聚合完成: 股票={len(quotes)}, 操作={len(ops)}, 周期={self.periods}")
+        return len(ops)
+
+    async def get_bars(
+        self,
+        code: str,
+        period: int = 1,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 240,
+    ) -> List[Dict[str, Any]]:
+        """
+        查询某只股票的日内K线（按时间升序）
+
+        未指定时间范围时返回最近 limit 根K线；不带时区的时间按配置时区解释。
+        """
+        query: Dict[str, Any] = {"code": code, "period": period}
+        if start or end:
+            query["bar_time"] = {}
+            if start:
+                query["bar_time"]["$gte"] = ensure_timezone(start)
+            if end:
+                query["bar_time"]["$lte"] = ensure_timezone(end)
+
+        coll = get_mongo_db()[COLLECTION_NAME]
+        projection = {"_id": 0, "code": 0, "period": 0, "updated_at": 0}
+        docs = await coll.find(query, projection).sort("bar_time", -1).limit(limit).to_list(length=limit)
+        docs.reverse()
+        return [self._to_bar(doc) for doc in docs]
+
+    @staticmethod
+    def _to_bar(doc: Dict[str, Any]) -> Dict[str, Any]:
+        def _delta(end_key: str, base_key: str) -> Optional[float]:
+            end, base = doc.get(end_key), doc.get(base_key)
+            if end is None or base is None:
+                return None
+            return max(0.0, end - base)
+
+        bar_time = to_config_tz(doc.get("bar_time"))
+        return {
+            "time": bar_time.isoformat() if bar_time else None,
+            "trade_date": doc.get("trade_date"),
+            "open": doc.get("open"),
+            "high": doc.get("high"),
+            "low": doc.get("low"),
+            "close": doc.get("close"),
+            "volume": _delta("volume_end", "volume_base"),
+            "amount": _delta("amount_end", "amount_base"),
+        }
+
+
+# 全局服务实例
+_intraday_bar_service: Optional[IntradayBarService] = None
+
+
+def get_intraday_bar_service() -> IntradayBarService:
+    """获取日内分钟K线服务实例（周期与保留天数来自配置）"""
+    global _intraday_bar_service
+    if _intraday_bar_service is None:
+        from app.core.config import settings
+        _intraday_bar_service = IntradayBarService(
+            periods=parse_periods(settings.INTRADAY_BAR_PERIODS),
+            retention_days=settings.INTRADAY_BAR_RETENTION_DAYS,
+        )
+    return _intraday_bar_service
@@ -2,18 +2,42 @@
 新闻数据服务
 提供统一的新闻数据存储、查询和管理功能
 """
+import asyncio
 from typing import Optional, List, Dict, Any, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import logging
-from pymongo import ReplaceOne
+from pymongo import ReplaceOne, UpdateOne
 from pymongo.errors import BulkWriteError
 from bson import ObjectId
+import numpy as np
 
 from app.core.database import get_database
+from tradingagents.dataflows.news.near_duplicate import (
+    NEWS_DEDUP_ENABLED,
+    NEWS_DEDUP_WINDOW_HOURS,
+    NearDuplicateDetector,
+    fingerprint,
+    news_text,
+)
+from tradingagents.dataflows.news.search_index import (
+    NEWS_INDEX_MAX_CANDIDATES,
+    get_news_search_index,
+    news_key,
+)
 
 logger = logging.getLogger(__name__)
 
+# 近似去重写入的字段
+DEDUP_FIELDS = ("dup_signature", "dup_bands", "cluster_id", "is_duplicate")
+# 近似去重指纹字段，仅供入库比对，查询结果中不返回（dup_signature 为二进制，无法 JSON 序列化）
+DEDUP_FIELDS_PROJECTION = {"dup_signature": 0, "dup_bands": 0}
+# 入库比对时读取的已入库新闻字段
+DEDUP_LOOKUP_PROJECTION = {
+    "url": 1, "title": 1, "publish_time": 1,
+    "cluster_id": 1, "is_duplicate": 1, "dup_signature": 1, "dup_bands": 1,
+}
+
 
 def convert_objectid_to_str(data: Union[Dict, List[Dict]]) -> Union[Dict, List[Dict]]:
     """
@@ -53,6 +77,7 @@ class NewsQueryParams:
     skip: int = 0
     sort_by: str = "publish_time"
     sort_order: int = -1  # -1 for desc, 1 for asc
+    collapse_duplicates: bool = True  # 近似重复的转载稿每簇只返回代表（最先入库的一条）
 
 
 @dataclass
@@ -130,6 +155,12 @@ class NewsDataService:
             # 10. 更新时间索引（数据维护）
             await collection.create_index([("updated_at", -1)], name="updated_at_index", background=True)
 
+            # 11. 近似去重分段键索引（入库时查找同桶的已入库新闻）
+            await collection.create_index([("dup_bands", 1)], name="dup_bands_index", background=True)
+
+            # 12. 簇索引（按簇查看同一新闻的各家转载）
+            await collection.create_index([("cluster_id", 1)], name="cluster_id_index", background=True)
+
             self._indexes_ensured = True
             self.logger.info("✅ 新闻数据索引检查完成")
         except Exception as e:
@@ -178,12 +209,14 @@ class NewsDataService:
             
             # 准备批量操作
             operations = []
+            standardized_list = []
 
             for i, news in enumerate(news_list):
                 # 标准化新闻数据
                 standardized_news = self._standardize_news_data(
                     news, data_source, market, now
                 )
+                standardized_list.append(standardized_news)
 
                 # 🔍 记录前3条数据的详细信息
                 if i < 3:
@@ -207,11 +240,23 @@ class NewsDataService:
                         upsert=True
                     )
                 )
+
+            # 近似重复聚类：与批内及近期已入库的新闻比对，分配 cluster_id
+            lookup = self._prepare_clusters(standardized_list)
+            if lookup is not None:
+                try:
+                    existing = await collection.find(lookup, DEDUP_LOOKUP_PROJECTION).to_list(length=None)
+                except Exception as e:
+                    self.logger.warning(f"⚠️ 查询近似重复候选新闻失败，仅在本批内去重: {e}")
+                    existing = []
+                self._assign_clusters(standardized_list, existing)
             
             # 执行批量操作
             if operations:
                 result = await collection.bulk_write(operations)
                 saved_count = result.upserted_count + result.modified_count
+                # 分词建索引在线程中执行，不阻塞事件循环
+                await asyncio.to_thread(self._index_news, standardized_list)
                 
                 self.logger.info(f"💾 新闻数据保存完成: {saved_count}条记录 (数据源: {data_source})")
                 return saved_count
@@ -281,9 +326,11 @@ class NewsDataService:
 
             self.logger.info(f"📝 开始标准化 {len(news_list)} 条新闻数据...")
 
+            standardized_list = []
             for i, news in enumerate(news_list, 1):
                 # 标准化新闻数据
                 standardized_news = self._standardize_news_data(news, data_source, market, now)
+                standardized_list.append(standardized_news)
 
                 # 记录前3条新闻的详细信息
                 if i <= 3:
@@ -309,10 +356,21 @@ class NewsDataService:
                     )
                 )
 
+            # 近似重复聚类：与批内及近期已入库的新闻比对，分配 cluster_id
+            lookup = self._prepare_clusters(standardized_list)
+            if lookup is not None:
+                try:
+                    existing = list(collection.find(lookup, DEDUP_LOOKUP_PROJECTION))
+                except Exception as e:
+                    self.logger.warning(f"⚠️ 查询近似重复候选新闻失败，仅在本批内去重: {e}")
+                    existing = []
+                self._assign_clusters(standardized_list, existing)
+
             # 执行批量操作（同步方式）
             if operations:
                 result = collection.bulk_write(operations)
                 saved_count = result.upserted_count + result.modified_count
+                self._index_news(standardized_list)
 
                 self.logger.info(f"💾 新闻数据保存完成: {saved_count}条记录 (数据源: {data_source})")
                 return saved_count
@@ -344,6 +402,92 @@ class NewsDataService:
             self.logger.error(traceback.format_exc())
             return 0
 
+    def _prepare_clusters(self, news_list: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        为新闻计算近似去重指纹（dup_signature / dup_bands，按股票代码分组）
+
+        Returns:
+            查找近期同桶已入库新闻的查询条件；未启用近似去重或没有可比对的新闻时返回 None
+        """
+        if not NEWS_DEDUP_ENABLED:
+            return None
+
+        band_keys = set()
+        publish_times = []
+        for news in news_list:
+            fp = fingerprint(news_text(news), news.get("symbol") or "")
+            if fp is None:
+                continue
+            news["dup_signature"] = fp[0].tobytes()
+            news["dup_bands"] = fp[1]
+            band_keys.update(fp[1])
+            if news.get("publish_time"):
+                publish_times.append(news["publish_time"])
+
+        if not band_keys:
+            return None
+        query = {"dup_bands": {"$in": sorted(band_keys)}}
+        if publish_times:
+            query["publish_time"] = {"$gte": min(publish_times) - timedelta(hours=NEWS_DEDUP_WINDOW_HOURS)}
+        return query
+
+    def _assign_clusters(self, news_list: List[Dict[str, Any]], existing: List[Dict[str, Any]]) -> None:
+        """
+        分配 cluster_id 与 is_duplicate：与同桶的已入库新闻或本批中靠前的新闻近似重复时归入其簇，
+        每簇最先入库的新闻为代表（is_duplicate=False）；重复保存的新闻沿用入库时的簇归属
+        """
+        detector = NearDuplicateDetector()
+        stored = {}
+        for doc in existing:
+            if not doc.get("cluster_id") or not doc.get("dup_signature"):
+                continue
+            stored[news_key(doc)] = doc
+            detector.register((np.frombuffer(doc["dup_signature"], dtype=np.uint32), doc["dup_bands"]), doc["cluster_id"])
+
+        for news in news_list:
+            if "dup_signature" not in news:
+                continue
+            key = news_key(news)
+            previous = stored.get(key)
+            if previous is not None:
+                news["cluster_id"] = previous["cluster_id"]
+                news["is_duplicate"] = bool(previous.get("is_duplicate"))
+                continue
+            news["cluster_id"], news["is_duplicate"] = detector.add(
+                (np.frombuffer(news["dup_signature"], dtype=np.uint32), news["dup_bands"])
+            )
+            stored[key] = news
+
+        if detector.duplicate_count:
+            self.logger.info(f"🧬 近似重复新闻: {detector.duplicate_count}/{len(news_list)} 条归入已有新闻簇")
+
+    def _index_news(self, news_list: List[Dict[str, Any]]) -> None:
+        """把已保存的新闻写入全文检索索引（其他进程写入的新闻在检索前按水位线追平）"""
+        index = get_news_search_index()
+        if index is None:
+            return
+        try:
+            index.add_documents(news_list)
+        except Exception as e:
+            self.logger.warning(f"⚠️ 新闻写入检索索引失败: {e}")
+
+    async def _get_search_index(self):
+        """
+        获取已追平的全文检索索引
+
+        Returns:
+            索引不可用时返回 None，调用方回退到 MongoDB $text 搜索
+            （追平在线程中执行；首次全量构建尚未完成时其他请求也会回退）
+        """
+        index = get_news_search_index()
+        if index is None:
+            return None
+        try:
+            await index.refresh_async(self._get_collection())
+        except Exception as e:
+            self.logger.warning(f"⚠️ 新闻检索索引追平失败: {e}")
+        return index if index.ready else None
+
     def _standardize_news_data(
         self,
         news_data: Dict[str, Any],
@@ -506,19 +650,38 @@ class NewsDataService:
                 query["data_source"] = params.data_source
                 self.logger.info(f"   添加查询条件: data_source={params.data_source}")
 
+            if params.collapse_duplicates:
+                query["is_duplicate"] = {"$ne": True}
+
             if params.keywords:
-                # 文本搜索
-                query["$text"] = {"$search": " ".join(params.keywords)}
-                self.logger.info(f"   添加查询条件: text search={params.keywords}")
+                index = await self._get_search_index()
+                if index is not None:
+                    # 中文分词索引先筛出候选新闻，其余条件仍由 MongoDB 过滤
+                    symbols = ([params.symbol] if params.symbol else []) + list(params.symbols or [])
+                    hits = index.search(
+                        " ".join(params.keywords),
+                        symbols=symbols or None,
+                        start_time=params.start_time,
+                        end_time=params.end_time,
+                        limit=NEWS_INDEX_MAX_CANDIDATES,
+                    )
+                    self.logger.info(f"   添加查询条件: 检索索引匹配 {params.keywords} -> {len(hits)} 条候选")
+                    if not hits:
+                        return []
+                    query.update(index.keys_filter(key for key, _ in hits))
+                else:
+                    # 文本搜索
+                    query["$text"] = {"$search": " ".join(params.keywords)}
+                    self.logger.info(f"   添加查询条件: text search={params.keywords}")
 
-            self.logger.info(f"   最终查询条件: {query}")
+            self.logger.info(f"   最终查询条件: {str(query)[:500]}")
 
             # 先统计总数
             total_count = await collection.count_documents(query)
             self.logger.info(f"   数据库中符合条件的总记录数: {total_count}")
 
             # 执行查询
-            cursor = collection.find(query)
+            cursor = collection.find(query, DEDUP_FIELDS_PROJECTION)
 
             # 排序
             cursor = cursor.sort(params.sort_by, params.sort_order)
@@ -701,6 +864,10 @@ class NewsDataService:
             
             deleted_count = result.deleted_count
             self.logger.info(f"🗑️ 删除过期新闻: {deleted_count}条记录")
+
+            index = get_news_search_index()
+            if index is not None:
+                index.remove_before(cutoff_date)
             
             return deleted_count
             
@@ -708,6 +875,41 @@ class NewsDataService:
             self.logger.error(f"❌ 删除过期新闻失败: {e}")
             return 0
 
+    async def backfill_news_clusters(self, start_time: datetime, end_time: datetime) -> int:
+        """
+        为发布时间在 [start_time, end_time) 内、尚未分配簇的新闻（近似去重启用前入库）补充 cluster_id
+
+        按入库时间顺序处理，与已分配簇的近期新闻比对，每簇最先入库的新闻为代表
+
+        Returns:
+            更新的记录数量
+        """
+        try:
+            collection = self._get_collection()
+            docs = await collection.find({
+                "publish_time": {"$gte": start_time, "$lt": end_time},
+                "cluster_id": {"$exists": False},
+            }).sort("created_at", 1).to_list(length=None)
+
+            lookup = self._prepare_clusters(docs)
+            if lookup is None:
+                return 0
+            existing = await collection.find(lookup, DEDUP_LOOKUP_PROJECTION).to_list(length=None)
+            self._assign_clusters(docs, existing)
+
+            operations = [
+                UpdateOne({"_id": doc["_id"]}, {"$set": {field: doc[field] for field in DEDUP_FIELDS}})
+                for doc in docs if "cluster_id" in doc
+            ]
+            if operations:
+                await collection.bulk_write(operations)
+            self.logger.info(f"🧬 补充新闻簇: {len(operations)}条记录")
+            return len(operations)
+
+        except Exception as e:
+            self.logger.error(f"❌ 补充新闻簇失败: {e}")
+            return 0
+
     async def search_news(
         self,
         query_text: str,
@@ -717,19 +919,45 @@ class NewsDataService:
         """
         全文搜索新闻
 
+        优先使用中文分词的 BM25 检索索引，索引不可用时回退到 MongoDB $text 搜索；
+        近似重复的转载稿只返回每簇的代表
+
         Args:
             query_text: 搜索文本
             symbol: 股票代码过滤
             limit: 返回数量限制
 
         Returns:
-            搜索结果列表
+            搜索结果列表（score 为相关性得分）
         """
         try:
             collection = self._get_collection()
 
+            index = await self._get_search_index()
+            if index is not None:
+                # 多取一些候选，近似重复的转载稿过滤掉后仍能凑满 limit 条
+                hits = index.search(query_text, symbols=[symbol] if symbol else None, limit=limit * 2)
+                if not hits:
+                    self.logger.info(f"🔍 全文搜索返回 0 条结果")
+                    return []
+                docs = await collection.find(
+                    {**index.keys_filter(key for key, _ in hits), "is_duplicate": {"$ne": True}},
+                    DEDUP_FIELDS_PROJECTION,
+                ).to_list(length=None)
+                docs_by_key = {news_key(doc): doc for doc in docs}
+                results = []
+                for key, score in hits:
+                    doc = docs_by_key.get(key)
+                    if doc is not None:
+                        doc["score"] = score
+                        results.append(doc)
+                results = results[:limit]
+                results = convert_objectid_to_str(results)
+                self.logger.info(f"🔍 全文搜索返回 {len(results)} 条结果（检索索引）")
+                return results
+
             # 构建查询条件
-            query = {"$text": {"$search": query_text}}
+            query = {"$text": {"$search": query_text}, "is_duplicate": {"$ne": True}}
 
             if symbol:
                 query["symbol"] = symbol
@@ -737,7 +965,7 @@ class NewsDataService:
             # 执行搜索，按相关性排序
             cursor = collection.find(
                 query,
-                {"score": {"$meta": "textScore"}}
+                {"score": {"$meta": "textScore"}, **DEDUP_FIELDS_PROJECTION}
             ).sort([("score", {"$meta": "textScore"})])
 
             cursor = cursor.limit(limit)
@@ -2,6 +2,7 @@
 Queue 子包
 - keys: Redis 键名与常量
 - helpers: 队列相关的 Redis 操作辅助函数
+- scripts: 原子认领/确认/续租/回收使用的 Lua 脚本
 """
 from .keys import (
     READY_LIST,
@@ -17,6 +18,11 @@ from .keys import (
     DEFAULT_USER_CONCURRENT_LIMIT,
     GLOBAL_CONCURRENT_LIMIT,
     VISIBILITY_TIMEOUT_SECONDS,
+    READY_SIGNAL_LIST,
+    VISIBILITY_ZSET,
+    READY_SIGNAL_MAX_LEN,
+    CLAIM_SCAN_LIMIT,
+    RECLAIM_BATCH_SIZE,
 )
 
 from .helpers import (
@@ -26,5 +32,13 @@ from .helpers import (
     unmark_task_processing,
     set_visibility_timeout,
     clear_visibility_timeout,
+    signal_ready,
+)
+
+from .scripts import (
+    CLAIM_TASK_LUA,
+    ACK_TASK_LUA,
+    RECLAIM_EXPIRED_LUA,
+    RENEW_LEASE_LUA,
 )
 
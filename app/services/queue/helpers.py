@@ -11,7 +11,9 @@ from .keys import (
     TASK_PREFIX,
     SET_PROCESSING,
     USER_PROCESSING_PREFIX,
-    VISIBILITY_TIMEOUT_PREFIX,
+    VISIBILITY_ZSET,
+    READY_SIGNAL_LIST,
+    READY_SIGNAL_MAX_LEN,
 )
 
 
@@ -43,19 +45,18 @@ async def unmark_task_processing(r: Redis, task_id: str, user_id: str) -> None:
 
 
 async def set_visibility_timeout(r: Redis, task_id: str, worker_id: str, visibility_timeout: int) -> None:
-    """设置可见性超时"""
-    timeout_key = VISIBILITY_TIMEOUT_PREFIX + task_id
-    timeout_data: Dict[str, str] = {
-        "task_id": task_id,
-        "worker_id": worker_id,
-        "timeout_at": str(int(time.time()) + visibility_timeout),
-    }
-    await r.hset(timeout_key, mapping=timeout_data)
-    await r.expire(timeout_key, visibility_timeout)
+    """设置可见性超时（写入截止时间ZSET，由回收脚本按score扫描）"""
+    await r.zadd(VISIBILITY_ZSET, {task_id: int(time.time()) + visibility_timeout})
 
 
 async def clear_visibility_timeout(r: Redis, task_id: str) -> None:
     """清除可见性超时"""
-    timeout_key = VISIBILITY_TIMEOUT_PREFIX + task_id
-    await r.delete(timeout_key)
+    await r.zrem(VISIBILITY_ZSET, task_id)
 
+
+async def signal_ready(r: Redis, count: int = 1) -> None:
+    """向唤醒信号列表推送信号，唤醒阻塞等待的Worker"""
+    pipe = r.pipeline(transaction=True)
+    pipe.lpush(READY_SIGNAL_LIST, *(["1"] * max(1, count)))
+    pipe.ltrim(READY_SIGNAL_LIST, 0, READY_SIGNAL_MAX_LEN - 1)
+    await pipe.execute()
@@ -22,3 +22,10 @@ DEFAULT_USER_CONCURRENT_LIMIT = 3
 GLOBAL_CONCURRENT_LIMIT = 3  # 开源版全局最大并发限制为3
 VISIBILITY_TIMEOUT_SECONDS = 300  # 5分钟
 
+
+# 原子派发相关
+READY_SIGNAL_LIST = "qa:ready_signal"  # 唤醒阻塞Worker的信号列表
+VISIBILITY_ZSET = "qa:visibility_deadlines"  # 处理中任务的可见性截止时间（score=timeout_at）
+READY_SIGNAL_MAX_LEN = 64  # 信号列表上限，多余信号只会带来一次空唤醒
+CLAIM_SCAN_LIMIT = 100  # 单次认领时从队尾向前扫描的最大任务数
+RECLAIM_BATCH_SIZE = 100  # 单次回收过期任务的最大数量
@@ -0,0 +1,111 @@
+"""
+队列服务使用的 Redis Lua 脚本
+认领（claim）、确认（ack）、续租（renew）、回收（reclaim）均在服务端单步原子执行，
+避免多 Worker 下 RPOP → 检查 → 回推 的竞态。
+"""
+
+# 认领任务
+# KEYS[1]=就绪队列 KEYS[2]=处理中集合 KEYS[3]=可见性ZSET
+# ARGV: worker_id, now, visibility_timeout, user_limit, global_limit,
+#       task_prefix, user_processing_prefix, scan_limit
+# 从队尾（最早入队）向前扫描，跳过已达用户并发上限的任务，
+# 被跳过的任务保持原位，不打乱其他任务的先后顺序
+CLAIM_TASK_LUA = """
+if redis.call('SCARD', KEYS[2]) >= tonumber(ARGV[5]) then
+    return false
+end
+local ids = redis.call('LRANGE', KEYS[1], -tonumber(ARGV[8]), -1)
+for i = #ids, 1, -1 do
+    local task_id = ids[i]
+    local task_key = ARGV[6] .. task_id
+    local user = redis.call('HGET', task_key, 'user')
+    if not user then
+        redis.call('LREM', KEYS[1], -1, task_id)
+    else
+        local user_key = ARGV[7] .. user
+        if redis.call('SCARD', user_key) < tonumber(ARGV[4]) then
+            redis.call('LREM', KEYS[1], -1, task_id)
+            redis.call('SADD', user_key, task_id)
+            redis.call('SADD', KEYS[2], task_id)
+            redis.call('ZADD', KEYS[3], tonumber(ARGV[2]) + tonumber(ARGV[3]), task_id)
+            redis.call('HSET', task_key, 'status', 'processing', 'worker_id', ARGV[1], 'started_at', ARGV[2])
+            return task_id
+        end
+    end
+end
+return false
+"""
+
+# 确认任务
+# KEYS[1]=任务Hash KEYS[2]=处理中集合 KEYS[3]=可见性ZSET KEYS[4]=完成/失败集合
+# KEYS[5]=就绪队列 KEYS[6]=唤醒信号列表
+# ARGV: task_id, status, now, user_processing_prefix, worker_id（空串表示不校验）, signal_max_len
+# 返回 1=成功 0=任务不存在 -1=任务已被其他Worker重新认领
+ACK_TASK_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if ARGV[5] ~= '' and redis.call('HGET', KEYS[1], 'worker_id') ~= ARGV[5] then
+    return -1
+end
+local user = redis.call('HGET', KEYS[1], 'user')
+if user then
+    redis.call('SREM', ARGV[4] .. user, ARGV[1])
+end
+redis.call('SREM', KEYS[2], ARGV[1])
+redis.call('ZREM', KEYS[3], ARGV[1])
+redis.call('HSET', KEYS[1], 'status', ARGV[2], 'completed_at', ARGV[3])
+redis.call('SADD', KEYS[4], ARGV[1])
+if redis.call('LLEN', KEYS[5]) > 0 then
+    redis.call('LPUSH', KEYS[6], '1')
+    redis.call('LTRIM', KEYS[6], 0, tonumber(ARGV[6]) - 1)
+end
+return 1
+"""
+
+# 回收可见性超时的任务
+# KEYS[1]=可见性ZSET KEYS[2]=处理中集合 KEYS[3]=就绪队列 KEYS[4]=唤醒信号列表
+# ARGV: now, task_prefix, user_processing_prefix, batch_size, signal_max_len
+# 过期任务放回队尾（下一个被认领），返回被回收的任务ID列表
+RECLAIM_EXPIRED_LUA = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[4]))
+local requeued = {}
+for _, task_id in ipairs(ids) do
+    local task_key = ARGV[2] .. task_id
+    redis.call('ZREM', KEYS[1], task_id)
+    redis.call('SREM', KEYS[2], task_id)
+    local user = redis.call('HGET', task_key, 'user')
+    if user then
+        redis.call('SREM', ARGV[3] .. user, task_id)
+    end
+    if redis.call('HGET', task_key, 'status') == 'processing' then
+        redis.call('HSET', task_key, 'status', 'queued', 'worker_id', '', 'requeued_at', ARGV[1])
+        redis.call('RPUSH', KEYS[3], task_id)
+        redis.call('LPUSH', KEYS[4], '1')
+        table.insert(requeued, task_id)
+    end
+end
+if #requeued > 0 then
+    redis.call('LTRIM', KEYS[4], 0, tonumber(ARGV[5]) - 1)
+end
+return requeued
+"""
+
+# 续租可见性截止时间（Worker 心跳时调用）
+# KEYS[1]=任务Hash KEYS[2]=可见性ZSET
+# ARGV: task_id, worker_id, deadline
+# 仅当任务仍由该 Worker 处理中且尚未被回收时（ZADD XX 只更新已存在的成员）推迟截止时间；
+# 返回 1=已续租 0=任务已被回收或由其他Worker认领（本Worker已失去所有权）
+RENEW_LEASE_LUA = """
+if redis.call('HGET', KEYS[1], 'status') ~= 'processing' then
+    return 0
+end
+if redis.call('HGET', KEYS[1], 'worker_id') ~= ARGV[2] then
+    return 0
+end
+if redis.call('ZSCORE', KEYS[2], ARGV[1]) == false then
+    return 0
+end
+redis.call('ZADD', KEYS[2], 'XX', tonumber(ARGV[3]), ARGV[1])
+return 1
+"""
@@ -29,6 +29,15 @@ from app.services.queue import (
     DEFAULT_USER_CONCURRENT_LIMIT,
     GLOBAL_CONCURRENT_LIMIT,
     VISIBILITY_TIMEOUT_SECONDS,
+    READY_SIGNAL_LIST,
+    VISIBILITY_ZSET,
+    READY_SIGNAL_MAX_LEN,
+    CLAIM_SCAN_LIMIT,
+    RECLAIM_BATCH_SIZE,
+    CLAIM_TASK_LUA,
+    ACK_TASK_LUA,
+    RECLAIM_EXPIRED_LUA,
+    RENEW_LEASE_LUA,
     check_user_concurrent_limit,
     check_global_concurrent_limit,
     mark_task_processing,
@@ -50,6 +59,11 @@ class QueueService:
         self.user_concurrent_limit = DEFAULT_USER_CONCURRENT_LIMIT
         self.global_concurrent_limit = GLOBAL_CONCURRENT_LIMIT
         self.visibility_timeout = VISIBILITY_TIMEOUT_SECONDS
+        # 认领/确认/回收/续租均为服务端原子脚本（register_script 不产生网络请求）
+        self._claim_script = redis.register_script(CLAIM_TASK_LUA)
+        self._ack_script = redis.register_script(ACK_TASK_LUA)
+        self._reclaim_script = redis.register_script(RECLAIM_EXPIRED_LUA)
+        self._renew_script = redis.register_script(RENEW_LEASE_LUA)
 
     async def enqueue_task(
         self,
@@ -85,54 +99,39 @@ class QueueService:
         if batch_id:
             mapping["batch_id"] = batch_id
 
-        # 保存任务数据
-        await self.r.hset(key, mapping=mapping)
-
-        # 添加到FIFO队列
-        await self.r.lpush(READY_LIST, task_id)
-
+        # 保存任务数据、加入FIFO队列并唤醒阻塞的Worker（单次事务提交）
+        pipe = self.r.pipeline(transaction=True)
+        pipe.hset(key, mapping=mapping)
+        pipe.lpush(READY_LIST, task_id)
         if batch_id:
-            await self.r.sadd(BATCH_TASKS_PREFIX + batch_id, task_id)
+            pipe.sadd(BATCH_TASKS_PREFIX + batch_id, task_id)
+        pipe.lpush(READY_SIGNAL_LIST, "1")
+        pipe.ltrim(READY_SIGNAL_LIST, 0, READY_SIGNAL_MAX_LEN - 1)
+        await pipe.execute()
 
         logger.info(f"任务已入队: {task_id}")
         return task_id
 
-    async def dequeue_task(self, worker_id: str) -> Optional[Dict[str, Any]]:
-        """从FIFO队列中取出任务"""
+    async def dequeue_task(self, worker_id: str, block_timeout: float = 0) -> Optional[Dict[str, Any]]:
+        """从FIFO队列中认领任务
+
+        认领、并发限制检查与可见性超时在同一个Lua脚本中原子完成；
+        block_timeout > 0 时，队列中暂无可认领任务则阻塞等待唤醒信号，而不是由调用方轮询休眠
+        """
         try:
-            # 从FIFO队列获取任务
-            task_id = await self.r.rpop(READY_LIST)
+            task_id = await self._claim(worker_id)
+            if not task_id and block_timeout > 0:
+                # 入队、确认释放名额、过期回收都会推送信号
+                if await self.r.blpop([READY_SIGNAL_LIST], timeout=block_timeout):
+                    task_id = await self._claim(worker_id)
             if not task_id:
                 return None
 
-            # 获取任务详情
             task_data = await self.get_task(task_id)
             if not task_data:
                 logger.warning(f"任务数据不存在: {task_id}")
                 return None
 
-            user_id = task_data.get("user")
-
-            # 再次检查并发限制（防止竞态条件）
-            if not await self._check_user_concurrent_limit(user_id):
-                # 如果超过限制，将任务放回队列
-                await self.r.lpush(READY_LIST, task_id)
-                logger.warning(f"用户 {user_id} 并发限制，任务重新入队: {task_id}")
-                return None
-
-            # 标记任务为处理中
-            await self._mark_task_processing(task_id, user_id, worker_id)
-
-            # 设置可见性超时
-            await self._set_visibility_timeout(task_id, worker_id)
-
-            # 更新任务状态
-            await self.r.hset(TASK_PREFIX + task_id, mapping={
-                "status": "processing",
-                "worker_id": worker_id,
-                "started_at": str(int(time.time()))
-            })
-
             logger.info(f"任务已出队: {task_id} -> Worker: {worker_id}")
             return task_data
 
@@ -140,34 +139,46 @@ class QueueService:
             logger.error(f"出队失败: {e}")
             return None
 
-    async def ack_task(self, task_id: str, success: bool = True) -> bool:
-        """确认任务完成"""
+    async def _claim(self, worker_id: str) -> Optional[str]:
+        """执行原子认领脚本，返回任务ID"""
+        return await self._claim_script(
+            keys=[READY_LIST, SET_PROCESSING, VISIBILITY_ZSET],
+            args=[
+                worker_id,
+                int(time.time()),
+                self.visibility_timeout,
+                self.user_concurrent_limit,
+                self.global_concurrent_limit,
+                TASK_PREFIX,
+                USER_PROCESSING_PREFIX,
+                CLAIM_SCAN_LIMIT,
+            ],
+        )
+
+    async def ack_task(self, task_id: str, success: bool = True, worker_id: Optional[str] = None) -> bool:
+        """确认任务完成
+
+        传入 worker_id 时，若任务已因可见性超时被回收或被其他Worker重新认领，则拒绝本次确认并返回 False，
+        调用方应视为已失去任务所有权（任务会由其他Worker重新执行）
+        """
         try:
-            task_data = await self.get_task(task_id)
-            if not task_data:
-                return False
-
-            user_id = task_data.get("user")
-            worker_id = task_data.get("worker_id")
-
-            # 从处理中集合移除
-            await self._unmark_task_processing(task_id, user_id)
-
-            # 清除可见性超时
-            await self._clear_visibility_timeout(task_id)
-
-            # 更新任务状态
             status = "completed" if success else "failed"
-            await self.r.hset(TASK_PREFIX + task_id, mapping={
-                "status": status,
-                "completed_at": str(int(time.time()))
-            })
-
-            # 添加到相应的集合
-            if success:
-                await self.r.sadd(SET_COMPLETED, task_id)
-            else:
-                await self.r.sadd(SET_FAILED, task_id)
+            result = await self._ack_script(
+                keys=[
+                    TASK_PREFIX + task_id,
+                    SET_PROCESSING,
+                    VISIBILITY_ZSET,
+                    SET_COMPLETED if success else SET_FAILED,
+                    READY_LIST,
+                    READY_SIGNAL_LIST,
+                ],
+                args=[task_id, status, int(time.time()), USER_PROCESSING_PREFIX, worker_id or "", READY_SIGNAL_MAX_LEN],
+            )
+            if int(result) == -1:
+                logger.error(f"任务已被重新认领，拒绝过期确认: {task_id} (Worker: {worker_id})")
+                return False
+            if int(result) == 0:
+                return False
 
             logger.info(f"任务已确认: {task_id} (成功: {success})")
             return True
@@ -176,6 +187,26 @@ class QueueService:
             logger.error(f"确认任务失败: {e}")
             return False
 
+    async def renew_lease(self, task_id: str, worker_id: str) -> bool:
+        """续租可见性截止时间（now + visibility_timeout），由 Worker 心跳在任务处理期间调用
+
+        Returns:
+            bool: 任务已被回收或由其他Worker认领时返回 False（已失去所有权）；
+                  Redis 异常时无法判断，返回 True 由下一次心跳重试
+        """
+        try:
+            result = await self._renew_script(
+                keys=[TASK_PREFIX + task_id, VISIBILITY_ZSET],
+                args=[task_id, worker_id, int(time.time()) + self.visibility_timeout],
+            )
+            if int(result) != 1:
+                logger.error(f"任务续租失败，已失去所有权: {task_id} (Worker: {worker_id})")
+                return False
+            return True
+        except Exception as e:
+            logger.warning(f"任务续租异常: {task_id} - {e}")
+            return True
+
     async def create_batch(self, user_id: str, symbols: List[str], params: Dict[str, Any]) -> tuple[str, int]:
         batch_id = str(uuid.uuid4())
         now = int(time.time())
@@ -270,63 +301,29 @@ class QueueService:
             "available_slots": max(0, self.user_concurrent_limit - int(processing_count or 0))
         }
 
-    async def cleanup_expired_tasks(self):
-        """清理过期任务（可见性超时）"""
+    async def reclaim_expired_tasks(self) -> List[str]:
+        """回收可见性超时的任务（按截止时间ZSET扫描，原子放回队列）"""
+        reclaimed: List[str] = []
         try:
-            # 获取所有可见性超时键
-            timeout_keys = await self.r.keys(VISIBILITY_TIMEOUT_PREFIX + "*")
-
-            current_time = int(time.time())
-            expired_tasks = []
-
-            for timeout_key in timeout_keys:
-                timeout_data = await self.r.hgetall(timeout_key)
-                if timeout_data:
-                    timeout_at = int(timeout_data.get("timeout_at", 0))
-                    if current_time > timeout_at:
-                        task_id = timeout_data.get("task_id")
-                        if task_id:
-                            expired_tasks.append(task_id)
-
-            # 处理过期任务
-            for task_id in expired_tasks:
-                await self._handle_expired_task(task_id)
-
-            if expired_tasks:
-                logger.warning(f"处理了 {len(expired_tasks)} 个过期任务")
+            while True:
+                batch = await self._reclaim_script(
+                    keys=[VISIBILITY_ZSET, SET_PROCESSING, READY_LIST, READY_SIGNAL_LIST],
+                    args=[int(time.time()), TASK_PREFIX, USER_PROCESSING_PREFIX, RECLAIM_BATCH_SIZE, READY_SIGNAL_MAX_LEN],
+                )
+                reclaimed.extend(batch or [])
+                if len(batch or []) < RECLAIM_BATCH_SIZE:
+                    break
+
+            if reclaimed:
+                logger.warning(f"过期任务重新入队: {len(reclaimed)} 个")
 
         except Exception as e:
-            logger.error(f"清理过期任务失败: {e}")
+            logger.error(f"回收过期任务失败: {e}")
+        return reclaimed
 
-    async def _handle_expired_task(self, task_id: str):
-        """处理过期任务"""
-        try:
-            task_data = await self.get_task(task_id)
-            if not task_data:
-                return
-
-            user_id = task_data.get("user")
-
-            # 从处理中集合移除
-            await self._unmark_task_processing(task_id, user_id)
-
-            # 清除可见性超时
-            await self._clear_visibility_timeout(task_id)
-
-            # 重新加入队列
-            await self.r.lpush(READY_LIST, task_id)
-
-            # 更新任务状态
-            await self.r.hset(TASK_PREFIX + task_id, mapping={
-                "status": "queued",
-                "worker_id": "",
-                "requeued_at": str(int(time.time()))
-            })
-
-            logger.warning(f"过期任务重新入队: {task_id}")
-
-        except Exception as e:
-            logger.error(f"处理过期任务失败: {task_id} - {e}")
+    async def cleanup_expired_tasks(self):
+        """清理过期任务（可见性超时），保留旧接口名"""
+        await self.reclaim_expired_tasks()
 
     async def cancel_task(self, task_id: str) -> bool:
         """取消任务"""
@@ -1,6 +1,10 @@
+import asyncio
+import json
 import logging
+import math
+import time
 from datetime import datetime, time as dtime, timedelta
-from typing import Dict, Optional, Tuple, List
+from typing import Any, Dict, Optional, Tuple, List
 from zoneinfo import ZoneInfo
 from collections import deque
 
@@ -9,9 +13,40 @@ from pymongo import UpdateOne
 from app.core.config import settings
 from app.core.database import get_mongo_db
 from app.services.data_sources.manager import DataSourceManager
+from app.services.intraday_bar_service import get_intraday_bar_service
 
 logger = logging.getLogger(__name__)
 
+# 入库的行情字段（同时是变更检测与变更流差量中数值的顺序）
+QUOTE_FIELDS = ("close", "pct_chg", "amount", "volume", "open", "high", "low", "pre_close")
+
+
+def _json_number(value: Any) -> Any:
+    """转换为可 JSON 序列化的数值（numpy 数值转 float，NaN 转 None）"""
+    if value is None or isinstance(value, (int, str)):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return None if math.isnan(number) else number
+
+
+def decode_quote_changes(fields: Dict[Any, Any]) -> Dict[str, Dict[str, Any]]:
+    """解析行情变更流中的一条记录，返回 {code: {字段: 值}}（供 WebSocket/SSE 推送与缓存失效使用）"""
+    def _text(value: Any) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+    fields = {_text(k): _text(v) for k, v in fields.items()}
+    names = fields.get("fields", "").split(",")
+    trade_date = fields.get("trade_date")
+    result = {}
+    for code, values in json.loads(fields.get("data") or "{}").items():
+        quote = dict(zip(names, values))
+        quote["trade_date"] = trade_date
+        result[code] = quote
+    return result
+
 
 class QuotesIngestionService:
     """
@@ -23,6 +58,13 @@ class QuotesIngestionService:
     - 智能限流：Tushare免费用户每小时最多2次，付费用户自动切换到高频模式（5秒）
     - 休市时间：跳过任务，保持上次收盘数据；必要时执行一次性兜底补数
     - 字段：code(6位)、close、pct_chg、amount、open、high、low、pre_close、trade_date、updated_at
+    - 增量入库：内存中保存每只股票上次写入的快照哈希，只写入发生变化的行，
+      按 QUOTES_FULL_REFRESH_SECONDS 周期全量重写一次；
+      因此 market_quotes.updated_at 表示行情最后变化（或最近一次全量重写）的时间，而不是最后一次采集到的时间，
+      最后采集时间见 quotes_ingestion_status.last_sync_time
+    - 变更流：每次采集的变更集以紧凑差量发布到 Redis Stream（QUOTES_CHANGE_STREAM_KEY）
+    - 日内K线：变更集同时聚合为分钟 OHLCV K线（见 intraday_bar_service）
+    - 同步的数据源调用在线程中执行，不阻塞事件循环
     """
 
     def __init__(self, collection_name: str = "market_quotes") -> None:
@@ -44,6 +86,17 @@ class QuotesIngestionService:
         self._rotation_sources = ["tushare", "akshare_eastmoney", "akshare_sina"]
         self._rotation_index = 0  # 当前轮换索引
 
+        # 增量入库相关属性
+        self._last_hashes: Dict[str, int] = {}  # code -> 上次写入的行情快照哈希
+        self._last_full_refresh: Optional[float] = None  # 上次全量写入的时间（monotonic）
+        self._manager: Optional[DataSourceManager] = None
+
+    def _get_manager(self) -> DataSourceManager:
+        """进程内复用同一个 DataSourceManager，避免每次采集都重新初始化适配器"""
+        if self._manager is None:
+            self._manager = DataSourceManager()
+        return self._manager
+
     @staticmethod
     def _normalize_stock_code(code: str) -> str:
         """
@@ -92,6 +145,8 @@ class QuotesIngestionService:
             await coll.create_index("updated_at")
         except Exception as e:
             logger.warning(f"创建行情表索引失败（忽略）: {e}")
+        if settings.INTRADAY_BARS_ENABLED:
+            await get_intraday_bar_service().ensure_indexes()
 
     async def _record_sync_status(
         self,
@@ -364,10 +419,38 @@ class QuotesIngestionService:
         except Exception:
             return True
 
-    async def _bulk_upsert(self, quotes_map: Dict[str, Dict], trade_date: str, source: Optional[str] = None) -> None:
+    def _full_refresh_due(self, now: float) -> bool:
+        interval = settings.QUOTES_FULL_REFRESH_SECONDS
+        return (
+            interval <= 0
+            or self._last_full_refresh is None
+            or now - self._last_full_refresh >= interval
+        )
+
+    async def _bulk_upsert(
+        self,
+        quotes_map: Dict[str, Dict],
+        trade_date: str,
+        source: Optional[str] = None,
+        full: bool = False,
+    ) -> Dict[str, Tuple]:
+        """
+        写入行情，默认只写入与上次快照相比发生变化的股票
+
+        Args:
+            full: 强制全量写入（未变化的行也刷新 updated_at）
+
+        Returns:
+            Dict[str, Tuple]: 本次发生变化的股票 {code: 按 QUOTE_FIELDS 排列的数值}
+        """
         db = get_mongo_db()
         coll = db[self.collection_name]
+        now = time.monotonic()
+        full = full or self._full_refresh_due(now)
+
         ops = []
+        changed: Dict[str, Tuple] = {}
+        hashes: Dict[str, int] = {}
         updated_at = datetime.now(self.tz)
         for code, q in quotes_map.items():
             if not code:
@@ -377,39 +460,67 @@ class QuotesIngestionService:
             if not code6:
                 continue
 
+            values = tuple(q.get(field) for field in QUOTE_FIELDS)
+            # 按归一化后的值计算哈希：NaN 的哈希随对象变化（Python 3.10+），停牌/缺字段的股票会被误判为每次都变化
+            snapshot_hash = hash((trade_date,) + tuple(_json_number(v) for v in values))
+            is_changed = self._last_hashes.get(code6) != snapshot_hash
+            if not (is_changed or full):
+                continue
+            hashes[code6] = snapshot_hash
+            if is_changed:
+                changed[code6] = values
+
             # 🔥 日志：记录写入的成交量值
-            volume = q.get("volume")
             if code6 in ["300750", "000001", "600000"]:  # 只记录几个示例股票
-                logger.info(f"📊 [写入market_quotes] {code6} - volume={volume}, amount={q.get('amount')}, source={source}")
-
-            ops.append(
-                UpdateOne(
-                    {"code": code6},
-                    {"$set": {
-                        "code": code6,
-                        "symbol": code6,  # 添加 symbol 字段，与 code 保持一致
-                        "close": q.get("close"),
-                        "pct_chg": q.get("pct_chg"),
-                        "amount": q.get("amount"),
-                        "volume": volume,
-                        "open": q.get("open"),
-                        "high": q.get("high"),
-                        "low": q.get("low"),
-                        "pre_close": q.get("pre_close"),
-                        "trade_date": trade_date,
-                        "updated_at": updated_at,
-                    }},
-                    upsert=True,
-                )
-            )
+                logger.info(f"📊 [写入market_quotes] {code6} - volume={q.get('volume')}, amount={q.get('amount')}, source={source}")
+
+            doc = {
+                "code": code6,
+                "symbol": code6,  # 添加 symbol 字段，与 code 保持一致
+                **dict(zip(QUOTE_FIELDS, values)),
+                "trade_date": trade_date,
+                "updated_at": updated_at,
+            }
+            ops.append(UpdateOne({"code": code6}, {"$set": doc}, upsert=True))
+
         if not ops:
-            logger.info("无可写入的数据，跳过")
-            return
+            logger.info(f"⏭️ 行情无变化，跳过入库 source={source}, total={len(quotes_map)}")
+            return {}
         result = await coll.bulk_write(ops, ordered=False)
+        self._last_hashes.update(hashes)
+        if full:
+            self._last_full_refresh = now
         logger.info(
-            f"✅ 行情入库完成 source={source}, matched={result.matched_count}, upserted={len(result.upserted_ids) if result.upserted_ids else 0}, modified={result.modified_count}"
+            f"✅ 行情入库完成 source={source}, mode={'full' if full else 'delta'}, changed={len(changed)}/{len(quotes_map)}, "
+            f"matched={result.matched_count}, upserted={len(result.upserted_ids) if result.upserted_ids else 0}, modified={result.modified_count}"
         )
 
+        await self._publish_changes(changed, trade_date, source)
+        return changed
+
+    async def _publish_changes(self, changed: Dict[str, Tuple], trade_date: str, source: Optional[str]) -> None:
+        """将本次变更集以紧凑差量发布到 Redis Stream；Redis 不可用时忽略"""
+        if not changed or not settings.QUOTES_CHANGE_STREAM_ENABLED:
+            return
+        try:
+            from app.core.database import get_redis_client
+            redis = get_redis_client()
+            data = {code: [_json_number(v) for v in values] for code, values in changed.items()}
+            await redis.xadd(
+                settings.QUOTES_CHANGE_STREAM_KEY,
+                {
+                    "trade_date": str(trade_date),
+                    "source": source or "",
+                    "fields": ",".join(QUOTE_FIELDS),
+                    "count": len(changed),
+                    "data": json.dumps(data, separators=(",", ":")),
+                },
+                maxlen=settings.QUOTES_CHANGE_STREAM_MAXLEN,
+                approximate=True,
+            )
+        except Exception as e:
+            logger.debug(f"发布行情变更流失败（忽略）: {e}")
+
     async def backfill_from_historical_data(self) -> None:
         """
         从历史数据集合导入前一天的收盘数据到 market_quotes
@@ -429,11 +540,11 @@ class QuotesIngestionService:
             logger.info("📊 market_quotes 集合为空，开始从历史数据导入")
 
             db = get_mongo_db()
-            manager = DataSourceManager()
+            manager = self._get_manager()
 
             # 获取最新交易日
             try:
-                latest_trade_date = manager.find_latest_trade_date_with_fallback()
+                latest_trade_date = await asyncio.to_thread(manager.find_latest_trade_date_with_fallback)
                 if not latest_trade_date:
                     logger.warning("⚠️ 无法获取最新交易日，跳过历史数据导入")
                     return
@@ -487,7 +598,7 @@ class QuotesIngestionService:
                 }
 
             if quotes_map:
-                await self._bulk_upsert(quotes_map, latest_trade_date, "historical_data")
+                await self._bulk_upsert(quotes_map, latest_trade_date, "historical_data", full=True)
                 logger.info(f"✅ 成功从历史数据导入 {len(quotes_map)} 条收盘数据到 market_quotes")
             else:
                 logger.warning("⚠️ 历史数据转换后为空，无法导入")
@@ -500,14 +611,14 @@ class QuotesIngestionService:
     async def backfill_last_close_snapshot(self) -> None:
         """一次性补齐上一笔收盘快照（用于冷启动或数据陈旧）。允许在休市期调用。"""
         try:
-            manager = DataSourceManager()
+            manager = self._get_manager()
             # 使用近实时快照作为兜底，休市期返回的即为最后收盘数据
-            quotes_map, source = manager.get_realtime_quotes_with_fallback()
+            quotes_map, source = await asyncio.to_thread(manager.get_realtime_quotes_with_fallback)
             if not quotes_map:
                 logger.warning("backfill: 未获取到行情数据，跳过")
                 return
             try:
-                trade_date = manager.find_latest_trade_date_with_fallback() or datetime.now(self.tz).strftime("%Y%m%d")
+                trade_date = await asyncio.to_thread(manager.find_latest_trade_date_with_fallback) or datetime.now(self.tz).strftime("%Y%m%d")
             except Exception:
                 trade_date = datetime.now(self.tz).strftime("%Y%m%d")
             await self._bulk_upsert(quotes_map, trade_date, source)
@@ -526,8 +637,7 @@ class QuotesIngestionService:
                 return
 
             # 如果集合不为空但数据陈旧，使用实时接口更新
-            manager = DataSourceManager()
-            latest_td = manager.find_latest_trade_date_with_fallback()
+            latest_td = await asyncio.to_thread(self._get_manager().find_latest_trade_date_with_fallback)
             if await self._collection_stale(latest_td):
                 logger.info("🔁 触发休市期/启动期 backfill 以填充最新收盘数据")
                 await self.backfill_last_close_snapshot()
@@ -615,7 +725,7 @@ class QuotesIngestionService:
             # 首次运行：检测 Tushare 权限
             if settings.QUOTES_AUTO_DETECT_TUSHARE_PERMISSION and not self._tushare_permission_checked:
                 logger.info("🔍 首次运行，检测 Tushare rt_k 接口权限...")
-                has_premium = self._check_tushare_permission()
+                has_premium = await asyncio.to_thread(self._check_tushare_permission)
 
                 if has_premium:
                     logger.info(
@@ -630,8 +740,8 @@ class QuotesIngestionService:
             # 获取下一个数据源
             source_type, akshare_api = self._get_next_source()
 
-            # 尝试获取行情
-            quotes_map, source_name = self._fetch_quotes_from_source(source_type, akshare_api)
+            # 尝试获取行情（同步的数据源调用放到线程中执行，不阻塞事件循环）
+            quotes_map, source_name = await asyncio.to_thread(self._fetch_quotes_from_source, source_type, akshare_api)
 
             if not quotes_map:
                 logger.warning(f"⚠️ {source_name or source_type} 未获取到行情数据，跳过本次入库")
@@ -646,13 +756,26 @@ class QuotesIngestionService:
 
             # 获取交易日
             try:
-                manager = DataSourceManager()
-                trade_date = manager.find_latest_trade_date_with_fallback() or datetime.now(self.tz).strftime("%Y%m%d")
+                trade_date = await asyncio.to_thread(
+                    self._get_manager().find_latest_trade_date_with_fallback
+                ) or datetime.now(self.tz).strftime("%Y%m%d")
             except Exception:
                 trade_date = datetime.now(self.tz).strftime("%Y%m%d")
 
             # 入库
-            await self._bulk_upsert(quotes_map, trade_date, source_name)
+            tick_time = datetime.now(self.tz)
+            changed = await self._bulk_upsert(quotes_map, trade_date, source_name)
+
+            # 聚合日内分钟K线（只处理发生变化的股票，失败不影响行情入库）
+            if changed and settings.INTRADAY_BARS_ENABLED:
+                try:
+                    await get_intraday_bar_service().record_tick(
+                        {code: dict(zip(QUOTE_FIELDS, values)) for code, values in changed.items()},
+                        trade_date,
+                        tick_time,
+                    )
+                except Exception as e:
+                    logger.warning(f"⚠️ 日内分钟K线聚合失败（忽略）: {e}")
 
             # 记录成功状态
             await self._record_sync_status(
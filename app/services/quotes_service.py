@@ -60,8 +60,9 @@ class QuotesService:
         不同版本可能有差异，做多列名兼容。
         """
         try:
-            import akshare as ak  # 已在项目中使用，不额外安装
-            df = ak.stock_zh_a_spot_em()
+            from tradingagents.dataflows.cache.spot_snapshot import A_SHARE_SPOT_EM, get_spot_snapshot
+            # 与 AKShare 单股/批量行情共享同一份全市场快照，快照新鲜度不低于本服务的 TTL
+            df = get_spot_snapshot(A_SHARE_SPOT_EM).get_frame(max_age=self._ttl)
             if df is None or getattr(df, "empty", True):
                 logger.warning("AKShare spot 返回空数据")
                 return {}
@@ -157,6 +157,100 @@ def evaluate_conditions(
     return False
 
 
+def _column(frame: pd.DataFrame, field: str) -> pd.Series:
+    if field in frame.columns:
+        return pd.to_numeric(frame[field], errors="coerce")
+    return pd.Series(np.nan, index=frame.index)
+
+
+def evaluate_conditions_mask(
+    latest: pd.DataFrame,
+    prev: pd.DataFrame,
+    node: Dict[str, Any],
+    allowed_fields: Iterable[str],
+    allowed_ops: Iterable[str],
+) -> pd.Series:
+    """
+    evaluate_conditions 的向量化版本：一次评估全市场
+
+    Args:
+        latest: 每只股票最近一行（index=股票代码，columns=字段）
+        prev: 每只股票倒数第二行（与 latest 同索引），交叉条件使用
+
+    Returns:
+        index 与 latest 一致的布尔 Series，语义与逐股票 evaluate_conditions 相同
+    """
+    if not node:
+        return pd.Series(True, index=latest.index)
+    # group 节点
+    if node.get("op") == "group" or "children" in node:
+        logic = (node.get("logic") or "AND").upper()
+        children = node.get("children", [])
+        if logic not in {"AND", "OR"}:
+            logic = "AND"
+        mask = pd.Series(logic == "AND", index=latest.index)
+        for c in children:
+            child = evaluate_conditions_mask(latest, prev, c, allowed_fields, allowed_ops)
+            mask = (mask & child) if logic == "AND" else (mask | child)
+        return mask
+
+    none = pd.Series(False, index=latest.index)
+    field = node.get("field")
+    op = node.get("op")
+    if field not in allowed_fields or op not in set(allowed_ops):
+        return none
+
+    # 交叉：最近两行，四个值都必须有效
+    if op in {"cross_up", "cross_down"}:
+        right_field = node.get("right_field")
+        if right_field not in allowed_fields:
+            return none
+        prev = prev.reindex(latest.index)
+        a0, a1 = _column(latest, field), _column(prev, field)
+        b0, b1 = _column(latest, right_field), _column(prev, right_field)
+        valid = a0.notna() & a1.notna() & b0.notna() & b1.notna()
+        if op == "cross_up":
+            return valid & (a1 <= b1) & (a0 > b0)
+        return valid & (a1 >= b1) & (a0 < b0)
+
+    # 普通比较：最近一行
+    left = _column(latest, field)
+    valid = left.notna()
+
+    if node.get("right_field"):
+        rf = node.get("right_field")
+        if rf not in allowed_fields or rf not in latest.columns:
+            return none
+        right = _column(latest, rf)
+    else:
+        right = node.get("value")
+
+    try:
+        if op == "between":
+            lo_hi = right if isinstance(right, (list, tuple)) else (None, None)
+            lo, hi = lo_hi if isinstance(lo_hi, (list, tuple)) and len(lo_hi) == 2 else (None, None)
+            if lo is None or hi is None:
+                return none
+            return valid & (left >= float(lo)) & (left <= float(hi))
+        if not isinstance(right, pd.Series):
+            right = float(right)
+        if op == ">":
+            return valid & (left > right)
+        if op == "<":
+            return valid & (left < right)
+        if op == ">=":
+            return valid & (left >= right)
+        if op == "<=":
+            return valid & (left <= right)
+        if op == "==":
+            return valid & (left == right)
+        if op == "!=":
+            return valid & (left != right)
+    except Exception:
+        return none
+    return none
+
+
 def safe_float(v: Any) -> Optional[float]:
     try:
         if v is None or (isinstance(v, float) and np.isnan(v)):
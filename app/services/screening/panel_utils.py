@@ -0,0 +1,58 @@
+"""
+Utility functions for building (bar × symbol) panels from long-format daily bars.
+Shared by ScreeningService (full-universe screening) and IndicatorSnapshotService.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+def build_bar_panel(bars: pd.DataFrame, fields: Iterable[str]) -> Dict[str, pd.DataFrame]:
+    """
+    长表 → 面板：{字段: (bar × symbol) DataFrame}
+
+    按K线序号右对齐：每只股票的最新一根K线都在最后一行，停牌/新股只在前面留 NaN，
+    因此逐列计算的指标与按股票单独计算的结果一致。
+
+    Args:
+        bars: 至少包含 symbol、trade_date、close 列的长表
+        fields: 需要展开为面板的字段
+
+    Returns:
+        面板字典，额外包含派生字段 pct_chg（按相邻K线收盘价计算）
+    """
+    bars = bars.sort_values(["symbol", "trade_date"], kind="mergesort")
+    bars = bars.drop_duplicates(["symbol", "trade_date"], keep="last")
+    codes, symbols = pd.factorize(bars["symbol"], sort=True)
+    rev_pos = bars.groupby("symbol", sort=False).cumcount(ascending=False).to_numpy()
+    n_bars = int(rev_pos.max()) + 1
+    rows = n_bars - 1 - rev_pos
+    index = pd.RangeIndex(n_bars)
+    columns = pd.Index(symbols, name="symbol")
+
+    panel: Dict[str, pd.DataFrame] = {}
+    for f in fields:
+        if f not in bars.columns:
+            continue
+        grid = np.full((n_bars, len(symbols)), np.nan)
+        grid[rows, codes] = pd.to_numeric(bars[f], errors="coerce").to_numpy(dtype=float)
+        panel[f] = pd.DataFrame(grid, index=index, columns=columns)
+    close = panel["close"]
+    panel["pct_chg"] = (close / close.shift(1) - 1) * 100.0
+    return panel
+
+
+def last_trade_dates(bars: pd.DataFrame, n: int = 2) -> pd.DataFrame:
+    """
+    每只股票最近 n 根K线的交易日期
+
+    Returns:
+        index=symbol，列 0..n-1 依次为最新、上一根……（不足时为 NaN）
+    """
+    bars = bars[["symbol", "trade_date"]].drop_duplicates().sort_values(["symbol", "trade_date"])
+    tail = bars.groupby("symbol").tail(n)
+    tail = tail.assign(k=tail.groupby("symbol").cumcount(ascending=False))
+    return tail.pivot(index="symbol", columns="k", values="trade_date").reindex(columns=range(n))
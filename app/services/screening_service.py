@@ -3,12 +3,13 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+import time
 
 import pandas as pd
 import numpy as np
 
 # 统一指标库
-from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many
+from tradingagents.tools.analysis.indicators import STANDARD_SPECS, compute_panel
 # 统一多数据源DF接口（按优先级降级）
 from tradingagents.dataflows.data_source_manager import get_data_source_manager
 from tradingagents.dataflows.providers.china.fundamentals_snapshot import get_cn_fund_snapshot
@@ -17,9 +18,11 @@ from tradingagents.dataflows.providers.china.fundamentals_snapshot import get_cn
 from app.services.screening.eval_utils import (
     collect_fields_from_conditions as _collect_fields_from_conditions_util,
     evaluate_conditions as _evaluate_conditions_util,
+    evaluate_conditions_mask as _evaluate_conditions_mask_util,
     evaluate_fund_conditions as _evaluate_fund_conditions_util,
     safe_float as _safe_float_util,
 )
+from app.services.screening.panel_utils import build_bar_panel as _build_bar_panel_util
 
 # --- DSL 约束 ---
 ALLOWED_FIELDS = {
@@ -54,6 +57,14 @@ FUND_FIELDS = {"pe", "pb", "roe", "market_cap"}
 
 ALLOWED_OPS = {">", "<", ">=", "<=", "==", "!=", "between", "cross_up", "cross_down"}
 
+# --- 面板计算 ---
+PANEL_LOOKBACK_DAYS = 220  # 约150根日线，覆盖 ma60/ema26 预热
+PANEL_FIELDS = ["open", "high", "low", "close", "vol", "amount"]
+PANEL_QUERY_BATCH_SIZE = 10000
+FALLBACK_SYMBOL_LIMIT = 120  # 数据库无K线时逐股票降级的上限
+PANEL_SPECS = STANDARD_SPECS
+RESULT_TECH_FIELDS = ["ma20", "rsi14", "kdj_k", "kdj_d", "kdj_j", "dif", "dea", "macd_hist"]
+
 
 @dataclass
 class ScreeningParams:
@@ -76,16 +87,12 @@ class ScreeningService:
     # --- 公共入口 ---
     def run(self, conditions: Dict[str, Any], params: ScreeningParams) -> Dict[str, Any]:
         symbols = self._get_universe()
-        # 为控制时长，先限制样本规模（后续用批量/缓存优化）
-        symbols = symbols[:120]
 
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=220)
+        end_date = datetime.strptime(params.date, "%Y-%m-%d") if params.date else datetime.now()
+        start_date = end_date - timedelta(days=PANEL_LOOKBACK_DAYS)
         end_s = end_date.strftime("%Y-%m-%d")
         start_s = start_date.strftime("%Y-%m-%d")
 
-        results: List[Dict[str, Any]] = []
-
         # 解析条件中涉及的字段，决定是否需要技术指标/行情
         needed_fields = self._collect_fields_from_conditions(conditions)
         order_fields = {o.get("field") for o in (params.order_by or []) if o.get("field")}
@@ -94,77 +101,12 @@ class ScreeningService:
         need_base = any(f in BASE_FIELDS for f in all_needed) or need_tech
         need_fund = any(f in FUND_FIELDS for f in all_needed)
 
-        for code in symbols:
-            try:
-                dfc = None
-                last = None
-
-                # 如需要基础行情/技术指标才取K线
-                if need_base:
-                    manager = get_data_source_manager()
-                    df = manager.get_stock_dataframe(code, start_s, end_s)
-                    if df is None or df.empty:
-                        continue
-                    # 统一列为小写
-                    dfu = df.rename(columns={
-                        "Open": "open", "High": "high", "Low": "low", "Close": "close",
-                        "Volume": "vol", "Amount": "amount"
-                    }).copy()
-                    # 计算派生：pct_chg
-                    if "close" in dfu.columns:
-                        dfu["pct_chg"] = dfu["close"].pct_change() * 100.0
-
-                    # 仅在需要技术指标时计算
-                    if need_tech:
-                        specs = [
-                            IndicatorSpec("ma", {"n": 5}),
-                            IndicatorSpec("ma", {"n": 10}),
-                            IndicatorSpec("ma", {"n": 20}),
-                            IndicatorSpec("ema", {"n": 12}),
-                            IndicatorSpec("ema", {"n": 26}),
-                            IndicatorSpec("macd"),
-                            IndicatorSpec("rsi", {"n": 14}),
-                            IndicatorSpec("boll", {"n": 20, "k": 2}),
-                            IndicatorSpec("atr", {"n": 14}),
-                            IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
-                        ]
-                        dfc = compute_many(dfu, specs)
-                    else:
-                        dfc = dfu
-
-                    last = dfc.iloc[-1]
-
-                # 评估条件（若条件完全是基本面且不涉及行情/技术，这里可跳过K线）
-                passes = True
-                if need_base:
-                    passes = self._evaluate_conditions(dfc, conditions)
-                elif need_fund and not need_base and not need_tech:
-                    # 仅基本面条件：使用基本面快照判断
-                    snap = get_cn_fund_snapshot(code)
-                    if not snap:
-                        passes = False
-                    else:
-                        passes = self._evaluate_fund_conditions(snap, conditions)
-
-                if passes:
-                    item = {"code": code}
-                    if last is not None:
-                        item.update({
-                            "close": self._safe_float(last.get("close")),
-                            "pct_chg": self._safe_float(last.get("pct_chg")),
-                            "amount": self._safe_float(last.get("amount")),
-                            "ma20": self._safe_float(last.get("ma20")) if need_tech else None,
-                            "rsi14": self._safe_float(last.get("rsi14")) if need_tech else None,
-                            "kdj_k": self._safe_float(last.get("kdj_k")) if need_tech else None,
-                            "kdj_d": self._safe_float(last.get("kdj_d")) if need_tech else None,
-                            "kdj_j": self._safe_float(last.get("kdj_j")) if need_tech else None,
-                            "dif": self._safe_float(last.get("dif")) if need_tech else None,
-                            "dea": self._safe_float(last.get("dea")) if need_tech else None,
-                            "macd_hist": self._safe_float(last.get("macd_hist")) if need_tech else None,
-                        })
-                    results.append(item)
-            except Exception:
-                continue
+        if need_base:
+            results = self._run_panel(symbols, conditions, start_s, end_s, need_tech)
+        elif need_fund:
+            results = self._run_fund_only(symbols, conditions)
+        else:
+            results = [{"code": code} for code in symbols]
 
         total = len(results)
         # 排序
@@ -184,6 +126,148 @@ class ScreeningService:
             "total": total,
             "items": page_items,
         }
+
+    # --- 内部：面板计算 ---
+    def _run_panel(
+        self,
+        symbols: List[str],
+        conditions: Dict[str, Any],
+        start_s: str,
+        end_s: str,
+        need_tech: bool,
+    ) -> List[Dict[str, Any]]:
+        """全市场面板筛选：一次加载 (bar × symbol) 面板，指标逐列计算，条件按布尔掩码评估"""
+        t0 = time.perf_counter()
+        bars = self._load_bars_from_db(symbols, start_s, end_s)
+        source = "MongoDB"
+        if bars is None or bars.empty:
+            logger.warning(
+                f"⚠️ stock_daily_quotes 中无可用K线，降级为逐股票获取（最多 {FALLBACK_SYMBOL_LIMIT} 只）"
+            )
+            bars = self._load_bars_from_manager(symbols[:FALLBACK_SYMBOL_LIMIT], start_s, end_s)
+            source = "DataSourceManager"
+        if bars is None or bars.empty:
+            return []
+
+        panel = self._build_panel(bars)
+        if need_tech:
+            panel = compute_panel(panel, PANEL_SPECS)
+
+        latest = pd.DataFrame({f: df.iloc[-1] for f, df in panel.items()})
+        prev = pd.DataFrame({f: df.iloc[-2] for f, df in panel.items()}) if len(panel["close"]) >= 2 \
+            else pd.DataFrame(index=latest.index, columns=latest.columns, dtype=float)
+        mask = self._evaluate_conditions_mask(latest, prev, conditions)
+        matched = latest[mask.reindex(latest.index, fill_value=False)]
+
+        item_fields = ["close", "pct_chg", "amount"] + (RESULT_TECH_FIELDS if need_tech else [])
+        results: List[Dict[str, Any]] = []
+        for code, row in zip(matched.index, matched.reindex(columns=item_fields).to_dict("records")):
+            item = {"code": code}
+            item.update({f: self._safe_float(row.get(f)) for f in item_fields})
+            if not need_tech:
+                item.update({f: None for f in RESULT_TECH_FIELDS})
+            results.append(item)
+
+        logger.info(
+            f"📊 面板筛选完成: {latest.shape[0]} 只股票 × {len(panel['close'])} 根K线（{source}），"
+            f"命中 {len(results)} 只，耗时 {time.perf_counter() - t0:.2f}秒"
+        )
+        return results
+
+    def _run_fund_only(self, symbols: List[str], conditions: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """仅基本面条件：使用基本面快照判断，不加载K线"""
+        results: List[Dict[str, Any]] = []
+        for code in symbols:
+            try:
+                snap = get_cn_fund_snapshot(code)
+                if snap and self._evaluate_fund_conditions(snap, conditions):
+                    results.append({"code": code})
+            except Exception:
+                continue
+        return results
+
+    def _build_panel(self, bars: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Delegate long-to-panel pivoting to utils."""
+        return _build_bar_panel_util(bars, PANEL_FIELDS)
+
+    def _load_bars_from_db(self, symbols: List[str], start_s: str, end_s: str) -> Optional[pd.DataFrame]:
+        """从 stock_daily_quotes 一次性加载全市场日线（每只股票按数据源优先级只取一个来源）"""
+        try:
+            from app.core.database import get_mongo_db_sync
+
+            db = get_mongo_db_sync()
+            collection = db.stock_daily_quotes
+            projection = {"_id": 0, "symbol": 1, "trade_date": 1, "open": 1, "high": 1,
+                          "low": 1, "close": 1, "volume": 1, "amount": 1}
+
+            frames: List[pd.DataFrame] = []
+            remaining = set(symbols)
+            for src in self._get_source_priority():
+                if not remaining:
+                    break
+                cursor = collection.find(
+                    {
+                        "symbol": {"$in": list(remaining)},
+                        "data_source": src,
+                        "period": "daily",
+                        "trade_date": {"$gte": start_s, "$lte": end_s},
+                    },
+                    projection,
+                ).batch_size(PANEL_QUERY_BATCH_SIZE)
+                df = pd.DataFrame(list(cursor))
+                if df.empty:
+                    continue
+                frames.append(df)
+                remaining -= set(df["symbol"].unique())
+                logger.debug(f"📊 [{src}] 加载 {len(df)} 条日线，剩余 {len(remaining)} 只股票无数据")
+
+            if not frames:
+                return None
+            bars = pd.concat(frames, ignore_index=True).rename(columns={"volume": "vol"})
+            return bars
+        except Exception as e:
+            logger.error(f"❌ 从 MongoDB 加载K线面板失败: {e}")
+            return None
+
+    def _load_bars_from_manager(self, symbols: List[str], start_s: str, end_s: str) -> Optional[pd.DataFrame]:
+        """逐股票通过统一DF接口获取K线（数据库无数据时的降级路径）"""
+        manager = get_data_source_manager()
+        frames: List[pd.DataFrame] = []
+        for code in symbols:
+            try:
+                df = manager.get_stock_dataframe(code, start_s, end_s)
+                if df is None or df.empty:
+                    continue
+                # 统一列为小写
+                dfu = df.rename(columns={
+                    "Open": "open", "High": "high", "Low": "low", "Close": "close",
+                    "Volume": "vol", "Amount": "amount"
+                }).reset_index(drop=True)
+                dfu["symbol"] = code
+                dfu["trade_date"] = range(len(dfu))  # 仅用于保持顺序
+                frames.append(dfu)
+            except Exception:
+                continue
+        if not frames:
+            return None
+        return pd.concat(frames, ignore_index=True)
+
+    def _get_source_priority(self) -> List[str]:
+        """A股日线数据源优先级：读取配置快照（无I/O），默认 Tushare > AKShare > BaoStock"""
+        default = ["tushare", "akshare", "baostock"]
+        try:
+            from app.core.config_snapshot import get_config_snapshot
+
+            enabled = get_config_snapshot().enabled_data_sources("a_shares")
+            ordered = [str(ds.get("type", "")).lower() for ds in enabled]
+            ordered = [t for t in ordered if t in default]
+            if ordered:
+                # 未配置的来源排在最后，仍可作为兜底
+                return list(dict.fromkeys(ordered + default))
+        except Exception as e:
+            logger.warning(f"⚠️ 读取数据源优先级失败，使用默认顺序: {e}")
+        return default
+
     def _evaluate_fund_conditions(self, snap: Dict[str, Any], node: Dict[str, Any]) -> bool:
         """Delegate fundamental condition evaluation to utils to keep service slim."""
         return _evaluate_fund_conditions_util(snap, node, FUND_FIELDS)
@@ -198,6 +282,10 @@ class ScreeningService:
         """Delegate technical/base condition evaluation to utils."""
         return _evaluate_conditions_util(df, node, ALLOWED_FIELDS, ALLOWED_OPS)
 
+    def _evaluate_conditions_mask(self, latest: pd.DataFrame, prev: pd.DataFrame, node: Dict[str, Any]) -> pd.Series:
+        """Delegate vectorized (whole-universe) condition evaluation to utils."""
+        return _evaluate_conditions_mask_util(latest, prev, node, ALLOWED_FIELDS, ALLOWED_OPS)
+
     # --- 工具 ---
     def _safe_float(self, v: Any) -> Optional[float]:
         """Delegate numeric coercion to utils."""
@@ -206,9 +294,9 @@ class ScreeningService:
     def _get_universe(self) -> List[str]:
         """获取A股代码集合：从 MongoDB stock_basic_info 集合获取所有A股股票代码"""
         try:
-            from app.core.database import get_mongo_db
+            from app.core.database import get_mongo_db_sync
 
-            db = get_mongo_db()
+            db = get_mongo_db_sync()
             collection = db.stock_basic_info
 
             # 查询所有A股股票代码（兼容不同的数据结构）
@@ -28,6 +28,7 @@ from app.models.user import PyObjectId
 from app.models.notification import NotificationCreate
 from bson import ObjectId
 from app.core.database import get_mongo_db
+from app.utils.report_search import build_report_list_fields
 from app.services.config_service import ConfigService
 from app.services.memory_state_manager import get_memory_state_manager, TaskStatus
 from app.services.redis_progress_tracker import RedisProgressTracker, get_progress_by_id
@@ -2621,6 +2622,9 @@ class SimpleAnalysisService:
                 "performance_metrics": result.get("performance_metrics", {})
             }
 
+            # 列表页字段：报告大小与检索词元（列表接口不再读取完整报告内容）
+            document.update(build_report_list_fields(document))
+
             # 保存到analysis_reports集合（与web目录保持一致）
             result_insert = await db.analysis_reports.insert_one(document)
 
@@ -0,0 +1,245 @@
+"""
+分析报告列表查询辅助
+- 保存报告时预先计算 report_size（报告内容的 BSON 字节数）与 search_ngrams（检索词元），
+  列表页只需投影少量字段，不再读取完整的 reports 内容
+- 关键词检索：英文/数字按整词、中文按单字+双字切分，查询时用 $all 命中多键索引，
+  替代不可走索引的非锚定 $regex（MongoDB 的 text 索引不支持中文分词）
+- 游标分页：按 (created_at, _id) 降序的键集分页，游标为 base64 编码的最后一条记录位置
+- 总数：无过滤条件时使用 estimated_document_count，带过滤条件时短期缓存 count_documents 结果
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import bson
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger("webapi")
+
+# 单个报告保存的检索词元上限（摘要很长时截断，避免文档与索引膨胀）
+MAX_SEARCH_TERMS = 1000
+
+# 带过滤条件的总数缓存时间（秒）与容量
+COUNT_CACHE_TTL_SECONDS = 30.0
+COUNT_CACHE_MAX_ENTRIES = 256
+
+# 参与检索的字段
+SEARCH_FIELDS = ("stock_symbol", "stock_name", "analysis_id", "summary")
+
+# 列表页投影：不读取 reports 正文；旧文档没有 report_size 时由服务端计算 BSON 大小。
+# $bsonSize 需要 MongoDB 4.4+，更低版本的服务端会拒绝该投影，此时改用 REPORT_LIST_PROJECTION_STORED_SIZE，
+# 未回填 report_size 的旧报告大小显示为 0（可运行 scripts/migrate_report_list_fields.py 回填）
+REPORT_LIST_PROJECTION = {
+    "analysis_id": 1,
+    "stock_symbol": 1,
+    "stock_name": 1,
+    "market_type": 1,
+    "model_info": 1,
+    "status": 1,
+    "created_at": 1,
+    "analysis_date": 1,
+    "analysts": 1,
+    "research_depth": 1,
+    "summary": 1,
+    "source": 1,
+    "task_id": 1,
+    "report_size": {"$ifNull": ["$report_size", {"$bsonSize": {"$ifNull": ["$reports", {}]}}]},
+}
+
+# 只读取已保存的 report_size，适用于 MongoDB 4.4 以下版本
+REPORT_LIST_PROJECTION_STORED_SIZE = {**REPORT_LIST_PROJECTION, "report_size": 1}
+
+REPORT_LIST_SORT = [("created_at", -1), ("_id", -1)]
+
+# 服务端不支持 $bsonSize 时置为 False，之后不再尝试
+_bson_size_supported = True
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[一-鿿]+")
+
+
+def _is_cjk(token: str) -> bool:
+    return "一" <= token[0] <= "鿿"
+
+
+def tokenize(text: str) -> List[str]:
+    """切分检索词元：英文/数字整词，中文单字与相邻双字"""
+    terms: List[str] = []
+    for token in _TOKEN_RE.findall(str(text or "").lower()):
+        if _is_cjk(token):
+            terms.extend(token)
+            terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            terms.append(token)
+    return terms
+
+
+def build_search_ngrams(document: Dict[str, Any]) -> List[str]:
+    """从报告文档的检索字段生成去重后的词元列表"""
+    seen: Dict[str, None] = {}
+    for field in SEARCH_FIELDS:
+        for term in tokenize(document.get(field, "")):
+            if len(seen) >= MAX_SEARCH_TERMS:
+                return list(seen)
+            seen.setdefault(term, None)
+    return list(seen)
+
+
+def compute_report_size(reports: Any) -> int:
+    """报告内容的 BSON 字节数（与列表页对旧文档使用的 $bsonSize 口径一致）"""
+    if not isinstance(reports, dict):
+        return 0
+    try:
+        return len(bson.encode(reports))
+    except Exception:
+        return len(str(reports))
+
+
+def build_report_list_fields(document: Dict[str, Any]) -> Dict[str, Any]:
+    """保存报告时需要附带的列表页字段"""
+    return {
+        "report_size": compute_report_size(document.get("reports")),
+        "search_ngrams": build_search_ngrams(document),
+    }
+
+
+def build_keyword_query(keyword: str) -> Dict[str, Any]:
+    """关键词检索条件
+
+    中文关键词只需匹配双字（长度为1时匹配单字），英文/数字按整词匹配；
+    另外保留股票代码前缀与分析ID精确匹配，两者均可走索引，也能覆盖尚未回填词元的旧报告。
+
+    与旧的子串 $regex 检索相比：stock_symbol 只做前缀匹配（关键词转为大写），
+    analysis_id 只做精确匹配，子串需通过 search_ngrams 的整词/双字命中（见 docs/api/reports-list.md）。
+    """
+    keyword = keyword.strip()
+    terms: List[str] = []
+    for token in _TOKEN_RE.findall(keyword.lower()):
+        if _is_cjk(token) and len(token) > 1:
+            terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            terms.append(token)
+    terms = list(dict.fromkeys(terms))
+
+    conditions: List[Dict[str, Any]] = [
+        {"stock_symbol": {"$regex": f"^{re.escape(keyword.upper())}"}},
+        {"analysis_id": keyword},
+    ]
+    if terms:
+        conditions.append({"search_ngrams": {"$all": terms}})
+    return {"$or": conditions}
+
+
+async def find_report_page(collection, query: Dict[str, Any], skip: int, limit: int) -> List[Dict[str, Any]]:
+    """按列表页投影与排序查询一页报告
+
+    MongoDB 4.4 以下版本不支持 $bsonSize，首次被拒绝后改用只读取已保存 report_size 的投影。
+    """
+    global _bson_size_supported
+    if _bson_size_supported:
+        try:
+            return await collection.find(query, REPORT_LIST_PROJECTION) \
+                .sort(REPORT_LIST_SORT).skip(skip).limit(limit).to_list(length=limit)
+        except OperationFailure as e:
+            _bson_size_supported = False
+            logger.warning(f"⚠️ 服务端不支持 $bsonSize（需要 MongoDB 4.4+），"
+                           f"列表页改用已保存的 report_size: {e}")
+    return await collection.find(query, REPORT_LIST_PROJECTION_STORED_SIZE) \
+        .sort(REPORT_LIST_SORT).skip(skip).limit(limit).to_list(length=limit)
+
+
+def encode_cursor(created_at: Any, doc_id: Any) -> str:
+    """将最后一条记录的 (created_at, _id) 编码为游标"""
+    payload = {
+        "t": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+        "id": str(doc_id),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    """解析游标，格式错误时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = payload["t"]
+        if isinstance(created_at, str):
+            try:
+                created_at = datetime.fromisoformat(created_at)
+            except ValueError:
+                pass
+        return created_at, ObjectId(payload["id"])
+    except Exception as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+def build_keyset_query(cursor: str) -> Dict[str, Any]:
+    """游标之后（按 created_at、_id 降序）的记录条件"""
+    created_at, doc_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": doc_id}},
+        ]
+    }
+
+
+def combine_queries(*queries: Dict[str, Any]) -> Dict[str, Any]:
+    """用 $and 合并多个查询条件（忽略空条件）"""
+    parts = [q for q in queries if q]
+    if not parts:
+        return {}
+    if len(parts) == 1:
+        return parts[0]
+    return {"$and": parts}
+
+
+class ReportCountCache:
+    """报告总数缓存"""
+
+    def __init__(self, ttl: float = COUNT_CACHE_TTL_SECONDS, max_entries: int = COUNT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, int]] = {}
+
+    @staticmethod
+    def _key(query: Dict[str, Any]) -> str:
+        return json.dumps(query, sort_keys=True, default=str, ensure_ascii=False)
+
+    async def count(self, collection, query: Dict[str, Any]) -> int:
+        if not query:
+            # 无过滤条件：读取集合元数据，不扫描索引
+            return await collection.estimated_document_count()
+
+        key = self._key(query)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        total = await collection.count_documents(query)
+        if len(self._entries) >= self.max_entries:
+            self._evict(now)
+        self._entries[key] = (now + self.ttl, total)
+        return total
+
+    def _evict(self, now: float) -> None:
+        expired = [k for k, (expires, _) in self._entries.items() if expires <= now]
+        for k in expired:
+            del self._entries[k]
+        while len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+
+report_count_cache = ReportCountCache()
+
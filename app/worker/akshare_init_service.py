@@ -9,6 +9,7 @@ from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 
 from app.core.database import get_mongo_db
+from app.core.rate_limiter import bulk_lane
 from app.worker.akshare_sync_service import get_akshare_sync_service
 
 logger = logging.getLogger(__name__)
@@ -60,6 +61,7 @@ class AKShareInitService:
         self.sync_service = await get_akshare_sync_service()
         logger.info("✅ AKShare初始化服务准备完成")
     
+    @bulk_lane
     async def run_full_initialization(
         self,
         historical_days: int = 365,
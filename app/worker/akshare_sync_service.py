@@ -8,7 +8,9 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
 from app.core.database import get_mongo_db
+from app.core.rate_limiter import bulk_lane
 from app.services.historical_data_service import get_historical_data_service
+from app.services.indicator_snapshot_service import run_indicator_snapshot_update
 from app.services.news_data_service import get_news_data_service
 from tradingagents.dataflows.providers.china.akshare import get_akshare_provider
 
@@ -59,6 +61,7 @@ class AKShareSyncService:
             logger.error(f"❌ AKShare同步服务初始化失败: {e}")
             raise
     
+    @bulk_lane
     async def sync_stock_basic_info(self, force_update: bool = False) -> Dict[str, Any]:
         """
         同步股票基础信息
@@ -231,6 +234,7 @@ class AKShareSyncService:
             logger.debug(f"检查数据新鲜度失败: {e}")
             return False
     
+    @bulk_lane
     async def sync_realtime_quotes(self, symbols: List[str] = None, force: bool = False) -> Dict[str, Any]:
         """
         同步实时行情数据
@@ -529,6 +533,7 @@ class AKShareSyncService:
             logger.error(f"❌ 获取 {symbol} 行情失败: {e}", exc_info=True)
             return False
 
+    @bulk_lane
     async def sync_historical_data(
         self,
         start_date: str = None,
@@ -751,6 +756,7 @@ class AKShareSyncService:
             # 出错时返回30天前，确保不漏数据
             return (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
 
+    @bulk_lane
     async def sync_financial_data(self, symbols: List[str] = None) -> Dict[str, Any]:
         """
         同步财务数据
@@ -995,6 +1001,7 @@ class AKShareSyncService:
             logger.error(f"❌ 获取自选股列表失败: {e}")
             return []
 
+    @bulk_lane
     async def sync_news_data(
         self,
         symbols: List[str] = None,
@@ -1191,6 +1198,7 @@ async def run_akshare_historical_sync(incremental: bool = True):
         service = await get_akshare_sync_service()
         result = await service.sync_historical_data(incremental=incremental)
         logger.info(f"✅ AKShare历史数据同步完成: {result}")
+        await run_indicator_snapshot_update("akshare")
         return result
     except Exception as e:
         logger.error(f"❌ AKShare历史数据同步失败: {e}")
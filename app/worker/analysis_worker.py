@@ -20,6 +20,7 @@ sys.path.insert(0, str(project_root))
 from app.services.queue_service import get_queue_service
 from app.services.analysis_service import get_analysis_service
 from app.core.database import init_database, close_database
+from app.core.config_snapshot import config_snapshot_store
 from app.core.redis_client import init_redis, close_redis
 from app.core.config import settings
 from app.models.analysis import AnalysisTask, AnalysisParameters
@@ -37,11 +38,14 @@ class AnalysisWorker:
         self.queue_service = None
         self.running = False
         self.current_task = None
+        # 当前分析协程与租约状态：心跳续租失败时取消分析，避免与重新认领的Worker重复执行
+        self._analysis_task: Optional[asyncio.Task] = None
+        self._lease_lost = False
 
         # 配置参数（可由系统设置覆盖）
         self.heartbeat_interval = int(getattr(settings, 'WORKER_HEARTBEAT_INTERVAL', 30))
         self.max_retries = int(getattr(settings, 'QUEUE_MAX_RETRIES', 3))
-        self.poll_interval = float(getattr(settings, 'QUEUE_POLL_INTERVAL_SECONDS', 1))  # 队列轮询间隔（秒）
+        self.poll_interval = float(getattr(settings, 'QUEUE_POLL_INTERVAL_SECONDS', 1))  # 空闲时单次阻塞等待上限（秒）
         self.cleanup_interval = float(getattr(settings, 'QUEUE_CLEANUP_INTERVAL_SECONDS', 60))
 
         # 注册信号处理器
@@ -62,6 +66,12 @@ class AnalysisWorker:
             await init_database()
             await init_redis()
 
+            # 配置快照：数据源优先级等配置在分析过程中无需逐次查询数据库
+            try:
+                await config_snapshot_store.start()
+            except Exception as e:
+                logger.warning(f"⚠️ 配置快照监听启动失败，将按轮询间隔刷新: {e}")
+
             # 读取系统设置（ENV 优先 → DB）
             try:
                 effective_settings = await config_provider.get_effective_system_settings()
@@ -115,14 +125,11 @@ class AnalysisWorker:
 
         while self.running:
             try:
-                # 从队列获取任务
-                task_data = await self.queue_service.dequeue_task(self.worker_id)
+                # 从队列认领任务；队列为空时阻塞等待唤醒信号，无需轮询休眠
+                task_data = await self.queue_service.dequeue_task(self.worker_id, block_timeout=self.poll_interval)
 
                 if task_data:
                     await self._process_task(task_data)
-                else:
-                    # 没有任务，短暂休眠
-                    await asyncio.sleep(self.poll_interval)
 
             except Exception as e:
                 logger.error(f"工作循环异常: {e}")
@@ -139,6 +146,7 @@ class AnalysisWorker:
         logger.info(f"📊 开始处理任务: {task_id} - {stock_code}")
 
         self.current_task = task_id
+        self._lease_lost = False
         success = False
 
         try:
@@ -153,31 +161,43 @@ class AnalysisWorker:
             task = AnalysisTask(
                 task_id=task_id,
                 user_id=user_id,
+                symbol=stock_code,
                 stock_code=stock_code,
                 batch_id=task_data.get("batch_id"),
                 parameters=parameters
             )
 
-            # 执行分析
-            result = await get_analysis_service().execute_analysis_task(
+            # 执行分析（独立协程，续租失败时由心跳取消）
+            self._analysis_task = asyncio.create_task(get_analysis_service().execute_analysis_task(
                 task,
                 progress_callback=self._progress_callback
-            )
+            ))
+            result = await self._analysis_task
 
             success = True
             logger.info(f"✅ 任务完成: {task_id} - 耗时: {result.execution_time:.2f}秒")
 
+        except asyncio.CancelledError:
+            if not self._lease_lost:
+                raise
+            logger.error(f"❌ 任务已被重新认领，停止执行: {task_id}")
+
         except Exception as e:
             logger.error(f"❌ 任务执行失败: {task_id} - {e}")
             logger.error(traceback.format_exc())
 
         finally:
-            # 确认任务完成
-            try:
-                await self.queue_service.ack_task(task_id, success)
-            except Exception as e:
-                logger.error(f"确认任务失败: {task_id} - {e}")
-
+            # 确认任务完成；已失去所有权时不再确认，结果以重新认领的Worker为准
+            if not self._lease_lost:
+                try:
+                    acked = await self.queue_service.ack_task(task_id, success, worker_id=self.worker_id)
+                    if not acked:
+                        self._lease_lost = True
+                        logger.error(f"❌ 任务确认被拒绝，已失去所有权: {task_id} (Worker: {self.worker_id})")
+                except Exception as e:
+                    logger.error(f"确认任务失败: {task_id} - {e}")
+
+            self._analysis_task = None
             self.current_task = None
 
     def _progress_callback(self, progress: int, message: str):
@@ -185,17 +205,32 @@ class AnalysisWorker:
         logger.debug(f"任务进度 {self.current_task}: {progress}% - {message}")
 
     async def _heartbeat_loop(self):
-        """心跳循环"""
+        """心跳循环，同时续租当前任务的可见性截止时间"""
         while self.running:
             try:
                 await self._send_heartbeat()
-                await asyncio.sleep(self.heartbeat_interval)
+                await self._renew_lease()
+                # 续租间隔不超过可见性超时的 1/3，避免长任务在两次心跳之间被回收
+                visibility_timeout = getattr(self.queue_service, "visibility_timeout", VISIBILITY_TIMEOUT_SECONDS)
+                await asyncio.sleep(max(1, min(self.heartbeat_interval, visibility_timeout / 3)))
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"心跳异常: {e}")
                 await asyncio.sleep(5)
 
+    async def _renew_lease(self):
+        """续租当前任务；任务已被回收或重新认领时取消本地分析"""
+        task_id = self.current_task
+        if not task_id or not self.queue_service or self._lease_lost:
+            return
+        if await self.queue_service.renew_lease(task_id, self.worker_id):
+            return
+        self._lease_lost = True
+        logger.error(f"❌ 任务租约已失效，取消本地分析: {task_id} (Worker: {self.worker_id})")
+        if self._analysis_task and not self._analysis_task.done():
+            self._analysis_task.cancel()
+
     async def _send_heartbeat(self):
         """发送心跳"""
         try:
@@ -216,12 +251,12 @@ class AnalysisWorker:
             logger.error(f"发送心跳失败: {e}")
 
     async def _cleanup_loop(self):
-        """清理循环，定期清理过期任务"""
+        """清理循环，定期回收可见性超时的任务"""
         while self.running:
             try:
                 await asyncio.sleep(self.cleanup_interval)  # 清理间隔（秒），可配
                 if self.queue_service:
-                    await self.queue_service.cleanup_expired_tasks()
+                    await self.queue_service.reclaim_expired_tasks()
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -242,6 +277,7 @@ class AnalysisWorker:
 
         try:
             # 关闭数据库连接
+            await config_snapshot_store.stop()
             await close_database()
             await close_redis()
         except Exception as e:
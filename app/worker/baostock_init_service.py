@@ -11,6 +11,7 @@ from dataclasses import dataclass, field
 
 from app.core.config import get_settings
 from app.core.database import get_database
+from app.core.rate_limiter import bulk_lane
 from app.worker.baostock_sync_service import BaoStockSyncService, BaoStockSyncStats
 
 logger = logging.getLogger(__name__)
@@ -115,6 +116,7 @@ class BaoStockInitService:
             logger.error(f"❌ 检查数据库状态失败: {e}")
             return {"status": "error", "error": str(e)}
     
+    @bulk_lane
     async def full_initialization(self, historical_days: int = 365,
                                 force: bool = False,
                                 enable_multi_period: bool = False) -> BaoStockInitializationStats:
@@ -246,8 +248,9 @@ class BaoStockInitService:
             # 限制数量以避免超时
             limited_codes = stock_codes[:50]  # 只处理前50只股票
             financial_count = 0
-            
-            for code in limited_codes:
+
+            async def sync_one(code: str):
+                nonlocal financial_count
                 try:
                     financial_data = await self.sync_service.provider.get_financial_data(code)
                     if financial_data:
@@ -266,7 +269,9 @@ class BaoStockInitService:
                     
                 except Exception as e:
                     logger.debug(f"获取{code}财务数据失败: {e}")
-                    continue
+
+            # 按同步服务的会话数并发
+            await self.sync_service.run_concurrently(limited_codes, sync_one)
             
             logger.info(f"✅ 财务数据同步完成: {financial_count}条记录")
             return financial_count
@@ -294,6 +299,7 @@ class BaoStockInitService:
             logger.error(f"❌ 数据完整性验证失败: {e}")
             stats.errors.append(f"数据完整性验证失败: {e}")
     
+    @bulk_lane
     async def basic_initialization(self) -> BaoStockInitializationStats:
         """基础数据初始化（仅基础信息和行情）"""
         stats = BaoStockInitializationStats()
@@ -11,7 +11,9 @@ from dataclasses import dataclass
 
 from app.core.config import get_settings
 from app.core.database import get_database
+from app.core.rate_limiter import bulk_lane
 from app.services.historical_data_service import get_historical_data_service
+from app.services.indicator_snapshot_service import run_indicator_snapshot_update
 from tradingagents.dataflows.providers.china.baostock import BaoStockProvider
 
 logger = logging.getLogger(__name__)
@@ -42,7 +44,8 @@ class BaoStockSyncService:
         """
         try:
             self.settings = get_settings()
-            self.provider = BaoStockProvider()
+            # 多会话时每个会话独立登录，批次内按会话数并发请求
+            self.provider = BaoStockProvider(sessions=self.settings.BAOSTOCK_SYNC_SESSIONS)
             self.historical_service = None  # 延迟初始化
             self.db = None  # 🔥 延迟初始化，在 initialize() 中设置
 
@@ -68,6 +71,7 @@ class BaoStockSyncService:
             logger.error(f"❌ BaoStock同步服务异步初始化失败: {e}")
             raise
     
+    @bulk_lane
     async def sync_stock_basic_info(self, batch_size: int = 100) -> BaoStockSyncStats:
         """
         同步股票基础信息
@@ -118,7 +122,7 @@ class BaoStockSyncService:
         """同步基础信息批次（包含估值数据和总市值）"""
         stats = BaoStockSyncStats()
 
-        for stock in stock_batch:
+        async def sync_one(stock: Dict[str, Any]):
             try:
                 code = stock['code']
 
@@ -127,7 +131,7 @@ class BaoStockSyncService:
 
                 if not basic_info:
                     stats.errors.append(f"获取{code}基础信息失败")
-                    continue
+                    return
 
                 # 2. 获取估值数据（PE、PB、PS、PCF等）
                 try:
@@ -167,8 +171,19 @@ class BaoStockSyncService:
             except Exception as e:
                 stats.errors.append(f"处理{stock.get('code', 'unknown')}失败: {e}")
 
+        await self.run_concurrently(stock_batch, sync_one)
         return stats
     
+    async def run_concurrently(self, items: List[Any], worker) -> None:
+        """按会话数并发处理批次内的股票（单个会话内的请求仍由会话池串行执行）"""
+        semaphore = asyncio.Semaphore(self.provider.sessions)
+
+        async def run(item):
+            async with semaphore:
+                await worker(item)
+
+        await asyncio.gather(*(run(item) for item in items))
+
     async def _get_total_shares(self, code: str) -> Optional[float]:
         """
         获取股票总股本（万股）
@@ -251,6 +266,7 @@ class BaoStockSyncService:
             logger.error(f"❌ 更新基础信息到数据库失败: {e}")
             raise
     
+    @bulk_lane
     async def sync_daily_quotes(self, batch_size: int = 50) -> BaoStockSyncStats:
         """
         同步日K线数据（最新交易日）
@@ -307,7 +323,7 @@ class BaoStockSyncService:
         """同步日K线批次"""
         stats = BaoStockSyncStats()
 
-        for code in code_batch:
+        async def sync_one(code: str):
             try:
                 # 注意：get_stock_quotes 实际返回的是最新日K线数据，不是实时行情
                 quotes = await self.provider.get_stock_quotes(code)
@@ -322,6 +338,7 @@ class BaoStockSyncService:
             except Exception as e:
                 stats.errors.append(f"处理{code}日K线失败: {e}")
 
+        await self.run_concurrently(code_batch, sync_one)
         return stats
 
     async def _update_stock_quotes(self, quotes: Dict[str, Any]):
@@ -345,6 +362,7 @@ class BaoStockSyncService:
             logger.error(f"❌ 更新日K线到数据库失败: {e}")
             raise
     
+    @bulk_lane
     async def sync_historical_data(self, days: int = 30, batch_size: int = 20, period: str = "daily", incremental: bool = True) -> BaoStockSyncStats:
         """
         同步历史数据
@@ -421,7 +439,7 @@ class BaoStockSyncService:
         """同步历史数据批次"""
         stats = BaoStockSyncStats()
 
-        for code in code_batch:
+        async def sync_one(code: str):
             try:
                 # 确定该股票的起始日期
                 if incremental:
@@ -447,6 +465,7 @@ class BaoStockSyncService:
             except Exception as e:
                 stats.errors.append(f"处理{code}历史数据失败: {e}")
 
+        await self.run_concurrently(code_batch, sync_one)
         return stats
 
     async def _update_historical_data(self, code: str, hist_data, period: str = "daily") -> int:
@@ -592,6 +611,7 @@ async def run_baostock_historical_sync():
         await service.initialize()  # 🔥 必须先初始化
         stats = await service.sync_historical_data()
         logger.info(f"🎯 BaoStock历史数据同步完成: {stats.historical_records}条记录, {len(stats.errors)}个错误")
+        await run_indicator_snapshot_update("baostock")
     except Exception as e:
         logger.error(f"❌ BaoStock历史数据同步任务失败: {e}")
 
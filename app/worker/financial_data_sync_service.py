@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 
 from app.core.database import get_mongo_db
+from app.core.rate_limiter import bulk_lane
 from app.services.financial_data_service import get_financial_data_service
 from tradingagents.dataflows.providers.china.tushare import get_tushare_provider
 from tradingagents.dataflows.providers.china.akshare import get_akshare_provider
@@ -72,6 +73,7 @@ class FinancialDataSyncService:
             logger.error(f"❌ 财务数据同步服务初始化失败: {e}")
             raise
     
+    @bulk_lane
     async def sync_financial_data(
         self,
         symbols: List[str] = None,
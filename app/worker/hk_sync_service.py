@@ -29,6 +29,7 @@ sys.path.insert(0, str(project_root))
 
 from tradingagents.dataflows.providers.hk.hk_stock import HKStockProvider
 from tradingagents.dataflows.providers.hk.improved_hk import ImprovedHKStockProvider
+from tradingagents.dataflows.cache.spot_snapshot import HK_SPOT, get_spot_snapshot
 from app.core.database import get_mongo_db
 from app.core.config import settings
 
@@ -69,7 +70,6 @@ class HKDataService:
             List[str]: 港股代码列表
         """
         try:
-            import akshare as ak
             from datetime import datetime, timedelta
 
             # 检查缓存是否有效
@@ -81,8 +81,8 @@ class HKDataService:
             logger.info("🔄 从 AKShare 获取港股列表...")
 
             # 获取所有港股实时行情（包含代码和名称）
-            # 使用新浪财经接口（更稳定）
-            df = ak.stock_hk_spot()
+            # 使用新浪财经接口（更稳定），与行情查询共享进程级全市场快照
+            df = get_spot_snapshot(HK_SPOT).get_frame()
 
             if df is None or df.empty:
                 logger.warning("⚠️ AKShare 返回空数据，使用备用列表")
@@ -243,14 +243,13 @@ class HKDataService:
             Dict: 同步统计信息 {updated: int, inserted: int, failed: int}
         """
         try:
-            import akshare as ak
             from datetime import datetime
 
             logger.info("🇭🇰 开始批量同步港股基础信息 (数据源: akshare)")
 
             # 获取所有港股实时行情（包含代码、名称等基础信息）
-            # 使用新浪财经接口（更稳定）
-            df = ak.stock_hk_spot()
+            # 使用新浪财经接口（更稳定），与行情查询共享进程级全市场快照
+            df = await get_spot_snapshot(HK_SPOT).aget_frame(max_age=0 if force_update else None)
 
             if df is None or df.empty:
                 logger.error("❌ AKShare 返回空数据")
@@ -9,9 +9,11 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 
 from app.services.news_data_service import get_news_data_service
+from app.core.rate_limiter import bulk_lane
 from tradingagents.dataflows.providers.china.tushare import get_tushare_provider
 from tradingagents.dataflows.providers.china.akshare import get_akshare_provider
 from tradingagents.dataflows.news.realtime_news import RealtimeNewsAggregator
+from tradingagents.dataflows.news.near_duplicate import drop_near_duplicates
 
 logger = logging.getLogger(__name__)
 
@@ -86,6 +88,7 @@ class NewsDataSyncService:
             self._realtime_aggregator = RealtimeNewsAggregator()
         return self._realtime_aggregator
     
+    @bulk_lane
     async def sync_stock_news(
         self,
         symbol: str,
@@ -417,7 +420,7 @@ class NewsDataSyncService:
         return keywords[:10]  # 最多返回10个关键词
     
     def _deduplicate_news(self, news_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """去重新闻"""
+        """去重新闻（标题和URL相同，或同一股票下标题 + 正文近似重复的多源转载稿）"""
         seen = set()
         unique_news = []
         
@@ -428,8 +431,9 @@ class NewsDataSyncService:
                 seen.add(key)
                 unique_news.append(news)
         
-        return unique_news
+        return drop_near_duplicates(unique_news, scope_of=lambda news: news.get("symbol") or "")
     
+    @bulk_lane
     async def sync_market_news(
         self,
         data_sources: List[str] = None,
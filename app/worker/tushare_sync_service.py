@@ -7,13 +7,16 @@ from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 import logging
 
-from tradingagents.dataflows.providers.china.tushare import TushareProvider
+import pandas as pd
+
+from tradingagents.dataflows.providers.china.tushare import TushareProvider, to_qfq_cross_section
 from app.services.stock_data_service import get_stock_data_service
 from app.services.historical_data_service import get_historical_data_service
+from app.services.indicator_snapshot_service import run_indicator_snapshot_update
 from app.services.news_data_service import get_news_data_service
 from app.core.database import get_mongo_db
 from app.core.config import settings
-from app.core.rate_limiter import get_tushare_rate_limiter
+from app.core.rate_limiter import bulk_lane, get_tushare_rate_limiter
 from app.utils.timezone import now_tz
 
 logger = logging.getLogger(__name__)
@@ -51,7 +54,8 @@ class TushareSyncService:
         self.rate_limit_delay = 0.1  # API调用间隔(秒) - 已弃用，使用rate_limiter
         self.max_retries = 3  # 最大重试次数
 
-        # 速率限制器（从环境变量读取配置）
+        # 速率限制器（从环境变量读取配置）；接口调用由 provider 在内部获取许可，
+        # 同步方法均以 bulk_lane 装饰，走批量通道并在有交互式请求等待时让行
         tushare_tier = getattr(settings, "TUSHARE_TIER", "standard")  # free/basic/standard/premium/vip
         safety_margin = float(getattr(settings, "TUSHARE_RATE_LIMIT_SAFETY_MARGIN", "0.8"))
         self.rate_limiter = get_tushare_rate_limiter(tier=tushare_tier, safety_margin=safety_margin)
@@ -72,6 +76,7 @@ class TushareSyncService:
     
     # ==================== 基础信息同步 ====================
     
+    @bulk_lane
     async def sync_stock_basic_info(self, force_update: bool = False, job_id: str = None) -> Dict[str, Any]:
         """
         同步股票基础信息
@@ -225,6 +230,7 @@ class TushareSyncService:
     
     # ==================== 实时行情同步 ====================
     
+    @bulk_lane
     async def sync_realtime_quotes(self, symbols: List[str] = None, force: bool = False) -> Dict[str, Any]:
         """
         同步实时行情数据
@@ -540,6 +546,7 @@ class TushareSyncService:
 
     # ==================== 历史数据同步 ====================
 
+    @bulk_lane
     async def sync_historical_data(
         self,
         symbols: List[str] = None,
@@ -580,31 +587,7 @@ class TushareSyncService:
         try:
             # 1. 获取股票列表（排除退市股票）
             if symbols is None:
-                # 查询所有A股股票（兼容不同的数据结构），排除退市股票
-                # 优先使用 market_info.market，降级到 category 字段
-                cursor = self.db.stock_basic_info.find(
-                    {
-                        "$and": [
-                            {
-                                "$or": [
-                                    {"market_info.market": "CN"},  # 新数据结构
-                                    {"category": "stock_cn"},      # 旧数据结构
-                                    {"market": {"$in": ["主板", "创业板", "科创板", "北交所"]}}  # 按市场类型
-                                ]
-                            },
-                            # 排除退市股票
-                            {
-                                "$or": [
-                                    {"status": {"$ne": "D"}},  # status 不是 D（退市）
-                                    {"status": {"$exists": False}}  # 或者 status 字段不存在
-                                ]
-                            }
-                        ]
-                    },
-                    {"code": 1}
-                )
-                symbols = [doc["code"] async for doc in cursor]
-                logger.info(f"📋 从 stock_basic_info 获取到 {len(symbols)} 只股票（已排除退市股票）")
+                symbols = await self._get_active_symbols()
 
             stats["total_processed"] = len(symbols)
 
@@ -636,9 +619,6 @@ class TushareSyncService:
                         stats["stopped"] = True
                         break
 
-                    # 速率限制
-                    await self.rate_limiter.acquire()
-
                     # 确定该股票的起始日期
                     symbol_start_date = start_date
                     if not symbol_start_date:
@@ -756,6 +736,215 @@ class TushareSyncService:
             })
             return stats
 
+    @bulk_lane
+    async def sync_historical_data_by_trade_date(
+        self,
+        end_date: str = None,
+        job_id: str = None
+    ) -> Dict[str, Any]:
+        """
+        按交易日增量同步日线数据
+
+        全局检测缺失的交易日，每个交易日调用一次全市场日线接口和一次复权因子接口并批量 upsert 截面数据，
+        API 调用次数与缺失交易日数量相关，而与股票数量无关。
+        daily 接口为未复权价格，按复权因子换算为以最后一个交易日为基准的前复权价格后再保存，
+        与逐股票模式（pro_bar 前复权）写入的历史一致；区间内发生除权除息的股票，
+        已保存的历史仍以旧复权因子为基准，改走逐股票模式重新同步全部历史。
+        尚无历史数据的股票（新上市或从未同步）仍走逐股票模式补齐。
+
+        Args:
+            end_date: 结束日期，默认今天
+            job_id: 任务ID（用于进度跟踪）
+
+        Returns:
+            同步结果统计
+        """
+        logger.info("🔄 开始按交易日同步日线历史数据...")
+
+        stats = {
+            "mode": "by_trade_date",
+            "total_processed": 0,
+            "success_count": 0,
+            "error_count": 0,
+            "total_records": 0,
+            "trade_dates": [],
+            "backfill_symbols": 0,
+            "adjusted_symbols": 0,
+            "start_time": datetime.utcnow(),
+            "errors": []
+        }
+
+        try:
+            if self.historical_service is None:
+                self.historical_service = await get_historical_data_service()
+
+            if not end_date:
+                end_date = datetime.now().strftime('%Y-%m-%d')
+
+            last_date = await self.historical_service.get_latest_trade_date("tushare", "daily")
+            if not last_date:
+                logger.info("📋 尚无Tushare日线数据，使用逐股票模式初始化")
+                return await self.sync_historical_data(incremental=True, job_id=job_id)
+
+            # 1. 在写入截面之前确定需要逐股票补齐的股票（写入后它们会出现在已同步列表中）
+            symbols = await self._get_active_symbols()
+            synced = set(await self.historical_service.get_synced_symbols("tushare", "daily"))
+            backfill_symbols = [code for code in symbols if code not in synced]
+
+            # 2. 确定缺失的交易日
+            start_date = (datetime.strptime(last_date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+            trade_dates: List[str] = []
+            calendar_known = False
+            if start_date <= end_date:
+                trade_dates = await self.provider.get_trade_calendar(start_date, end_date)
+                calendar_known = trade_dates is not None
+                if not calendar_known:
+                    # 交易日历不可用时按工作日推算，节假日的空截面直接跳过
+                    trade_dates = [d.strftime('%Y-%m-%d') for d in
+                                   pd.bdate_range(start_date, end_date)]
+
+            logger.info(f"📅 最后同步日期 {last_date}，缺失交易日 {len(trade_dates)} 个: {trade_dates[:10]}")
+
+            # 3. 逐个交易日拉取全市场截面与复权因子
+            # 上次同步日的复权因子，用于发现区间内除权除息的股票
+            prev_factors = None
+            if trade_dates:
+                prev_factors = await self.provider.get_adj_factor_by_trade_date(last_date)
+
+            sections = []
+            for i, trade_date in enumerate(trade_dates):
+                if job_id and await self._should_stop(job_id):
+                    logger.warning(f"⚠️ 任务 {job_id} 收到停止信号，正在退出...")
+                    stats["stopped"] = True
+                    break
+
+                try:
+                    df = await self.provider.get_daily_by_trade_date(trade_date)
+                    factors = None
+                    if df is not None and not df.empty:
+                        factors = await self.provider.get_adj_factor_by_trade_date(trade_date)
+                except Exception as e:
+                    stats["error_count"] += 1
+                    stats["errors"].append({
+                        "trade_date": trade_date,
+                        "error": str(e),
+                        "error_type": type(e).__name__,
+                        "context": "sync_historical_data_by_trade_date"
+                    })
+                    logger.error(f"❌ {trade_date} 全市场日线获取失败: {e}")
+                    break
+
+                if df is None or df.empty:
+                    if calendar_known:
+                        # 交易日数据尚未发布（如收盘后入库前），停在这里，避免跳过该日导致缺口
+                        logger.warning(f"⚠️ {trade_date} 全市场日线尚不可用，停止本次同步")
+                        break
+                    continue
+
+                if factors is None:
+                    # 没有复权因子无法换算前复权价格，不能写入未复权价格
+                    logger.warning(f"⚠️ {trade_date} 复权因子尚不可用，停止本次同步")
+                    break
+
+                sections.append((trade_date, df, factors))
+
+                if job_id:
+                    await self._update_progress(
+                        job_id,
+                        int(((i + 1) / len(trade_dates)) * 100),
+                        f"正在同步交易日 {trade_date} ({i + 1}/{len(trade_dates)})"
+                    )
+
+            # 换算为以最后一个交易日为基准的前复权价格后保存
+            adjusted_symbols = []
+            if sections:
+                base_factors = sections[-1][2]
+                for trade_date, df, factors in sections:
+                    df = to_qfq_cross_section(df, factors, base_factors)
+                    records_saved = await self.historical_service.save_cross_section(
+                        df, data_source="tushare", market="CN", period="daily"
+                    )
+                    stats["trade_dates"].append(trade_date)
+                    stats["total_processed"] += len(df)
+                    stats["success_count"] += records_saved
+                    stats["total_records"] += records_saved
+                    logger.info(f"✅ {trade_date}: 保存 {records_saved}/{len(df)} 条日线记录")
+
+                if prev_factors is not None:
+                    common = base_factors.index.intersection(prev_factors.index)
+                    diff = (base_factors[common] - prev_factors[common]).abs()
+                    adjusted_symbols = sorted(code for code in diff[diff > 1e-6].index if code in synced)
+
+            # 区间内除权除息的股票重新同步全部前复权历史
+            if adjusted_symbols and not stats.get("stopped"):
+                logger.info(f"📋 {len(adjusted_symbols)} 只股票复权因子变化，重新同步全部历史")
+                adjusted_stats = await self.sync_historical_data(
+                    symbols=adjusted_symbols, incremental=False, all_history=True, job_id=job_id
+                )
+                stats["adjusted_symbols"] = len(adjusted_symbols)
+                stats["total_records"] += adjusted_stats.get("total_records", 0)
+                stats["error_count"] += adjusted_stats.get("error_count", 0)
+                stats["errors"].extend(adjusted_stats.get("errors", []))
+
+            # 4. 新上市/从未同步的股票走逐股票模式
+            if backfill_symbols and not stats.get("stopped"):
+                logger.info(f"📋 {len(backfill_symbols)} 只股票尚无历史数据，逐股票补齐")
+                backfill_stats = await self.sync_historical_data(
+                    symbols=backfill_symbols, incremental=True, job_id=job_id
+                )
+                stats["backfill_symbols"] = len(backfill_symbols)
+                stats["total_records"] += backfill_stats.get("total_records", 0)
+                stats["error_count"] += backfill_stats.get("error_count", 0)
+                stats["errors"].extend(backfill_stats.get("errors", []))
+
+            stats["end_time"] = datetime.utcnow()
+            stats["duration"] = (stats["end_time"] - stats["start_time"]).total_seconds()
+            logger.info(f"✅ 按交易日同步完成: 交易日 {len(stats['trade_dates'])} 个, "
+                       f"记录 {stats['total_records']} 条, 补齐股票 {stats['backfill_symbols']} 只, "
+                       f"复权重同步 {stats['adjusted_symbols']} 只, "
+                       f"错误 {stats['error_count']} 个, 耗时 {stats['duration']:.2f} 秒")
+            return stats
+
+        except Exception as e:
+            import traceback
+            error_details = traceback.format_exc()
+            logger.error(f"❌ 按交易日同步失败: {e}\n{error_details}")
+            stats["errors"].append({
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "context": "sync_historical_data_by_trade_date",
+                "traceback": error_details
+            })
+            return stats
+
+    async def _get_active_symbols(self) -> List[str]:
+        """查询所有A股股票（兼容不同的数据结构），排除退市股票"""
+        # 优先使用 market_info.market，降级到 category 字段
+        cursor = self.db.stock_basic_info.find(
+            {
+                "$and": [
+                    {
+                        "$or": [
+                            {"market_info.market": "CN"},  # 新数据结构
+                            {"category": "stock_cn"},      # 旧数据结构
+                            {"market": {"$in": ["主板", "创业板", "科创板", "北交所"]}}  # 按市场类型
+                        ]
+                    },
+                    # 排除退市股票
+                    {
+                        "$or": [
+                            {"status": {"$ne": "D"}},  # status 不是 D（退市）
+                            {"status": {"$exists": False}}  # 或者 status 字段不存在
+                        ]
+                    }
+                ]
+            },
+            {"code": 1}
+        )
+        symbols = [doc["code"] async for doc in cursor]
+        logger.info(f"📋 从 stock_basic_info 获取到 {len(symbols)} 只股票（已排除退市股票）")
+        return symbols
+
     async def _save_historical_data(self, symbol: str, df, period: str = "daily") -> int:
         """保存历史数据到数据库"""
         try:
@@ -835,6 +1024,7 @@ class TushareSyncService:
 
     # ==================== 财务数据同步 ====================
 
+    @bulk_lane
     async def sync_financial_data(self, symbols: List[str] = None, limit: int = 20, job_id: str = None) -> Dict[str, Any]:
         """
         同步财务数据
@@ -876,11 +1066,10 @@ class TushareSyncService:
             # 批量处理
             for i, symbol in enumerate(symbols):
                 try:
-                    # 速率限制
-                    await self.rate_limiter.acquire()
-
-                    # 获取财务数据（指定获取期数）
-                    financial_data = await self.provider.get_financial_data(symbol, limit=limit)
+                    # 获取财务数据（指定获取期数），五类报表并发请求，每次调用都经过共享速率限制
+                    financial_data = await self.provider.get_financial_data(
+                        symbol, limit=limit
+                    )
 
                     if financial_data:
                         # 保存财务数据
@@ -946,6 +1135,88 @@ class TushareSyncService:
             stats["errors"].append({"error": str(e), "context": "sync_financial_data"})
             return stats
 
+    @staticmethod
+    def _recent_report_periods(count: int, today: datetime = None) -> List[str]:
+        """最近 count 个已结束的报告期（季末日期，YYYYMMDD，倒序）"""
+        today = today or datetime.now()
+        quarter_ends = ["0331", "0630", "0930", "1231"]
+        year = today.year
+        periods = [f"{year}{md}" for md in quarter_ends if f"{year}{md}" < today.strftime("%Y%m%d")]
+        while len(periods) < count:
+            year -= 1
+            periods = [f"{year}{md}" for md in quarter_ends] + periods
+        return list(reversed(periods[-count:]))
+
+    @bulk_lane
+    async def sync_financial_data_by_period(
+        self,
+        periods: List[str] = None,
+        job_id: str = None
+    ) -> Dict[str, Any]:
+        """
+        按报告期同步全市场财务数据
+
+        每个报告期通过 VIP 接口一次性拉取全市场报表并批量 upsert，
+        API 调用次数与报告期数量相关，而与股票数量无关。
+
+        Args:
+            periods: 报告期列表 (YYYYMMDD)，默认最近 TUSHARE_FINANCIAL_SYNC_PERIODS 个已结束的报告期
+            job_id: 任务ID（用于进度跟踪）
+
+        Returns:
+            同步结果统计
+        """
+        if not periods:
+            periods = self._recent_report_periods(int(getattr(self.settings, "TUSHARE_FINANCIAL_SYNC_PERIODS", 2)))
+        logger.info(f"🔄 开始按报告期同步财务数据: {periods}")
+
+        stats = {
+            "mode": "by_period",
+            "periods": list(periods),
+            "total_processed": 0,
+            "success_count": 0,
+            "error_count": 0,
+            "start_time": datetime.utcnow(),
+            "errors": []
+        }
+
+        from app.services.financial_data_service import get_financial_data_service
+        financial_service = await get_financial_data_service()
+
+        for i, period in enumerate(periods):
+            try:
+                data_by_code = await self.provider.get_financial_data_for_period(period)
+                if not data_by_code:
+                    logger.warning(f"⚠️ 报告期 {period}: 无财务数据（可能缺少VIP接口权限）")
+                    continue
+
+                data_by_symbol = {ts_code.split('.')[0]: data for ts_code, data in data_by_code.items()}
+                saved = await financial_service.save_financial_data_batch(data_by_symbol, data_source="tushare")
+                stats["total_processed"] += len(data_by_symbol)
+                stats["success_count"] += saved
+                logger.info(f"📈 报告期 {period} 同步完成: {len(data_by_symbol)} 只股票, 写入 {saved} 条")
+            except Exception as e:
+                stats["error_count"] += 1
+                stats["errors"].append({"period": period, "error": str(e), "context": "sync_financial_data_by_period"})
+                logger.error(f"❌ 报告期 {period} 财务数据同步失败: {e}")
+
+            if job_id:
+                from app.services.scheduler_service import update_job_progress
+                await update_job_progress(
+                    job_id=job_id,
+                    progress=int((i + 1) / len(periods) * 100),
+                    message=f"已同步报告期 {period}",
+                    current_item=period,
+                    total_items=len(periods),
+                    processed_items=i + 1
+                )
+
+        stats["end_time"] = datetime.utcnow()
+        stats["duration"] = (stats["end_time"] - stats["start_time"]).total_seconds()
+        logger.info(f"✅ 按报告期财务数据同步完成: 写入 {stats['success_count']} 条, "
+                    f"错误 {stats['error_count']} 个, 耗时 {stats['duration']:.2f} 秒")
+        return stats
+
     async def _save_financial_data(self, symbol: str, financial_data: Dict[str, Any]) -> bool:
         """保存财务数据"""
         try:
@@ -1018,6 +1289,7 @@ class TushareSyncService:
 
     # ==================== 新闻数据同步 ====================
 
+    @bulk_lane
     async def sync_news_data(
         self,
         symbols: List[str] = None,
@@ -1309,8 +1581,12 @@ async def run_tushare_historical_sync(incremental: bool = True):
     try:
         service = await get_tushare_sync_service()
         logger.info(f"✅ [APScheduler] Tushare 同步服务已初始化")
-        result = await service.sync_historical_data(incremental=incremental, job_id="tushare_historical_sync")
+        if incremental and getattr(settings, "TUSHARE_HISTORICAL_SYNC_BY_TRADE_DATE", True):
+            result = await service.sync_historical_data_by_trade_date(job_id="tushare_historical_sync")
+        else:
+            result = await service.sync_historical_data(incremental=incremental, job_id="tushare_historical_sync")
         logger.info(f"✅ [APScheduler] Tushare历史数据同步完成: {result}")
+        await run_indicator_snapshot_update("tushare")
         return result
     except Exception as e:
         logger.error(f"❌ [APScheduler] Tushare历史数据同步失败: {e}")
@@ -1320,10 +1596,13 @@ async def run_tushare_historical_sync(incremental: bool = True):
 
 
 async def run_tushare_financial_sync():
-    """APScheduler任务：同步财务数据（获取最近20期，约5年）"""
+    """APScheduler任务：同步财务数据（按报告期全市场同步，或逐股票获取最近20期，约5年）"""
     try:
         service = await get_tushare_sync_service()
-        result = await service.sync_financial_data(limit=20, job_id="tushare_financial_sync")  # 获取最近20期（约5年数据）
+        if getattr(settings, "TUSHARE_FINANCIAL_SYNC_BY_PERIOD", False):
+            result = await service.sync_financial_data_by_period(job_id="tushare_financial_sync")
+        else:
+            result = await service.sync_financial_data(limit=20, job_id="tushare_financial_sync")  # 获取最近20期（约5年数据）
         logger.info(f"✅ Tushare财务数据同步完成: {result}")
         return result
     except Exception as e:
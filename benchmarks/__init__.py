@@ -0,0 +1,43 @@
+"""
+离线端到端基准测试
+
+不依赖网络、MongoDB、Redis 与真实大模型：
+- fake_llm：确定性的模拟聊天模型（可配置延迟与 token 数），接入 create_llm_by_provider
+- fake_db：内存 MongoDB（同步/异步接口），统计数据库操作次数
+- recording：Tushare/AKShare/BaoStock 提供器的录制/回放与禁网保护
+- synthetic：按种子生成的合成行情、财务与新闻数据
+- scenarios：单股分析、批量分析、全市场同步、选股、缓存编码、新闻检索、新闻去重七个场景
+- cache_codec：缓存编码的体积与编解码耗时对比
+- news_search：新闻全文检索索引的召回率与查询耗时对比
+- news_dedup：多源转载新闻的近似去重效果（聚类精确率/召回率）与 token 节省
+- metrics：墙钟耗时、节点耗时、RSS 峰值、内存分配、数据库操作等指标，以 JSON 输出便于跨提交对比
+
+用法：python -m benchmarks [场景...] --output bench.json
+"""
+
+from .fake_db import InMemoryDatabase, install_fake_db
+from .fake_llm import FakeChatModel, fake_llm_stats, install_fake_llm, reset_fake_llm_stats
+from .metrics import NodeTimer, measure, write_report
+from .recording import RecordReplay, ReplayMissError, block_network
+from .scenarios import SCENARIOS, analysis_config, bench_environment, run_scenario
+from .synthetic import SyntheticMarket
+
+__all__ = [
+    "FakeChatModel",
+    "InMemoryDatabase",
+    "NodeTimer",
+    "RecordReplay",
+    "ReplayMissError",
+    "SCENARIOS",
+    "SyntheticMarket",
+    "analysis_config",
+    "bench_environment",
+    "block_network",
+    "fake_llm_stats",
+    "install_fake_db",
+    "install_fake_llm",
+    "measure",
+    "reset_fake_llm_stats",
+    "run_scenario",
+    "write_report",
+]
@@ -0,0 +1,83 @@
+"""
+命令行入口
+
+    python -m benchmarks                                   # 运行全部场景，JSON 输出到标准输出
+    python -m benchmarks single_analysis screening -o bench/HEAD.json --repeat 3
+    python -m benchmarks batch_analysis --count 50 --concurrency 4 --llm-latency 0.2
+    python -m benchmarks single_analysis --record          # 访问真实数据源录制夹具（需要网络与凭证）
+"""
+import argparse
+import logging
+import sys
+
+from .scenarios import SCENARIOS
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="离线端到端基准测试")
+    parser.add_argument("scenarios", nargs="*", help=f"要运行的场景，默认全部: {', '.join(SCENARIOS)}")
+    parser.add_argument("-o", "--output", help="JSON 报告输出路径（默认只打印）")
+    parser.add_argument("--repeat", type=int, default=1, help="每个场景重复次数")
+    parser.add_argument("--universe", type=int, help="合成股票池规模（默认按场景：同步 5000，选股 1000，其余 500）")
+    parser.add_argument("--seed", type=int, default=42, help="合成数据随机种子")
+    parser.add_argument("--count", type=int, default=50, help="batch_analysis 的分析数量")
+    parser.add_argument("--concurrency", type=int, default=1, help="batch_analysis 的并发数")
+    parser.add_argument("--days", type=int, default=5, help="market_sync 需要补齐的交易日数")
+    parser.add_argument("--symbol", default="000001", help="single_analysis 的股票代码")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="模拟模型每次调用的固定延迟（秒）")
+    parser.add_argument("--llm-tps", type=float, default=0.0, help="模拟模型输出速度（token/秒），0 表示不模拟")
+    parser.add_argument("--llm-tokens", type=int, default=600, help="模拟模型每次文本回复的 token 数")
+    parser.add_argument("--trace-alloc", action="store_true", help="用 tracemalloc 统计内存分配（显著变慢）")
+    parser.add_argument("--record", action="store_true", help="录制模式：调用真实数据源并写入夹具")
+    parser.add_argument("--strict", action="store_true", help="严格回放：未录制的数据源调用直接报错")
+    parser.add_argument("--verbose", action="store_true", help="保留业务日志（默认只输出 ERROR）")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"未知场景: {', '.join(unknown)}（可选: {', '.join(SCENARIOS)}）")
+    return args
+
+
+def main(argv=None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    if not args.verbose:
+        # 业务代码日志量很大，格式化与写文件的开销会淹没被测代码本身
+        logging.disable(logging.WARNING)
+
+    from .metrics import write_report
+    from .scenarios import run_scenario
+
+    llm_options = {
+        "latency_seconds": args.llm_latency,
+        "tokens_per_second": args.llm_tps,
+        "completion_tokens": args.llm_tokens,
+    }
+    results = []
+    for name in args.scenarios or list(SCENARIOS):
+        print(f"▶ {name}", file=sys.stderr)
+        result = run_scenario(
+            name,
+            repeat=args.repeat,
+            mode="record" if args.record else "replay",
+            strict=args.strict,
+            trace_alloc=args.trace_alloc,
+            universe=args.universe,
+            seed=args.seed,
+            llm_options=llm_options,
+            symbol=args.symbol,
+            count=args.count,
+            concurrency=args.concurrency,
+            days=args.days,
+        )
+        print(f"  wall={result['wall_time_seconds']['median']:.3f}s peak_rss={result['peak_rss_mb']}MB",
+              file=sys.stderr)
+        results.append(result)
+
+    text = write_report(results, args.output)
+    if not args.output:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
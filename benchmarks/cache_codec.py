@@ -0,0 +1,100 @@
+"""
+缓存编码基准
+
+对比缓存层历史格式（JSON records / CSV / 裸 pickle）与 tradingagents.dataflows.cache.codec 各编码
+在 1 年与 10 年日线上的体积、编码耗时、解码耗时，以及写成文件后的读取耗时（arrow 为内存映射读取）。
+耗时取 repeat 次中位数，单位毫秒。
+"""
+import io
+import os
+import pickle
+import tempfile
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from .synthetic import SyntheticMarket
+
+
+def _median_ms(func: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return round(samples[len(samples) // 2] * 1000, 3)
+
+
+def _formats() -> Dict[str, Tuple[Callable[[pd.DataFrame], bytes], Callable[[bytes], pd.DataFrame], Callable[[str], pd.DataFrame]]]:
+    """格式名 -> (编码, 解码, 读文件)"""
+    from tradingagents.dataflows.cache import codec
+
+    def _json_encode(df: pd.DataFrame) -> bytes:
+        return df.to_json(orient="records", date_format="iso").encode("utf-8")
+
+    def _json_decode(payload: bytes) -> pd.DataFrame:
+        return pd.read_json(io.StringIO(payload.decode("utf-8")), orient="records")
+
+    def _csv_encode(df: pd.DataFrame) -> bytes:
+        return df.to_csv(index=True).encode("utf-8")
+
+    def _csv_decode(payload: bytes) -> pd.DataFrame:
+        return pd.read_csv(io.BytesIO(payload), index_col=0)
+
+    def _read_bytes(decode: Callable[[bytes], pd.DataFrame]) -> Callable[[str], pd.DataFrame]:
+        def read(path: str) -> pd.DataFrame:
+            with open(path, "rb") as f:
+                return decode(f.read())
+        return read
+
+    formats = {
+        "legacy_json": (_json_encode, _json_decode, _read_bytes(_json_decode)),
+        "legacy_csv": (_csv_encode, _csv_decode, _read_bytes(_csv_decode)),
+        "legacy_pickle": (pickle.dumps, pickle.loads, _read_bytes(pickle.loads)),
+    }
+    for name in codec.available_codecs():
+        formats[name] = (
+            lambda df, name=name: codec.encode_frame(df, name),
+            codec.decode_frame,
+            codec.read_frame,
+        )
+    return formats
+
+
+def daily_bars_frame(market: SyntheticMarket, symbol: str, years: int) -> pd.DataFrame:
+    """以 DatetimeIndex 为索引的日线，与数据源标准化后的缓存内容一致"""
+    bars = market.daily_bars(symbol, market.as_of - timedelta(days=365 * years), market.as_of)
+    bars.index = pd.DatetimeIndex(pd.to_datetime(bars.pop("date")), name="date")
+    return bars
+
+
+def run_codec_benchmark(market: SyntheticMarket, symbol: str = "000001",
+                        years: Tuple[int, ...] = (1, 10), repeat: int = 7) -> List[Dict[str, Any]]:
+    """各格式 × 各数据长度的体积与耗时"""
+    rows = []
+    formats = _formats()
+    with tempfile.TemporaryDirectory(prefix="bench-cache-codec-") as tmp_dir:
+        for span in years:
+            frame = daily_bars_frame(market, symbol, span)
+            for name, (encode, decode, read_file) in formats.items():
+                payload = encode(frame)
+                path = os.path.join(tmp_dir, f"{span}y.{name}")
+                with open(path, "wb") as f:
+                    f.write(payload)
+                restored = decode(payload)
+                rows.append({
+                    "format": name,
+                    "years": span,
+                    "rows": len(frame),
+                    "size_bytes": len(payload),
+                    "encode_ms": _median_ms(lambda: encode(frame), repeat),
+                    "decode_ms": _median_ms(lambda: decode(payload), repeat),
+                    "file_read_ms": _median_ms(lambda: read_file(path), repeat),
+                    "dtypes_preserved": bool(
+                        isinstance(restored.index, pd.DatetimeIndex) and restored.dtypes.equals(frame.dtypes)
+                    ),
+                })
+    return rows
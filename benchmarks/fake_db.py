@@ -0,0 +1,762 @@
+"""
+内存版 MongoDB 数据库（同步 pymongo / 异步 motor 两种接口）
+
+基准场景用它替换 app.core.database 中的全局连接，业务代码不做任何改动即可离线运行，
+同时按操作类型统计数据库调用次数与写入文档数。
+
+支持的能力以业务代码实际用到的为准：
+- 查询：等值、$eq/$ne/$gt/$gte/$lt/$lte/$in/$nin/$exists/$regex/$all、$or/$and/$nor、点号路径
+- 更新：$set/$setOnInsert/$unset/$inc/$max/$min/$push，upsert
+- find 的投影、sort/skip/limit/batch_size，bulk_write（InsertOne/UpdateOne/UpdateMany/ReplaceOne/DeleteOne/DeleteMany）
+- aggregate 只支持 $match/$sort/$skip/$limit/$project
+create_index 声明的键会建立内存哈希索引，等值查询命中索引时不做全表扫描。
+"""
+import contextlib
+import copy
+import re
+import threading
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+
+_MISSING = object()
+
+
+def _get_path(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+def _set_path(doc: Dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset_path(doc: Dict[str, Any], path: str) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def _compare(a: Any, b: Any, op: str) -> bool:
+    if a is _MISSING or a is None or b is None:
+        return False
+    try:
+        if op == "$gt":
+            return a > b
+        if op == "$gte":
+            return a >= b
+        if op == "$lt":
+            return a < b
+        return a <= b
+    except TypeError:
+        return False
+
+
+def _values_equal(value: Any, expected: Any) -> bool:
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    if value is _MISSING:
+        return expected is None
+    return value == expected
+
+
+def _in(value: Any, options: Any) -> bool:
+    if isinstance(options, frozenset):
+        if isinstance(value, list):
+            return any(_hashable(v) and v in options for v in value)
+        return _hashable(value) and (None if value is _MISSING else value) in options
+    return any(_values_equal(value, item) for item in options)
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def prepare_query(query: Any) -> Any:
+    """预处理查询：可哈希的 $in/$nin 列表转为集合，避免逐文档线性查找"""
+    if isinstance(query, list):
+        return [prepare_query(q) for q in query]
+    if not isinstance(query, dict):
+        return query
+    prepared = {}
+    for key, value in query.items():
+        if key in ("$in", "$nin") and isinstance(value, (list, tuple, set)) and all(_hashable(v) for v in value):
+            prepared[key] = frozenset(value)
+        else:
+            prepared[key] = prepare_query(value)
+    return prepared
+
+
+def _match_operator(value: Any, op: str, arg: Any) -> bool:
+    if op == "$eq":
+        return _values_equal(value, arg)
+    if op == "$ne":
+        return not _values_equal(value, arg)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        return _compare(value, arg, op)
+    if op == "$in":
+        return _in(value, arg)
+    if op == "$nin":
+        return not _in(value, arg)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+    if op == "$all":
+        return isinstance(value, list) and all(item in value for item in arg)
+    if op == "$regex":
+        return isinstance(value, str) and re.search(arg, value) is not None
+    if op == "$options":
+        return True
+    raise NotImplementedError(f"内存数据库不支持查询操作符 {op}")
+
+
+def matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """判断文档是否满足查询条件"""
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, sub) for sub in condition):
+                return False
+        else:
+            value = _get_path(doc, key)
+            if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+                if "$regex" in condition:
+                    flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+                    if not (isinstance(value, str) and re.search(condition["$regex"], value, flags)):
+                        return False
+                if not all(_match_operator(value, op, arg) for op, arg in condition.items() if op != "$regex"):
+                    return False
+            elif isinstance(condition, re.Pattern):
+                if not (isinstance(value, str) and condition.search(value)):
+                    return False
+            elif not _values_equal(value, condition):
+                return False
+    return True
+
+
+def project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """应用投影（只支持字段包含/排除）"""
+    if not projection:
+        return copy.deepcopy(doc)
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        result = {}
+        for path in include:
+            value = _get_path(doc, path)
+            if value is not _MISSING:
+                _set_path(result, path, copy.deepcopy(value))
+        if projection.get("_id", 1) and "_id" in doc:
+            result["_id"] = doc["_id"]
+        return result
+    result = copy.deepcopy(doc)
+    for path, flag in projection.items():
+        if not flag:
+            _unset_path(result, path)
+    return result
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, str(value))
+
+
+def _sort_docs(docs: List[Dict[str, Any]], sort: Sequence[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    for field, direction in reversed(list(sort)):
+        docs.sort(key=lambda d: _sort_key(_get_path(d, field)), reverse=direction < 0)
+    return docs
+
+
+def _normalize_sort(key_or_list: Any, direction: Optional[int] = None) -> List[Tuple[str, int]]:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction if direction is not None else 1)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return [tuple(item) for item in key_or_list]
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _equality_value(condition: Any) -> Any:
+    if isinstance(condition, dict):
+        if set(condition) == {"$eq"}:
+            return condition["$eq"]
+        if any(k.startswith("$") for k in condition):
+            return _MISSING
+    if isinstance(condition, (list, frozenset, re.Pattern)):
+        return _MISSING
+    return condition
+
+
+class OpCounter:
+    """按操作类型统计数据库调用"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ops: Counter = Counter()
+        self.documents_written = 0
+        self.documents_read = 0
+
+    def record(self, op: str, written: int = 0, read: int = 0) -> None:
+        with self._lock:
+            self.ops[op] += 1
+            self.documents_written += written
+            self.documents_read += read
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "total": sum(self.ops.values()),
+                "by_op": dict(self.ops),
+                "documents_written": self.documents_written,
+                "documents_read": self.documents_read,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.ops.clear()
+            self.documents_written = 0
+            self.documents_read = 0
+
+
+class _Store:
+    """单个集合的内存存储与哈希索引"""
+
+    def __init__(self, name: str, counter: OpCounter):
+        self.name = name
+        self.counter = counter
+        self.docs: Dict[Any, Dict[str, Any]] = {}
+        self.indexes: Dict[Tuple[str, ...], Dict[Any, set]] = {}
+        self.lock = threading.RLock()
+
+    # ---- 索引 ----
+
+    def create_index(self, keys: Any, **kwargs: Any) -> str:
+        fields = tuple(field for field, _ in _normalize_sort(keys, 1))
+        with self.lock:
+            if fields not in self.indexes:
+                index: Dict[Any, set] = {}
+                for doc_id, doc in self.docs.items():
+                    index.setdefault(self._index_key(doc, fields), set()).add(doc_id)
+                self.indexes[fields] = index
+        return kwargs.get("name") or "_".join(f"{f}_1" for f in fields)
+
+    @staticmethod
+    def _index_key(doc: Dict[str, Any], fields: Tuple[str, ...]) -> Any:
+        return tuple(_freeze(None if (v := _get_path(doc, f)) is _MISSING else v) for f in fields)
+
+    def _index_add(self, doc: Dict[str, Any]) -> None:
+        for fields, index in self.indexes.items():
+            index.setdefault(self._index_key(doc, fields), set()).add(doc["_id"])
+
+    def _index_remove(self, doc: Dict[str, Any]) -> None:
+        for fields, index in self.indexes.items():
+            ids = index.get(self._index_key(doc, fields))
+            if ids is not None:
+                ids.discard(doc["_id"])
+
+    def _candidates(self, query: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+        equalities = {}
+        for key, condition in (query or {}).items():
+            if not key.startswith("$"):
+                value = _equality_value(condition)
+                if value is not _MISSING:
+                    equalities[key] = value
+        if "_id" in equalities:
+            doc = self.docs.get(equalities["_id"])
+            return [doc] if doc is not None else []
+        best = None
+        for fields in self.indexes:
+            if all(f in equalities for f in fields) and (best is None or len(fields) > len(best)):
+                best = fields
+        if best is None:
+            return list(self.docs.values())
+        key = tuple(_freeze(equalities[f]) for f in best)
+        return [self.docs[i] for i in self.indexes[best].get(key, ()) if i in self.docs]
+
+    # ---- 读 ----
+
+    def query(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        query = prepare_query(query or {})
+        with self.lock:
+            return [doc for doc in self._candidates(query) if matches(doc, query)]
+
+    # ---- 写 ----
+
+    def insert(self, doc: Dict[str, Any]) -> Any:
+        doc = copy.deepcopy(doc)
+        doc.setdefault("_id", ObjectId())
+        with self.lock:
+            self.docs[doc["_id"]] = doc
+            self._index_add(doc)
+        return doc["_id"]
+
+    def _apply_update(self, doc: Dict[str, Any], update: Dict[str, Any], inserting: bool) -> bool:
+        before = copy.deepcopy(doc)
+        if not any(k.startswith("$") for k in update):
+            keep_id = doc.get("_id")
+            doc.clear()
+            doc.update(copy.deepcopy(update))
+            if keep_id is not None:
+                doc["_id"] = keep_id
+            return doc != before
+        for op, fields in update.items():
+            for path, value in fields.items():
+                current = _get_path(doc, path)
+                if op == "$set" or (op == "$setOnInsert" and inserting):
+                    _set_path(doc, path, copy.deepcopy(value))
+                elif op == "$unset":
+                    _unset_path(doc, path)
+                elif op == "$inc":
+                    _set_path(doc, path, (0 if current is _MISSING else current) + value)
+                elif op == "$max":
+                    if current is _MISSING or current is None or (value is not None and value > current):
+                        _set_path(doc, path, value)
+                elif op == "$min":
+                    if current is _MISSING or current is None or (value is not None and value < current):
+                        _set_path(doc, path, value)
+                elif op == "$push":
+                    items = [] if current is _MISSING else list(current)
+                    items.append(copy.deepcopy(value))
+                    _set_path(doc, path, items)
+                elif op != "$setOnInsert":
+                    raise NotImplementedError(f"内存数据库不支持更新操作符 {op}")
+        return doc != before
+
+    def update(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool, many: bool) -> SimpleNamespace:
+        with self.lock:
+            targets = self.query(query)
+            if not many:
+                targets = targets[:1]
+            modified = 0
+            for doc in targets:
+                self._index_remove(doc)
+                modified += int(self._apply_update(doc, update, inserting=False))
+                self._index_add(doc)
+            upserted_id = None
+            if not targets and upsert:
+                seed = {}
+                for key, condition in query.items():
+                    value = _equality_value(condition)
+                    if not key.startswith("$") and value is not _MISSING:
+                        _set_path(seed, key, copy.deepcopy(value))
+                self._apply_update(seed, update, inserting=True)
+                upserted_id = self.insert(seed)
+        return SimpleNamespace(
+            matched_count=len(targets),
+            modified_count=modified,
+            upserted_id=upserted_id,
+            acknowledged=True,
+        )
+
+    def delete(self, query: Dict[str, Any], many: bool) -> int:
+        with self.lock:
+            targets = self.query(query)
+            if not many:
+                targets = targets[:1]
+            for doc in targets:
+                self._index_remove(doc)
+                self.docs.pop(doc["_id"], None)
+        return len(targets)
+
+
+class Cursor:
+    """同步游标（pymongo 风格）"""
+
+    def __init__(self, store: _Store, query: Dict[str, Any], projection: Optional[Dict[str, Any]]):
+        self._store = store
+        self._query = query or {}
+        self._projection = projection
+        self._sort: List[Tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list: Any, direction: Optional[int] = None) -> "Cursor":
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, n: int) -> "Cursor":
+        self._skip = n
+        return self
+
+    def limit(self, n: int) -> "Cursor":
+        self._limit = n
+        return self
+
+    def batch_size(self, n: int) -> "Cursor":
+        return self
+
+    def _results(self) -> List[Dict[str, Any]]:
+        docs = self._store.query(self._query)
+        if self._sort:
+            docs = _sort_docs(docs, self._sort)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        self._store.counter.record("find", read=len(docs))
+        return [project(doc, self._projection) for doc in docs]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._results())
+
+
+class AsyncCursor(Cursor):
+    """异步游标（motor 风格）"""
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        docs = self._results()
+        return docs if length is None else docs[:length]
+
+    def __aiter__(self):
+        self._iter = iter(self._results())
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class Collection:
+    """同步集合（pymongo 风格）"""
+
+    _cursor_class = Cursor
+
+    def __init__(self, store: _Store):
+        self._store = store
+        self.name = store.name
+
+    def _count(self, op: str, written: int = 0, read: int = 0) -> None:
+        self._store.counter.record(op, written=written, read=read)
+
+    def find(self, filter: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        cursor = self._cursor_class(self._store, filter or {}, projection)
+        if kwargs.get("sort"):
+            cursor.sort(kwargs["sort"])
+        if kwargs.get("limit"):
+            cursor.limit(kwargs["limit"])
+        return cursor
+
+    def _find_one(self, filter=None, projection=None, sort=None, **kwargs):
+        docs = self._store.query(filter or {})
+        if sort:
+            docs = _sort_docs(docs, _normalize_sort(sort))
+        self._count("find_one", read=min(1, len(docs)))
+        return project(docs[0], projection) if docs else None
+
+    def _count_documents(self, filter: Dict[str, Any], **kwargs: Any) -> int:
+        self._count("count_documents")
+        return len(self._store.query(filter))
+
+    def _estimated_document_count(self, **kwargs: Any) -> int:
+        self._count("estimated_document_count")
+        return len(self._store.docs)
+
+    def _distinct(self, key: str, filter: Optional[Dict[str, Any]] = None) -> List[Any]:
+        self._count("distinct")
+        values = []
+        for doc in self._store.query(filter or {}):
+            value = _get_path(doc, key)
+            if value is not _MISSING and value not in values:
+                values.append(value)
+        return values
+
+    def _insert_one(self, document: Dict[str, Any], **kwargs: Any):
+        self._count("insert_one", written=1)
+        inserted_id = self._store.insert(document)
+        document.setdefault("_id", inserted_id)
+        return SimpleNamespace(inserted_id=inserted_id, acknowledged=True)
+
+    def _insert_many(self, documents: List[Dict[str, Any]], **kwargs: Any):
+        self._count("insert_many", written=len(documents))
+        return SimpleNamespace(inserted_ids=[self._store.insert(d) for d in documents], acknowledged=True)
+
+    def _update(self, op: str, filter, update, upsert=False, many=False):
+        result = self._store.update(filter, update, upsert, many)
+        self._count(op, written=result.modified_count + int(result.upserted_id is not None))
+        return result
+
+    def _delete(self, op: str, filter, many: bool):
+        deleted = self._store.delete(filter, many)
+        self._count(op, written=deleted)
+        return SimpleNamespace(deleted_count=deleted, acknowledged=True)
+
+    def _bulk_write(self, requests: List[Any], ordered: bool = True, **kwargs: Any):
+        matched = modified = inserted = deleted = 0
+        upserted_ids: Dict[int, Any] = {}
+        for i, request in enumerate(requests):
+            kind = type(request).__name__
+            if kind == "InsertOne":
+                self._store.insert(request._doc)
+                inserted += 1
+            elif kind in ("UpdateOne", "UpdateMany", "ReplaceOne"):
+                result = self._store.update(request._filter, request._doc, bool(request._upsert), kind == "UpdateMany")
+                matched += result.matched_count
+                modified += result.modified_count
+                if result.upserted_id is not None:
+                    upserted_ids[i] = result.upserted_id
+            elif kind in ("DeleteOne", "DeleteMany"):
+                deleted += self._store.delete(request._filter, kind == "DeleteMany")
+            else:
+                raise NotImplementedError(f"内存数据库不支持批量操作 {kind}")
+        self._count("bulk_write", written=inserted + modified + len(upserted_ids) + deleted)
+        return SimpleNamespace(
+            matched_count=matched,
+            modified_count=modified,
+            inserted_count=inserted,
+            deleted_count=deleted,
+            upserted_count=len(upserted_ids),
+            upserted_ids=upserted_ids,
+            acknowledged=True,
+        )
+
+    def _aggregate(self, pipeline: List[Dict[str, Any]], **kwargs: Any) -> List[Dict[str, Any]]:
+        self._count("aggregate")
+        docs = list(self._store.docs.values())
+        for stage in pipeline:
+            (op, arg), = stage.items()
+            if op == "$match":
+                docs = [d for d in docs if matches(d, arg)]
+            elif op == "$sort":
+                docs = _sort_docs(list(docs), _normalize_sort(arg))
+            elif op == "$skip":
+                docs = docs[arg:]
+            elif op == "$limit":
+                docs = docs[:arg]
+            elif op == "$project":
+                docs = [project(d, arg) for d in docs]
+            else:
+                raise NotImplementedError(f"内存数据库不支持聚合阶段 {op}")
+        return [copy.deepcopy(d) for d in docs]
+
+    # ---- pymongo 风格同步接口 ----
+
+    def find_one(self, filter=None, projection=None, **kwargs):
+        return self._find_one(filter, projection, **kwargs)
+
+    def count_documents(self, filter, **kwargs):
+        return self._count_documents(filter, **kwargs)
+
+    def estimated_document_count(self, **kwargs):
+        return self._estimated_document_count(**kwargs)
+
+    def distinct(self, key, filter=None, **kwargs):
+        return self._distinct(key, filter)
+
+    def insert_one(self, document, **kwargs):
+        return self._insert_one(document, **kwargs)
+
+    def insert_many(self, documents, **kwargs):
+        return self._insert_many(documents, **kwargs)
+
+    def update_one(self, filter, update, upsert=False, **kwargs):
+        return self._update("update_one", filter, update, upsert)
+
+    def update_many(self, filter, update, upsert=False, **kwargs):
+        return self._update("update_many", filter, update, upsert, many=True)
+
+    def replace_one(self, filter, replacement, upsert=False, **kwargs):
+        return self._update("replace_one", filter, replacement, upsert)
+
+    def delete_one(self, filter, **kwargs):
+        return self._delete("delete_one", filter, many=False)
+
+    def delete_many(self, filter, **kwargs):
+        return self._delete("delete_many", filter, many=True)
+
+    def bulk_write(self, requests, ordered=True, **kwargs):
+        return self._bulk_write(requests, ordered, **kwargs)
+
+    def aggregate(self, pipeline, **kwargs):
+        return iter(self._aggregate(pipeline, **kwargs))
+
+    def create_index(self, keys, **kwargs):
+        self._count("create_index")
+        return self._store.create_index(keys, **kwargs)
+
+
+class AsyncCollection(Collection):
+    """异步集合（motor 风格），与同步集合共享存储"""
+
+    _cursor_class = AsyncCursor
+
+    async def find_one(self, filter=None, projection=None, **kwargs):
+        return self._find_one(filter, projection, **kwargs)
+
+    async def count_documents(self, filter, **kwargs):
+        return self._count_documents(filter, **kwargs)
+
+    async def estimated_document_count(self, **kwargs):
+        return self._estimated_document_count(**kwargs)
+
+    async def distinct(self, key, filter=None, **kwargs):
+        return self._distinct(key, filter)
+
+    async def insert_one(self, document, **kwargs):
+        return self._insert_one(document, **kwargs)
+
+    async def insert_many(self, documents, **kwargs):
+        return self._insert_many(documents, **kwargs)
+
+    async def update_one(self, filter, update, upsert=False, **kwargs):
+        return self._update("update_one", filter, update, upsert)
+
+    async def update_many(self, filter, update, upsert=False, **kwargs):
+        return self._update("update_many", filter, update, upsert, many=True)
+
+    async def replace_one(self, filter, replacement, upsert=False, **kwargs):
+        return self._update("replace_one", filter, replacement, upsert)
+
+    async def delete_one(self, filter, **kwargs):
+        return self._delete("delete_one", filter, many=False)
+
+    async def delete_many(self, filter, **kwargs):
+        return self._delete("delete_many", filter, many=True)
+
+    async def bulk_write(self, requests, ordered=True, **kwargs):
+        return self._bulk_write(requests, ordered, **kwargs)
+
+    def aggregate(self, pipeline, **kwargs):
+        cursor = AsyncCursor(self._store, {}, None)
+        cursor._results = lambda: self._aggregate(pipeline, **kwargs)
+        return cursor
+
+    async def create_index(self, keys, **kwargs):
+        self._count("create_index")
+        return self._store.create_index(keys, **kwargs)
+
+
+class InMemoryDatabase:
+    """内存数据库：sync / async 两个视图共享同一份数据与操作计数"""
+
+    def __init__(self, name: str = "tradingagents"):
+        self.name = name
+        self.counter = OpCounter()
+        self._stores: Dict[str, _Store] = {}
+        self._lock = threading.Lock()
+        self.sync = _DatabaseView(self, Collection)
+        self.async_ = _DatabaseView(self, AsyncCollection)
+
+    def store(self, name: str) -> _Store:
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                store = self._stores[name] = _Store(name, self.counter)
+            return store
+
+    def collection_names(self) -> List[str]:
+        return list(self._stores)
+
+    def seed(self, collection: str, documents: Iterable[Dict[str, Any]]) -> int:
+        """灌入初始数据（不计入操作统计）"""
+        store = self.store(collection)
+        count = 0
+        for doc in documents:
+            store.insert(doc)
+            count += 1
+        return count
+
+
+class InMemoryClient:
+    """客户端外观：client[db_name] / client.<db_name> 都返回同一个数据库的指定视图"""
+
+    def __init__(self, view: "_DatabaseView"):
+        self._view = view
+
+    def __getitem__(self, name: str) -> "_DatabaseView":
+        return self._view
+
+    def __getattr__(self, name: str) -> "_DatabaseView":
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._view
+
+    def close(self) -> None:
+        pass
+
+
+class _DatabaseView:
+    def __init__(self, database: InMemoryDatabase, collection_class: type):
+        self._database = database
+        self._collection_class = collection_class
+        self.name = database.name
+
+    def __getitem__(self, name: str) -> Collection:
+        return self._collection_class(self._database.store(name))
+
+    def __getattr__(self, name: str) -> Collection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str) -> Collection:
+        return self[name]
+
+    def list_collection_names(self) -> List[str]:
+        return self._database.collection_names()
+
+    def command(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        return {"ok": 1.0}
+
+
+@contextlib.contextmanager
+def install_fake_db(database: Optional[InMemoryDatabase] = None) -> Iterator[InMemoryDatabase]:
+    """把 app.core.database 的全局连接替换为内存数据库（退出时恢复）"""
+    from app.core import database as db_module
+
+    database = database or InMemoryDatabase()
+    async_client = InMemoryClient(database.async_)
+    patches = {
+        "mongo_client": async_client,
+        "mongo_db": database.async_,
+        "_sync_mongo_client": InMemoryClient(database.sync),
+        "_sync_mongo_db": database.sync,
+    }
+    saved = {name: getattr(db_module, name) for name in patches}
+    saved_manager = (db_module.db_manager.mongo_client, db_module.db_manager.mongo_db)
+    for name, value in patches.items():
+        setattr(db_module, name, value)
+    db_module.db_manager.mongo_client = async_client
+    db_module.db_manager.mongo_db = database.async_
+    try:
+        yield database
+    finally:
+        for name, value in saved.items():
+            setattr(db_module, name, value)
+        db_module.db_manager.mongo_client, db_module.db_manager.mongo_db = saved_manager
@@ -0,0 +1,226 @@
+"""
+确定性的模拟聊天模型
+
+FakeChatModel 是一个 LangChain BaseChatModel 实现，不访问网络：
+- 绑定了工具且对话中还没有工具结果时，按工具参数结构返回一次工具调用（股票代码、日期从对话中解析）
+- 提示词要求 JSON（信号提取）时返回固定的决策 JSON
+- 其余情况返回固定长度的中文报告文本
+- 可配置每次调用的固定延迟与按输出 token 计的生成速度，用于模拟真实模型的耗时特征
+- 统计调用次数与输入/输出 token 数（输入按字符数估算）
+
+install_fake_llm() 替换 trading_graph.create_llm_by_provider：provider 以 "fake" 开头时返回 FakeChatModel，
+其他 provider 仍走原实现。
+"""
+import contextlib
+import hashlib
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field, PrivateAttr
+
+FAKE_PROVIDER_PREFIX = "fake"
+
+_TICKER_RE = re.compile(r"股票\s*([0-9A-Za-z.]+)\s*进行")
+_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+
+_DECISION_JSON = (
+    '{"action": "买入", "target_price": 12.5, "confidence": 0.72, '
+    '"risk_score": 0.35, "reasoning": "基准测试固定决策：趋势向上，估值合理。"}'
+)
+
+_REPORT_PARAGRAPH = (
+    "## 基准测试分析\n"
+    "技术面：均线多头排列，MACD 位于零轴上方，RSI 处于中性区间，成交量温和放大。\n"
+    "基本面：营收与净利润保持增长，估值处于历史中位附近，现金流稳健。\n"
+    "情绪面：新闻与社交媒体情绪中性偏多，无重大负面事件。\n"
+)
+_REPORT_TAIL = "\n最终交易建议: **买入**\n目标价位: ¥12.50\n置信度: 0.72\n风险评分: 0.35\n"
+
+
+class FakeChatModel(BaseChatModel):
+    """确定性的模拟聊天模型（不访问网络）"""
+
+    model_name: str = "fake-chat"
+    latency_seconds: float = Field(default=0.0, description="每次调用的固定延迟（秒）")
+    tokens_per_second: float = Field(default=0.0, description="输出生成速度（token/秒），0 表示不模拟生成耗时")
+    completion_tokens: int = Field(default=600, description="每次文本回复的输出 token 数")
+    chars_per_token: float = Field(default=1.5, description="估算 token 数时每个 token 对应的字符数")
+    default_ticker: str = "000001"
+    default_date: str = "2025-01-02"
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _stats: Dict[str, int] = PrivateAttr(default_factory=lambda: {
+        "calls": 0, "tool_calls": 0, "input_tokens": 0, "output_tokens": 0,
+    })
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    # ---- 统计 ----
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+    def _record(self, input_tokens: int, output_tokens: int, tool_call: bool) -> None:
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["tool_calls"] += int(tool_call)
+            self._stats["input_tokens"] += input_tokens
+            self._stats["output_tokens"] += output_tokens
+
+    # ---- 工具 ----
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Optional[str] = None, **kwargs: Any):
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, **kwargs)
+
+    def _tool_args(self, parameters: Dict[str, Any], ticker: str, trade_date: str) -> Dict[str, Any]:
+        properties = parameters.get("properties", {}) or {}
+        try:
+            end = datetime.strptime(trade_date, "%Y-%m-%d")
+        except ValueError:
+            end = datetime.strptime(self.default_date, "%Y-%m-%d")
+        args: Dict[str, Any] = {}
+        for name, schema in properties.items():
+            lowered = name.lower()
+            if lowered in ("ticker", "symbol", "stock_code", "code", "company", "company_name", "stock_symbol"):
+                args[name] = ticker
+            elif lowered == "start_date":
+                args[name] = (end - timedelta(days=30)).strftime("%Y-%m-%d")
+            elif "date" in lowered:
+                args[name] = end.strftime("%Y-%m-%d")
+            elif lowered in ("look_back_days", "lookback_days", "days"):
+                args[name] = 30
+            elif name in (parameters.get("required") or []):
+                args[name] = {"integer": 1, "number": 1.0, "boolean": False}.get(schema.get("type"), "")
+        return args
+
+    # ---- 生成 ----
+
+    def _context(self, messages: List[BaseMessage]) -> Dict[str, str]:
+        ticker, trade_date = self.default_ticker, self.default_date
+        for message in messages:
+            text = message.content if isinstance(message.content, str) else str(message.content)
+            match = _TICKER_RE.search(text)
+            if match:
+                ticker = match.group(1)
+                date_match = _DATE_RE.search(text)
+                if date_match:
+                    trade_date = date_match.group(1)
+                break
+        return {"ticker": ticker, "trade_date": trade_date}
+
+    def _report(self, seed: str) -> str:
+        """生成约 completion_tokens 个 token 的确定性报告（同一输入得到同一输出）"""
+        target_chars = int(self.completion_tokens * self.chars_per_token)
+        digest = hashlib.sha1(seed.encode("utf-8")).hexdigest()[:8]
+        header = f"# 基准测试报告 {digest}\n"
+        body = _REPORT_PARAGRAPH * max(1, (target_chars - len(header) - len(_REPORT_TAIL)) // len(_REPORT_PARAGRAPH))
+        return header + body + _REPORT_TAIL
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt_chars = sum(len(m.content) if isinstance(m.content, str) else len(str(m.content)) for m in messages)
+        input_tokens = int(prompt_chars / self.chars_per_token)
+        tools = kwargs.get("tools") or []
+        last_text = messages[-1].content if messages and isinstance(messages[-1].content, str) else ""
+
+        if tools and not any(isinstance(m, ToolMessage) for m in messages):
+            context = self._context(messages)
+            function = tools[0]["function"]
+            message = AIMessage(
+                content="",
+                tool_calls=[{
+                    "name": function["name"],
+                    "args": self._tool_args(function.get("parameters", {}), context["ticker"], context["trade_date"]),
+                    "id": f"call_{self._stats['calls']}",
+                    "type": "tool_call",
+                }],
+            )
+            output_tokens = 20
+        else:
+            content = _DECISION_JSON if "JSON" in last_text else self._report(last_text[-200:])
+            message = AIMessage(content=content)
+            output_tokens = self.completion_tokens
+
+        delay = self.latency_seconds
+        if self.tokens_per_second > 0:
+            delay += output_tokens / self.tokens_per_second
+        if delay > 0:
+            time.sleep(delay)
+
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        message.response_metadata = {"model_name": self.model_name, "finish_reason": "stop"}
+        self._record(input_tokens, output_tokens, bool(message.tool_calls))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+_active_models: List[FakeChatModel] = []
+
+
+def fake_llm_stats() -> Dict[str, int]:
+    """汇总当前已创建的模拟模型的调用统计"""
+    total = {"calls": 0, "tool_calls": 0, "input_tokens": 0, "output_tokens": 0}
+    for model in _active_models:
+        for key, value in model.get_stats().items():
+            total[key] += value
+    return total
+
+
+def reset_fake_llm_stats() -> None:
+    for model in _active_models:
+        model.reset_stats()
+
+
+@contextlib.contextmanager
+def install_fake_llm(**model_kwargs: Any) -> Iterator[None]:
+    """让 create_llm_by_provider 对 "fake*" provider 返回 FakeChatModel
+
+    TradingAgentsGraph 只有在快速/深度模型来自不同 provider 时才经过 create_llm_by_provider，
+    因此基准配置使用 quick_provider="fake-quick"、deep_provider="fake-deep"（见 scenarios.analysis_config）。
+    """
+    from tradingagents.graph import trading_graph
+
+    original = trading_graph.create_llm_by_provider
+
+    def create_llm_by_provider(provider: str, model: str, backend_url: str, temperature: float,
+                               max_tokens: int, timeout: int, api_key: str = None):
+        if provider.lower().startswith(FAKE_PROVIDER_PREFIX):
+            llm = FakeChatModel(model_name=model, **model_kwargs)
+            _active_models.append(llm)
+            return llm
+        return original(provider, model, backend_url, temperature, max_tokens, timeout, api_key)
+
+    trading_graph.create_llm_by_provider = create_llm_by_provider
+    try:
+        yield
+    finally:
+        trading_graph.create_llm_by_provider = original
+        _active_models.clear()
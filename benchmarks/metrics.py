@@ -0,0 +1,233 @@
+"""
+基准指标采集
+
+measure() 在一个代码块上采集：
+- wall_time_seconds：墙钟耗时（perf_counter）
+- peak_rss_mb / rss_delta_mb：后台线程按固定间隔采样的进程 RSS 峰值与前后差值
+- allocations：开启 trace_alloc 时由 tracemalloc 统计的峰值分配字节数与分配块数（会明显拖慢运行，默认关闭）
+- db_ops：内存数据库的操作计数增量
+- llm：模拟模型的调用次数与 token 数增量
+- provider_calls：录制/回放层的调用统计增量
+
+NodeTimer 通过 LangChain 回调统计 LangGraph 各节点耗时（并行分析师的耗时互相重叠，是包含子图的区间耗时）。
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+import psutil
+from langchain_core.callbacks import BaseCallbackHandler
+
+_MB = 1024 * 1024
+
+
+class RSSSampler:
+    """后台线程采样进程 RSS，记录峰值"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self._process = psutil.Process(os.getpid())
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.start_rss = 0
+        self.peak_rss = 0
+        self.end_rss = 0
+
+    def _sample(self) -> int:
+        rss = self._process.memory_info().rss
+        if rss > self.peak_rss:
+            self.peak_rss = rss
+        return rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self.start_rss = self.peak_rss = self._process.memory_info().rss
+        self._thread = threading.Thread(target=self._run, name="bench-rss-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.end_rss = self._sample()
+
+
+class NodeTimer(BaseCallbackHandler):
+    """按 LangGraph 节点名累计执行耗时与次数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._starts: Dict[UUID, Any] = {}
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+
+    def on_chain_start(self, serialized: Optional[Dict[str, Any]], inputs: Any, *, run_id: UUID,
+                       metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # 只统计节点本身的 run，忽略节点内部的子 runnable
+        if node and kwargs.get("name") == node:
+            with self._lock:
+                self._starts[run_id] = (node, time.perf_counter())
+
+    def _finish(self, run_id: UUID) -> None:
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+            if started is not None:
+                node, t0 = started
+                self.totals[node] += time.perf_counter() - t0
+                self.counts[node] += 1
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                node: {"seconds": round(self.totals[node], 6), "calls": self.counts[node]}
+                for node in sorted(self.totals, key=self.totals.get, reverse=True)
+            }
+
+    def attach(self, graph: Any) -> None:
+        """让 TradingAgentsGraph.propagate 的图调用带上本回调"""
+        propagator = graph.propagator
+        original = propagator.get_graph_args
+
+        def get_graph_args(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+            graph_args = original(*args, **kwargs)
+            config = dict(graph_args.get("config") or {})
+            config["callbacks"] = list(config.get("callbacks") or []) + [self]
+            graph_args["config"] = config
+            return graph_args
+
+        propagator.get_graph_args = get_graph_args
+
+
+def _delta(after: Dict[str, Any], before: Dict[str, Any]) -> Dict[str, Any]:
+    result = {}
+    for key, value in after.items():
+        if isinstance(value, dict):
+            result[key] = _delta(value, before.get(key) or {})
+        elif isinstance(value, (int, float)):
+            result[key] = value - (before.get(key) or 0)
+        else:
+            result[key] = value
+    return result
+
+
+class Measurement:
+    """一次被测代码块的指标"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.metrics: Dict[str, Any] = {}
+        self.extra: Dict[str, Any] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, **self.metrics, **self.extra}
+
+
+class measure:
+    """
+    采集代码块指标的上下文管理器
+
+    Args:
+        name: 指标名
+        sources: {指标名: 返回计数字典的函数}，进入与退出时各取一次快照，记录增量
+        trace_alloc: 是否用 tracemalloc 统计内存分配
+    """
+
+    def __init__(self, name: str, sources: Optional[Dict[str, Callable[[], Dict[str, Any]]]] = None,
+                 trace_alloc: bool = False, rss_interval: float = 0.01):
+        self.measurement = Measurement(name)
+        self.sources = sources or {}
+        self.trace_alloc = trace_alloc
+        self.sampler = RSSSampler(rss_interval)
+        self._before: Dict[str, Dict[str, Any]] = {}
+        self._t0 = 0.0
+
+    def __enter__(self) -> Measurement:
+        self._before = {key: source() for key, source in self.sources.items()}
+        if self.trace_alloc:
+            tracemalloc.start()
+        self.sampler.start()
+        self._t0 = time.perf_counter()
+        return self.measurement
+
+    def __exit__(self, *exc: Any) -> None:
+        wall = time.perf_counter() - self._t0
+        self.sampler.stop()
+        metrics: Dict[str, Any] = {
+            "wall_time_seconds": round(wall, 6),
+            "peak_rss_mb": round(self.sampler.peak_rss / _MB, 2),
+            "rss_delta_mb": round((self.sampler.end_rss - self.sampler.start_rss) / _MB, 2),
+        }
+        if self.trace_alloc:
+            current, peak = tracemalloc.get_traced_memory()
+            blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+            tracemalloc.stop()
+            metrics["allocations"] = {
+                "peak_bytes": peak,
+                "retained_bytes": current,
+                "retained_blocks": blocks,
+            }
+        for key, source in self.sources.items():
+            metrics[key] = _delta(source(), self._before.get(key) or {})
+        self.measurement.metrics = metrics
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """多次重复运行的耗时汇总"""
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {
+        "runs": n,
+        "min": round(ordered[0], 6),
+        "median": round(ordered[n // 2] if n % 2 else (ordered[n // 2 - 1] + ordered[n // 2]) / 2, 6),
+        "max": round(ordered[-1], 6),
+        "mean": round(sum(ordered) / n, 6),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """运行环境信息，用于跨提交对比时核对条件是否一致"""
+    commit = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip() or None
+    except Exception:
+        pass
+    return {
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def write_report(results: List[Dict[str, Any]], path: Optional[str]) -> str:
+    """输出 JSON 报告；path 为空时只返回文本"""
+    report = {"environment": environment(), "scenarios": results}
+    text = json.dumps(report, ensure_ascii=False, indent=2, default=str)
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
@@ -0,0 +1,152 @@
+"""
+新闻近似去重基准
+
+合成一天的多源新闻：每只股票若干条原创新闻，其中一部分被其他媒体改写转载
+（加来源前缀、改标题措辞、换标点、增删句子），标注每条新闻所属的原始报道。
+对比按标题精确去重与 tradingagents.dataflows.news.near_duplicate 近似去重后：
+- 剩余新闻数与估算 token 数（进入新闻分析师提示词的规模）
+- 成对精确率/召回率：同一报道的转载稿被合并的比例，不同报道被误合并的比例
+- 聚类耗时（新闻数翻倍时耗时应近似翻倍）
+"""
+import itertools
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from .synthetic import SyntheticMarket
+
+_EVENTS = ["业绩预增", "股份回购", "大股东减持", "重大合同中标", "股权激励", "年度分红", "资产重组", "产品提价"]
+_OUTLETS = ["新浪财经", "东方财富", "财联社", "证券时报", "每日经济新闻"]
+_TITLE_REWRITES = [("公告", "披露"), ("发布", "宣布"), ("事项", "计划"), ("同比增长", "同比上升")]
+
+
+_SENTENCES = [
+    "公告显示，公司最近一期实现营业收入{revenue:.2f}亿元，同比增长{growth:.2f}%",
+    "公司所属{industry}行业景气度{trend}，管理层表示将继续聚焦主业",
+    "分析人士认为，该事项对公司未来{years}年的经营将产生积极影响",
+    "截至发稿，{name}股价报{price:.2f}元，总市值约{cap:.0f}亿元",
+    "公司同时披露，拟向全体股东每10股派发现金红利{dividend:.2f}元",
+    "机构调研纪要显示，公司海外订单占比已提升至{share:.0f}%",
+    "公司表示，本次事项不会导致控股股东及实际控制人发生变化",
+    "此前{days}个交易日内，公司股价累计{move}{change:.1f}%，成交额明显放大",
+    "公司董事会秘书在投资者互动平台回复称，相关产能预计于{year}年投产",
+    "多家券商维持对{name}的“{rating}”评级，目标价上调至{target:.2f}元",
+]
+
+
+def _story(info: Dict[str, Any], event: str, rng) -> Tuple[str, str]:
+    """一条原创报道的标题与正文（事件句 + 随机选取、随机排列的若干叙述句）"""
+    name = info["name"]
+    slots = {
+        "name": name,
+        "industry": info["industry"],
+        "revenue": float(rng.uniform(5, 500)),
+        "growth": float(rng.uniform(-30, 80)),
+        "trend": "回升" if rng.random() < 0.5 else "承压",
+        "years": int(rng.integers(1, 4)),
+        "price": float(rng.uniform(5, 200)),
+        "cap": float(rng.uniform(50, 5000)),
+        "dividend": float(rng.uniform(0.5, 30)),
+        "share": float(rng.uniform(5, 60)),
+        "days": int(rng.integers(3, 20)),
+        "move": "上涨" if rng.random() < 0.5 else "下跌",
+        "change": float(rng.uniform(1, 30)),
+        "year": int(rng.integers(2025, 2028)),
+        "rating": "买入" if rng.random() < 0.5 else "增持",
+        "target": float(rng.uniform(5, 250)),
+    }
+    amount = float(rng.uniform(0.5, 50))
+    picked = rng.choice(len(_SENTENCES), size=4, replace=False)
+    sentences = [f"{name}（{info['ts_code']}）{int(rng.integers(1, 28))}日晚间公告{event}事项，涉及金额约{amount:.2f}亿元"]
+    sentences += [_SENTENCES[int(i)].format(**slots) for i in picked]
+    title = f"{name}发布{event}公告，涉及金额{amount:.1f}亿元"
+    return title, "。".join(sentences) + "。"
+
+
+def _syndicate(title: str, body: str, outlet: str, rng) -> Tuple[str, str]:
+    """媒体改写转载：加来源前缀、改措辞、换标点、删改句子"""
+    for old, new in _TITLE_REWRITES:
+        if rng.random() < 0.5:
+            title = title.replace(old, new)
+    title = f"【{outlet}】{title}" if rng.random() < 0.5 else f"{title}（{outlet}）"
+    sentences = [s for s in body.split("。") if s]
+    if len(sentences) > 3 and rng.random() < 0.5:
+        del sentences[int(rng.integers(1, len(sentences)))]
+    body = "。".join(sentences) + "。"
+    body = body.replace("，", "；", 1) if rng.random() < 0.5 else body
+    body = f"{outlet}讯 {body}" if rng.random() < 0.5 else f"{body}（来源：{outlet}）"
+    return title, body
+
+
+def news_day(market: SyntheticMarket, stories_per_stock: int = 4) -> List[Dict[str, Any]]:
+    """合成一天的多源新闻，story 字段为原始报道编号"""
+    docs = []
+    day = datetime.combine(market.as_of, datetime.min.time())
+    story_id = 0
+    for code in market.universe():
+        info = market.basic_info(code)
+        rng = market._rng("news_dedup", code)
+        for _ in range(stories_per_stock):
+            event = _EVENTS[int(rng.integers(len(_EVENTS)))]
+            title, body = _story(info, event, rng)
+            publish_time = day + timedelta(minutes=int(rng.integers(0, 24 * 60)))
+            copies = [(title, body, _OUTLETS[int(rng.integers(len(_OUTLETS)))])]
+            # 约一半的报道被 1~3 家媒体转载
+            if rng.random() < 0.5:
+                for outlet in rng.choice(_OUTLETS, size=int(rng.integers(1, 4)), replace=False):
+                    copies.append((*_syndicate(title, body, str(outlet), rng), str(outlet)))
+            for i, (copy_title, copy_body, outlet) in enumerate(copies):
+                docs.append({
+                    "symbol": code,
+                    "title": copy_title,
+                    "content": copy_body,
+                    "source": outlet,
+                    "url": f"https://example.invalid/{outlet}/{code}/{story_id}/{i}",
+                    "publish_time": publish_time + timedelta(minutes=5 * i),
+                    "story": story_id,
+                })
+            story_id += 1
+    docs.sort(key=lambda doc: doc["publish_time"])
+    return docs
+
+
+def _pairwise(docs: List[Dict[str, Any]], clusters: List[str]) -> Dict[str, float]:
+    """成对精确率/召回率（同一报道的新闻对为正例）"""
+    by_story = defaultdict(list)
+    by_cluster = defaultdict(list)
+    for docno, (doc, cluster_id) in enumerate(zip(docs, clusters)):
+        by_story[doc["story"]].append(docno)
+        by_cluster[cluster_id].append(docno)
+    truth = {pair for members in by_story.values() for pair in itertools.combinations(members, 2)}
+    predicted = {pair for members in by_cluster.values() for pair in itertools.combinations(members, 2)}
+    hit = len(truth & predicted)
+    return {
+        "precision": round(hit / len(predicted), 4) if predicted else 1.0,
+        "recall": round(hit / len(truth), 4) if truth else 1.0,
+    }
+
+
+def _cluster_ms(docs: List[Dict[str, Any]]) -> float:
+    from tradingagents.dataflows.news.near_duplicate import cluster_news
+
+    t0 = time.perf_counter()
+    cluster_news(docs, scope_of=lambda doc: doc["symbol"])
+    return round((time.perf_counter() - t0) * 1000, 1)
+
+
+def run_news_dedup_benchmark(market: SyntheticMarket, stories_per_stock: int = 4) -> Dict[str, Any]:
+    """合成一天新闻上精确标题去重与近似去重的新闻数、token 数、聚类质量与耗时"""
+    from tradingagents.dataflows.news.near_duplicate import cluster_news, dedup_savings
+
+    docs = news_day(market, stories_per_stock=stories_per_stock)
+    scope_of = lambda doc: doc["symbol"]
+
+    clusters = [cluster_id for cluster_id, _ in cluster_news(docs, scope_of=scope_of)]
+    half = docs[:len(docs) // 2]
+    return {
+        "stories": len({doc["story"] for doc in docs}),
+        "savings": dedup_savings(docs, scope_of=scope_of),
+        "pairwise": _pairwise(docs, clusters),
+        "cluster_ms": {"half": _cluster_ms(half), "full": _cluster_ms(docs)},
+    }
@@ -0,0 +1,124 @@
+"""
+新闻检索基准
+
+在合成新闻语料上对比 tradingagents.dataflows.news.search_index 与逐条子串扫描
+（相当于 MongoDB $text 对未分词中文的匹配效果）的召回率与查询耗时：
+- 行业 + 事件查询（如“白酒提价”）：相关新闻为该行业股票发布的该类事件
+- 股票代码查询（如“sh600001”、“600001.SH”）：相关新闻为该股票的新闻
+召回率为 recall@10（前10条中相关新闻数 / min(10, 相关总数)），耗时单位毫秒。
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from .synthetic import SyntheticMarket
+
+_EVENTS = ["提价", "回购", "减持", "中标", "业绩预增", "股权激励", "分红", "重组"]
+
+
+def news_corpus(market: SyntheticMarket, per_stock: int = 20) -> Tuple[List[Dict[str, Any]], Dict[int, Tuple[str, str]]]:
+    """
+    合成新闻语料
+
+    Returns:
+        (新闻文档列表, 文档序号 -> (行业, 事件))
+    """
+    docs = []
+    labels = {}
+    day = datetime.combine(market.as_of, datetime.min.time())
+    for code in market.universe():
+        info = market.basic_info(code)
+        rng = market._rng("news_corpus", code)
+        for i in range(per_stock):
+            event = _EVENTS[int(rng.integers(len(_EVENTS)))]
+            labels[len(docs)] = (info["industry"], event)
+            docs.append({
+                "symbol": code,
+                "symbols": [code],
+                "title": f"{info['name']}公告{event}事项",
+                "summary": f"{info['name']}（{info['ts_code']}）发布{event}相关公告",
+                "content": (
+                    f"{info['name']}属于{info['industry']}行业，公司今日公告{event}事项。"
+                    f"第{i + 1}季度订单保持稳定，经营情况正常。"
+                ),
+                "url": f"https://example.invalid/news/{code}/{i}",
+                "publish_time": day - timedelta(hours=6 * i),
+                "updated_at": day,
+            })
+    return docs, labels
+
+
+def _queries(market: SyntheticMarket, labels: Dict[int, Tuple[str, str]],
+             docs: List[Dict[str, Any]]) -> List[Tuple[str, Set[int]]]:
+    """(查询文本, 相关文档序号集合)"""
+    industries = sorted({industry for industry, _ in labels.values()})
+    queries = []
+    for industry in industries:
+        for event in _EVENTS[:4]:
+            relevant = {docno for docno, label in labels.items() if label == (industry, event)}
+            queries.append((f"{industry}{event}", relevant))
+    for code in market.universe()[:16]:
+        exchange = market.basic_info(code)["ts_code"].split(".")[1]
+        relevant = {docno for docno, doc in enumerate(docs) if doc["symbol"] == code}
+        queries.append((f"{exchange.lower()}{code}", relevant))
+        queries.append((f"{code}.{exchange}", relevant))
+    return queries
+
+
+def _recall_at_10(ranked: List[int], relevant: Set[int]) -> float:
+    if not relevant:
+        return 1.0
+    return sum(1 for docno in ranked[:10] if docno in relevant) / min(10, len(relevant))
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000, 3)
+
+
+def _evaluate(search: Callable[[str], List[int]], queries: List[Tuple[str, Set[int]]]) -> Dict[str, Any]:
+    latencies = []
+    recalls = []
+    for text, relevant in queries:
+        t0 = time.perf_counter()
+        ranked = search(text)
+        latencies.append(time.perf_counter() - t0)
+        recalls.append(_recall_at_10(ranked, relevant))
+    return {
+        "recall_at_10": round(sum(recalls) / len(recalls), 4),
+        "p50_ms": _percentile(latencies, 0.5),
+        "p95_ms": _percentile(latencies, 0.95),
+    }
+
+
+def run_news_search_benchmark(market: SyntheticMarket, per_stock: int = 20) -> Dict[str, Any]:
+    """合成语料上索引检索与子串扫描的召回率、耗时，以及建索引耗时"""
+    from tradingagents.dataflows.news.search_index import NewsSearchIndex, news_key
+
+    docs, labels = news_corpus(market, per_stock=per_stock)
+    queries = _queries(market, labels, docs)
+
+    index = NewsSearchIndex(path=None)
+    t0 = time.perf_counter()
+    index.add_documents(docs)
+    build_ms = round((time.perf_counter() - t0) * 1000, 1)
+    docnos = {news_key(doc): docno for docno, doc in enumerate(docs)}
+
+    def index_search(text: str) -> List[int]:
+        return [docnos[key] for key, _ in index.search(text, limit=10)]
+
+    texts = [doc["title"] + doc["summary"] + doc["content"] for doc in docs]
+    order = sorted(range(len(docs)), key=lambda docno: docs[docno]["publish_time"], reverse=True)
+
+    def scan_search(text: str) -> List[int]:
+        return [docno for docno in order if text in texts[docno]][:10]
+
+    return {
+        "documents": len(docs),
+        "queries": len(queries),
+        "tokenizer": index.tokenizer,
+        "build_ms": build_ms,
+        "index": _evaluate(index_search, queries),
+        "substring_scan": _evaluate(scan_search, queries),
+        "index_stats": index.stats(),
+    }
@@ -0,0 +1,372 @@
+"""
+数据源录制 / 回放
+
+RecordReplay 替换 Tushare / AKShare / BaoStock 提供器类上的取数方法（get_* / find_*，同步与异步均支持），
+以及 SDK_FUNCTIONS 中绕过提供器直接调用的 SDK 函数：
+- record：调用真实方法并把返回值写入夹具文件（需要网络与数据源凭证）
+- replay：只从夹具读取，不访问网络；未录制的调用返回 SyntheticMarket 生成的合成数据，strict=True 时抛出 ReplayMissError
+
+夹具按提供器类分文件保存在 benchmarks/fixtures/<类名>.pkl，键为 (方法名, 参数) 的哈希。
+回放模式同时让 connect/is_available 直接返回成功，避免初始化阶段访问网络。
+
+block_network() 让所有 socket 连接与 DNS 解析立即失败，保证基准运行期间没有漏网的网络调用。
+"""
+import contextlib
+import functools
+import hashlib
+import importlib
+import inspect
+import logging
+import os
+import pickle
+import socket
+import threading
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .synthetic import SyntheticMarket
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# (模块, 类名)
+PROVIDER_CLASSES: List[Tuple[str, str]] = [
+    ("tradingagents.dataflows.providers.china.tushare", "TushareProvider"),
+    ("tradingagents.dataflows.providers.china.akshare", "AKShareProvider"),
+    ("tradingagents.dataflows.providers.china.baostock", "BaoStockProvider"),
+]
+
+# 绕过提供器直接调用的 SDK 函数（模块, 函数名）
+SDK_FUNCTIONS: List[Tuple[str, str]] = [
+    ("akshare", "stock_individual_info_em"),
+]
+
+_CONNECT_METHODS = ("connect", "connect_sync", "test_connection")
+_DATA_METHOD_PREFIXES = ("get_", "find_")
+
+
+class ReplayMissError(LookupError):
+    """严格回放模式下请求了未录制的数据"""
+
+
+def _normalize_arg(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, str) and len(value) == 8 and value.isdigit():
+        # 20250102 与 2025-01-02 视为同一日期
+        return f"{value[:4]}-{value[4:6]}-{value[6:]}"
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize_arg(v) for v in value)
+    return value
+
+
+def fixture_key(method: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    normalized = (method, tuple(_normalize_arg(a) for a in args),
+                  tuple(sorted((k, _normalize_arg(v)) for k, v in kwargs.items())))
+    return hashlib.sha1(repr(normalized).encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    """单个提供器类的夹具（内存字典 + pickle 文件）"""
+
+    def __init__(self, name: str, directory: str = FIXTURE_DIR):
+        self.name = name
+        self.path = os.path.join(directory, f"{name}.pkl")
+        self._lock = threading.Lock()
+        self._data: Dict[str, Any] = {}
+        self._dirty = False
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                self._data = pickle.load(f)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Any:
+        return self._data[key]
+
+    def put(self, key: str, value: Any, persist: bool = True) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._dirty = self._dirty or persist
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            with open(self.path, "wb") as f:
+                pickle.dump(self._data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._dirty = False
+        logger.info(f"💾 夹具已保存: {self.path} ({len(self._data)} 条)")
+
+
+def _bound_args(func: Callable, args: Tuple[Any, ...], kwargs: Dict[str, Any],
+                has_self: bool = True) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+    """把位置参数与关键字参数统一为关键字形式（包含默认值），使不同调用方式命中同一夹具"""
+    try:
+        bound = inspect.signature(func).bind(*((None,) if has_self else ()), *args, **kwargs)
+        bound.apply_defaults()
+        params = dict(bound.arguments)
+        if has_self:
+            params.pop(next(iter(params)))
+        return (), params
+    except TypeError:
+        return args, kwargs
+
+
+class RecordReplay:
+    """提供器取数方法的录制 / 回放"""
+
+    def __init__(self, mode: str = "replay", strict: bool = False,
+                 market: Optional[SyntheticMarket] = None, fixture_dir: str = FIXTURE_DIR):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"不支持的模式: {mode}")
+        self.mode = mode
+        self.strict = strict
+        self.market = market or SyntheticMarket()
+        self.fixture_dir = fixture_dir
+        self.stores: Dict[str, FixtureStore] = {}
+        self.stats = {"calls": 0, "hits": 0, "synthetic": 0, "recorded": 0}
+        self._stats_lock = threading.Lock()
+        self._patched: List[Tuple[type, str, Any]] = []
+
+    # ---- 夹具 ----
+
+    def store(self, class_name: str) -> FixtureStore:
+        if class_name not in self.stores:
+            self.stores[class_name] = FixtureStore(class_name, self.fixture_dir)
+        return self.stores[class_name]
+
+    def preload(self, class_name: str, method: str, result: Any, *args: Any, **kwargs: Any) -> None:
+        """预置一条回放结果（不写入夹具文件），场景用它在计时前准备好大批量数据"""
+        cls = self._load_class(class_name)
+        func = getattr(cls, method) if cls is not None else None
+        if func is not None:
+            args, kwargs = _bound_args(func, args, kwargs)
+        self.store(class_name).put(fixture_key(method, args, kwargs), result, persist=False)
+
+    @staticmethod
+    def _load_class(class_name: str) -> Optional[type]:
+        for module_name, name in PROVIDER_CLASSES:
+            if name == class_name:
+                try:
+                    return getattr(importlib.import_module(module_name), name)
+                except Exception as e:
+                    logger.warning(f"⚠️ 无法导入提供器 {module_name}.{name}: {e}")
+                    return None
+        return None
+
+    # ---- 合成数据 ----
+
+    def synthesize(self, method: str, params: Dict[str, Any]) -> Any:
+        """未录制调用的合成返回值；无法合成的方法返回 None（与数据源无数据时的约定一致）"""
+        market = self.market
+        symbol = params.get("symbol") or params.get("code") or params.get("stock_code")
+        if isinstance(symbol, str):
+            symbol = symbol.split(".")[0][-6:]
+        if method == "get_historical_data" or method in ("get_daily_data", "get_stock_data"):
+            bars = market.daily_bars(symbol or "000001", params.get("start_date"), params.get("end_date"))
+            return bars if not bars.empty else None
+        if method == "get_daily_by_trade_date":
+            frame = market.cross_section(params.get("trade_date"))
+            return frame if not frame.empty else None
+        if method == "get_stock_basic_info":
+            return market.basic_info(symbol) if symbol else market.stock_list()
+        if method == "get_stock_list":
+            return market.stock_list()
+        if method == "get_stock_list_sync":
+            import pandas as pd
+            return pd.DataFrame(market.stock_list())
+        if method == "get_stock_quotes":
+            return market.quote(symbol or "000001")
+        if method in ("get_realtime_quotes_batch", "get_batch_stock_quotes"):
+            return market.quotes_batch(params.get("codes"))
+        if method in ("get_financial_data", "get_financial_indicators_only"):
+            return market.financials(symbol or "000001")
+        if method in ("get_stock_news", "get_stock_news_sync"):
+            news = market.news(symbol, params.get("limit") or 10)
+            if method.endswith("_sync"):
+                import pandas as pd
+                return pd.DataFrame(news)
+            return news
+        if method == "get_trade_calendar":
+            return [d.strftime("%Y-%m-%d") for d in market.trade_dates(params.get("start_date"), params.get("end_date"))]
+        if method == "find_latest_trade_date":
+            return market.as_of.strftime("%Y-%m-%d")
+        if method == "stock_individual_info_em":
+            import pandas as pd
+            info = market.basic_info(symbol or "000001")
+            return pd.DataFrame({
+                "item": ["股票代码", "股票简称", "行业", "总市值", "流通市值", "上市时间"],
+                "value": [info["code"], info["name"], info["industry"], info["total_mv"] * 1e8,
+                          info["circ_mv"] * 1e8, info["list_date"]],
+            })
+        return None
+
+    # ---- 替换 ----
+
+    def _count(self, outcome: str) -> None:
+        with self._stats_lock:
+            self.stats["calls"] += 1
+            self.stats[outcome] += 1
+
+    def _resolve(self, class_name: str, method: str, func: Callable, args: Tuple[Any, ...],
+                 kwargs: Dict[str, Any], has_self: bool = True) -> Tuple[bool, Any, str, Dict[str, Any]]:
+        """返回 (是否已得到结果, 结果, 夹具键, 参数)"""
+        args, params = _bound_args(func, args, kwargs, has_self)
+        key = fixture_key(method, args, params)
+        store = self.store(class_name)
+        if key in store:
+            self._count("hits")
+            return True, store.get(key), key, params
+        if self.mode == "record":
+            return False, None, key, params
+        if self.strict:
+            raise ReplayMissError(f"{class_name}.{method}{params} 未录制")
+        self._count("synthetic")
+        return True, self.synthesize(method, params), key, params
+
+    def _wrap(self, class_name: str, method: str, func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(instance, *args, **kwargs):
+                done, result, key, _ = self._resolve(class_name, method, func, args, kwargs)
+                if done:
+                    return result
+                result = await func(instance, *args, **kwargs)
+                self.store(class_name).put(key, result)
+                self._count("recorded")
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(instance, *args, **kwargs):
+            done, result, key, _ = self._resolve(class_name, method, func, args, kwargs)
+            if done:
+                return result
+            result = func(instance, *args, **kwargs)
+            self.store(class_name).put(key, result)
+            self._count("recorded")
+            return result
+        return wrapper
+
+    def _wrap_function(self, store_name: str, name: str, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            done, result, key, _ = self._resolve(store_name, name, func, args, kwargs, has_self=False)
+            if done:
+                return result
+            result = func(*args, **kwargs)
+            self.store(store_name).put(key, result)
+            self._count("recorded")
+            return result
+        return wrapper
+
+    def _patch(self, cls: Any, name: str, value: Any) -> None:
+        self._patched.append((cls, name, vars(cls).get(name, _ABSENT)))
+        setattr(cls, name, value)
+
+    def install(self) -> None:
+        for module_name, class_name in PROVIDER_CLASSES:
+            cls = self._load_class(class_name)
+            if cls is None:
+                continue
+            for name, func in inspect.getmembers(cls, inspect.isfunction):
+                if name.startswith(_DATA_METHOD_PREFIXES):
+                    self._patch(cls, name, self._wrap(class_name, name, func))
+            if self.mode == "replay":
+                for name in _CONNECT_METHODS:
+                    func = getattr(cls, name, None)
+                    if func is None:
+                        continue
+                    self._patch(cls, name, _connected_async if inspect.iscoroutinefunction(func) else _connected_sync)
+                self._patch(cls, "is_available", lambda instance: True)
+        for module_name, name in SDK_FUNCTIONS:
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                continue
+            func = getattr(module, name, None)
+            if func is not None:
+                self._patch(module, name, self._wrap_function(module_name, name, func))
+
+    def uninstall(self) -> None:
+        while self._patched:
+            cls, name, original = self._patched.pop()
+            if original is _ABSENT:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+        if self.mode == "record":
+            for store in self.stores.values():
+                store.save()
+
+    def __enter__(self) -> "RecordReplay":
+        self.install()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.uninstall()
+
+
+_ABSENT = object()
+
+
+def _connected_sync(instance, *args: Any, **kwargs: Any) -> bool:
+    instance.connected = True
+    return True
+
+
+async def _connected_async(instance, *args: Any, **kwargs: Any) -> bool:
+    instance.connected = True
+    return True
+
+
+class NetworkBlockedError(ConnectionRefusedError):
+    """基准运行期间禁止访问网络"""
+
+
+@contextlib.contextmanager
+def block_network() -> Iterator[List[Any]]:
+    """禁止 TCP 连接与 DNS 解析，返回被拦截的地址列表"""
+    blocked: List[Any] = []
+    original_connect = socket.socket.connect
+    original_connect_ex = socket.socket.connect_ex
+    original_getaddrinfo = socket.getaddrinfo
+
+    def _allowed(address: Any) -> bool:
+        # 只放行 Unix 域套接字；本机 TCP 服务（MongoDB/Redis）同样拦截，避免基准结果受本地服务影响
+        return not isinstance(address, tuple)
+
+    def guarded_connect(sock, address):
+        if not _allowed(address):
+            blocked.append(address)
+            raise NetworkBlockedError(f"基准运行期间禁止网络连接: {address}")
+        return original_connect(sock, address)
+
+    def guarded_connect_ex(sock, address):
+        if not _allowed(address):
+            blocked.append(address)
+            return 111  # ECONNREFUSED
+        return original_connect_ex(sock, address)
+
+    def guarded_getaddrinfo(host, *args, **kwargs):
+        if host is not None:
+            blocked.append(host)
+            raise socket.gaierror(f"基准运行期间禁止解析域名: {host}")
+        return original_getaddrinfo(host, *args, **kwargs)
+
+    socket.socket.connect = guarded_connect
+    socket.socket.connect_ex = guarded_connect_ex
+    socket.getaddrinfo = guarded_getaddrinfo
+    try:
+        yield blocked
+    finally:
+        socket.socket.connect = original_connect
+        socket.socket.connect_ex = original_connect_ex
+        socket.getaddrinfo = original_getaddrinfo
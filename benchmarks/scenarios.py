@@ -0,0 +1,298 @@
+"""
+基准场景
+
+每个场景在 BenchContext（内存数据库 + 模拟模型 + 数据源回放 + 禁网）中运行，
+准备数据的时间不计入指标，只有 ctx.measure() 包住的部分被计时。
+
+- single_analysis：单只股票完整多智能体分析（TradingAgentsGraph.propagate），附各节点耗时
+- batch_analysis：批量分析（默认 50 只，可并发）
+- market_sync：全市场按交易日增量同步日线（TushareSyncService.sync_historical_data_by_trade_date）
+- screening：全市场面板选股（ScreeningService.run）
+- cache_codec：缓存编码在 1 年 / 10 年日线上的体积与编解码耗时（对比历史 JSON/CSV/pickle 格式）
+- news_search：新闻全文检索索引在合成新闻语料上的召回率与查询耗时（对比子串扫描）
+"""
+import asyncio
+import contextlib
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .fake_db import InMemoryDatabase, install_fake_db
+from .fake_llm import fake_llm_stats, install_fake_llm
+from .metrics import Measurement, NodeTimer, measure
+from .recording import RecordReplay, block_network
+from .synthetic import SyntheticMarket
+
+DEFAULT_ANALYSTS = ["market", "fundamentals", "news", "social"]
+
+
+def analysis_config(**overrides: Any) -> Dict[str, Any]:
+    """
+    基准分析配置
+
+    快速/深度模型使用不同的 fake provider，使 TradingAgentsGraph 走 create_llm_by_provider 创建模型；
+    关闭记忆与在线工具，避免加载向量库与访问网络。
+    """
+    from tradingagents.default_config import DEFAULT_CONFIG
+
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config.update(
+        llm_provider="fake",
+        quick_provider="fake-quick",
+        deep_provider="fake-deep",
+        quick_think_llm="fake-quick-model",
+        deep_think_llm="fake-deep-model",
+        memory_enabled=False,
+        online_tools=False,
+    )
+    config.update(overrides)
+    return config
+
+
+@dataclass
+class BenchContext:
+    """场景运行环境"""
+
+    db: InMemoryDatabase
+    replay: RecordReplay
+    market: SyntheticMarket
+    trace_alloc: bool = False
+
+    def measure(self, name: str) -> measure:
+        sources = {
+            "db_ops": self.db.counter.snapshot,
+            "llm": fake_llm_stats,
+            "provider_calls": lambda: dict(self.replay.stats),
+        }
+        return measure(name, sources=sources, trace_alloc=self.trace_alloc)
+
+
+@contextlib.contextmanager
+def bench_environment(
+    mode: str = "replay",
+    strict: bool = False,
+    trace_alloc: bool = False,
+    market: Optional[SyntheticMarket] = None,
+    llm_options: Optional[Dict[str, Any]] = None,
+) -> Iterator[BenchContext]:
+    """
+    组装离线运行环境
+
+    record 模式需要访问真实数据源，因此不禁网；数据库与模型仍使用内存实现。
+    """
+    market = market or SyntheticMarket()
+    network = block_network() if mode == "replay" else contextlib.nullcontext([])
+    with network, install_fake_db() as db, install_fake_llm(**(llm_options or {})), \
+            RecordReplay(mode=mode, strict=strict, market=market) as replay:
+        _reset_service_singletons()
+        yield BenchContext(db=db, replay=replay, market=market, trace_alloc=trace_alloc)
+        _reset_service_singletons()
+
+
+def _reset_service_singletons() -> None:
+    """清理缓存了数据库集合的服务单例，使每个场景都绑定到当前的内存数据库"""
+    from app.services import historical_data_service
+
+    historical_data_service._historical_data_service = None
+
+
+SCENARIOS: Dict[str, Callable[..., Measurement]] = {}
+
+
+def scenario(name: str) -> Callable:
+    def decorator(func: Callable[..., Measurement]) -> Callable[..., Measurement]:
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+# ---- 数据准备 ----
+
+def seed_basic_info(ctx: BenchContext, codes: List[str]) -> None:
+    ctx.db.seed("stock_basic_info", [ctx.market.basic_info(code) for code in codes])
+
+
+def seed_daily_quotes(ctx: BenchContext, codes: List[str], start: str, end: str,
+                      data_source: str = "tushare") -> int:
+    docs = []
+    for code in codes:
+        for bar in ctx.market.daily_bars(code, start, end).to_dict("records"):
+            bar.update(symbol=code, code=code, trade_date=bar.pop("date"),
+                       data_source=data_source, period="daily", market="CN")
+            docs.append(bar)
+    ctx.db.seed("stock_daily_quotes", docs)
+    return len(docs)
+
+
+# ---- 场景 ----
+
+def _run_analysis(config: Dict[str, Any], symbol: str, trade_date: str,
+                  analysts: List[str], timer: Optional[NodeTimer] = None) -> Dict[str, Any]:
+    from tradingagents.graph.trading_graph import TradingAgentsGraph
+
+    graph = TradingAgentsGraph(analysts, config=config)
+    if timer is not None:
+        timer.attach(graph)
+    # 生产路径总是传入进度回调（updates 流模式）
+    _, decision = graph.propagate(symbol, trade_date, progress_callback=lambda *args, **kwargs: None)
+    return decision
+
+
+@scenario("single_analysis")
+def single_analysis(ctx: BenchContext, symbol: str = "000001", trade_date: Optional[str] = None,
+                    analysts: Optional[List[str]] = None, **_: Any) -> Measurement:
+    config = analysis_config()
+    trade_date = trade_date or ctx.market.as_of.strftime("%Y-%m-%d")
+    timer = NodeTimer()
+    with ctx.measure("single_analysis") as m:
+        decision = _run_analysis(config, symbol, trade_date, analysts or DEFAULT_ANALYSTS, timer)
+    m.extra.update(
+        params={"symbol": symbol, "trade_date": trade_date},
+        node_timings=timer.snapshot(),
+        decision=(decision or {}).get("action"),
+    )
+    return m
+
+
+@scenario("batch_analysis")
+def batch_analysis(ctx: BenchContext, count: int = 50, concurrency: int = 1, trade_date: Optional[str] = None,
+                   analysts: Optional[List[str]] = None, **_: Any) -> Measurement:
+    config = analysis_config()
+    trade_date = trade_date or ctx.market.as_of.strftime("%Y-%m-%d")
+    symbols = [ctx.market.universe()[i % ctx.market.universe_size] for i in range(count)]
+    timer = NodeTimer()
+
+    def _one(symbol: str) -> Optional[str]:
+        decision = _run_analysis(config, symbol, trade_date, analysts or DEFAULT_ANALYSTS, timer)
+        return (decision or {}).get("action")
+
+    with ctx.measure("batch_analysis") as m:
+        if concurrency <= 1:
+            actions = [_one(symbol) for symbol in symbols]
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench-analysis") as pool:
+                actions = list(pool.map(_one, symbols))
+    m.extra.update(
+        params={"count": count, "concurrency": concurrency, "trade_date": trade_date},
+        node_timings=timer.snapshot(),
+        completed=sum(1 for action in actions if action),
+        throughput_per_minute=round(count / m.metrics["wall_time_seconds"] * 60, 2),
+    )
+    return m
+
+
+@scenario("market_sync")
+def market_sync(ctx: BenchContext, days: int = 5, **_: Any) -> Measurement:
+    from app.worker.tushare_sync_service import TushareSyncService
+
+    codes = ctx.market.universe()
+    end = ctx.market.as_of
+    trade_dates = ctx.market.trade_dates(end - timedelta(days=days * 2 + 7), end)[-(days + 1):]
+    last_synced, missing = trade_dates[0], trade_dates[1:]
+
+    # 已同步到 last_synced，缺失之后的交易日；截面数据在计时前生成并预置为回放结果
+    seed_basic_info(ctx, codes)
+    seed_daily_quotes(ctx, codes, last_synced.isoformat(), last_synced.isoformat())
+    start_s = (last_synced + timedelta(days=1)).isoformat()
+    end_s = end.isoformat()
+    ctx.replay.preload("TushareProvider", "get_trade_calendar", [d.isoformat() for d in missing], start_s, end_s)
+    for day in missing:
+        ctx.replay.preload("TushareProvider", "get_daily_by_trade_date", ctx.market.cross_section(day), day.isoformat())
+
+    service = TushareSyncService()
+    with ctx.measure("market_sync") as m:
+        stats = asyncio.run(service.sync_historical_data_by_trade_date(end_date=end_s))
+    m.extra.update(
+        params={"universe": len(codes), "days": len(missing)},
+        records=stats.get("total_records"),
+        errors=stats.get("error_count"),
+        rows_per_second=round((stats.get("total_records") or 0) / m.metrics["wall_time_seconds"], 1),
+    )
+    return m
+
+
+@scenario("screening")
+def screening(ctx: BenchContext, conditions: Optional[Dict[str, Any]] = None, **_: Any) -> Measurement:
+    from app.services.screening_service import PANEL_LOOKBACK_DAYS, ScreeningParams, ScreeningService
+
+    codes = ctx.market.universe()
+    end = ctx.market.as_of
+    seed_basic_info(ctx, codes)
+    bars = seed_daily_quotes(ctx, codes, (end - timedelta(days=PANEL_LOOKBACK_DAYS)).isoformat(), end.isoformat())
+    conditions = conditions or {
+        "logic": "AND",
+        "children": [
+            {"field": "close", "op": ">", "value": 10},
+            {"field": "rsi14", "op": "<", "value": 70},
+            {"field": "macd_hist", "op": ">", "value": 0},
+        ],
+    }
+    params = ScreeningParams(date=end.isoformat(), limit=50, order_by=[{"field": "pct_chg", "direction": "desc"}])
+
+    service = ScreeningService()
+    with ctx.measure("screening") as m:
+        result = service.run(conditions, params)
+    m.extra.update(
+        params={"universe": len(codes), "bars": bars},
+        matched=result.get("total"),
+    )
+    return m
+
+
+@scenario("cache_codec")
+def cache_codec(ctx: BenchContext, symbol: str = "000001", **_: Any) -> Measurement:
+    from .cache_codec import run_codec_benchmark
+
+    with ctx.measure("cache_codec") as m:
+        rows = run_codec_benchmark(ctx.market, symbol=symbol)
+    m.extra.update(params={"symbol": symbol}, formats=rows)
+    return m
+
+
+@scenario("news_search")
+def news_search(ctx: BenchContext, per_stock: int = 20, **_: Any) -> Measurement:
+    from .news_search import run_news_search_benchmark
+
+    with ctx.measure("news_search") as m:
+        result = run_news_search_benchmark(ctx.market, per_stock=per_stock)
+    m.extra.update(params={"per_stock": per_stock}, **result)
+    return m
+
+
+@scenario("news_dedup")
+def news_dedup(ctx: BenchContext, stories_per_stock: int = 4, **_: Any) -> Measurement:
+    from .news_dedup import run_news_dedup_benchmark
+
+    with ctx.measure("news_dedup") as m:
+        result = run_news_dedup_benchmark(ctx.market, stories_per_stock=stories_per_stock)
+    m.extra.update(params={"stories_per_stock": stories_per_stock}, **result)
+    return m
+
+
+# 各场景默认股票池规模
+DEFAULT_UNIVERSE = {"market_sync": 5000, "screening": 1000}
+
+
+def run_scenario(name: str, repeat: int = 1, mode: str = "replay", strict: bool = False,
+                 trace_alloc: bool = False, universe: Optional[int] = None, seed: int = 42,
+                 llm_options: Optional[Dict[str, Any]] = None, **params: Any) -> Dict[str, Any]:
+    """运行一个场景 repeat 次（每次使用全新的内存数据库），返回各次指标与耗时汇总"""
+    from .metrics import summarize
+
+    if name not in SCENARIOS:
+        raise KeyError(f"未知场景: {name}（可选: {', '.join(SCENARIOS)}）")
+    universe = universe or DEFAULT_UNIVERSE.get(name, 500)
+    runs = []
+    for _ in range(repeat):
+        market = SyntheticMarket(universe_size=universe, seed=seed)
+        with bench_environment(mode=mode, strict=strict, trace_alloc=trace_alloc,
+                               market=market, llm_options=llm_options) as ctx:
+            runs.append(SCENARIOS[name](ctx, **params).to_dict())
+    return {
+        "scenario": name,
+        "wall_time_seconds": summarize([run["wall_time_seconds"] for run in runs]),
+        "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+        "runs": runs,
+    }
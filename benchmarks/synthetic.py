@@ -0,0 +1,239 @@
+"""
+确定性的合成行情数据
+
+回放模式下夹具缺失时，用这里生成的数据代替真实数据源返回值；场景也用它向内存数据库灌入初始数据。
+所有数据由 (seed, 股票代码) 决定，同一参数多次运行结果完全一致，保证跨提交的基准可比。
+"""
+import functools
+import hashlib
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+_BOARDS = [("600", "主板", "SH"), ("000", "主板", "SZ"), ("300", "创业板", "SZ"), ("688", "科创板", "SH")]
+_INDUSTRIES = ["银行", "白酒", "半导体", "医药", "汽车", "光伏", "软件", "证券"]
+
+
+def _to_date(value: Union[str, date, datetime, None], default: date) -> date:
+    if value is None:
+        return default
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).replace("-", "")
+    return datetime.strptime(text[:8], "%Y%m%d").date()
+
+
+# 合成数据覆盖的交易日历（工作日近似）
+_CALENDAR_START = date(2015, 1, 1)
+_CALENDAR_END = date(2030, 12, 31)
+
+
+@functools.lru_cache(maxsize=1)
+def _calendar() -> pd.DatetimeIndex:
+    return pd.bdate_range(_CALENDAR_START, _CALENDAR_END)
+
+
+@functools.lru_cache(maxsize=1)
+def _calendar_strings() -> np.ndarray:
+    return np.asarray(_calendar().strftime("%Y-%m-%d"))
+
+
+def _slice(calendar: pd.DatetimeIndex, start: date, end: date):
+    return calendar.searchsorted(pd.Timestamp(start)), calendar.searchsorted(pd.Timestamp(end), side="right")
+
+
+class SyntheticMarket:
+    """按种子生成的合成A股市场"""
+
+    def __init__(self, universe_size: int = 500, seed: int = 42, as_of: str = "2025-01-02"):
+        self.universe_size = universe_size
+        self.seed = seed
+        self.as_of = _to_date(as_of, date.today())
+
+    # ---- 股票池 ----
+
+    def universe(self) -> List[str]:
+        codes = []
+        for i in range(self.universe_size):
+            prefix, _, _ = _BOARDS[i % len(_BOARDS)]
+            codes.append(f"{prefix}{i // len(_BOARDS) + 1:03d}")
+        return codes
+
+    def _rng(self, *parts: Any) -> np.random.Generator:
+        digest = hashlib.sha1("|".join(map(str, (self.seed,) + parts)).encode("utf-8")).digest()
+        return np.random.default_rng(int.from_bytes(digest[:8], "little"))
+
+    @staticmethod
+    def _board(code: str):
+        for prefix, market, exchange in _BOARDS:
+            if code.startswith(prefix):
+                return market, exchange
+        return "主板", "SH" if code.startswith("6") else "SZ"
+
+    def basic_info(self, code: str) -> Dict[str, Any]:
+        market, exchange = self._board(code)
+        rng = self._rng("basic", code)
+        return {
+            "code": code,
+            "symbol": code,
+            "name": f"合成股份{code}",
+            "ts_code": f"{code}.{exchange}",
+            "industry": _INDUSTRIES[int(rng.integers(len(_INDUSTRIES)))],
+            "area": "上海" if exchange == "SH" else "深圳",
+            "market": market,
+            "list_date": "20100104",
+            "total_mv": round(float(rng.uniform(50, 5000)), 2),
+            "circ_mv": round(float(rng.uniform(30, 3000)), 2),
+            "pe": round(float(rng.uniform(5, 80)), 2),
+            "pb": round(float(rng.uniform(0.5, 12)), 2),
+            "market_info": {"market": "CN", "exchange": exchange},
+            "category": "stock_cn",
+            "data_source": "tushare",
+        }
+
+    def stock_list(self) -> List[Dict[str, Any]]:
+        return [self.basic_info(code) for code in self.universe()]
+
+    # ---- 行情 ----
+
+    def trade_dates(self, start: Union[str, date, None], end: Union[str, date, None]) -> List[date]:
+        end_d = _to_date(end, self.as_of)
+        start_d = _to_date(start, end_d - timedelta(days=180))
+        calendar = _calendar()
+        lo, hi = _slice(calendar, start_d, end_d)
+        return [d.date() for d in calendar[lo:hi]]
+
+    def _series(self, code: str) -> Dict[str, np.ndarray]:
+        """整个日历区间上的日线序列（随机游走），任意区间截取结果一致"""
+        n = len(_calendar())
+        rng = self._rng("path", code)
+        base = float(rng.uniform(5, 80))
+        close = base * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+        pre_close = np.concatenate([[close[0] / 1.001], close[:-1]])
+        open_ = pre_close * (1 + rng.normal(0, 0.005, n))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+        volume = rng.integers(50_000, 2_000_000, n).astype(float)
+        return {"open": open_, "high": high, "low": low, "close": close, "pre_close": pre_close, "volume": volume}
+
+    def daily_bars(self, code: str, start: Union[str, date, None] = None,
+                   end: Union[str, date, None] = None) -> pd.DataFrame:
+        """单只股票日线（列：date/open/high/low/close/pre_close/change/pct_chg/volume/amount）"""
+        end_d = _to_date(end, self.as_of)
+        start_d = _to_date(start, end_d - timedelta(days=180))
+        lo, hi = _slice(_calendar(), start_d, end_d)
+        if lo >= hi:
+            return pd.DataFrame()
+        series = {key: values[lo:hi] for key, values in self._series(code).items()}
+        close, pre_close = series["close"], series["pre_close"]
+        return pd.DataFrame({
+            "date": _calendar_strings()[lo:hi],
+            "open": series["open"].round(2),
+            "high": series["high"].round(2),
+            "low": series["low"].round(2),
+            "close": close.round(2),
+            "pre_close": pre_close.round(2),
+            "change": (close - pre_close).round(2),
+            "pct_chg": ((close / pre_close - 1) * 100).round(2),
+            "volume": series["volume"],
+            "amount": (series["volume"] * close).round(2),
+        })
+
+    def cross_section(self, trade_date: Union[str, date]) -> pd.DataFrame:
+        """全市场单日截面（Tushare daily 接口标准化后的格式：date 索引 + symbol/ts_code 列，成交量单位为手）"""
+        day = _to_date(trade_date, self.as_of)
+        lo, hi = _slice(_calendar(), day, day)
+        if lo >= hi:
+            return pd.DataFrame()
+        rows = []
+        for code in self.universe():
+            series = self._series(code)
+            close, pre_close, volume = series["close"][lo], series["pre_close"][lo], series["volume"][lo]
+            _, exchange = self._board(code)
+            rows.append({
+                "symbol": code,
+                "ts_code": f"{code}.{exchange}",
+                "open": round(series["open"][lo], 2),
+                "high": round(series["high"][lo], 2),
+                "low": round(series["low"][lo], 2),
+                "close": round(close, 2),
+                "pre_close": round(pre_close, 2),
+                "change": round(close - pre_close, 2),
+                "pct_chg": round((close / pre_close - 1) * 100, 2),
+                "volume": volume / 100,
+                "amount": round(volume * close / 1000, 3),
+            })
+        frame = pd.DataFrame(rows)
+        frame.index = pd.DatetimeIndex([_calendar()[lo]] * len(frame), name="date")
+        return frame
+
+    def quote(self, code: str, trade_date: Union[str, date, None] = None) -> Dict[str, Any]:
+        day = _to_date(trade_date, self.as_of)
+        bars = self.daily_bars(code, day - timedelta(days=7), day)
+        if bars.empty:
+            return {}
+        last = bars.iloc[-1]
+        return {
+            "code": code,
+            "symbol": code,
+            "name": f"合成股份{code}",
+            "price": float(last["close"]),
+            "close": float(last["close"]),
+            "open": float(last["open"]),
+            "high": float(last["high"]),
+            "low": float(last["low"]),
+            "pre_close": float(last["pre_close"]),
+            "change": float(last["change"]),
+            "pct_chg": float(last["pct_chg"]),
+            "change_percent": float(last["pct_chg"]),
+            "volume": float(last["volume"]),
+            "amount": float(last["amount"]),
+            "trade_date": str(last["date"]).replace("-", ""),
+        }
+
+    def quotes_batch(self, codes: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        return {code: self.quote(code) for code in (codes or self.universe())}
+
+    # ---- 财务与新闻 ----
+
+    def financials(self, code: str) -> Dict[str, Any]:
+        rng = self._rng("fin", code)
+        revenue = float(rng.uniform(1e9, 5e11))
+        net_profit = revenue * float(rng.uniform(0.02, 0.3))
+        return {
+            "code": code,
+            "symbol": code,
+            "report_period": "20240930",
+            "revenue": revenue,
+            "net_profit": net_profit,
+            "revenue_ttm": revenue * 1.3,
+            "net_profit_ttm": net_profit * 1.3,
+            "total_assets": revenue * 3,
+            "total_liab": revenue * 1.8,
+            "roe": round(float(rng.uniform(2, 30)), 2),
+            "gross_margin": round(float(rng.uniform(10, 70)), 2),
+            "eps": round(float(rng.uniform(0.1, 5)), 3),
+            "bps": round(float(rng.uniform(2, 30)), 3),
+            "data_source": "synthetic",
+        }
+
+    def news(self, code: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        code = code or "000001"
+        day = datetime.combine(self.as_of, datetime.min.time())
+        return [
+            {
+                "symbol": code,
+                "title": f"合成股份{code}发布第{i + 1}条经营公告",
+                "content": f"合成股份{code}公告：公司经营情况正常，第{i + 1}季度订单保持稳定增长。",
+                "summary": f"合成股份{code}经营正常",
+                "source": "合成新闻",
+                "url": f"https://example.invalid/news/{code}/{i}",
+                "publish_time": (day - timedelta(hours=6 * i)).strftime("%Y-%m-%d %H:%M:%S"),
+                "sentiment": "neutral",
+            }
+            for i in range(limit)
+        ]
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+BaoStock历史数据同步基准测试
+
+对比三种方式拉取 N 只股票日线的吞吐（records/sec）：
+- legacy: 每次查询 login/logout（改造前的行为）
+- pool-1: 单会话长连接
+- pool-N: N 个并行会话（每个会话一个子进程）
+
+用法:
+    python scripts/development/benchmark_baostock_sync.py --symbols 500 --days 30 --sessions 1 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from tradingagents.dataflows.providers.china.baostock import BaoStockProvider
+from tradingagents.dataflows.providers.china.baostock_session import get_baostock_session_pool
+
+FIELDS = "date,code,open,high,low,close,preclose,volume,amount,adjustflag,turn,tradestatus,pctChg,isST"
+
+
+def _load_symbols(limit: int):
+    rows, _ = get_baostock_session_pool(1).query_sync("query_stock_basic")
+    codes = [row[0] for row in rows if len(row) > 5 and row[4] == '1' and row[5] == '1']
+    return [code.split('.')[1] for code in codes[:limit]]
+
+
+def _run_legacy(symbols, start_date, end_date) -> int:
+    import baostock as bs
+
+    provider = BaoStockProvider()
+    records = 0
+    for code in symbols:
+        bs.login()
+        try:
+            rs = bs.query_history_k_data_plus(
+                provider._to_baostock_code(code), FIELDS,
+                start_date=start_date, end_date=end_date, frequency="d", adjustflag="2",
+            )
+            while (rs.error_code == '0') & rs.next():
+                rs.get_row_data()
+                records += 1
+        finally:
+            bs.logout()
+    return records
+
+
+async def _run_pool(symbols, start_date, end_date, sessions: int) -> int:
+    provider = BaoStockProvider(sessions=sessions)
+    semaphore = asyncio.Semaphore(sessions)
+
+    async def fetch(code):
+        async with semaphore:
+            df = await provider.get_historical_data(code, start_date, end_date, "daily")
+            return 0 if df is None else len(df)
+
+    counts = await asyncio.gather(*(fetch(code) for code in symbols))
+    provider._pool.close()
+    return sum(counts)
+
+
+def _report(name: str, records: int, elapsed: float, symbols: int):
+    print(f"{name:<10} symbols={symbols:<5} records={records:<8} "
+          f"elapsed={elapsed:8.2f}s  {records / elapsed if elapsed else 0:10.1f} records/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BaoStock历史数据同步基准测试")
+    parser.add_argument("--symbols", type=int, default=500, help="股票数量")
+    parser.add_argument("--days", type=int, default=30, help="历史天数")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4], help="会话池大小")
+    parser.add_argument("--skip-legacy", action="store_true", help="跳过逐次登录的基线")
+    args = parser.parse_args()
+
+    end_date = datetime.now().strftime('%Y-%m-%d')
+    start_date = (datetime.now() - timedelta(days=args.days)).strftime('%Y-%m-%d')
+    symbols = _load_symbols(args.symbols)
+    print(f"📊 {len(symbols)}只股票, {start_date} ~ {end_date}")
+
+    if not args.skip_legacy:
+        # 基线使用 baostock 模块全局会话，先释放单会话池占用的登录态
+        get_baostock_session_pool(1).close()
+        t0 = time.perf_counter()
+        records = _run_legacy(symbols, start_date, end_date)
+        _report("legacy", records, time.perf_counter() - t0, len(symbols))
+
+    for sessions in args.sessions:
+        t0 = time.perf_counter()
+        records = asyncio.run(_run_pool(symbols, start_date, end_date, sessions))
+        _report(f"pool-{sessions}", records, time.perf_counter() - t0, len(symbols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+文件缓存元数据查找性能对比
+比较旧的 *_meta.json 逐文件扫描与 SQLite 元数据索引在 1k/10k/100k 条目下的查找延迟
+
+用法:
+    python scripts/development/benchmark_cache_metadata_index.py
+    python scripts/development/benchmark_cache_metadata_index.py --sizes 1000 10000 --lookups 50
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.cache.metadata_index import CacheMetadataIndex
+
+
+def _populate(metadata_dir: Path, size: int) -> list:
+    """生成 size 条旧格式元数据文件，返回股票代码列表"""
+    metadata_dir.mkdir(parents=True, exist_ok=True)
+    now = datetime.now().isoformat()
+    symbols = []
+    for i in range(size):
+        symbol = f"{i:06d}"
+        symbols.append(symbol)
+        metadata = {
+            'symbol': symbol,
+            'data_type': 'stock_data',
+            'market_type': 'china',
+            'start_date': '2024-01-01',
+            'end_date': '2024-12-31',
+            'data_source': 'tushare',
+            'file_path': str(metadata_dir / f"{symbol}.csv"),
+            'file_format': 'csv',
+            'content_length': 1024,
+            'cached_at': now,
+        }
+        with open(metadata_dir / f"{symbol}_stock_data_{i:012x}_meta.json", 'w', encoding='utf-8') as f:
+            json.dump(metadata, f)
+    return symbols
+
+
+def _scan_lookup(metadata_dir: Path, symbol: str):
+    """旧实现：遍历并解析全部元数据文件"""
+    for metadata_file in metadata_dir.glob("*_meta.json"):
+        with open(metadata_file, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        if metadata.get('symbol') == symbol and metadata.get('data_type') == 'stock_data':
+            return metadata_file.stem.replace('_meta', '')
+    return None
+
+
+def run(sizes, lookups: int, scan_lookups: int):
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            metadata_dir = Path(tmp) / "metadata"
+            symbols = _populate(metadata_dir, size)
+            # 随机抽取已缓存的代码作为查找目标
+            targets = random.sample(symbols, min(lookups, len(symbols)))
+
+            start = time.perf_counter()
+            index = CacheMetadataIndex(metadata_dir / "metadata_index.sqlite3")
+            index.migrate_from_metadata_dir(metadata_dir)
+            migrate_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for symbol in targets:
+                assert index.find_latest(symbol, 'stock_data', 'china', 'tushare') is not None
+            index_ms = (time.perf_counter() - start) * 1000 / len(targets)
+            index.close()
+
+            scan_targets = targets[:scan_lookups]
+            start = time.perf_counter()
+            for symbol in scan_targets:
+                _scan_lookup(metadata_dir, symbol)
+            scan_ms = (time.perf_counter() - start) * 1000 / len(scan_targets)
+
+            results.append({
+                'entries': size,
+                'migration_s': round(migrate_s, 3),
+                'scan_lookup_ms': round(scan_ms, 3),
+                'index_lookup_ms': round(index_ms, 4),
+                'speedup': round(scan_ms / index_ms, 1) if index_ms else None,
+            })
+            print(f"📊 {size:>7} 条: 扫描 {scan_ms:9.3f} ms/次 | 索引 {index_ms:7.4f} ms/次 | "
+                  f"迁移 {migrate_s:.2f}s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="缓存元数据索引性能对比")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--lookups', type=int, default=200, help="索引查找次数")
+    parser.add_argument('--scan-lookups', type=int, default=3, help="扫描查找次数（较慢）")
+    parser.add_argument('--json', action='store_true', help="以JSON格式输出结果")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.lookups, args.scan_lookups)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+数据迁移脚本：为已有的分析报告回填列表页字段 report_size 与 search_ngrams
+
+报告列表接口只投影少量字段并通过 search_ngrams 索引检索关键词，
+旧报告缺少这两个字段时大小由服务端临时计算、关键词只能命中股票代码前缀与分析ID。
+
+使用方法：
+    python scripts/migrate_report_list_fields.py [--dry-run] [--batch-size 500]
+
+参数：
+    --dry-run: 只统计需要回填的报告数量，不实际执行更新
+    --batch-size: 每批写入的报告数量（默认500）
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from pymongo import UpdateOne
+
+from app.core.database import init_database, close_database, get_mongo_db
+from app.utils.report_search import SEARCH_FIELDS, build_report_list_fields
+from tradingagents.utils.logging_init import get_logger
+
+logger = get_logger("default")
+
+
+async def migrate_report_list_fields(dry_run: bool = False, batch_size: int = 500):
+    """为缺少 report_size / search_ngrams 的报告回填字段"""
+
+    logger.info("=" * 60)
+    logger.info("开始数据迁移：回填 report_size / search_ngrams 字段")
+    logger.info("=" * 60)
+
+    try:
+        logger.info("📡 正在连接数据库...")
+        await init_database()
+        logger.info("✅ 数据库连接成功（索引已在初始化时创建）")
+
+        db = get_mongo_db()
+
+        query = {"$or": [{"report_size": {"$exists": False}}, {"search_ngrams": {"$exists": False}}]}
+        total_count = await db.analysis_reports.count_documents(query)
+        logger.info(f"📊 找到 {total_count} 条需要回填的报告")
+
+        if total_count == 0 or dry_run:
+            if dry_run:
+                logger.info("\n💡 提示：移除 --dry-run 参数以实际执行更新")
+            return
+
+        projection = {field: 1 for field in SEARCH_FIELDS}
+        projection["reports"] = 1
+
+        updated_count = 0
+        operations = []
+        async for doc in db.analysis_reports.find(query, projection):
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": build_report_list_fields(doc)}))
+            if len(operations) >= batch_size:
+                result = await db.analysis_reports.bulk_write(operations, ordered=False)
+                updated_count += result.modified_count
+                operations = []
+                logger.info(f"📝 已回填 {updated_count}/{total_count}")
+
+        if operations:
+            result = await db.analysis_reports.bulk_write(operations, ordered=False)
+            updated_count += result.modified_count
+
+        logger.info("=" * 60)
+        logger.info("迁移完成")
+        logger.info("=" * 60)
+        logger.info(f"📊 总数：{total_count}")
+        logger.info(f"✅ 成功：{updated_count}")
+
+    except Exception as e:
+        logger.error(f"❌ 迁移失败：{e}")
+        import traceback
+        logger.error(traceback.format_exc())
+
+
+async def main():
+    """主函数"""
+
+    try:
+        dry_run = "--dry-run" in sys.argv
+        batch_size = 500
+        if "--batch-size" in sys.argv:
+            batch_size = int(sys.argv[sys.argv.index("--batch-size") + 1])
+
+        await migrate_report_list_fields(dry_run=dry_run, batch_size=batch_size)
+
+    finally:
+        logger.info("\n📡 正在关闭数据库连接...")
+        await close_database()
+        logger.info("✅ 数据库连接已关闭")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
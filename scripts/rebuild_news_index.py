@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+维护脚本：从 stock_news 全量重建新闻全文检索索引快照
+
+服务运行时索引随新闻保存增量更新，并按 updated_at 水位线追平其他进程的写入；
+首次启用、切换分词器（安装/卸载 jieba、pypinyin）或快照损坏时可用本脚本离线重建，
+避免第一次搜索时在线全量构建。
+
+使用方法：
+    python scripts/rebuild_news_index.py [--path ./data/news_index/stock_news.idx] [--query 贵州茅台]
+
+参数：
+    --path: 快照文件路径（默认取 TA_NEWS_INDEX_PATH，未设置时为 <数据目录>/news_index/stock_news.idx）
+    --query: 重建完成后用该查询词试搜，输出前5条结果与耗时
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import init_database, close_database, get_mongo_db
+from tradingagents.dataflows.news.search_index import NEWS_INDEX_PATH, NewsSearchIndex
+from tradingagents.utils.logging_init import get_logger
+
+logger = get_logger("default")
+
+
+async def rebuild_news_index(path: str = NEWS_INDEX_PATH, query: str = None):
+    """全量重建新闻索引并保存快照"""
+
+    logger.info("=" * 60)
+    logger.info("开始重建新闻全文检索索引")
+    logger.info("=" * 60)
+
+    try:
+        logger.info("📡 正在连接数据库...")
+        await init_database()
+        logger.info("✅ 数据库连接成功")
+
+        collection = get_mongo_db().stock_news
+        total_count = await collection.count_documents({})
+        logger.info(f"📊 stock_news 共 {total_count} 条新闻")
+
+        index = NewsSearchIndex(path=path)
+        index.clear()
+
+        started = time.perf_counter()
+        count = await index.refresh_async(collection, force=True)
+        elapsed = time.perf_counter() - started
+        index.save()
+
+        stats = index.stats()
+        logger.info("=" * 60)
+        logger.info("重建完成")
+        logger.info("=" * 60)
+        logger.info(f"📊 索引新闻：{count}（去重后 {stats['documents']}）")
+        logger.info(f"🔤 词项：{stats['terms']}，分词器：{stats['tokenizer']}")
+        logger.info(f"⏱️ 耗时：{elapsed:.2f}s")
+        logger.info(f"💾 快照：{path}")
+
+        if query:
+            started = time.perf_counter()
+            hits = index.search(query, limit=5)
+            logger.info(f"\n🔍 试搜 “{query}”：{len(hits)} 条，{(time.perf_counter() - started) * 1000:.2f}ms")
+            for (url, title, publish_time), score in hits:
+                logger.info(f"   {score:.3f}  {publish_time}  {title}")
+
+    except Exception as e:
+        logger.error(f"❌ 重建失败：{e}")
+        import traceback
+        logger.error(traceback.format_exc())
+
+
+async def main():
+    """主函数"""
+
+    try:
+        path = NEWS_INDEX_PATH
+        if "--path" in sys.argv:
+            path = sys.argv[sys.argv.index("--path") + 1]
+        query = None
+        if "--query" in sys.argv:
+            query = sys.argv[sys.argv.index("--query") + 1]
+
+        await rebuild_news_index(path=path, query=query)
+
+    finally:
+        logger.info("\n📡 正在关闭数据库连接...")
+        await close_database()
+        logger.info("✅ 数据库连接已关闭")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+维护脚本：统计某一天 stock_news 的近似重复情况与 token 节省
+
+按股票分组，对比按标题精确去重与近似去重（MinHash-LSH，标题 + 正文）后
+进入新闻分析师提示词的新闻数与估算 token 数；同时给出库中已标记的重复新闻数。
+近似去重启用前入库的新闻没有 cluster_id，查询时不会被折叠，可用 --backfill 补充。
+
+使用方法：
+    python scripts/report_news_dedup.py [--date 2024-03-01] [--symbol 600519] [--backfill] [--top 5]
+
+参数：
+    --date: 统计日期（按发布时间，默认今天）
+    --symbol: 只统计该股票的新闻
+    --backfill: 为当天尚未分配簇的新闻补充 cluster_id
+    --top: 输出转载最多的前N个新闻簇（默认5）
+"""
+
+import sys
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import init_database, close_database, get_mongo_db
+from app.services.news_data_service import DEDUP_FIELDS_PROJECTION, NewsDataService
+from tradingagents.dataflows.news.near_duplicate import NEWS_DEDUP_THRESHOLD, cluster_news, dedup_savings
+from tradingagents.utils.logging_init import get_logger
+
+logger = get_logger("default")
+
+
+async def report_news_dedup(day: datetime, symbol: str = None, backfill: bool = False, top: int = 5):
+    """统计一天新闻的近似重复情况"""
+
+    start_time = day
+    end_time = day + timedelta(days=1)
+
+    logger.info("=" * 60)
+    logger.info(f"新闻近似去重报告: {day.strftime('%Y-%m-%d')}" + (f"（{symbol}）" if symbol else ""))
+    logger.info("=" * 60)
+
+    try:
+        logger.info("📡 正在连接数据库...")
+        await init_database()
+        logger.info("✅ 数据库连接成功")
+
+        if backfill:
+            updated = await NewsDataService().backfill_news_clusters(start_time, end_time)
+            logger.info(f"🧬 已补充 {updated} 条新闻的 cluster_id")
+
+        query = {"publish_time": {"$gte": start_time, "$lt": end_time}}
+        if symbol:
+            query["symbol"] = symbol
+        collection = get_mongo_db().stock_news
+        docs = await collection.find(query, DEDUP_FIELDS_PROJECTION).sort("created_at", 1).to_list(length=None)
+        if not docs:
+            logger.info("⚠️ 当天没有新闻")
+            return
+
+        scope_of = lambda doc: doc.get("symbol") or ""
+        savings = dedup_savings(docs, scope_of=scope_of)
+        stored_duplicates = sum(1 for doc in docs if doc.get("is_duplicate"))
+        unclustered = sum(1 for doc in docs if "cluster_id" not in doc)
+
+        logger.info(f"📊 新闻总数: {savings['news']}（{len({scope_of(doc) for doc in docs})} 只股票/分组）")
+        logger.info(f"   按标题精确去重后: {savings['after_exact_title']} 条，{savings['tokens_after_exact_title']} tokens")
+        logger.info(f"   近似去重后（阈值 {NEWS_DEDUP_THRESHOLD}）: {savings['after_near_duplicate']} 条，"
+                    f"{savings['tokens_after_near_duplicate']} tokens")
+        logger.info(f"💰 相比精确去重节省: {savings['tokens_saved_vs_exact_title']} tokens "
+                    f"({savings['saved_ratio_vs_exact_title']:.1%})，计数方式: {savings['token_counter']}")
+        logger.info(f"🗄️ 库中已标记重复: {stored_duplicates} 条，未分配簇: {unclustered} 条"
+                    + ("（可用 --backfill 补充）" if unclustered else ""))
+
+        if top > 0:
+            clusters = [cluster_id for cluster_id, _ in cluster_news(docs, scope_of=scope_of)]
+            members = {}
+            for doc, cluster_id in zip(docs, clusters):
+                members.setdefault(cluster_id, []).append(doc)
+            logger.info(f"\n📰 转载最多的 {top} 个新闻簇：")
+            for cluster_id, count in Counter(clusters).most_common(top):
+                if count < 2:
+                    break
+                group = members[cluster_id]
+                logger.info(f"   ×{count}  [{scope_of(group[0]) or '-'}] {group[0].get('title', '')[:60]}")
+                for doc in group[1:]:
+                    logger.info(f"         {doc.get('source', '')}: {doc.get('title', '')[:60]}")
+
+    except Exception as e:
+        logger.error(f"❌ 统计失败：{e}")
+        import traceback
+        logger.error(traceback.format_exc())
+
+
+async def main():
+    """主函数"""
+
+    try:
+        day = datetime.now()
+        if "--date" in sys.argv:
+            day = datetime.strptime(sys.argv[sys.argv.index("--date") + 1], "%Y-%m-%d")
+        day = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        symbol = None
+        if "--symbol" in sys.argv:
+            symbol = sys.argv[sys.argv.index("--symbol") + 1]
+        top = 5
+        if "--top" in sys.argv:
+            top = int(sys.argv[sys.argv.index("--top") + 1])
+
+        await report_news_dedup(day, symbol=symbol, backfill="--backfill" in sys.argv, top=top)
+
+    finally:
+        logger.info("\n📡 正在关闭数据库连接...")
+        await close_database()
+        logger.info("✅ 数据库连接已关闭")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
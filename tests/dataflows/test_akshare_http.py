@@ -0,0 +1,87 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = self.headers.get("User-Agent", "").encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_token_bucket_paces_per_host_without_blocking_others(server):
+    from tradingagents.dataflows.providers.china.akshare_http import AKShareHttpClient, parse_host_rates
+
+    assert parse_host_rates("eastmoney.com=2, sina.com.cn=5/5,bad") == {
+        "eastmoney.com": (2.0, 1.0), "sina.com.cn": (5.0, 5.0)}
+
+    client = AKShareHttpClient(host_rates={"localhost": (20.0, 1.0)}, use_curl_cffi=False)
+    durations = {}
+
+    def fetch(name, host, n):
+        started = time.monotonic()
+        for _ in range(n):
+            assert client.get(f"http://{host}:{server}/").status_code == 200
+        durations[name] = time.monotonic() - started
+
+    threads = [threading.Thread(target=fetch, args=(f"limited-{i}", "localhost", 2)) for i in range(5)]
+    threads.append(threading.Thread(target=fetch, args=("free", "127.0.0.1", 10)))
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+
+    # 10 次请求按 20/s 排开（约0.45秒），并发调用方并行等待而非串行累加
+    assert 0.4 <= elapsed < 1.5
+    # 未配置限速的主机不受影响
+    assert durations["free"] < 0.4
+    metrics = client.get_metrics()
+    assert metrics["localhost"]["requests"] == 10
+    assert metrics["localhost"]["wait_seconds"] > 0
+    assert metrics["127.0.0.1"]["wait_seconds"] == 0
+    client.close()
+
+
+def test_pooled_session_reuses_connections_and_routes_requests_get(server):
+    from tradingagents.dataflows.providers.china.akshare_http import AKShareHttpClient
+
+    client = AKShareHttpClient(host_rates={}, use_curl_cffi=False)
+    original_get = requests.get
+    client.install()
+    try:
+        responses = [requests.get(f"http://127.0.0.1:{server}/", params={"i": i}) for i in range(5)]
+    finally:
+        client.uninstall()
+    assert requests.get is original_get
+
+    # 补齐浏览器 headers
+    assert all(r.text.startswith("Mozilla/5.0") for r in responses)
+    metrics = client.get_metrics()["127.0.0.1"]
+    assert metrics["requests"] == 5
+    assert metrics["connections"] == 1
+    assert metrics["reuse_ratio"] == 0.8
+    client.close()
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+
+import baostock
+
+
+class _Result:
+    def __init__(self, error_code="0", rows=(), fields=("date", "code")):
+        self.error_code = error_code
+        self.error_msg = "" if error_code == "0" else "用户未登录"
+        self.fields = list(fields)
+        self._rows = list(rows)
+
+    def next(self):
+        return bool(self._rows)
+
+    def get_row_data(self):
+        return self._rows.pop(0)
+
+
+def _fake_baostock(monkeypatch, responses):
+    from tradingagents.dataflows.providers.china import baostock_session
+
+    calls = {"login": 0, "logout": 0, "threads": set()}
+
+    def login():
+        calls["login"] += 1
+        return _Result()
+
+    def logout():
+        calls["logout"] += 1
+        return _Result()
+
+    def query(**kwargs):
+        calls["threads"].add(threading.get_ident())
+        return responses.pop(0)
+
+    monkeypatch.setattr(baostock, "login", login)
+    monkeypatch.setattr(baostock, "logout", logout)
+    monkeypatch.setattr(baostock, "query_history_k_data_plus", query, raising=False)
+    monkeypatch.setitem(baostock_session._session_state, "logged_in", False)
+    monkeypatch.setitem(baostock_session._session_state, "last_used", 0.0)
+    return calls
+
+
+def test_session_reused_and_relogin_on_expiry(monkeypatch):
+    from tradingagents.dataflows.providers.china.baostock_session import BaoStockSessionPool
+
+    responses = [
+        _Result(rows=[["2025-01-02", "sh.600000"]]),
+        _Result(rows=[["2025-01-03", "sh.600000"]]),
+        _Result(error_code="10001001"),
+        _Result(rows=[["2025-01-06", "sh.600000"]]),
+    ]
+    calls = _fake_baostock(monkeypatch, responses)
+    pool = BaoStockSessionPool(1)
+
+    async def run():
+        first = await pool.query("query_history_k_data_plus", code="sh.600000")
+        second = await pool.query("query_history_k_data_plus", code="sh.600000")
+        third = await pool.query("query_history_k_data_plus", code="sh.600000")
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    pool.close()
+
+    assert first == ([["2025-01-02", "sh.600000"]], ["date", "code"])
+    assert second[0] == [["2025-01-03", "sh.600000"]]
+    assert third[0] == [["2025-01-06", "sh.600000"]]
+    # 首次登录 + 会话失效后重新登录一次，没有逐次 login/logout
+    assert calls["login"] == 2
+    assert calls["logout"] == 1
+    assert len(calls["threads"]) == 1
+
+
+def test_provider_historical_data_goes_through_pool(monkeypatch):
+    from tradingagents.dataflows.providers.china.baostock import BaoStockProvider
+    from tradingagents.dataflows.providers.china.baostock_session import BaoStockQueryError, execute_query
+
+    fields = ["date", "code", "open", "high", "low", "close", "volume", "amount", "pctChg"]
+    responses = [
+        _Result(rows=[["2025-01-03", "sh.600000", "1", "2", "0.5", "1.5", "100", "150", "0.1"]], fields=fields),
+        _Result(error_code="10004006"),
+    ]
+    calls = _fake_baostock(monkeypatch, responses)
+
+    provider = BaoStockProvider()
+    df = asyncio.run(provider.get_historical_data("600000", "2025-01-01", "2025-01-03", "weekly"))
+    assert list(df["close"]) == [1.5]
+    assert df["preclose"].iloc[0] == 1.5
+
+    # 非会话类错误不重试，直接抛出
+    try:
+        execute_query("query_history_k_data_plus", {})
+        raise AssertionError("expected BaoStockQueryError")
+    except BaoStockQueryError as e:
+        assert e.error_code == "10004006"
+    assert calls["login"] == 1
+
+
+def test_adapter_and_stock_info_share_pooled_session(monkeypatch):
+    from app.services.data_sources.baostock_adapter import BaoStockAdapter
+    from tradingagents.dataflows.data_source_manager import DataSourceManager
+
+    calls = _fake_baostock(monkeypatch, [])
+    basic_fields = ("code", "code_name", "ipoDate", "outDate", "type", "status")
+    industry_fields = ("updateDate", "code", "code_name", "industry", "industryClassification")
+    monkeypatch.setattr(baostock, "query_stock_basic", lambda **kwargs: _Result(
+        rows=[["sh.600000", "浦发银行", "1999-11-10", "", "1", "1"]], fields=basic_fields), raising=False)
+    monkeypatch.setattr(baostock, "query_stock_industry", lambda **kwargs: _Result(
+        rows=[["2025-01-06", "sh.600000", "浦发银行", "J66货币金融服务", "证监会行业分类"]], fields=industry_fields),
+        raising=False)
+
+    df = BaoStockAdapter().get_stock_list()
+    assert list(df["symbol"]) == ["600000"] and list(df["industry"]) == ["货币金融服务"]
+
+    manager = DataSourceManager.__new__(DataSourceManager)
+    info = manager._get_baostock_stock_info("600000")
+    assert info["name"] == "浦发银行" and info["list_date"] == "1999-11-10"
+
+    # 复用会话池的登录态，不再逐次 login/logout
+    assert calls["login"] == 1 and calls["logout"] == 0
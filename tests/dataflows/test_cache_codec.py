@@ -0,0 +1,180 @@
+"""
+测试缓存数据编解码层及其在文件 / MongoDB / Redis 缓存中的使用
+"""
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.cache import codec
+from tradingagents.dataflows.cache.adaptive import AdaptiveCacheSystem
+from tradingagents.dataflows.cache.db_cache import DatabaseCacheManager
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+
+
+def _bars():
+    index = pd.DatetimeIndex(pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"]), name="date")
+    return pd.DataFrame({
+        "open": [10.0, 10.5, 10.2],
+        "volume": np.array([100, 200, 300], dtype="int64"),
+        "code": ["000001"] * 3,
+        "suspended": [False, False, True],
+    }, index=index)
+
+
+@pytest.mark.parametrize("name", codec.available_codecs())
+def test_roundtrip_preserves_dtypes_and_index(name):
+    df = _bars()
+    payload = codec.encode_frame(df, name)
+
+    assert codec.frame_codec(payload) == name
+    pd.testing.assert_frame_equal(codec.decode_frame(payload), df)
+
+
+def test_unconvertible_frame_falls_back_to_pickle():
+    df = pd.DataFrame({"mixed": [1, "a"]})
+    payload = codec.encode_frame(df, "arrow")
+
+    assert codec.frame_codec(payload) == "pickle"
+    pd.testing.assert_frame_equal(codec.decode_frame(payload), df)
+
+
+def test_legacy_entries_are_readable(tmp_path):
+    df = _bars()
+
+    records = codec.decode_frame(df.reset_index().to_json(orient="records", date_format="iso"), json_orient="records")
+    assert list(records["open"]) == [10.0, 10.5, 10.2]
+
+    pd.testing.assert_frame_equal(codec.decode_frame(pickle.dumps(df)), df)
+
+    csv_path = tmp_path / "legacy.csv"
+    df.to_csv(csv_path, index=True)
+    assert list(codec.read_frame(csv_path)["volume"]) == [100, 200, 300]
+
+
+def test_file_cache_roundtrip_and_legacy_csv(tmp_path):
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    df = _bars()
+
+    key = cache.save_stock_data("000001", df, "2024-01-01", "2024-01-31", "tushare")
+    metadata = cache._load_metadata(key)
+    assert metadata["file_format"] == codec.get_default_codec()
+    assert metadata["file_path"].endswith("." + codec.FILE_EXTENSIONS[metadata["file_format"]])
+    pd.testing.assert_frame_equal(cache.load_stock_data(key), df)
+
+    # 旧版本写入的 CSV 条目仍可读取
+    legacy_path = tmp_path / "china_stocks" / "legacy.csv"
+    df.to_csv(legacy_path, index=True)
+    cache._save_metadata("legacy", {**metadata, "file_path": str(legacy_path), "file_format": "csv"})
+    assert list(cache.load_stock_data("legacy")["open"]) == [10.0, 10.5, 10.2]
+
+
+class _FakeRedis:
+    def __init__(self, store):
+        self.store = store
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value.encode("utf-8") if isinstance(value, str) else value
+
+    def get(self, key):
+        return self.store.get(key)
+
+
+def test_db_cache_stores_frames_as_binary():
+    store = {}
+    manager = DatabaseCacheManager.__new__(DatabaseCacheManager)
+    manager.mongodb_db = None
+    manager.redis_client = _FakeRedis(store)
+    manager.redis_binary_client = _FakeRedis(store)
+    df = _bars()
+
+    key = manager.save_stock_data("000001", df, "2024-01-01", "2024-01-31", "tushare")
+    if codec.ARROW_AVAILABLE:
+        assert codec.frame_codec(store[key]) == "arrow"
+        pd.testing.assert_frame_equal(manager.load_stock_data(key), df)
+    else:
+        # 共享存储不使用 pickle，没有 pyarrow 时沿用 JSON
+        assert json.loads(store[key])["data_format"] == "dataframe_json"
+        assert list(manager.load_stock_data(key)["volume"]) == [100, 200, 300]
+
+    # 旧版 JSON 包装的条目
+    store["legacy"] = json.dumps({
+        "data": df.reset_index().to_json(orient="records", date_format="iso"),
+        "data_format": "dataframe_json",
+    }).encode("utf-8")
+    assert list(manager.load_stock_data("legacy")["volume"]) == [100, 200, 300]
+
+
+def test_db_cache_rejects_pickle_entries():
+    store = {}
+    manager = DatabaseCacheManager.__new__(DatabaseCacheManager)
+    manager.mongodb_db = None
+    manager.redis_client = _FakeRedis(store)
+    manager.redis_binary_client = _FakeRedis(store)
+
+    # 能写入共享 Redis 的人不能借缓存条目在读取方执行代码
+    store["framed"] = codec.encode_frame(_bars(), "pickle")
+    store["raw"] = pickle.dumps(_bars())
+    assert manager.load_stock_data("framed") is None
+    assert manager.load_stock_data("raw") is None
+
+    with pytest.raises(ValueError):
+        codec.decode_frame(store["framed"], allow_pickle=False)
+    with pytest.raises(ValueError):
+        codec.encode_frame(pd.DataFrame({"mixed": [1, "a"]}), allow_pickle=False)
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.docs = {}
+
+    def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = doc
+
+    def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    def delete_one(self, query):
+        self.docs.pop(query["_id"], None)
+
+
+class _FakeDbManager:
+    def __init__(self, redis_client, collection):
+        self.redis_client = redis_client
+        self.mongodb_client = type("Client", (), {"tradingagents": type("Db", (), {"cache": collection})()})()
+
+    def get_redis_client(self):
+        return self.redis_client
+
+    def get_mongodb_client(self):
+        return self.mongodb_client
+
+
+def test_adaptive_cache_shared_tiers_never_pickle():
+    import logging
+
+    store, collection = {}, _FakeCollection()
+    system = AdaptiveCacheSystem.__new__(AdaptiveCacheSystem)
+    system.logger = logging.getLogger(__name__)
+    system.db_manager = _FakeDbManager(_FakeRedis(store), collection)
+    df = _bars()
+
+    assert system._save_to_redis("frame", df, {"symbol": "000001"}, 60)
+    assert system._save_to_mongodb("frame", df, {"symbol": "000001"}, 60)
+    json.loads(store["frame"])
+    expected_format = "dataframe_binary" if codec.ARROW_AVAILABLE else "dataframe_json"
+    assert collection.docs["frame"]["data_type"] == expected_format
+    for loaded in (system._load_from_redis("frame"), system._load_from_mongodb("frame")):
+        assert list(loaded["data"]["volume"]) == [100, 200, 300]
+
+    assert system._save_to_mongodb("text", {"summary": "ok"}, {}, 60)
+    assert system._load_from_mongodb("text")["data"] == {"summary": "ok"}
+
+    # 旧版 pickle 信封 / 条目不再反序列化
+    store["legacy"] = pickle.dumps({"data": df, "timestamp": "2024-01-01T00:00:00"})
+    collection.docs["legacy"] = {"_id": "legacy", "data": pickle.dumps(df).hex(), "data_type": "pickle",
+                                 "metadata": {}, "timestamp": None}
+    assert system._load_from_redis("legacy") is None
+    assert system._load_from_mongodb("legacy") is None
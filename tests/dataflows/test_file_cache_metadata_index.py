@@ -0,0 +1,131 @@
+"""
+测试文件缓存的 SQLite 元数据索引
+"""
+import json
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+
+
+def _sample_df():
+    return pd.DataFrame({'close': [1.0, 2.0]}, index=['2024-01-01', '2024-01-02'])
+
+
+def test_partial_match_uses_index(tmp_path):
+    """不同日期范围的缓存可通过索引部分匹配命中"""
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    assert cache.metadata_index is not None
+
+    key = cache.save_stock_data('000001', _sample_df(), '2024-01-01', '2024-01-31', 'tushare')
+
+    assert cache.find_cached_stock_data('000001', '2024-02-01', '2024-02-28', 'tushare') == key
+    assert cache.find_cached_stock_data('000001', '2024-02-01', '2024-02-28', 'akshare') is None
+    assert cache.find_cached_stock_data('600000', '2024-01-01', '2024-01-31') is None
+
+
+def test_fundamentals_lookup_and_stats(tmp_path):
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    cache.save_stock_data('000001', _sample_df(), '2024-01-01', '2024-01-31', 'tushare')
+    key = cache.save_fundamentals_data('AAPL', 'fundamentals report', 'finnhub')
+
+    assert cache.find_cached_fundamentals_data('AAPL', 'finnhub') == key
+    assert cache.load_fundamentals_data(key) == 'fundamentals report'
+
+    stats = cache.get_cache_stats()
+    assert stats['total_files'] == 2
+    assert stats['stock_data_count'] == 1
+    assert stats['fundamentals_count'] == 1
+    assert stats['total_size'] > 0
+
+
+def test_migration_from_legacy_metadata_files(tmp_path):
+    """旧的 *_meta.json 在首次初始化时被迁移进索引"""
+    data_file = tmp_path / 'china_stocks' / 'legacy.txt'
+    data_file.parent.mkdir(parents=True)
+    data_file.write_text('legacy data', encoding='utf-8')
+
+    metadata_dir = tmp_path / 'metadata'
+    metadata_dir.mkdir()
+    legacy = {
+        'symbol': '000002',
+        'data_type': 'stock_data',
+        'market_type': 'china',
+        'data_source': 'akshare',
+        'file_path': str(data_file),
+        'file_format': 'txt',
+        'cached_at': datetime.now().isoformat(),
+    }
+    (metadata_dir / '000002_stock_data_abcdef123456_meta.json').write_text(
+        json.dumps(legacy), encoding='utf-8'
+    )
+
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    assert cache.metadata_index.is_migrated()
+
+    key = cache.find_cached_stock_data('000002', '2024-01-01', '2024-01-31')
+    assert key == '000002_stock_data_abcdef123456'
+    assert cache.load_stock_data(key) == 'legacy data'
+
+
+def test_clear_old_cache_removes_index_rows_and_files(tmp_path):
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_stock_data('000001', 'old data', '2024-01-01', '2024-01-31', 'tushare')
+
+    # 将缓存时间改为10天前
+    metadata = cache.metadata_index.get(key)
+    metadata['cached_at'] = (datetime.now() - timedelta(days=10)).isoformat()
+    cache.metadata_index.upsert(key, metadata)
+
+    cache.clear_old_cache(max_age_days=7)
+
+    assert cache.metadata_index.count() == 0
+    assert not cache._get_metadata_path(key).exists()
+    assert list((tmp_path / 'china_stocks').glob('*')) == []
+
+
+def test_lookup_resyncs_when_metadata_dir_changed_outside_index(tmp_path):
+    """其他进程（未启用索引）写入或删除元数据文件后，查找先按目录扫描重新同步索引"""
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_stock_data('000001', 'cached', '2024-01-01', '2024-01-31', 'tushare')
+    time.sleep(0.05)
+
+    data_file = tmp_path / 'china_stocks' / 'external.txt'
+    data_file.write_text('external data', encoding='utf-8')
+    external = {
+        'symbol': '000002',
+        'data_type': 'stock_data',
+        'market_type': 'china',
+        'data_source': 'akshare',
+        'file_path': str(data_file),
+        'file_format': 'txt',
+        'cached_at': datetime.now().isoformat(),
+    }
+    (tmp_path / 'metadata' / '000002_stock_data_0123456789ab_meta.json').write_text(
+        json.dumps(external), encoding='utf-8'
+    )
+    cache._get_metadata_path(key).unlink()
+
+    assert cache.find_cached_stock_data('000002', '2024-02-01', '2024-02-28') == '000002_stock_data_0123456789ab'
+    assert cache.metadata_index.get(key) is None
+    assert not cache.metadata_index.is_stale(cache.metadata_dir)
+
+
+def test_default_cache_dir_keeps_index_out_of_package(tmp_path, monkeypatch):
+    monkeypatch.setenv('TRADINGAGENTS_CACHE_DIR', str(tmp_path / 'runtime_cache'))
+    cache = StockDataCache(cache_dir=str(tmp_path / 'cache'))
+    assert cache._metadata_index_path().parent == tmp_path / 'cache' / 'metadata'
+
+    cache._default_cache_dir = True
+    path = cache._metadata_index_path()
+    assert path.parent == tmp_path / 'runtime_cache' / 'metadata_index'
+
+    # 索引文件丢失时重新打开并从元数据文件重建
+    cache.metadata_index.close()
+    cache.metadata_index = cache._init_metadata_index()
+    key = cache.save_stock_data('000001', 'cached', '2024-01-01', '2024-01-31', 'tushare')
+    path.unlink()
+    assert cache.find_cached_stock_data('000001', '2024-02-01', '2024-02-28', 'tushare') == key
+    assert path.exists()
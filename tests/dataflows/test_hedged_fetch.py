@@ -0,0 +1,167 @@
+"""
+测试数据源对冲请求
+"""
+import threading
+import time
+
+from tradingagents.dataflows.hedged_fetch import HedgedFetcher, MIN_SAMPLES_FOR_ADAPT, SourceStats
+
+
+def _valid(result):
+    return bool(result) and "❌" not in result
+
+
+def test_slow_primary_is_hedged_by_next_source():
+    release = threading.Event()
+
+    def hanging_primary():
+        release.wait(5)
+        return "primary data"
+
+    fetcher = HedgedFetcher(budget_seconds=0.05, total_timeout=5)
+    start = time.perf_counter()
+    result, source = fetcher.fetch('stock_data', [
+        ('tushare', hanging_primary),
+        ('akshare', lambda: "akshare data"),
+    ], _valid)
+    elapsed = time.perf_counter() - start
+    release.set()
+
+    assert (result, source) == ("akshare data", 'akshare')
+    assert elapsed < 1
+
+
+def test_invalid_result_launches_next_immediately_and_first_valid_wins():
+    launched = []
+
+    def make(name, value, delay=0.0):
+        def call():
+            launched.append(name)
+            time.sleep(delay)
+            return value
+        return call
+
+    fetcher = HedgedFetcher(budget_seconds=10, total_timeout=5)
+    start = time.perf_counter()
+    result, source = fetcher.fetch('stock_data', [
+        ('tushare', make('tushare', "❌ 数据为空")),
+        ('akshare', make('akshare', "akshare data")),
+        ('baostock', make('baostock', "baostock data")),
+    ], _valid)
+
+    assert (result, source) == ("akshare data", 'akshare')
+    # 失败后无需等待延迟预算，且成功后不再启动后续数据源
+    assert time.perf_counter() - start < 1
+    assert launched == ['tushare', 'akshare']
+
+
+def test_all_sources_fail_returns_none():
+    def boom():
+        raise RuntimeError("network down")
+
+    fetcher = HedgedFetcher(budget_seconds=0.05, total_timeout=2)
+    assert fetcher.fetch('news', [('tushare', boom), ('akshare', lambda: [])], bool) == (None, None)
+
+    stats = fetcher.stats.snapshot()
+    assert stats['news:tushare']['errors'] == 1
+    assert stats['news:akshare']['errors'] == 1
+
+
+def test_unhealthy_source_is_demoted():
+    stats = SourceStats()
+    for _ in range(MIN_SAMPLES_FOR_ADAPT):
+        stats.observe('stock_data', 'tushare', 0.01, ok=False)
+        stats.observe('stock_data', 'akshare', 0.01, ok=True)
+
+    assert stats.rank('stock_data', ['tushare', 'akshare', 'baostock'], budget=1.0) == \
+        ['akshare', 'baostock', 'tushare']
+    # 其他数据类型的统计不受影响
+    assert stats.rank('news', ['tushare', 'akshare'], budget=1.0) == ['tushare', 'akshare']
+
+    hist = stats.get('stock_data', 'akshare')
+    assert hist.error_rate == 0.0
+    assert hist.quantile(0.9) == 0.1
+
+
+def test_gather_streams_results_and_times_out_slow_source():
+    release = threading.Event()
+
+    def hanging():
+        release.wait(5)
+        return ["late"]
+
+    def slow():
+        time.sleep(0.1)
+        return ["slow"]
+
+    fetcher = HedgedFetcher(total_timeout=5)
+    start = time.perf_counter()
+    outcomes = list(fetcher.gather('news', [
+        ('hanging', hanging),
+        ('slow', slow),
+        ('fast', lambda: ["fast"]),
+        ('empty', lambda: []),
+    ], deadlines={'hanging': 0.3}))
+    elapsed = time.perf_counter() - start
+    release.set()
+
+    # 按完成顺序产出，慢源超过截止时间后不再等待
+    assert [o.source for o in outcomes][-1] == 'hanging'
+    assert [o.source for o in outcomes].index('fast') < [o.source for o in outcomes].index('slow')
+    by_source = {o.source: o for o in outcomes}
+    assert by_source['hanging'].status == 'timeout' and by_source['hanging'].result is None
+    assert by_source['slow'].result == ["slow"] and by_source['empty'].status == 'invalid'
+    assert elapsed < 1
+
+
+def test_data_source_managers_share_one_fetcher(monkeypatch):
+    from tradingagents.dataflows import data_source_manager as dsm
+
+    monkeypatch.setattr(dsm, "_stock_fetcher", None)
+    first = dsm.get_stock_fetcher()
+    assert dsm.get_stock_fetcher() is first
+    first.shutdown()
+
+
+def test_source_with_too_many_inflight_calls_is_skipped():
+    release = threading.Event()
+    launched = []
+
+    def hanging_primary():
+        launched.append('tushare')
+        release.wait(5)
+        return "primary data"
+
+    fetcher = HedgedFetcher(budget_seconds=0.05, total_timeout=5, max_inflight_per_source=1)
+    candidates = [('tushare', hanging_primary), ('akshare', lambda: "akshare data")]
+    try:
+        assert fetcher.fetch('stock_data', candidates, _valid) == ("akshare data", 'akshare')
+        # 被放弃的 tushare 请求仍在运行，第二次请求直接跳过它
+        start = time.perf_counter()
+        assert fetcher.fetch('stock_data', candidates, _valid) == ("akshare data", 'akshare')
+        assert time.perf_counter() - start < 0.05
+        assert launched == ['tushare'] and fetcher.inflight() == {'tushare': 1}
+    finally:
+        release.set()
+
+
+def test_queue_time_does_not_count_against_budget():
+    launched = []
+
+    def make(name, delay):
+        def call():
+            launched.append(name)
+            time.sleep(delay)
+            return f"{name} data"
+        return call
+
+    fetcher = HedgedFetcher(budget_seconds=0.2, total_timeout=5, max_workers=1)
+    # 占住唯一的工作线程，tushare 排队 0.3s 后才开始运行
+    fetcher._executor.submit(time.sleep, 0.3)
+    result = fetcher.fetch('stock_data', [
+        ('tushare', make('tushare', 0.05)),
+        ('akshare', make('akshare', 0.0)),
+    ], _valid)
+
+    assert result == ("tushare data", 'tushare')
+    assert launched == ['tushare']
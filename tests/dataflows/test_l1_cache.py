@@ -0,0 +1,124 @@
+"""
+测试进程内 L1 缓存（LRU + TTL + single-flight）及其在集成缓存中的使用
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+from tradingagents.dataflows.cache.integrated import IntegratedCacheManager
+from tradingagents.dataflows.cache.l1_cache import L1Cache, estimate_size
+
+
+def test_lru_evicts_by_size_and_expires_by_ttl(monkeypatch):
+    item = "x" * 1000
+    cache = L1Cache(max_bytes=estimate_size(item) * 2)
+    cache.put("a", item, 60)
+    cache.put("b", item, 60)
+    assert cache.get("a") == item  # a 变为最近使用
+    cache.put("c", item, 60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == item and cache.get("c") == item
+
+    now = time.monotonic()
+    monkeypatch.setattr("tradingagents.dataflows.cache.l1_cache.time.monotonic", lambda: now + 61)
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["expirations"] == 1
+    assert stats["hits"] == 3 and stats["misses"] == 2
+
+
+def test_concurrent_misses_load_once():
+    cache = L1Cache()
+    calls = []
+    started = threading.Event()
+
+    def loader():
+        calls.append(1)
+        started.wait(1)
+        return pd.DataFrame({"close": [1.0, 2.0]})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(cache.get_or_load, "000001", loader, 60) for _ in range(8)]
+        time.sleep(0.05)
+        started.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(list(df["close"]) == [1.0, 2.0] for df in results)
+    # 每个调用方拿到独立副本
+    results[0].loc[0, "close"] = 99.0
+    assert cache.get("000001").loc[0, "close"] == 1.0
+    stats = cache.stats()
+    assert stats["loads"] == 1 and stats["coalesced"] + stats["hits"] == 8
+
+
+def test_integrated_manager_serves_repeated_loads_from_l1(tmp_path):
+    manager = IntegratedCacheManager.__new__(IntegratedCacheManager)
+    manager.legacy_cache = StockDataCache(cache_dir=str(tmp_path))
+    manager.use_adaptive = False
+    manager.l1_cache = L1Cache()
+
+    key = manager.save_stock_data("000001", pd.DataFrame({"close": [1.0]}), "2024-01-01", "2024-01-31", "tushare")
+    manager.l1_cache.clear()
+
+    loads = []
+    original = manager.legacy_cache.load_stock_data
+    manager.legacy_cache.load_stock_data = lambda cache_key: loads.append(cache_key) or original(cache_key)
+
+    assert list(manager.load_stock_data(key)["close"]) == [1.0]
+    assert list(manager.load_stock_data(key)["close"]) == [1.0]
+    assert loads == [key]
+
+    l1_stats = manager.get_cache_stats()["l1_cache"]
+    assert l1_stats["hits"] == 1 and l1_stats["misses"] == 1
+
+
+def test_concurrent_fetch_misses_call_provider_once(tmp_path):
+    from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+
+    cache = IntegratedCacheManager.__new__(IntegratedCacheManager)
+    cache.legacy_cache = StockDataCache(cache_dir=str(tmp_path))
+    cache.use_adaptive = False
+    cache.l1_cache = L1Cache()
+
+    manager = DataSourceManager.__new__(DataSourceManager)
+    manager.cache_manager = cache
+    manager.cache_enabled = True
+    manager.hedge_enabled = False
+    manager.current_source = ChinaDataSource.TUSHARE
+
+    calls = {"stock": 0, "news": 0}
+    started = threading.Event()
+
+    def fetch_stock(symbol, start_date, end_date, period="daily"):
+        calls["stock"] += 1
+        started.wait(1)
+        return f"{symbol} 日线数据"
+
+    def fetch_news(symbol, hours_back, limit):
+        calls["news"] += 1
+        started.wait(1)
+        return [{"title": "公告"}] if calls["news"] > 1 else []
+
+    manager._get_tushare_data = fetch_stock
+    manager._get_tushare_news = fetch_news
+    manager._try_fallback_news = lambda symbol, hours_back, limit: []
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        stock = [pool.submit(manager.get_stock_data, "000001", "2024-01-01", "2024-01-31") for _ in range(8)]
+        news = [pool.submit(manager.get_news_data, "000001") for _ in range(8)]
+        time.sleep(0.05)
+        started.set()
+        assert {f.result() for f in stock} == {"000001 日线数据"}
+        assert all(f.result() == [] for f in news)
+
+    assert calls == {"stock": 1, "news": 1}
+    # 无效结果只共享给在途调用方，不写入 L1；有效结果之后直接命中
+    assert manager.get_news_data("000001") == [{"title": "公告"}]
+    assert manager.get_stock_data("000001", "2024-01-01", "2024-01-31") == "000001 日线数据"
+    assert calls == {"stock": 1, "news": 2}
@@ -0,0 +1,86 @@
+"""
+测试新闻近似去重（MinHash-LSH）在请求内去重与入库聚类中的使用
+"""
+from datetime import datetime, timedelta, timezone
+
+from tradingagents.dataflows.news.near_duplicate import (
+    NearDuplicateDetector,
+    dedup_savings,
+    drop_near_duplicates,
+)
+from tradingagents.dataflows.news.realtime_news import NewsItem, NewsMerger
+
+_ORIGINAL = {
+    "symbol": "600519",
+    "title": "贵州茅台：2023年净利润同比增长19.16%",
+    "content": "贵州茅台发布2023年年度报告，公司全年实现营业总收入1505.6亿元，同比增长18.04%；"
+               "实现归母净利润747.34亿元，同比增长19.16%。公司拟每10股派发现金红利308.76元。",
+}
+_REWRITTEN = {
+    "symbol": "600519",
+    "title": "【财联社】贵州茅台2023年归母净利润增长19.16%",
+    "content": "贵州茅台发布2023年年度报告，公司全年实现营业总收入1505.6亿元，同比增长18.04%，"
+               "实现归母净利润747.34亿元，同比增长19.16%。公司拟每10股派现308.76元（含税）。",
+}
+_OTHER = {
+    "symbol": "600519",
+    "title": "茅台冰淇淋新品今日在贵阳上市",
+    "content": "茅台冰淇淋今日在贵阳推出两款新口味，首批门店同步开售，线上小程序同时上架。",
+}
+
+
+def test_rephrased_syndication_is_clustered_and_dropped():
+    detector = NearDuplicateDetector()
+    first, duplicate = detector.add_text(_ORIGINAL["title"] + _ORIGINAL["content"], "600519")
+    assert not duplicate
+    assert detector.add_text(_REWRITTEN["title"] + _REWRITTEN["content"], "600519") == (first, True)
+    assert not detector.add_text(_OTHER["title"] + _OTHER["content"], "600519")[1]
+    # 不同股票的新闻不互相比对
+    assert not detector.add_text(_REWRITTEN["title"] + _REWRITTEN["content"], "000858")[1]
+
+    news = [_ORIGINAL, _OTHER, _REWRITTEN]
+    assert drop_near_duplicates(news) == [_ORIGINAL, _OTHER]
+
+    savings = dedup_savings(news)
+    assert savings["after_exact_title"] == 3 and savings["after_near_duplicate"] == 2
+    assert 0 < savings["tokens_saved_vs_exact_title"] < savings["tokens_after_exact_title"]
+
+
+def test_merger_keeps_higher_priority_source_of_near_duplicates():
+    def item(news, source):
+        return NewsItem(title=news["title"], content=news["content"], source=source,
+                        publish_time=datetime(2024, 3, 30, tzinfo=timezone.utc), url="",
+                        urgency="low", relevance_score=0.5)
+
+    merger = NewsMerger(near_duplicate=True)
+    merger.add([item(_REWRITTEN, "财联社RSS"), item(_OTHER, "财联社RSS")], priority=4)
+    merger.add([item(_ORIGINAL, "东方财富")], priority=3)
+
+    assert [news.source for news in merger.items()] == ["东方财富", "财联社RSS"]
+    assert merger.duplicate_count == 1 and merger.near_duplicate_count == 1 and merger.short_title_count == 0
+
+
+def test_news_service_assigns_clusters_against_stored_news():
+    from app.services.news_data_service import NewsDataService, NewsQueryParams
+
+    service = NewsDataService()
+    published = datetime(2024, 3, 30, 20)
+
+    stored = [{**_ORIGINAL, "url": "u1", "publish_time": published}]
+    lookup = service._prepare_clusters(stored)
+    service._assign_clusters(stored, [])
+    assert stored[0]["is_duplicate"] is False and stored[0]["cluster_id"]
+    assert lookup["publish_time"]["$gte"] < published and len(lookup["dup_bands"]["$in"]) == 16
+
+    batch = [
+        {**_REWRITTEN, "url": "u2", "publish_time": published + timedelta(minutes=5)},
+        {**_OTHER, "url": "u3", "publish_time": published + timedelta(minutes=9)},
+        {**stored[0], "cluster_id": None, "is_duplicate": None},  # 重复保存同一条新闻
+    ]
+    service._prepare_clusters(batch)
+    service._assign_clusters(batch, stored)
+
+    assert batch[0]["cluster_id"] == stored[0]["cluster_id"] and batch[0]["is_duplicate"] is True
+    assert batch[1]["cluster_id"] != stored[0]["cluster_id"] and batch[1]["is_duplicate"] is False
+    assert batch[2]["cluster_id"] == stored[0]["cluster_id"] and batch[2]["is_duplicate"] is False
+    assert NewsQueryParams().collapse_duplicates
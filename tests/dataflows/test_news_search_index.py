@@ -0,0 +1,158 @@
+"""
+测试新闻全文检索索引（中文分词、代码别名、BM25、增量维护与快照）及其在新闻服务中的使用
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+from tradingagents.dataflows.news.search_index import NewsSearchIndex, news_key, tokenize
+
+
+def _news(url, title, content="", symbol=None, publish_time=datetime(2024, 3, 1), updated_at=None):
+    return {
+        "url": url,
+        "title": title,
+        "summary": "",
+        "content": content,
+        "symbol": symbol,
+        "symbols": [symbol] if symbol else [],
+        "publish_time": publish_time,
+        "updated_at": updated_at or publish_time,
+    }
+
+
+def _corpus():
+    return [
+        _news("u1", "贵州茅台发布2023年年报", "净利润同比增长19%", "600519", datetime(2024, 3, 30)),
+        _news("u2", "白酒板块午后拉升", "茅台、五粮液涨幅居前", None, datetime(2024, 3, 20)),
+        _news("u3", "平安银行一季度业绩", "营收稳定，拨备覆盖率提升", "000001", datetime(2024, 4, 20)),
+    ]
+
+
+def test_chinese_terms_and_code_aliases_match():
+    index = NewsSearchIndex(path=None)
+    index.add_documents(_corpus())
+
+    ranked = [key[0] for key, _ in index.search("茅台")]
+    assert ranked[0] == "u1" and set(ranked) == {"u1", "u2"}
+    assert tokenize("sh600519")[0] == tokenize("600519.SS")[0] == "600519"
+    assert [key[0] for key, _ in index.search("600519.SH")] == ["u1"]
+
+    assert [key[0] for key, _ in index.search("茅台", symbols=["600519"])] == ["u1"]
+    assert [key[0] for key, _ in index.search("茅台", start_time=datetime(2024, 3, 1),
+                                              end_time=datetime(2024, 3, 25))] == ["u2"]
+    assert index.search("不存在的词语") == []
+
+
+def test_upsert_remove_and_snapshot_roundtrip(tmp_path):
+    path = str(tmp_path / "news.idx")
+    index = NewsSearchIndex(path=path)
+    index.add_documents(_corpus(), track_watermark=True)
+    index.add_documents([_news("u2", "白酒板块午后拉升", "五粮液涨幅居前", None, datetime(2024, 3, 20))])
+    assert len(index) == 3
+    assert [key[0] for key, _ in index.search("茅台")] == ["u1"]
+
+    assert index.remove_before(datetime(2024, 3, 25)) == 1
+    index.save()
+
+    restored = NewsSearchIndex(path=path)
+    assert restored.load()
+    assert len(restored) == 2 and restored.watermark == datetime(2024, 4, 20)
+    assert [key[0] for key, _ in restored.search("平安银行")] == ["u3"]
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda doc: doc[field], reverse=direction == -1)
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def __iter__(self):
+        return iter(self.docs)
+
+    def __aiter__(self):
+        async def generate():
+            for doc in self.docs:
+                yield doc
+        return generate()
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+
+class _FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def _match(self, doc, query):
+        if "$or" in query:
+            return any(all(doc.get(k) == v for k, v in clause.items()) for clause in query["$or"])
+        if "updated_at" in query:
+            return doc["updated_at"] >= query["updated_at"]["$gte"]
+        return True
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return _FakeCursor([dict(doc) for doc in self.docs if self._match(doc, query)])
+
+
+def test_refresh_catches_up_by_watermark():
+    docs = _corpus()
+    collection = _FakeCollection(docs)
+    index = NewsSearchIndex(path=None, refresh_seconds=0)
+
+    assert index.refresh(collection) == 3 and index.ready
+    docs.append(_news("u4", "茅台冰淇淋上市", "", "600519", datetime(2024, 5, 1)))
+    index.refresh(collection)
+
+    assert collection.queries[-1]["updated_at"]["$gte"] < datetime(2024, 4, 20)
+    assert {key[0] for key, _ in index.search("茅台")} == {"u1", "u2", "u4"}
+
+
+def test_snapshot_hydrate_drops_news_deleted_elsewhere(tmp_path):
+    path = str(tmp_path / "news.idx")
+    docs = _corpus()
+    writer = NewsSearchIndex(path=path, refresh_seconds=0)
+    assert asyncio.run(writer.refresh_async(_FakeCollection(docs))) == 3
+
+    # 其他进程删除了 u2，随后新进程加载快照
+    del docs[1]
+    reader = NewsSearchIndex(path=path, refresh_seconds=0)
+    asyncio.run(reader.refresh_async(_FakeCollection(docs)))
+
+    assert len(reader) == 2
+    assert {key[0] for key, _ in reader.search("茅台")} == {"u1"}
+
+
+def test_default_snapshot_path_follows_data_dir():
+    from tradingagents.config.runtime_settings import get_data_dir
+    from tradingagents.dataflows.news import search_index
+
+    if not os.getenv("TA_NEWS_INDEX_PATH"):
+        assert search_index.NEWS_INDEX_PATH == str(get_data_dir("news_index", "stock_news.idx"))
+
+
+def test_news_service_search_uses_index(monkeypatch):
+    from app.services import news_data_service
+    from app.services.news_data_service import NewsDataService
+
+    docs = [{**doc, "_id": i} for i, doc in enumerate(_corpus())]
+    # MongoDB 时间精度为毫秒
+    docs[0]["publish_time"] = docs[0]["publish_time"] + timedelta(microseconds=123000)
+    index = NewsSearchIndex(path=None)
+    index.add_documents([{**docs[0], "publish_time": docs[0]["publish_time"] + timedelta(microseconds=456)}])
+    monkeypatch.setattr(news_data_service, "get_news_search_index", lambda: index)
+
+    service = NewsDataService()
+    service._collection = _FakeCollection(docs)
+    results = asyncio.run(service.search_news("茅台", limit=5))
+
+    assert [doc["url"] for doc in results] == ["u1", "u2"]
+    assert results[0]["score"] >= results[1]["score"] and results[0]["_id"] == "0"
+    assert news_key(results[0]) == news_key(docs[0])
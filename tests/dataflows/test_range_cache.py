@@ -0,0 +1,127 @@
+"""
+测试K线区间覆盖缓存
+"""
+import pandas as pd
+
+from tradingagents.dataflows.cache import range_cache
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+from tradingagents.dataflows.cache.integrated import IntegratedCacheManager
+from tradingagents.dataflows.cache.range_cache import RangeCoverageCache
+
+
+class _FakeProvider:
+    """按工作日生成K线（收盘价乘以复权因子），并记录每次请求的区间；failing 时返回空"""
+
+    def __init__(self):
+        self.calls = []
+        self.factor = 1.0
+        self.failing = False
+
+    def __call__(self, symbol, start_date, end_date):
+        self.calls.append((start_date, end_date))
+        if self.failing:
+            return pd.DataFrame()
+        dates = pd.date_range(start_date, end_date, freq='B')
+        return pd.DataFrame({'date': dates, 'close': [float(d.day) * self.factor for d in dates]})
+
+
+def test_sub_range_served_from_cache():
+    provider = _FakeProvider()
+    cache = RangeCoverageCache()
+
+    first = cache.get_range('000001', '2024-01-01', '2024-03-31', provider)
+    assert provider.calls == [('2024-01-01', '2024-03-31')]
+
+    sub = cache.get_range('000001', '2024-02-01', '2024-02-29', provider)
+    assert len(provider.calls) == 1
+    assert sub['date'].min() >= pd.Timestamp('2024-02-01')
+    assert sub['date'].max() <= pd.Timestamp('2024-02-29')
+    assert len(sub) < len(first)
+
+
+def test_sliding_window_fetches_only_tail_and_head():
+    provider = _FakeProvider()
+    cache = RangeCoverageCache()
+
+    cache.get_range('000001', '2024-01-01', '2024-03-31', provider)
+    df = cache.get_range('000001', '2023-12-01', '2024-04-15', provider)
+
+    # 缺口向已覆盖区间多取 OVERLAP_DAYS 天，用于检测复权因子变化
+    assert provider.calls[1:] == [('2023-12-01', '2024-01-07'), ('2024-03-23', '2024-04-15')]
+    assert df['date'].is_monotonic_increasing
+    assert not df['date'].duplicated().any()
+    assert df['date'].min() == pd.Timestamp('2023-12-01')
+
+
+def test_disjoint_request_rebuilds_series():
+    provider = _FakeProvider()
+    cache = RangeCoverageCache()
+
+    cache.get_range('000001', '2020-01-01', '2020-03-31', provider)
+    cache.get_range('000001', '2024-01-01', '2024-01-31', provider)
+
+    assert provider.calls[-1] == ('2024-01-01', '2024-01-31')
+
+
+def test_series_persisted_through_file_cache(tmp_path):
+    provider = _FakeProvider()
+    file_cache = StockDataCache(cache_dir=str(tmp_path))
+    RangeCoverageCache(file_cache).get_range('000001', '2024-01-01', '2024-03-31', provider)
+
+    # 新实例（模拟新进程）应从文件缓存恢复序列
+    cache = RangeCoverageCache(file_cache)
+    df = cache.get_range('000001', '2024-01-15', '2024-02-15', provider)
+
+    assert len(provider.calls) == 1
+    assert not df.empty
+
+
+def test_empty_gap_is_not_recorded_as_covered(monkeypatch):
+    provider = _FakeProvider()
+    cache = RangeCoverageCache()
+    cache.get_range('000001', '2024-01-01', '2024-02-29', provider)
+
+    provider.failing = True
+    df = cache.get_range('000001', '2024-01-01', '2024-03-29', provider)
+    assert df['date'].max() == pd.Timestamp('2024-02-29')
+    # 短时间内不重复请求同一空缺口
+    cache.get_range('000001', '2024-01-01', '2024-03-29', provider)
+    assert len(provider.calls) == 2
+
+    # 过期后重新请求，数据源恢复后补齐此前失败的日期
+    expired = range_cache.time.monotonic() + range_cache.EMPTY_GAP_TTL_SECONDS + 1
+    monkeypatch.setattr(range_cache.time, 'monotonic', lambda: expired)
+    provider.failing = False
+    df = cache.get_range('000001', '2024-01-01', '2024-03-29', provider)
+    assert df['date'].max() == pd.Timestamp('2024-03-29')
+    assert len(df) == len(pd.date_range('2024-01-01', '2024-03-29', freq='B'))
+
+
+def test_adjustment_change_refetches_whole_range():
+    provider = _FakeProvider()
+    cache = RangeCoverageCache()
+    cache.get_range('000001', '2024-01-01', '2024-03-29', provider)
+
+    # 除权除息后前复权价格整体变化
+    provider.factor = 0.5
+    df = cache.get_range('000001', '2024-01-01', '2024-04-15', provider)
+
+    assert provider.calls[-1] == ('2024-01-01', '2024-04-15')
+    assert (df['close'] == df['date'].dt.day * 0.5).all()
+
+
+def test_integrated_manager_exposes_range_cache(tmp_path):
+    manager = IntegratedCacheManager.__new__(IntegratedCacheManager)
+    manager.legacy_cache = StockDataCache(cache_dir=str(tmp_path))
+    manager.use_adaptive = False
+    manager.l1_cache = None
+    manager.range_cache = RangeCoverageCache(manager)
+
+    provider = _FakeProvider()
+    manager.get_stock_data_range('000001', '2024-01-01', '2024-03-29', provider)
+    manager.invalidate_stock_data_range('000001')
+    df = manager.get_stock_data_range('000001', '2024-02-01', '2024-02-29', provider)
+
+    # 进程内序列丢弃后从管理器持久化的序列恢复
+    assert len(provider.calls) == 1
+    assert df['date'].min() == pd.Timestamp('2024-02-01')
@@ -0,0 +1,59 @@
+"""
+测试实时新闻聚合器的并发获取、截止时间与增量去重
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from tradingagents.dataflows.news.realtime_news import NewsItem, NewsMerger, RealtimeNewsAggregator
+
+
+def _item(title, source, minutes_ago=0):
+    return NewsItem(title=title, content="", source=source,
+                    publish_time=datetime(2024, 3, 1, 10, 0, tzinfo=timezone.utc) - timedelta(minutes=minutes_ago),
+                    url="", urgency="low", relevance_score=0.5)
+
+
+def test_merger_keeps_higher_priority_source_regardless_of_arrival():
+    merger = NewsMerger()
+    merger.add([_item("Apple reports record quarterly revenue", "东方财富")], priority=3)
+    merger.add([_item("apple reports record quarterly revenue ", "FinnHub"),
+                _item("short", "FinnHub")], priority=0)
+
+    assert [item.source for item in merger.items()] == ["FinnHub"]
+    assert merger.duplicate_count == 1 and merger.short_title_count == 1
+
+
+def test_sources_run_concurrently_and_slow_source_is_dropped():
+    release = threading.Event()
+    aggregator = RealtimeNewsAggregator(source_deadline=0.5)
+
+    def source(items, delay=0.0):
+        def fetch():
+            time.sleep(delay)
+            return items
+        return fetch
+
+    def hanging():
+        release.wait(5)
+        return [_item("Late breaking story that never arrives", "NewsAPI")]
+
+    aggregator._news_sources = lambda ticker, hours_back: [
+        ("FinnHub", source([_item("Apple unveils new product lineup today", "FinnHub", 30)], 0.2)),
+        ("NewsAPI", hanging),
+        ("东方财富", source([_item("苹果公司发布新品，供应链企业受关注", "东方财富", 5),
+                            _item("Apple unveils new product lineup today", "东方财富", 1)], 0.2)),
+    ]
+
+    start = time.perf_counter()
+    news = aggregator.get_realtime_stock_news("AAPL", hours_back=6, max_news=10)
+    elapsed = time.perf_counter() - start
+    release.set()
+
+    # 两个 0.2s 的新闻源并发执行，挂起的新闻源在 0.5s 截止时间后被放弃
+    assert elapsed < 1.0
+    assert [(item.title[:6], item.source) for item in news] == [("苹果公司发布", "东方财富"), ("Apple ", "FinnHub")]
+    timings = aggregator.last_source_timings
+    assert timings["NewsAPI"]["status"] == "timeout"
+    assert timings["FinnHub"]["count"] == 1 and timings["东方财富"]["count"] == 2
+    assert "NewsAPI 超时" in aggregator.format_news_report(news, "AAPL")
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+
+def _spot_frame(codes):
+    return pd.DataFrame({
+        "代码": codes,
+        "名称": [f"股票{c[-6:]}" for c in codes],
+        "最新价": [10.0 + i for i in range(len(codes))],
+        "涨跌幅": [1.0] * len(codes),
+    })
+
+
+def test_concurrent_lookups_share_one_download():
+    from tradingagents.dataflows.cache.spot_snapshot import SpotSnapshot, normalize_a_share_code
+
+    calls = []
+
+    def fetch():
+        calls.append(time.monotonic())
+        time.sleep(0.2)
+        return _spot_frame(["sh600000", "sz000001", "bj430047"])
+
+    snapshot = SpotSnapshot("test", fetch, ttl_seconds=60, key_normalizer=normalize_a_share_code)
+    results = {}
+
+    def lookup(code):
+        results[code] = snapshot.get_row(code)
+
+    threads = [threading.Thread(target=lookup, args=(code,)) for code in ["600000", "000001", "430047", "688999"] * 4]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results["600000"]["最新价"] == 10.0
+    assert results["430047"]["名称"] == "股票430047"
+    assert results["688999"] is None
+    assert snapshot.get_rows(["000001", "sz000001", "999999"]).keys() == {"000001", "sz000001"}
+
+
+def test_refresh_after_ttl_and_errors_reach_waiters():
+    from tradingagents.dataflows.cache.spot_snapshot import SpotSnapshot
+
+    outcomes = [_spot_frame(["000001"]), RuntimeError("限流"), _spot_frame(["000001", "600000"])]
+
+    def fetch():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    snapshot = SpotSnapshot("test", fetch, ttl_seconds=0.05)
+    assert snapshot.get_row("600000") is None
+    time.sleep(0.06)
+    with pytest.raises(RuntimeError):
+        snapshot.get_row("600000")
+    # 失败不会留下在途请求，下一次访问重新拉取
+    assert asyncio.run(snapshot.aget_row("600000"))["代码"] == "600000"
+    assert snapshot.refresh_count == 2
+
+
+def test_akshare_quote_paths_read_shared_snapshot(monkeypatch):
+    from tradingagents.dataflows.cache import spot_snapshot
+    from tradingagents.dataflows.providers.china.akshare import AKShareProvider
+
+    downloads = []
+
+    def fetch():
+        downloads.append(1)
+        return _spot_frame(["000001", "600000"])
+
+    for name in (spot_snapshot.A_SHARE_SPOT_EM, spot_snapshot.A_SHARE_SPOT_SINA):
+        monkeypatch.setitem(spot_snapshot._snapshots, name, spot_snapshot.SpotSnapshot(
+            name, fetch, ttl_seconds=60, key_normalizer=spot_snapshot.normalize_a_share_code))
+
+    provider = AKShareProvider.__new__(AKShareProvider)
+    provider.connected = True
+
+    async def run():
+        single = await asyncio.gather(*(provider._get_realtime_quotes_data("600000") for _ in range(5)))
+        batch = await provider.get_batch_stock_quotes(["000001", "600000", "300750"])
+        return single, batch
+
+    single, batch = asyncio.run(run())
+    assert all(q["price"] == 11.0 for q in single)
+    assert set(batch) == {"000001", "600000"}
+    assert batch["000001"]["price"] == 10.0
+    # 东方财富与新浪快照各下载一次
+    assert len(downloads) == 2
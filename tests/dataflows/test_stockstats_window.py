@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+from stockstats import wrap
+
+
+def _write_offline_csv(tmp_path, symbol="TEST"):
+    price_dir = tmp_path / "market_data" / "price_data"
+    price_dir.mkdir(parents=True)
+    dates = pd.bdate_range("2024-01-01", periods=120)
+    close = 100 + np.cumsum(np.random.default_rng(1).normal(0, 1, len(dates)))
+    pd.DataFrame({
+        "Date": dates.strftime("%Y-%m-%d"),
+        "Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+        "Volume": np.arange(len(dates)) + 1000,
+    }).to_csv(price_dir / f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv", index=False)
+    return price_dir / f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv"
+
+
+def test_window_reads_once_and_matches_per_day_values(tmp_path, monkeypatch):
+    from tradingagents.dataflows import interface
+    from tradingagents.dataflows.technical.stockstats import StockstatsUtils
+
+    csv_path = _write_offline_csv(tmp_path)
+    monkeypatch.setattr(interface, "DATA_DIR", str(tmp_path))
+    StockstatsUtils.clear_cache()
+
+    reads = []
+    real_read_csv = pd.read_csv
+
+    def _counting_read_csv(*args, **kwargs):
+        reads.append(args[0] if args else kwargs.get("filepath_or_buffer"))
+        return real_read_csv(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_csv", _counting_read_csv)
+
+    report = interface.get_stock_stats_indicators_window("TEST", "close_10_ema", "2024-05-31", 30, False)
+    interface.get_stock_stats_indicators_window("TEST", "rsi", "2024-05-31", 30, False)
+    assert len(reads) == 1
+
+    # 旧实现：每个交易日重新读取并包装整段数据
+    full = wrap(real_read_csv(csv_path))
+    full["close_10_ema"]
+    lines = [line for line in report.splitlines() if line[:4] == "2024"]
+    window = full[(full["Date"] >= "2024-05-01") & (full["Date"] <= "2024-05-31")]
+    assert [line.split(": ")[0] for line in lines] == list(window["Date"][::-1])
+    assert [line.split(": ")[1] for line in lines] == [str(v) for v in window["close_10_ema"].values[::-1]]
+
+
+def test_single_day_lookup_uses_cached_frame(tmp_path):
+    from tradingagents.dataflows.technical.stockstats import StockstatsUtils
+
+    _write_offline_csv(tmp_path)
+    StockstatsUtils.clear_cache()
+    data_dir = str(tmp_path / "market_data" / "price_data")
+
+    window = StockstatsUtils.get_stock_stats_window("TEST", ["macd", "boll_ub"], "2024-03-05", 7, data_dir)
+    assert sorted(window["macd"]) == ["2024-02-27", "2024-02-28", "2024-02-29", "2024-03-01",
+                                      "2024-03-04", "2024-03-05"]
+    assert StockstatsUtils.get_stock_stats("TEST", "macd", "2024-03-04", data_dir) == window["macd"]["2024-03-04"]
+    assert StockstatsUtils.get_stock_stats("TEST", "macd", "2024-03-02", data_dir).startswith("N/A")
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+CONFIG_DOC = {
+    "_id": "c1",
+    "version": 3,
+    "is_active": True,
+    "data_source_configs": [
+        {"type": "akshare", "enabled": True, "priority": 1},
+        {"type": "tushare", "enabled": True, "priority": 3, "market_categories": ["a_shares"]},
+        {"type": "baostock", "enabled": False, "priority": 5},
+    ],
+    "system_settings": {"log_level": "INFO"},
+}
+GROUPINGS = [
+    {"data_source_name": "akshare", "market_category_id": "hk_stocks", "enabled": True, "priority": 1},
+    {"data_source_name": "yahoo_finance", "market_category_id": "hk_stocks", "enabled": True, "priority": 2},
+    {"data_source_name": "finnhub", "market_category_id": "us_stocks", "enabled": False, "priority": 9},
+]
+
+
+class _SyncCollection:
+    def __init__(self, docs, counter):
+        self.docs = docs
+        self.counter = counter
+
+    def find_one(self, *args, **kwargs):
+        self.counter.append("find_one")
+        return dict(self.docs[0]) if self.docs else None
+
+    def find(self, *args, **kwargs):
+        self.counter.append("find")
+        return [dict(d) for d in self.docs]
+
+
+class _SyncDb:
+    def __init__(self, config_docs, groupings):
+        self.calls = []
+        self.system_configs = _SyncCollection(config_docs, self.calls)
+        self.datasource_groupings = _SyncCollection(groupings, self.calls)
+
+
+def _patch_sync_db(monkeypatch, db):
+    from app.core import database
+
+    monkeypatch.setattr(database, "get_mongo_db_sync", lambda: db)
+
+
+def test_snapshot_loaded_once_and_immutable(monkeypatch):
+    from app.core.config_snapshot import ConfigSnapshotStore
+
+    db = _SyncDb([CONFIG_DOC], GROUPINGS)
+    _patch_sync_db(monkeypatch, db)
+    store = ConfigSnapshotStore(poll_interval=60)
+
+    snapshots = [store.get() for _ in range(100)]
+    assert len(db.calls) == 2  # 一次配置 + 一次分组，此后零 I/O
+    snapshot = snapshots[-1]
+    assert snapshot.version == 3
+    assert [ds["type"] for ds in snapshot.enabled_data_sources("a_shares")] == ["tushare", "akshare"]
+    assert [ds["type"] for ds in snapshot.enabled_data_sources("hk_stocks")] == ["akshare"]
+    assert snapshot.source_priority("hk_stocks") == ("yahoo_finance", "akshare")
+    assert snapshot.source_priority("us_stocks") == ()
+    with pytest.raises(TypeError):
+        snapshot.system_settings["log_level"] = "DEBUG"
+    with pytest.raises(TypeError):
+        snapshot.data_source_configs[0]["enabled"] = False
+
+    # 未启动监听的进程按轮询间隔懒刷新；加载失败时保留旧快照
+    store.poll_interval = 0
+    db.system_configs.docs = []
+    db.datasource_groupings.find = lambda *a, **k: (_ for _ in ()).throw(RuntimeError("down"))
+    assert store.get().version == 3
+
+
+class _AsyncCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+
+class _AsyncCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def find_one(self, *args, **kwargs):
+        return dict(self.docs[0]) if self.docs else None
+
+    def find(self, *args, **kwargs):
+        return _AsyncCursor(self.docs)
+
+
+class _Stream:
+    async def __aenter__(self):
+        from pymongo.errors import OperationFailure
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _AsyncDb:
+    def __init__(self, config_docs, groupings):
+        self.system_configs = _AsyncCollection(config_docs)
+        self.datasource_groupings = _AsyncCollection(groupings)
+
+    def watch(self, pipeline):
+        return _Stream()
+
+
+class _Redis:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+def test_write_publishes_invalidation_and_standalone_falls_back_to_polling(monkeypatch):
+    from app.core import config_snapshot, database
+    from app.services.foreign_stock_service import ForeignStockService
+
+    db = _AsyncDb([dict(CONFIG_DOC, version=4)], GROUPINGS)
+    redis = _Redis()
+    monkeypatch.setattr(database, "get_mongo_db", lambda: db)
+    monkeypatch.setattr(database, "get_redis_client", lambda: redis)
+    store = config_snapshot.ConfigSnapshotStore()
+    monkeypatch.setattr(config_snapshot, "config_snapshot_store", store)
+
+    asyncio.run(config_snapshot.publish_config_invalidation())
+    assert store.get().version == 4
+    assert redis.published == [(config_snapshot.CONFIG_INVALIDATION_CHANNEL, "4")]
+
+    service = ForeignStockService.__new__(ForeignStockService)
+    assert asyncio.run(service._get_source_priority("HK")) == ["yahoo_finance", "akshare"]
+    assert asyncio.run(service._get_source_priority("US")) == ["yfinance", "alpha_vantage", "finnhub"]
+
+    polled = []
+
+    async def _poll():
+        polled.append(True)
+
+    monkeypatch.setattr(store, "_poll_changes", _poll)
+    asyncio.run(store._watch_changes())
+    assert polled == [True]
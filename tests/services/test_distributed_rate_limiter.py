@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+
+class _Script:
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+
+    async def __call__(self, keys=None, args=None):
+        self.calls.append((keys, args))
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class _FakeRedis:
+    def __init__(self, results):
+        self.script = _Script(results)
+
+    def register_script(self, lua):
+        return self.script
+
+
+def _patch_redis(monkeypatch, redis):
+    from app.core import database
+
+    monkeypatch.setattr(database, "redis_client", redis)
+
+
+def test_lanes_share_redis_budget(monkeypatch):
+    from app.core.rate_limiter import PRIORITY_BULK, DistributedRateLimiter
+
+    # 交互式：首次超限等待50ms后获得许可；批量：先让行一次再获得许可
+    redis = _FakeRedis([50, 0, -1, 0])
+    _patch_redis(monkeypatch, redis)
+    limiter = DistributedRateLimiter(10, 60, name="test", key="tushare", bulk_share=0.5)
+    limiter.BULK_YIELD_SECONDS = 0.01
+
+    asyncio.run(limiter.acquire())
+    asyncio.run(limiter.acquire(priority=PRIORITY_BULK))
+
+    calls = redis.script.calls
+    assert calls[0][0] == ["rate_limit:tushare", "rate_limit:tushare:interactive_waiters"]
+    # 交互式可用全部额度，批量只能使用 bulk_share 部分
+    assert calls[0][1][1:3] == [10, "interactive"]
+    assert calls[2][1][1:3] == [5, "bulk"]
+    # 同一次 acquire 的重试沿用同一个等待者标记
+    assert calls[0][1][4] == calls[1][1][4]
+
+    stats = limiter.get_stats()
+    assert stats["backend"] == "redis"
+    assert stats["total_calls"] == 2
+    assert stats["lane_calls"] == {"interactive": 1, "bulk": 1}
+    assert stats["total_waits"] == 2
+
+
+def test_falls_back_to_local_window_without_redis(monkeypatch):
+    from app.core.rate_limiter import PRIORITY_BULK, DistributedRateLimiter
+
+    _patch_redis(monkeypatch, None)
+    limiter = DistributedRateLimiter(2, 60, name="test")
+    asyncio.run(limiter.acquire(priority=PRIORITY_BULK))
+    assert limiter.get_stats()["backend"] == "local"
+
+    # Redis 调用出错时同样回退，不阻塞数据同步
+    _patch_redis(monkeypatch, _FakeRedis([ConnectionError("down")]))
+    asyncio.run(limiter.acquire())
+    stats = limiter.get_stats()
+    assert stats["backend"] == "local"
+    assert stats["current_calls"] == 2
+
+
+def test_provider_calls_take_lane_from_context(monkeypatch):
+    import logging
+
+    import pandas as pd
+
+    from app.core import rate_limiter
+    from app.core.rate_limiter import DistributedRateLimiter, bulk_lane
+    from tradingagents.dataflows.providers.china.tushare import TushareProvider
+
+    redis = _FakeRedis([0, 0])
+    _patch_redis(monkeypatch, redis)
+    limiter = DistributedRateLimiter(10, 60, name="test", key="tushare", bulk_share=0.5)
+    monkeypatch.setattr(rate_limiter, "_tushare_limiter", limiter)
+
+    class _Api:
+        def adj_factor(self, trade_date):
+            return pd.DataFrame({"ts_code": ["600000.SH"], "adj_factor": [1.5]})
+
+    provider = TushareProvider.__new__(TushareProvider)
+    provider.api = _Api()
+    provider.connected = True
+    provider.logger = logging.getLogger("test")
+
+    @bulk_lane
+    async def bulk_sync():
+        return await provider.get_adj_factor_by_trade_date("20250103")
+
+    # 分析流程默认交互式通道，同步任务经 bulk_lane 走批量通道
+    assert asyncio.run(provider.get_adj_factor_by_trade_date("20250103"))["600000"] == 1.5
+    assert asyncio.run(bulk_sync())["600000"] == 1.5
+    assert [args[1:3] for _, args in redis.script.calls] == [[10, "interactive"], [5, "bulk"]]
+
+
+def test_script_runs_on_redis_loop_from_worker_thread_loop(monkeypatch):
+    import threading
+
+    from app.core import database
+    from app.core.rate_limiter import DistributedRateLimiter
+
+    owner = asyncio.new_event_loop()
+    thread = threading.Thread(target=owner.run_forever, daemon=True)
+    thread.start()
+    loops = []
+
+    class _LoopScript:
+        async def __call__(self, keys=None, args=None):
+            loops.append(asyncio.get_running_loop())
+            return 0
+
+    class _Redis:
+        def register_script(self, lua):
+            return _LoopScript()
+
+    _patch_redis(monkeypatch, _Redis())
+    monkeypatch.setattr(database, "redis_loop", owner)
+    try:
+        limiter = DistributedRateLimiter(10, 60, name="test")
+        # 分析线程中的独立事件循环：脚本投递到 Redis 客户端所属的循环执行
+        asyncio.run(limiter.acquire())
+        assert loops == [owner] and limiter.get_stats()["backend"] == "redis"
+    finally:
+        owner.call_soon_threadsafe(owner.stop)
+        thread.join(timeout=5)
+        owner.close()
+
+
+def test_local_fallback_keeps_bulk_share(monkeypatch):
+    from app.core.rate_limiter import PRIORITY_BULK, DistributedRateLimiter
+
+    _patch_redis(monkeypatch, None)
+    limiter = DistributedRateLimiter(4, 0.2, name="test", bulk_share=0.5)
+
+    async def run():
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire(priority=PRIORITY_BULK)
+        bulk_elapsed = time.monotonic() - started
+        # 批量通道用满自己的额度后，交互式请求仍可立即获得许可
+        started = time.monotonic()
+        await limiter.acquire()
+        return bulk_elapsed, time.monotonic() - started
+
+    bulk_elapsed, interactive_elapsed = asyncio.run(run())
+    assert bulk_elapsed >= 0.15 and interactive_elapsed < 0.05
+    assert limiter.get_stats()["lane_calls"] == {"interactive": 1, "bulk": 3}
+
+
+def test_akshare_is_paced_by_host_buckets_by_default(monkeypatch):
+    from app.core import rate_limiter
+    from app.core.config import settings
+
+    rate_limiter.reset_all_limiters()
+    try:
+        assert settings.AKSHARE_RATE_LIMIT_PER_MINUTE == 0
+        assert rate_limiter.get_rate_limiter("akshare") is None
+
+        monkeypatch.setattr(settings, "AKSHARE_RATE_LIMIT_PER_MINUTE", 120)
+        limiter = rate_limiter.get_rate_limiter("akshare")
+        assert limiter is not None and limiter.max_calls == 120
+    finally:
+        rate_limiter.reset_all_limiters()
@@ -0,0 +1,119 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+
+VOLATILE_KEYS = ("created_at", "updated_at")
+
+
+def _service():
+    from app.services.historical_data_service import HistoricalDataService
+    return HistoricalDataService()
+
+
+def _row_path(service, symbol, data, data_source, market, period="daily"):
+    docs = []
+    for date_index, row in data.iterrows():
+        doc = service._standardize_record(symbol, row, data_source, market, period, date_index)
+        docs.append({k: v for k, v in doc.items() if k not in VOLATILE_KEYS})
+    return docs
+
+
+def _frame_path(service, symbol, data, data_source, market, period="daily"):
+    docs = service._standardize_frame(data, data_source, market, period, symbol=symbol)
+    return [{k: v for k, v in doc.items() if k not in VOLATILE_KEYS} for doc in docs]
+
+
+def _assert_same(expected, actual):
+    assert len(expected) == len(actual)
+    for exp, act in zip(expected, actual):
+        assert set(exp) == set(act)
+        for key, value in exp.items():
+            if isinstance(value, float):
+                assert act[key] is not None and np.isclose(value, act[key]), key
+            else:
+                assert act[key] == value, key
+
+
+def test_tushare_style_frame_matches_row_path():
+    dates = pd.date_range("2024-01-02", periods=5, freq="B", name="date")
+    data = pd.DataFrame({
+        "ts_code": ["000001.SZ"] * 5,
+        "open": [10.0, 10.2, 10.1, np.nan, 10.5],
+        "high": [10.3, 10.4, 10.2, 10.6, 10.8],
+        "low": [9.9, 10.0, 9.8, 10.1, 10.4],
+        "close": [10.2, 10.1, 10.0, 10.5, 10.7],
+        "pre_close": [10.0, 10.2, 0.0, 10.0, 10.5],
+        "change": [0.2, -0.1, -0.1, 0.5, 0.2],
+        "pct_chg": [2.0, -0.98, -0.99, 5.0, 1.9],
+        "volume": [1000.0, 0.0, 1200.0, 1300.0, 900.0],
+        "amount": [5000.0, 5100.0, 0.0, 5300.0, 5400.0],
+    }, index=dates)
+
+    service = _service()
+    _assert_same(
+        _row_path(service, "000001", data, "tushare", "CN"),
+        _frame_path(service, "000001", data, "tushare", "CN"),
+    )
+
+
+def test_baostock_style_string_frame_matches_row_path():
+    data = pd.DataFrame({
+        "date": ["2024-01-02", "2024-01-03", "20240104"],
+        "open": ["10.0", "", "10.1"],
+        "high": ["10.3", "10.4", "10.2"],
+        "low": ["9.9", "10.0", "9.8"],
+        "close": ["10.2", "10.1", "10.0"],
+        "preclose": ["10.0", "10.2", "10.1"],
+        "volume": ["1000", "0", "1200"],
+        "amount": ["5000", "5100", ""],
+        "turn": ["0.5", "0.4", ""],
+        "adjustflag": ["3", "3", "3"],
+        "tradestatus": ["1", "1", "0"],
+        "isST": ["0", "0", "0"],
+    })
+
+    service = _service()
+    _assert_same(
+        _row_path(service, "600000", data, "baostock", "CN"),
+        _frame_path(service, "600000", data, "baostock", "CN"),
+    )
+
+
+def test_cross_section_uses_symbol_column_and_concurrent_batches(monkeypatch):
+    import app.services.historical_data_service as hds_mod
+
+    class _FakeResult:
+        def __init__(self, n):
+            self.upserted_count = n
+            self.modified_count = 0
+
+    class _FakeColl:
+        def __init__(self):
+            self.batches = []
+
+        async def bulk_write(self, ops, ordered=True):
+            assert ordered is False
+            self.batches.append(len(ops))
+            return _FakeResult(len(ops))
+
+    monkeypatch.setattr(hds_mod, "BULK_WRITE_BATCH_SIZE", 2)
+    service = _service()
+    service.collection = _FakeColl()
+
+    symbols = ["000001", "600000", "300750", "688981", "830799"]
+    data = pd.DataFrame(
+        {"symbol": symbols, "close": [10.0, 9.0, 200.0, 50.0, 8.0], "vol": [1.0] * 5},
+        index=pd.DatetimeIndex(["2025-01-03"] * 5, name="date"),
+    )
+
+    saved = asyncio.run(service.save_cross_section(data, data_source="tushare"))
+
+    assert saved == 5
+    assert service.collection.batches == [2, 2, 1]
+
+    docs = service._standardize_frame(data, "akshare", "CN")
+    assert [d["symbol"] for d in docs] == symbols
+    assert [d["full_symbol"] for d in docs][:2] == ["000001.SZ", "600000.SH"]
+    assert {d["trade_date"] for d in docs} == {"2025-01-03"}
@@ -0,0 +1,205 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+
+def _bars(lengths, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2025-01-01", periods=max(lengths.values()))
+    frames = []
+    for symbol, n in lengths.items():
+        close = 10 + np.cumsum(rng.normal(0, 0.3, n))
+        frames.append(pd.DataFrame({
+            "symbol": symbol,
+            "trade_date": dates[-n:].strftime("%Y-%m-%d"),
+            "open": close + rng.normal(0, 0.1, n),
+            "high": close + 0.2,
+            "low": close - 0.2,
+            "close": close,
+            "vol": rng.integers(1_000, 9_000, n).astype(float),
+            "amount": rng.integers(10_000, 90_000, n).astype(float),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _match(doc, query):
+    for key, cond in query.items():
+        value = doc.get(key)
+        if isinstance(cond, dict):
+            if "$in" in cond and value not in cond["$in"]:
+                return False
+            if "$gte" in cond and not (value is not None and value >= cond["$gte"]):
+                return False
+            if "$lte" in cond and not (value is not None and value <= cond["$lte"]):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+    def __aiter__(self):
+        self._it = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Result:
+    def __init__(self, n):
+        self.upserted_count = n
+        self.modified_count = 0
+
+
+class _FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+
+    def find(self, query, projection=None):
+        return _Cursor([dict(d) for d in self.docs if _match(d, query)])
+
+    async def find_one(self, query, projection=None, sort=None):
+        docs = [d for d in self.docs if _match(d, query)]
+        if sort:
+            key, direction = sort[0]
+            docs.sort(key=lambda d: d.get(key), reverse=direction < 0)
+        return dict(docs[0]) if docs else None
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            flt, doc = op._filter, op._doc
+            self.docs = [d for d in self.docs if not _match(d, flt)] + [doc]
+        return _Result(len(operations))
+
+
+def _service(bars):
+    from app.services.indicator_snapshot_service import IndicatorSnapshotService
+
+    quotes = [
+        {**{k: v for k, v in row.items() if k != "vol"}, "volume": row["vol"],
+         "data_source": "tushare", "period": "daily"}
+        for row in bars.to_dict("records")
+    ]
+    service = IndicatorSnapshotService()
+    service.quotes = _FakeCollection(quotes)
+    service.collection = _FakeCollection()
+    return service
+
+
+def test_incremental_step_matches_full_recompute():
+    from app.services.indicator_snapshot_service import (
+        compute_full_snapshots, advance_snapshots, SNAPSHOT_FIELDS, STATE_FIELDS,
+    )
+
+    bars = _bars({"000001": 150, "600000": 90, "688999": 12, "301001": 2})
+    latest = bars.groupby("symbol")["trade_date"].transform("max")
+    prev = compute_full_snapshots(bars[bars["trade_date"] < latest])
+    state = prev[[f"state_{f}" for f in STATE_FIELDS]].set_axis(STATE_FIELDS, axis=1)
+    window = bars.sort_values("trade_date").groupby("symbol").tail(70)
+
+    full = compute_full_snapshots(bars)
+    incremental = advance_snapshots(state, window)
+
+    pd.testing.assert_frame_equal(incremental[SNAPSHOT_FIELDS], full[SNAPSHOT_FIELDS].loc[incremental.index],
+                                  check_exact=False, rtol=1e-9, atol=1e-9)
+
+
+def test_update_snapshots_full_then_incremental():
+    bars = _bars({"000001": 120, "600000": 80})
+    dates = sorted(bars["trade_date"].unique())
+    day_before, last_day = dates[-2], dates[-1]
+
+    service = _service(bars[bars["trade_date"] <= day_before])
+    first = asyncio.run(service.update_snapshots("tushare"))
+    assert first["trade_date"] == day_before
+    assert (first["full"], first["incremental"], first["saved"]) == (2, 0, 2)
+
+    # 新增一根K线后只推进递推状态，结果与整段重算一致
+    service.quotes = _service(bars).quotes
+    second = asyncio.run(service.update_snapshots("tushare"))
+    assert (second["trade_date"], second["full"], second["incremental"]) == (last_day, 0, 2)
+
+    from app.services.indicator_snapshot_service import compute_full_snapshots
+    expected = compute_full_snapshots(bars)
+    docs = {d["symbol"]: d for d in service.collection.docs if d["trade_date"] == last_day}
+    for symbol in ["000001", "600000"]:
+        for field in ["ma60", "ema26", "dea", "rsi14", "atr14", "kdj_j"]:
+            assert np.isclose(docs[symbol][field], expected.loc[symbol, field]), (symbol, field)
+        assert set(docs[symbol]["state"]) == {"ema12", "ema26", "dea", "rsi14_avg_gain",
+                                              "rsi14_avg_loss", "kdj_k", "kdj_d"}
+
+
+def test_stock_data_report_reads_latest_snapshots(monkeypatch):
+    from app.services.indicator_snapshot_service import compute_full_snapshots
+    from tradingagents.dataflows.cache import mongodb_cache_adapter
+    from tradingagents.dataflows.data_source_manager import DataSourceManager
+
+    bars = _bars({"000001": 150})
+    dates = sorted(bars["trade_date"].unique())
+    snapshots = {
+        day: {"symbol": "000001", "trade_date": day,
+              **compute_full_snapshots(bars[bars["trade_date"] <= day]).loc["000001"].to_dict()}
+        for day in dates[-2:]
+    }
+
+    class _Adapter:
+        def __init__(self):
+            self.calls = []
+
+        def get_indicator_snapshot(self, symbol, as_of=None):
+            self.calls.append(as_of)
+            return snapshots.get(as_of)
+
+    adapter = _Adapter()
+    monkeypatch.setattr(mongodb_cache_adapter, "get_mongodb_cache_adapter", lambda: adapter)
+
+    # 只取最近30根K线时，本地现算的 MA60 不足60根；快照按完整回溯窗口计算
+    window = bars.tail(30).rename(columns={"trade_date": "date", "vol": "volume"}).reset_index(drop=True)
+    manager = DataSourceManager.__new__(DataSourceManager)
+    report = manager._format_stock_data_response(window, "000001", "平安银行", dates[-30], dates[-1])
+
+    assert adapter.calls == dates[-2:]
+    assert f"MA60: ¥{snapshots[dates[-1]]['ma60']:.2f}" in report
+    assert f"DIF:  {snapshots[dates[-1]]['dif']:.3f}" in report
+
+    # 没有快照时现算
+    snapshots.clear()
+    report = manager._format_stock_data_response(window, "000001", "平安银行", dates[-30], dates[-1])
+    assert f"MA60: ¥{window['close'].mean():.2f}" in report
+
+
+def test_rebased_history_forces_full_recompute():
+    from app.services.indicator_snapshot_service import compute_full_snapshots
+
+    bars = _bars({"000001": 120, "600000": 80})
+    dates = sorted(bars["trade_date"].unique())
+    day_before, last_day = dates[-2], dates[-1]
+
+    service = _service(bars[bars["trade_date"] <= day_before])
+    asyncio.run(service.update_snapshots("tushare"))
+
+    # 000001 除权除息：前复权后整段历史按新的价格基准重写
+    rebased = bars.copy()
+    mask = rebased["symbol"] == "000001"
+    for field in ["open", "high", "low", "close"]:
+        rebased.loc[mask, field] *= 0.9
+    service.quotes = _service(rebased).quotes
+    stats = asyncio.run(service.update_snapshots("tushare"))
+    assert (stats["trade_date"], stats["full"], stats["incremental"]) == (last_day, 1, 1)
+
+    expected = compute_full_snapshots(rebased)
+    docs = {d["symbol"]: d for d in service.collection.docs if d["trade_date"] == last_day}
+    for symbol in ["000001", "600000"]:
+        for field in ["ema12", "dea", "rsi14", "kdj_k"]:
+            assert np.isclose(docs[symbol][field], expected.loc[symbol, field]), (symbol, field)
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+TZ = ZoneInfo("Asia/Shanghai")
+
+
+def _ops_by_period(ops):
+    return {op._filter["period"]: op._doc for op in ops}
+
+
+def test_bar_bucket_and_volume_baseline():
+    from app.services.intraday_bar_service import IntradayBarService, bar_start
+
+    assert bar_start(datetime(2025, 1, 2, 9, 37, 12, tzinfo=TZ), 5) == datetime(2025, 1, 2, 9, 35, tzinfo=TZ)
+    assert bar_start(datetime(2025, 1, 2, 9, 37, 12, tzinfo=TZ), 15) == datetime(2025, 1, 2, 9, 30, tzinfo=TZ)
+
+    svc = IntradayBarService(periods=(1, 5))
+    first = svc.build_operations(
+        {"000001": {"close": 10.0, "volume": 1000, "amount": 1.0e4}}, "20250102",
+        datetime(2025, 1, 2, 9, 31, 5, tzinfo=TZ),
+    )
+    second = svc.build_operations(
+        {"000001": {"close": 10.2, "volume": 1500, "amount": 1.5e4}}, "20250102",
+        datetime(2025, 1, 2, 9, 32, 5, tzinfo=TZ),
+    )
+
+    assert len(first) == len(second) == 2
+    # 首次采集没有上一笔累计值，以当前值为基准
+    assert _ops_by_period(first)[1]["$setOnInsert"]["volume_base"] == 1000
+    # 后续采集以上一笔累计值为新K线的基准
+    doc = _ops_by_period(second)[1]
+    assert second[0]._filter["bar_time"] == datetime(2025, 1, 2, 9, 32, tzinfo=TZ)
+    assert doc["$setOnInsert"]["volume_base"] == 1000
+    assert doc["$set"]["volume_end"] == 1500
+    assert doc["$max"] == {"high": 10.2} and doc["$min"] == {"low": 10.2}
+
+    # 新交易日重置基准；无效价格不产生K线
+    third = svc.build_operations(
+        {"000001": {"close": 10.5, "volume": 200}, "600000": {"close": None}}, "20250103",
+        datetime(2025, 1, 3, 9, 31, tzinfo=TZ),
+    )
+    assert len(third) == 2
+    assert _ops_by_period(third)[5]["$setOnInsert"]["volume_base"] == 200
+
+
+def test_parse_periods_and_bar_output(monkeypatch):
+    import app.services.intraday_bar_service as mod
+
+    assert mod.parse_periods("15, 1,abc,7,5,1") == (1, 5, 15)
+    assert mod.parse_periods("") == mod.DEFAULT_PERIODS
+
+    docs = [
+        {"bar_time": datetime(2025, 1, 2, 1, 35), "open": 10.0, "high": 10.3, "low": 9.9, "close": 10.2,
+         "volume_base": 1000, "volume_end": 1500, "amount_base": 1.0e4, "amount_end": 1.5e4},
+        {"bar_time": datetime(2025, 1, 2, 1, 30), "open": 9.8, "high": 10.0, "low": 9.8, "close": 10.0,
+         "volume_base": 800, "volume_end": 1000, "amount_base": None, "amount_end": 1.0e4},
+    ]
+
+    class _Cursor:
+        def __init__(self):
+            self.sort_args = None
+
+        def sort(self, *args):
+            self.sort_args = args
+            return self
+
+        def limit(self, n):
+            return self
+
+        async def to_list(self, length=None):
+            return [dict(d) for d in docs]
+
+    class _Coll:
+        def find(self, query, projection=None):
+            self.query = query
+            return _Cursor()
+
+    coll = _Coll()
+    monkeypatch.setattr(mod, "get_mongo_db", lambda: {mod.COLLECTION_NAME: coll})
+
+    bars = asyncio.run(mod.IntradayBarService().get_bars("000001", period=5))
+
+    assert coll.query == {"code": "000001", "period": 5}
+    # 倒序查询最近K线后按时间升序返回，时间转换为配置时区
+    assert [b["time"] for b in bars] == ["2025-01-02T09:30:00+08:00", "2025-01-02T09:35:00+08:00"]
+    assert bars[1]["volume"] == 500 and bars[1]["amount"] == 5.0e3
+    assert bars[0]["amount"] is None
@@ -0,0 +1,140 @@
+import asyncio
+from types import SimpleNamespace
+
+
+class _Script:
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+
+    async def __call__(self, keys=None, args=None):
+        self.calls.append((keys, args))
+        return self.results.pop(0)
+
+
+class _FakeRedis:
+    def __init__(self, claims, acks=(), signals=(), renews=()):
+        self.scripts = [_Script(claims), _Script(acks), _Script([]), _Script(renews)]
+        self.signals = list(signals)
+        self.blpop_calls = []
+        self.tasks = {}
+
+    def register_script(self, lua):
+        # 按 QueueService 注册顺序返回：claim, ack, reclaim, renew
+        self._registered = getattr(self, "_registered", 0) + 1
+        return self.scripts[self._registered - 1]
+
+    async def blpop(self, keys, timeout=0):
+        self.blpop_calls.append((keys, timeout))
+        return self.signals.pop(0) if self.signals else None
+
+    async def hgetall(self, key):
+        return dict(self.tasks.get(key, {}))
+
+
+def test_dequeue_blocks_on_signal_then_claims_atomically():
+    from app.services.queue_service import QueueService
+    from app.services.queue import READY_SIGNAL_LIST, TASK_PREFIX
+
+    r = _FakeRedis(claims=[None, "t1"], signals=[(READY_SIGNAL_LIST, "1")])
+    r.tasks[TASK_PREFIX + "t1"] = {"id": "t1", "user": "u1", "symbol": "000001", "params": "{}"}
+    service = QueueService(r)
+
+    task = asyncio.run(service.dequeue_task("w1", block_timeout=2.5))
+
+    assert task["id"] == "t1" and task["parameters"] == {}
+    assert r.blpop_calls == [([READY_SIGNAL_LIST], 2.5)]
+    claim = r.scripts[0]
+    assert len(claim.calls) == 2
+    assert claim.calls[0][1][0] == "w1"
+
+    # 空闲超时后返回 None，且不阻塞第二次
+    r2 = _FakeRedis(claims=[None])
+    assert asyncio.run(QueueService(r2).dequeue_task("w1", block_timeout=1)) is None
+    assert len(r2.blpop_calls) == 1 and len(r2.scripts[0].calls) == 1
+
+    # 不阻塞模式保持旧行为：仅尝试一次认领
+    r3 = _FakeRedis(claims=[None])
+    assert asyncio.run(QueueService(r3).dequeue_task("w1")) is None
+    assert r3.blpop_calls == []
+
+
+def test_ack_rejects_stale_worker():
+    from app.services.queue_service import QueueService
+
+    r = _FakeRedis(claims=[], acks=[1, -1, 0])
+    service = QueueService(r)
+
+    assert asyncio.run(service.ack_task("t1", True, worker_id="w1")) is True
+    assert asyncio.run(service.ack_task("t1", True, worker_id="w-old")) is False
+    assert asyncio.run(service.ack_task("missing", False)) is False
+    assert r.scripts[1].calls[1][1][4] == "w-old"
+    assert r.scripts[1].calls[2][1][4] == ""
+
+
+def test_renew_lease_pushes_deadline_and_reports_lost_ownership():
+    from app.services.queue_service import QueueService
+    from app.services.queue import TASK_PREFIX, VISIBILITY_ZSET
+
+    r = _FakeRedis(claims=[], renews=[1, 0])
+    service = QueueService(r)
+    service.visibility_timeout = 300
+
+    assert asyncio.run(service.renew_lease("t1", "w1")) is True
+    assert asyncio.run(service.renew_lease("t1", "w1")) is False
+    keys, args = r.scripts[3].calls[0]
+    assert keys == [TASK_PREFIX + "t1", VISIBILITY_ZSET]
+    assert args[:2] == ["t1", "w1"] and args[2] >= 300
+
+
+def test_worker_cancels_analysis_when_lease_is_lost():
+    from app.worker import analysis_worker
+    from app.worker.analysis_worker import AnalysisWorker
+
+    class _Queue:
+        visibility_timeout = 300
+
+        def __init__(self, renew_ok):
+            self.renew_ok = renew_ok
+            self.acks = []
+
+        async def renew_lease(self, task_id, worker_id):
+            return self.renew_ok
+
+        async def ack_task(self, task_id, success, worker_id=None):
+            self.acks.append((task_id, success))
+            return True
+
+    class _Analysis:
+        def __init__(self, worker):
+            self.worker = worker
+
+        async def execute_analysis_task(self, task, progress_callback=None):
+            # 分析进行中心跳续租
+            await asyncio.sleep(0)
+            await self.worker._renew_lease()
+            await asyncio.sleep(0)
+            return SimpleNamespace(execution_time=0.1)
+
+    def run(renew_ok):
+        worker = AnalysisWorker.__new__(AnalysisWorker)
+        worker.worker_id = "w1"
+        worker.current_task = None
+        worker._analysis_task = None
+        worker._lease_lost = False
+        worker.queue_service = _Queue(renew_ok)
+        original = analysis_worker.get_analysis_service
+        analysis_worker.get_analysis_service = lambda: _Analysis(worker)
+        try:
+            asyncio.run(worker._process_task(
+                {"id": "t1", "symbol": "000001", "user": "507f1f77bcf86cd799439011", "parameters": {}}))
+        finally:
+            analysis_worker.get_analysis_service = original
+        return worker
+
+    lost = run(renew_ok=False)
+    assert lost._lease_lost and lost.queue_service.acks == []
+    assert lost.current_task is None
+
+    kept = run(renew_ok=True)
+    assert not kept._lease_lost and kept.queue_service.acks == [("t1", True)]
@@ -0,0 +1,110 @@
+import asyncio
+
+
+class _FakeResult:
+    def __init__(self, n):
+        self.matched_count = 0
+        self.modified_count = n
+        self.upserted_ids = {}
+
+
+class _FakeColl:
+    def __init__(self):
+        self.writes = []
+
+    async def bulk_write(self, ops, ordered=False):
+        self.writes.append(ops)
+        return _FakeResult(len(ops))
+
+
+class _FakeDB:
+    def __init__(self):
+        self.coll = _FakeColl()
+
+    def __getitem__(self, name):
+        return self.coll
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.entries = []
+
+    async def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.entries.append((key, fields))
+        return b"1-0"
+
+
+def _setup(monkeypatch):
+    import app.core.database as db_mod
+    import app.services.quotes_ingestion_service as qis_mod
+    from app.services.quotes_ingestion_service import QuotesIngestionService
+
+    fake_db, fake_redis = _FakeDB(), _FakeRedis()
+    monkeypatch.setattr(qis_mod, "get_mongo_db", lambda: fake_db)
+    monkeypatch.setattr(db_mod, "get_redis_client", lambda: fake_redis)
+    return QuotesIngestionService(), fake_db, fake_redis
+
+
+def test_only_changed_rows_are_written_and_published(monkeypatch):
+    from app.services.quotes_ingestion_service import decode_quote_changes
+
+    svc, fake_db, fake_redis = _setup(monkeypatch)
+    quotes = {
+        "sz000001": {"close": 10.1, "pct_chg": 0.1, "amount": 1.0e8},
+        "600000": {"close": 9.8, "pct_chg": -0.3, "amount": 7.5e7},
+    }
+
+    async def _run():
+        await svc._bulk_upsert(quotes, "20250102", "fake")
+        # 行情未变化：不写库、不发布
+        await svc._bulk_upsert(dict(quotes), "20250102", "fake")
+        changed = dict(quotes)
+        changed["600000"] = {"close": 9.9, "pct_chg": 0.7, "amount": 8.0e7}
+        return await svc._bulk_upsert(changed, "20250102", "fake")
+
+    result = asyncio.run(_run())
+
+    assert [len(ops) for ops in fake_db.coll.writes] == [2, 1]
+    assert list(result) == ["600000"]
+    assert len(fake_redis.entries) == 2
+
+    key, fields = fake_redis.entries[-1]
+    assert key == "quotes:changes"
+    decoded = decode_quote_changes(fields)
+    assert decoded == {
+        "600000": {
+            "close": 9.9, "pct_chg": 0.7, "amount": 8.0e7, "volume": None,
+            "open": None, "high": None, "low": None, "pre_close": None,
+            "trade_date": "20250102",
+        }
+    }
+
+
+def test_full_refresh_rewrites_unchanged_rows_without_publishing(monkeypatch):
+    svc, fake_db, fake_redis = _setup(monkeypatch)
+    quotes = {"000001": {"close": 10.1}}
+
+    async def _run():
+        await svc._bulk_upsert(quotes, "20250102", "fake")
+        await svc._bulk_upsert(quotes, "20250102", "fake", full=True)
+
+    asyncio.run(_run())
+
+    assert [len(ops) for ops in fake_db.coll.writes] == [1, 1]
+    assert len(fake_redis.entries) == 1
+
+
+def test_nan_fields_do_not_count_as_changes(monkeypatch):
+    svc, fake_db, fake_redis = _setup(monkeypatch)
+
+    def _halted():
+        # 每次采集都是新的 NaN 对象（与 pandas 逐行取值一致）
+        return {"600001": {"close": 8.5, "pct_chg": float("nan"), "amount": float("nan")}}
+
+    async def _run():
+        await svc._bulk_upsert(_halted(), "20250102", "fake")
+        return await svc._bulk_upsert(_halted(), "20250102", "fake")
+
+    assert asyncio.run(_run()) == {}
+    assert len(fake_db.coll.writes) == 1
+    assert len(fake_redis.entries) == 1
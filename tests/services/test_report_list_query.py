@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+
+class _FakeCollection:
+    def __init__(self, total):
+        self.total = total
+        self.count_calls = 0
+        self.estimate_calls = 0
+
+    async def count_documents(self, query):
+        self.count_calls += 1
+        return self.total
+
+    async def estimated_document_count(self):
+        self.estimate_calls += 1
+        return self.total
+
+
+def test_search_ngrams_cover_chinese_bigrams_and_ascii_words():
+    from app.utils.report_search import build_report_list_fields, build_keyword_query
+
+    doc = {
+        "stock_symbol": "600519",
+        "stock_name": "贵州茅台",
+        "analysis_id": "600519_20250101_abc",
+        "summary": "白酒龙头，Strong buy",
+        "reports": {"market_report": "内容" * 100},
+    }
+    fields = build_report_list_fields(doc)
+    ngrams = set(fields["search_ngrams"])
+
+    assert fields["report_size"] > 0
+    assert {"600519", "20250101", "abc", "strong", "buy"} <= ngrams
+    assert {"贵州", "州茅", "茅台", "龙头", "茅"} <= ngrams
+
+    # 中文关键词按双字匹配，全部词元都命中才算匹配
+    terms = build_keyword_query("州茅台")["$or"][-1]["search_ngrams"]["$all"]
+    assert set(terms) <= ngrams
+    assert terms == ["州茅", "茅台"]
+
+
+def test_keyword_query_keeps_symbol_prefix_and_exact_id():
+    from app.utils.report_search import build_keyword_query
+
+    conditions = build_keyword_query(" aapl ")["$or"]
+    assert {"stock_symbol": {"$regex": "^AAPL"}} in conditions
+    assert {"analysis_id": "aapl"} in conditions
+    # 仅由符号组成的关键词不产生词元条件
+    assert len(build_keyword_query("***")["$or"]) == 2
+
+
+def test_cursor_round_trip_and_keyset_query():
+    from app.utils.report_search import build_keyset_query, decode_cursor, encode_cursor
+
+    created_at = datetime(2025, 1, 2, 3, 4, 5, 678000)
+    doc_id = ObjectId()
+    cursor = encode_cursor(created_at, doc_id)
+
+    assert decode_cursor(cursor) == (created_at, doc_id)
+    assert build_keyset_query(cursor) == {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": doc_id}},
+        ]
+    }
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_count_cache_uses_estimate_without_filter_and_caches_filtered_counts():
+    from app.utils.report_search import ReportCountCache
+
+    cache = ReportCountCache(ttl=60)
+    collection = _FakeCollection(total=42)
+
+    assert asyncio.run(cache.count(collection, {})) == 42
+    assert collection.estimate_calls == 1 and collection.count_calls == 0
+
+    query = {"market_type": "A股"}
+    assert asyncio.run(cache.count(collection, query)) == 42
+    assert asyncio.run(cache.count(collection, dict(query))) == 42
+    assert collection.count_calls == 1
+
+    cache.invalidate()
+    asyncio.run(cache.count(collection, query))
+    assert collection.count_calls == 2
+
+
+class _FakeReportCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *_):
+        return self
+
+    def skip(self, *_):
+        return self
+
+    def limit(self, *_):
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs
+
+
+class _OldServerCollection:
+    """模拟 MongoDB 4.4 以下版本：拒绝 $bsonSize 投影"""
+
+    def __init__(self):
+        self.projections = []
+
+    def find(self, query, projection):
+        from pymongo.errors import OperationFailure
+
+        self.projections.append(projection)
+        if isinstance(projection["report_size"], dict):
+            raise OperationFailure("Unrecognized expression '$bsonSize'")
+        return _FakeReportCursor([{"_id": ObjectId(), "report_size": 10}])
+
+
+def test_find_report_page_falls_back_without_bson_size(monkeypatch):
+    from app.utils import report_search
+
+    monkeypatch.setattr(report_search, "_bson_size_supported", True)
+    collection = _OldServerCollection()
+
+    docs = asyncio.run(report_search.find_report_page(collection, {}, 0, 21))
+    assert docs[0]["report_size"] == 10
+    assert asyncio.run(report_search.find_report_page(collection, {}, 0, 21))
+    # 被拒绝一次后不再尝试 $bsonSize
+    assert [p["report_size"] for p in collection.projections] == [
+        report_search.REPORT_LIST_PROJECTION["report_size"], 1, 1,
+    ]
+
+
+def test_web_report_manager_saves_list_fields():
+    from types import SimpleNamespace
+    from web.utils.mongodb_report_manager import MongoDBReportManager
+
+    saved = []
+
+    class _Collection:
+        def replace_one(self, query, document, upsert=False):
+            saved.append(document)
+            return SimpleNamespace(upserted_id=ObjectId(), modified_count=0)
+
+    manager = MongoDBReportManager.__new__(MongoDBReportManager)
+    manager.connected = True
+    manager.collection = _Collection()
+
+    assert manager.save_report({
+        "analysis_id": "600519_20250101_abc",
+        "stock_symbol": "600519",
+        "stock_name": "贵州茅台",
+        "reports": {"market_report": "内容"},
+    })
+    assert saved[0]["report_size"] > 0
+    assert {"600519", "贵州", "茅台"} <= set(saved[0]["search_ngrams"])
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+
+CONDITIONS = {
+    "logic": "OR",
+    "children": [
+        {"field": "close", "op": ">", "right_field": "ma20"},
+        {"field": "kdj_k", "op": "cross_up", "right_field": "kdj_d"},
+        {"logic": "AND", "children": [
+            {"field": "rsi14", "op": "between", "value": [30, 60]},
+            {"field": "pct_chg", "op": "<", "value": 0},
+        ]},
+        {"field": "pe", "op": "!=", "right_field": "close"},
+    ],
+}
+
+
+def _bars(symbols_lengths, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-01", periods=max(symbols_lengths.values()))
+    frames = []
+    for symbol, n in symbols_lengths.items():
+        close = 10 + np.cumsum(rng.normal(0, 0.3, n))
+        frames.append(pd.DataFrame({
+            "symbol": symbol,
+            "trade_date": dates[-n:].strftime("%Y-%m-%d"),
+            "open": close + rng.normal(0, 0.1, n),
+            "high": close + 0.2,
+            "low": close - 0.2,
+            "close": close,
+            "vol": rng.integers(1_000, 9_000, n).astype(float),
+            "amount": rng.integers(10_000, 90_000, n).astype(float),
+        }))
+    # 打乱行序，模拟数据库返回顺序
+    return pd.concat(frames, ignore_index=True).sample(frac=1.0, random_state=seed)
+
+
+def _per_symbol(bars, symbol):
+    from app.services import screening_service as ss
+    from tradingagents.tools.analysis.indicators import compute_many
+
+    df = bars[bars["symbol"] == symbol].sort_values("trade_date").reset_index(drop=True)
+    df["pct_chg"] = df["close"].pct_change() * 100.0
+    return compute_many(df, ss.PANEL_SPECS)
+
+
+def test_panel_indicators_match_per_symbol_compute():
+    from app.services.screening_service import ScreeningService, PANEL_SPECS
+    from tradingagents.tools.analysis.indicators import compute_panel
+
+    lengths = {"000001": 150, "600000": 90, "688999": 12}  # 含新股（K线不足）
+    bars = _bars(lengths)
+    panel = compute_panel(ScreeningService()._build_panel(bars), PANEL_SPECS)
+
+    for symbol, n in lengths.items():
+        expected = _per_symbol(bars, symbol)
+        for field in ["close", "pct_chg", "ma5", "ma60", "ema26", "dif", "dea", "macd_hist",
+                      "rsi14", "boll_upper", "atr14", "kdj_k", "kdj_d", "kdj_j"]:
+            actual = panel[field][symbol].iloc[-n:].reset_index(drop=True)
+            pd.testing.assert_series_equal(actual, expected[field], check_names=False, obj=field)
+            assert panel[field][symbol].iloc[:-n].isna().all(), field
+
+
+def test_mask_matches_row_evaluation_and_run_uses_single_panel(monkeypatch):
+    from app.services.screening_service import (
+        ScreeningService, ScreeningParams, ALLOWED_FIELDS, ALLOWED_OPS,
+    )
+    from app.services.screening.eval_utils import evaluate_conditions
+
+    lengths = {f"{i:06d}": 40 + i * 7 for i in range(20)}
+    bars = _bars(lengths, seed=11)
+    svc = ScreeningService()
+    calls = []
+
+    def _load(symbols, start_s, end_s):
+        calls.append(len(symbols))
+        return bars
+
+    monkeypatch.setattr(svc, "_get_universe", lambda: list(lengths))
+    monkeypatch.setattr(svc, "_load_bars_from_db", _load)
+
+    result = svc.run(CONDITIONS, ScreeningParams(limit=100, order_by=[{"field": "rsi14", "direction": "asc"}]))
+
+    expected = [s for s in lengths if evaluate_conditions(_per_symbol(bars, s), CONDITIONS, ALLOWED_FIELDS, ALLOWED_OPS)]
+    assert calls == [len(lengths)]
+    assert sorted(item["code"] for item in result["items"]) == sorted(expected)
+    assert result["total"] == len(expected)
+    rsi = [item["rsi14"] for item in result["items"] if item["rsi14"] is not None]
+    assert rsi == sorted(rsi)
+
+
+def test_source_priority_reads_config_snapshot(monkeypatch):
+    from app.core import config_snapshot
+    import app.services.screening_service as ss
+
+    snapshot = config_snapshot.ConfigSnapshot.from_documents({
+        "data_source_configs": [
+            {"type": "akshare", "enabled": True, "priority": 5},
+            {"type": "tushare", "enabled": False, "priority": 9},
+            {"type": "yahoo_finance", "enabled": True, "priority": 7, "market_categories": ["us_stocks"]},
+        ],
+    }, [])
+    monkeypatch.setattr(config_snapshot, "get_config_snapshot", lambda: snapshot)
+
+    svc = ss.ScreeningService.__new__(ss.ScreeningService)
+    assert svc._get_source_priority() == ["akshare", "tushare", "baostock"]
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+
+import pandas as pd
+
+
+def _provider(monkeypatch, api):
+    from tradingagents.dataflows.providers.china import tushare
+    from tradingagents.dataflows.providers.china.tushare import TushareProvider
+
+    monkeypatch.setattr(tushare, "TUSHARE_AVAILABLE", True)
+    provider = TushareProvider.__new__(TushareProvider)
+    provider.api = api
+    provider.connected = True
+    provider.logger = logging.getLogger("test")
+    return provider
+
+
+class _SlowApi:
+    """每个接口耗时 0.2 秒"""
+
+    def __getattr__(self, name):
+        def call(**kwargs):
+            time.sleep(0.2)
+            return pd.DataFrame([{"ts_code": kwargs["ts_code"], "end_date": "20250630", "ann_date": "20250820",
+                                  "revenue": 100.0, "n_income_attr_p": 10.0, "total_assets": 500.0, "roe": 5.0}])
+        return call
+
+
+def test_statements_fetched_concurrently_under_limiter(monkeypatch):
+    provider = _provider(monkeypatch, _SlowApi())
+    acquired = []
+
+    async def acquire():
+        acquired.append(1)
+
+    started = time.monotonic()
+    data = asyncio.run(provider.get_financial_data("600000", limit=4, acquire=acquire))
+    elapsed = time.monotonic() - started
+
+    assert len(acquired) == 5
+    assert elapsed < 0.6  # 五个接口串行约1秒
+    assert data["report_period"] == "20250630"
+    assert data["total_assets"] == 500.0
+    assert len(data["raw_data"]["main_business"]) == 1
+
+
+class _PeriodApi:
+    def __init__(self):
+        self.calls = []
+
+    def _rows(self, period, codes):
+        return [{"ts_code": c, "end_date": period, "ann_date": period, "update_flag": "1",
+                 "revenue": float(period[:4]) - 2000, "n_income_attr_p": 1.0,
+                 "total_assets": 10.0, "n_cashflow_act": 2.0, "roe": 3.0} for c in codes]
+
+    def income_vip(self, period, limit, offset):
+        self.calls.append(("income_vip", period, offset))
+        codes = ["000001.SZ", "600000.SH", "688001.SH"] if period == "20250630" else ["000001.SZ", "600000.SH"]
+        rows = self._rows(period, codes)
+        if period == "20250630" and offset == 0:
+            # 更正前的旧记录应被去重
+            rows.append({**rows[0], "update_flag": "0", "revenue": -1.0})
+        return pd.DataFrame(rows[offset:offset + limit])
+
+    def __getattr__(self, name):
+        def call(period, limit, offset):
+            self.calls.append((name, period, offset))
+            return pd.DataFrame(self._rows(period, ["000001.SZ", "600000.SH"])[offset:offset + limit])
+        return call
+
+
+def test_period_bulk_fetch_groups_market_and_computes_ttm(monkeypatch):
+    from tradingagents.dataflows.providers.china import tushare
+
+    monkeypatch.setattr(tushare, "PERIOD_PAGE_SIZE", 2)
+    api = _PeriodApi()
+    provider = _provider(monkeypatch, api)
+
+    data = asyncio.run(provider.get_financial_data_for_period("20250630"))
+
+    assert set(data) == {"000001.SZ", "600000.SH", "688001.SH"}
+    assert data["000001.SZ"]["revenue"] == 25.0
+    # TTM = 2024年报 + (2025H1 - 2024H1) = 24 + (25 - 24)
+    assert data["000001.SZ"]["revenue_ttm"] == 25.0
+    assert data["688001.SH"]["total_assets"] is None
+    assert {c[1] for c in api.calls if c[0] == "income_vip"} == {"20250630", "20240630", "20241231"}
+    # 分页：每页2条，返回不足一页时停止
+    assert ("income_vip", "20250630", 2) in api.calls
+
+
+def test_sync_by_period_bulk_upserts(monkeypatch):
+    from app.core.rate_limiter import current_priority
+    from app.services import financial_data_service
+    from app.worker.tushare_sync_service import TushareSyncService
+
+    class _Provider:
+        def __init__(self):
+            self.priorities = []
+
+        async def get_financial_data_for_period(self, period, acquire=None):
+            # provider 内部按调用上下文的通道获取许可
+            self.priorities.append(current_priority())
+            return {"000001.SZ": {"report_period": period}, "600000.SH": {"report_period": period}}
+
+    class _FinancialService:
+        def __init__(self):
+            self.batches = []
+
+        async def save_financial_data_batch(self, data_by_symbol, data_source, market="CN"):
+            self.batches.append((sorted(data_by_symbol), data_source))
+            return len(data_by_symbol)
+
+    fin = _FinancialService()
+
+    async def _get_service():
+        return fin
+
+    monkeypatch.setattr(financial_data_service, "get_financial_data_service", _get_service)
+    service = TushareSyncService.__new__(TushareSyncService)
+    service.provider = _Provider()
+
+    stats = asyncio.run(service.sync_financial_data_by_period(periods=["20250630", "20250331"]))
+
+    assert stats["success_count"] == 4
+    assert fin.batches == [(["000001", "600000"], "tushare")] * 2
+    assert service.provider.priorities == ["bulk", "bulk"]
+    assert current_priority() == "interactive"
+    assert TushareSyncService._recent_report_periods(3, pd.Timestamp("2025-08-01").to_pydatetime()) == [
+        "20250630", "20250331", "20241231"]
@@ -0,0 +1,156 @@
+import asyncio
+
+import pandas as pd
+
+
+class _FakeLimiter:
+    async def acquire(self, priority=None):
+        return None
+
+
+class _FakeProvider:
+    def __init__(self, calendar, cross_sections, factors=None):
+        self.calendar = calendar
+        self.cross_sections = cross_sections
+        self.factors = factors or {}
+        self.daily_calls = []
+
+    async def get_trade_calendar(self, start_date, end_date=None):
+        return [d for d in self.calendar if start_date <= d <= end_date]
+
+    async def get_daily_by_trade_date(self, trade_date):
+        self.daily_calls.append(trade_date)
+        return self.cross_sections.get(trade_date)
+
+    async def get_adj_factor_by_trade_date(self, trade_date):
+        if trade_date in self.factors:
+            return pd.Series(self.factors[trade_date], dtype=float)
+        if self.factors:
+            return None
+        # 未指定复权因子时视为无除权除息
+        section = self.cross_sections.get(trade_date)
+        return pd.Series(1.0, index=section["symbol"] if section is not None else [])
+
+
+class _FakeHistoricalService:
+    def __init__(self, latest, synced):
+        self.latest = latest
+        self.synced = synced
+        self.saved = []
+
+    async def get_latest_trade_date(self, data_source, period="daily"):
+        return self.latest
+
+    async def get_synced_symbols(self, data_source, period="daily"):
+        return list(self.synced)
+
+    async def save_cross_section(self, data, data_source, market="CN", period="daily"):
+        self.saved.append(data)
+        return len(data)
+
+
+def _cross_section(trade_date, symbols, closes=None):
+    return pd.DataFrame(
+        {"symbol": symbols, "close": closes or [10.0] * len(symbols)},
+        index=pd.DatetimeIndex([trade_date] * len(symbols), name="date"),
+    )
+
+
+def _service(provider, historical, active_symbols, backfill_calls):
+    from app.worker.tushare_sync_service import TushareSyncService
+
+    service = TushareSyncService.__new__(TushareSyncService)
+    service.provider = provider
+    service.historical_service = historical
+    service.rate_limiter = _FakeLimiter()
+
+    async def _active():
+        return active_symbols
+
+    async def _per_symbol(symbols=None, all_history=False, **kwargs):
+        backfill_calls.append((symbols, "all_history") if all_history else symbols)
+        return {"total_records": len(symbols), "error_count": 0, "errors": []}
+
+    service._get_active_symbols = _active
+    service.sync_historical_data = _per_symbol
+    return service
+
+
+def test_one_call_per_missing_trade_date_and_backfill_new_symbols():
+    provider = _FakeProvider(
+        calendar=["2025-01-02", "2025-01-03", "2025-01-06"],
+        cross_sections={
+            "2025-01-03": _cross_section("2025-01-03", ["000001", "600000"]),
+            "2025-01-06": _cross_section("2025-01-06", ["000001", "600000", "688999"]),
+        },
+    )
+    historical = _FakeHistoricalService(latest="2025-01-02", synced={"000001", "600000"})
+    backfill_calls = []
+    service = _service(provider, historical, ["000001", "600000", "688999"], backfill_calls)
+
+    stats = asyncio.run(service.sync_historical_data_by_trade_date(end_date="2025-01-06"))
+
+    assert provider.daily_calls == ["2025-01-03", "2025-01-06"]
+    assert stats["trade_dates"] == ["2025-01-03", "2025-01-06"]
+    assert stats["total_records"] == 5 + 1
+    # 新上市股票在写入截面之前确定，仍走逐股票补齐
+    assert backfill_calls == [["688999"]]
+
+
+def test_stops_at_unpublished_trade_date():
+    provider = _FakeProvider(
+        calendar=["2025-01-03", "2025-01-06"],
+        cross_sections={"2025-01-06": _cross_section("2025-01-06", ["000001"])},
+    )
+    historical = _FakeHistoricalService(latest="2025-01-02", synced={"000001"})
+    service = _service(provider, historical, ["000001"], [])
+
+    stats = asyncio.run(service.sync_historical_data_by_trade_date(end_date="2025-01-06"))
+
+    # 01-03 尚未发布时不能跳过，否则全局最新日期会越过缺口
+    assert provider.daily_calls == ["2025-01-03"]
+    assert stats["trade_dates"] == []
+    assert historical.saved == []
+
+
+def test_raw_prices_converted_to_qfq_and_ex_dividend_symbols_resynced():
+    # 000001 在 01-06 除息：未复权收盘价下跌，复权因子上升
+    provider = _FakeProvider(
+        calendar=["2025-01-03", "2025-01-06"],
+        cross_sections={
+            "2025-01-03": _cross_section("2025-01-03", ["000001", "600000"], [11.0, 8.0]),
+            "2025-01-06": _cross_section("2025-01-06", ["000001", "600000"], [10.0, 8.0]),
+        },
+        factors={
+            "2025-01-02": {"000001": 1.0, "600000": 2.0},
+            "2025-01-03": {"000001": 1.0, "600000": 2.0},
+            "2025-01-06": {"000001": 1.1, "600000": 2.0},
+        },
+    )
+    historical = _FakeHistoricalService(latest="2025-01-02", synced={"000001", "600000"})
+    backfill_calls = []
+    service = _service(provider, historical, ["000001", "600000"], backfill_calls)
+
+    stats = asyncio.run(service.sync_historical_data_by_trade_date(end_date="2025-01-06"))
+
+    # 以最后一个交易日为基准前复权，与 pro_bar(adj='qfq') 一致
+    assert list(historical.saved[0]["close"]) == [10.0, 8.0]
+    assert list(historical.saved[1]["close"]) == [10.0, 8.0]
+    # 除息股票此前保存的历史以旧复权因子为基准，重新同步全部历史
+    assert backfill_calls == [(["000001"], "all_history")]
+    assert stats["adjusted_symbols"] == 1
+
+
+def test_stops_when_adj_factor_unavailable():
+    provider = _FakeProvider(
+        calendar=["2025-01-03"],
+        cross_sections={"2025-01-03": _cross_section("2025-01-03", ["000001"])},
+        factors={"2025-01-02": {"000001": 1.0}},
+    )
+    historical = _FakeHistoricalService(latest="2025-01-02", synced={"000001"})
+    service = _service(provider, historical, ["000001"], [])
+
+    stats = asyncio.run(service.sync_historical_data_by_trade_date(end_date="2025-01-06"))
+
+    # 不能写入未复权价格
+    assert stats["trade_dates"] == [] and historical.saved == []
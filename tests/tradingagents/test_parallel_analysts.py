@@ -0,0 +1,148 @@
+"""
+测试分析师并行扇出模式
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.prebuilt import ToolNode
+
+import tradingagents.graph.setup as setup_mod
+from tradingagents.graph.conditional_logic import ConditionalLogic
+from tradingagents.graph.setup import GraphSetup
+from tradingagents.graph.propagation import Propagator
+
+
+ANALYST_SLEEP = 0.3
+
+REPORT_KEYS = {
+    "market": "market_report",
+    "social": "sentiment_report",
+    "news": "news_report",
+    "fundamentals": "fundamentals_report",
+}
+
+
+@tool
+def echo(tag: str) -> str:
+    """Echo the tag back."""
+    return tag
+
+
+def _fake_analyst(analyst_type):
+    def factory(llm, toolkit):
+        def node(state):
+            tool_messages = [m for m in state["messages"] if isinstance(m, ToolMessage)]
+            if not tool_messages:
+                return {"messages": [AIMessage(content="", tool_calls=[
+                    {"name": "echo", "args": {"tag": analyst_type}, "id": f"call_{analyst_type}"}
+                ])]}
+            # 子图消息隔离：只能看到自己的工具调用结果
+            assert [m.content for m in tool_messages] == [analyst_type]
+            time.sleep(ANALYST_SLEEP)
+            return {
+                "messages": [AIMessage(content="done")],
+                REPORT_KEYS[analyst_type]: f"{analyst_type} report " + "x" * 120,
+            }
+        return node
+    return factory
+
+
+def _patch_nodes(monkeypatch, seen):
+    monkeypatch.setattr(setup_mod, "create_market_analyst", _fake_analyst("market"))
+    monkeypatch.setattr(setup_mod, "create_social_media_analyst", _fake_analyst("social"))
+    monkeypatch.setattr(setup_mod, "create_news_analyst", _fake_analyst("news"))
+    monkeypatch.setattr(setup_mod, "create_fundamentals_analyst", _fake_analyst("fundamentals"))
+
+    def bull(llm, memory):
+        def node(state):
+            seen.update({key: state[key] for key in REPORT_KEYS.values()})
+            return {"investment_debate_state": {
+                "history": "", "bull_history": "", "bear_history": "",
+                "current_response": "Bull", "judge_decision": "", "count": 99,
+            }}
+        return node
+
+    def risky(llm):
+        def node(state):
+            return {"risk_debate_state": {
+                "history": "", "risky_history": "", "safe_history": "", "neutral_history": "",
+                "latest_speaker": "Risky", "current_risky_response": "",
+                "current_safe_response": "", "current_neutral_response": "",
+                "judge_decision": "", "count": 99,
+            }}
+        return node
+
+    noop = lambda *args: (lambda state: {})
+    monkeypatch.setattr(setup_mod, "create_bull_researcher", bull)
+    monkeypatch.setattr(setup_mod, "create_bear_researcher", noop)
+    monkeypatch.setattr(setup_mod, "create_research_manager",
+                        lambda *a: (lambda state: {"investment_plan": "plan"}))
+    monkeypatch.setattr(setup_mod, "create_trader",
+                        lambda *a: (lambda state: {"trader_investment_plan": "plan"}))
+    monkeypatch.setattr(setup_mod, "create_risky_debator", risky)
+    monkeypatch.setattr(setup_mod, "create_safe_debator", noop)
+    monkeypatch.setattr(setup_mod, "create_neutral_debator", noop)
+    monkeypatch.setattr(setup_mod, "create_risk_manager",
+                        lambda *a: (lambda state: {"final_trade_decision": "BUY"}))
+
+
+def _graph_setup():
+    tool_nodes = {name: ToolNode([echo]) for name in REPORT_KEYS}
+    return GraphSetup(None, None, None, tool_nodes, None, None, None, None, None,
+                      ConditionalLogic(), config={})
+
+
+def test_parallel_analysts_fan_out_and_join(monkeypatch):
+    seen = {}
+    _patch_nodes(monkeypatch, seen)
+    graph_setup = _graph_setup()
+    graph = graph_setup.setup_graph(list(REPORT_KEYS), parallel_analysts=True)
+
+    state = Propagator().create_initial_state("000001", "2024-01-02")
+    config = {}
+    spans = graph_setup.attach_node_spans(config)
+    start = time.time()
+    final_state = graph.invoke(state, config)
+    elapsed = time.time() - start
+
+    # 汇合节点在所有分析师完成后才执行
+    assert all(value.startswith(key) for key, value in
+               zip(REPORT_KEYS, (seen[k] for k in REPORT_KEYS.values())))
+    assert final_state["final_trade_decision"] == "BUY"
+    # 主图消息未被分析师的工具调用历史污染
+    assert len(final_state["messages"]) == 1
+
+    # 墙钟时间接近单个分析师耗时，而不是四者之和
+    assert elapsed < ANALYST_SLEEP * len(REPORT_KEYS)
+    assert set(spans) == graph_setup.parallel_analyst_nodes
+    assert max(s for s, _ in spans.values()) < min(e for _, e in spans.values())
+
+
+def test_concurrent_runs_keep_their_own_spans(monkeypatch):
+    _patch_nodes(monkeypatch, {})
+    graph_setup = _graph_setup()
+    graph = graph_setup.setup_graph(list(REPORT_KEYS), parallel_analysts=True)
+
+    def run(symbol):
+        config = {}
+        spans = graph_setup.attach_node_spans(config)
+        graph.invoke(Propagator().create_initial_state(symbol, "2024-01-02"), config)
+        return spans
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first, second = pool.map(run, ["000001", "600519"])
+
+    assert set(first) == set(second) == graph_setup.parallel_analyst_nodes
+    assert first != second
+
+
+def test_sequential_mode_unchanged(monkeypatch):
+    seen = {}
+    _patch_nodes(monkeypatch, seen)
+    graph_setup = _graph_setup()
+    graph = graph_setup.setup_graph(["market"], parallel_analysts=False)
+
+    assert "tools_market" in graph.get_graph().nodes
+    assert graph_setup.parallel_analyst_nodes == set()
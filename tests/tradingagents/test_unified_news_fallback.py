@@ -0,0 +1,55 @@
+"""
+测试统一新闻工具按优先级取新闻源：大模型新闻工具不参与对冲，只作最后兜底
+"""
+from types import SimpleNamespace
+
+from tradingagents.tools.unified_news_tool import UnifiedNewsAnalyzer
+
+_NEWS = "新闻内容" * 40
+
+
+def _tool(result, calls, name):
+    def invoke(args):
+        calls.append(name)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return SimpleNamespace(invoke=invoke)
+
+
+def test_llm_tool_is_not_started_while_regular_sources_succeed():
+    calls = []
+    toolkit = SimpleNamespace(
+        get_global_news_openai=_tool(_NEWS, calls, "openai"),
+        get_google_news=_tool(_NEWS, calls, "google"),
+        get_finnhub_news=_tool(_NEWS, calls, "finnhub"),
+    )
+    analyzer = UnifiedNewsAnalyzer(toolkit)
+
+    result, source = analyzer._fetch_first_available("news_us_share", [
+        ("OpenAI美股新闻", "get_global_news_openai", {}, 50),
+        ("Google美股新闻", "get_google_news", {}, 50),
+        ("FinnHub美股新闻", "get_finnhub_news", {}, 50),
+    ])
+
+    assert (result, source) == (_NEWS, "Google美股新闻")
+    assert "openai" not in calls
+
+
+def test_llm_tool_is_last_resort():
+    calls = []
+    toolkit = SimpleNamespace(
+        get_realtime_stock_news=_tool(RuntimeError("boom"), calls, "realtime"),
+        get_google_news=_tool("", calls, "google"),
+        get_global_news_openai=_tool(_NEWS, calls, "openai"),
+    )
+    analyzer = UnifiedNewsAnalyzer(toolkit)
+
+    result, source = analyzer._fetch_first_available("news_a_share", [
+        ("东方财富实时新闻", "get_realtime_stock_news", {}, 100),
+        ("Google新闻", "get_google_news", {}, 50),
+        ("OpenAI全球新闻", "get_global_news_openai", {}, 50),
+    ])
+
+    assert (result, source) == (_NEWS, "OpenAI全球新闻")
+    assert calls[-1] == "openai" and sorted(calls[:-1]) == ["google", "realtime"]
@@ -0,0 +1,80 @@
+import asyncio
+
+from pymongo import ReplaceOne, UpdateOne
+
+
+def test_in_memory_db_matches_mongo_semantics():
+    from benchmarks.fake_db import InMemoryDatabase
+
+    db = InMemoryDatabase()
+    coll = db.sync["stock_daily_quotes"]
+    coll.create_index([("symbol", 1), ("trade_date", 1)], unique=True)
+
+    result = coll.bulk_write([
+        ReplaceOne({"symbol": "000001", "trade_date": "2025-01-02"}, {"symbol": "000001", "trade_date": "2025-01-02", "close": 10.0}, upsert=True),
+        ReplaceOne({"symbol": "600000", "trade_date": "2025-01-02"}, {"symbol": "600000", "trade_date": "2025-01-02", "close": 8.0}, upsert=True),
+        UpdateOne({"symbol": "000001", "trade_date": "2025-01-02"}, {"$max": {"close": 11.0}, "$setOnInsert": {"open": 1}}, upsert=True),
+    ])
+    assert result.upserted_count == 2 and result.modified_count == 1
+
+    docs = list(coll.find({"symbol": {"$in": ["000001", "300750"]}, "close": {"$gte": 10}}, {"_id": 0, "close": 1}))
+    assert docs == [{"close": 11.0}]
+    assert coll.find_one({}, sort=[("close", 1)])["symbol"] == "600000"
+    assert sorted(coll.distinct("symbol")) == ["000001", "600000"]
+
+    async def _async_view():
+        acoll = db.async_["stock_daily_quotes"]
+        return await acoll.find({"trade_date": "2025-01-02"}).sort("close", -1).limit(1).to_list(length=None)
+
+    assert [d["symbol"] for d in asyncio.run(_async_view())] == ["000001"]
+    ops = db.counter.snapshot()
+    assert ops["by_op"]["bulk_write"] == 1 and ops["documents_written"] == 3
+
+
+def test_fake_llm_tool_call_then_report():
+    from langchain_core.messages import HumanMessage, ToolMessage
+    from langchain_core.tools import tool
+
+    from benchmarks.fake_llm import FakeChatModel
+
+    @tool
+    def get_stock_market_data_unified(ticker: str, start_date: str, end_date: str) -> str:
+        """获取行情"""
+        return ""
+
+    llm = FakeChatModel(completion_tokens=50)
+    bound = llm.bind_tools([get_stock_market_data_unified])
+    prompt = HumanMessage(content="请对股票 600519 进行技术分析，交易日期为 2025-01-02")
+
+    first = bound.invoke([prompt])
+    call = first.tool_calls[0]
+    assert call["args"] == {"ticker": "600519", "start_date": "2024-12-03", "end_date": "2025-01-02"}
+
+    second = bound.invoke([prompt, first, ToolMessage(content="数据", tool_call_id=call["id"])])
+    assert not second.tool_calls and "最终交易建议" in second.content
+    assert llm.get_stats()["calls"] == 2 and llm.get_stats()["tool_calls"] == 1
+
+
+def test_replay_serves_preloaded_and_synthetic_data():
+    from benchmarks.recording import RecordReplay
+    from benchmarks.synthetic import SyntheticMarket
+    from tradingagents.dataflows.providers.china.tushare import TushareProvider
+
+    market = SyntheticMarket(universe_size=8)
+    original = TushareProvider.get_trade_calendar
+    with RecordReplay(market=market, fixture_dir="/nonexistent") as replay:
+        replay.preload("TushareProvider", "get_trade_calendar", ["2025-01-02"], "2025-01-01", "2025-01-02")
+        provider = TushareProvider()
+
+        async def _run():
+            # 20250101 与 2025-01-01 命中同一条预置结果
+            calendar = await provider.get_trade_calendar("20250101", end_date="2025-01-02")
+            bars = await provider.get_historical_data("000001", "2024-12-30", "2025-01-02")
+            return calendar, bars
+
+        calendar, bars = asyncio.run(_run())
+
+    assert calendar == ["2025-01-02"]
+    assert list(bars["date"]) == ["2024-12-30", "2024-12-31", "2025-01-01", "2025-01-02"]
+    assert replay.stats == {"calls": 2, "hits": 1, "synthetic": 1, "recorded": 0}
+    assert TushareProvider.get_trade_calendar is original
@@ -213,7 +213,33 @@ def get_zoneinfo(default: str = "Asia/Shanghai") -> _ZoneInfo:
         return _ZoneInfo("UTC")
 
 
+# --- Data directory helpers --------------------------------------------------
+from pathlib import Path as _Path
+
+_PROJECT_ROOT = _Path(__file__).resolve().parents[2]
+
+
+def _resolve_dir(value: str) -> _Path:
+    """Relative paths are resolved against the project root (not the working directory)."""
+    path = _Path(value).expanduser()
+    return path if path.is_absolute() else _PROJECT_ROOT / path
+
+
+def get_data_dir(*parts: str) -> _Path:
+    """Runtime data directory: TRADINGAGENTS_DATA_DIR (default <project>/data), optionally joined with parts."""
+    return _resolve_dir(os.getenv("TRADINGAGENTS_DATA_DIR") or "data").joinpath(*parts)
+
+
+def get_cache_dir(*parts: str) -> _Path:
+    """Runtime cache directory: TRADINGAGENTS_CACHE_DIR (default <data dir>/cache), optionally joined with parts."""
+    env_cache_dir = os.getenv("TRADINGAGENTS_CACHE_DIR")
+    base = _resolve_dir(env_cache_dir) if env_cache_dir else get_data_dir("cache")
+    return base.joinpath(*parts)
+
+
 __all__ = [
+    "get_data_dir",
+    "get_cache_dir",
     "get_float",
     "get_int",
     "get_bool",
@@ -6,16 +6,19 @@
 
 import os
 import json
+import base64
 import pickle
 import hashlib
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
 import pandas as pd
 
 from tradingagents.config.database_manager import get_database_manager
 
+from .codec import decode_frame, encode_frame
+
 class AdaptiveCacheSystem:
     """自适应缓存系统"""
     
@@ -69,12 +72,55 @@ class AdaptiveCacheSystem:
         expiry_time = cache_time + timedelta(seconds=ttl_seconds)
         return datetime.now() < expiry_time
     
+    @staticmethod
+    def _pack_data(data: Any) -> Dict[str, Any]:
+        """DataFrame 先编码为列式二进制再放入缓存信封，避免 pickle 逐对象序列化整个表"""
+        if isinstance(data, pd.DataFrame):
+            return {'data': encode_frame(data), 'data_format': 'frame'}
+        return {'data': data}
+
+    @staticmethod
+    def _unpack_data(cache_data: Dict) -> Dict:
+        """还原 _pack_data 编码的数据；旧缓存信封中直接保存的对象原样返回"""
+        if cache_data.pop('data_format', None) == 'frame':
+            cache_data['data'] = decode_frame(cache_data['data'])
+        return cache_data
+
+    def _encode_shared(self, data: Any) -> Tuple[Any, str]:
+        """
+        共享存储（Redis / MongoDB）的数据编码，不使用 pickle
+
+        DataFrame 以 Arrow 二进制保存，无法转换（或未安装 pyarrow）时改用 JSON；
+        其他数据原样放入 JSON / BSON 信封，无法序列化时由调用方降级到文件缓存。
+        """
+        if isinstance(data, pd.DataFrame):
+            try:
+                return encode_frame(data, allow_pickle=False), 'dataframe_binary'
+            except ValueError as e:
+                self.logger.debug(f"DataFrame 改用 JSON 保存: {e}")
+                return data.to_json(orient='split', date_format='iso'), 'dataframe_json'
+        return data, 'json'
+
+    @staticmethod
+    def _decode_shared(data: Any, data_format: str) -> Any:
+        """还原 _encode_shared 编码的数据；共享存储中的 pickle 条目一律拒绝"""
+        if data_format == 'dataframe_binary':
+            return decode_frame(bytes(data), allow_pickle=False)
+        if data_format == 'dataframe_json':
+            return decode_frame(data, json_orient='split')
+        if data_format == 'dataframe':
+            # 旧版以 to_json() 保存的条目
+            return decode_frame(data)
+        if data_format == 'json':
+            return data
+        raise ValueError(f"拒绝读取 {data_format} 格式的共享缓存条目")
+
     def _save_to_file(self, cache_key: str, data: Any, metadata: Dict) -> bool:
         """保存到文件缓存"""
         try:
             cache_file = self.cache_dir / f"{cache_key}.pkl"
             cache_data = {
-                'data': data,
+                **self._pack_data(data),
                 'metadata': metadata,
                 'timestamp': datetime.now(),
                 'backend': 'file'
@@ -101,7 +147,7 @@ class AdaptiveCacheSystem:
                 cache_data = pickle.load(f)
             
             self.logger.debug(f"文件缓存加载成功: {cache_key}")
-            return cache_data
+            return self._unpack_data(cache_data)
             
         except Exception as e:
             self.logger.error(f"文件缓存加载失败: {e}")
@@ -114,15 +160,18 @@ class AdaptiveCacheSystem:
             return False
         
         try:
+            payload, data_format = self._encode_shared(data)
+            if data_format == 'dataframe_binary':
+                payload = base64.b64encode(payload).decode('ascii')
             cache_data = {
-                'data': data,
+                'data': payload,
+                'data_format': data_format,
                 'metadata': metadata,
                 'timestamp': datetime.now().isoformat(),
                 'backend': 'redis'
             }
             
-            serialized_data = pickle.dumps(cache_data)
-            redis_client.setex(cache_key, ttl_seconds, serialized_data)
+            redis_client.setex(cache_key, ttl_seconds, json.dumps(cache_data, ensure_ascii=False))
             
             self.logger.debug(f"Redis缓存保存成功: {cache_key}")
             return True
@@ -142,11 +191,15 @@ class AdaptiveCacheSystem:
             if not serialized_data:
                 return None
             
-            cache_data = pickle.loads(serialized_data)
+            if isinstance(serialized_data, bytes):
+                serialized_data = serialized_data.decode('utf-8')
+            cache_data = json.loads(serialized_data)
             
-            # 转换时间戳
-            if isinstance(cache_data['timestamp'], str):
-                cache_data['timestamp'] = datetime.fromisoformat(cache_data['timestamp'])
+            payload = cache_data['data']
+            if cache_data.get('data_format') == 'dataframe_binary':
+                payload = base64.b64decode(payload)
+            cache_data['data'] = self._decode_shared(payload, cache_data.pop('data_format', None))
+            cache_data['timestamp'] = datetime.fromisoformat(cache_data['timestamp'])
             
             self.logger.debug(f"Redis缓存加载成功: {cache_key}")
             return cache_data
@@ -165,13 +218,8 @@ class AdaptiveCacheSystem:
             db = mongodb_client.tradingagents
             collection = db.cache
             
-            # 序列化数据
-            if isinstance(data, pd.DataFrame):
-                serialized_data = data.to_json()
-                data_type = 'dataframe'
-            else:
-                serialized_data = pickle.dumps(data).hex()
-                data_type = 'pickle'
+            # 序列化数据（BSON 信封，不使用 pickle）
+            serialized_data, data_type = self._encode_shared(data)
             
             cache_doc = {
                 '_id': cache_key,
@@ -211,14 +259,8 @@ class AdaptiveCacheSystem:
                 collection.delete_one({'_id': cache_key})
                 return None
             
-            # 反序列化数据
-            if doc['data_type'] == 'dataframe':
-                data = pd.read_json(doc['data'])
-            else:
-                data = pickle.loads(bytes.fromhex(doc['data']))
-            
             cache_data = {
-                'data': data,
+                'data': self._decode_shared(doc['data'], doc['data_type']),
                 'metadata': doc['metadata'],
                 'timestamp': doc['timestamp'],
                 'backend': 'mongodb'
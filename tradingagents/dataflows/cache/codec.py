@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+缓存数据编解码
+文件 / MongoDB / Redis 三种缓存后端共用的 DataFrame 二进制编码层
+
+- arrow：Arrow IPC 文件格式 + zstd 压缩（需要 pyarrow），列类型与索引（含 DatetimeIndex）原样保留，
+  文件条目可通过内存映射读取
+- pickle：pandas pickle + zstd 压缩（zstandard 不可用时退化为 zlib），
+  pyarrow 不可用或数据无法转换为 Arrow（如混合类型的 object 列）时使用
+
+解码按内容魔数识别格式，历史的 JSON 字符串 / CSV 文件 / 裸 pickle 缓存条目可透明读取。
+默认编码通过环境变量 TA_CACHE_CODEC 配置：auto（默认，优先 arrow）/ arrow / pickle。
+
+pickle 只用于本机文件缓存：Redis / MongoDB 等共享存储的条目可能被其他人写入，
+读取时应传 allow_pickle=False，只接受 Arrow（或 JSON）格式，避免反序列化任意对象。
+"""
+
+import io
+import os
+import pickle
+import threading
+import zlib
+from pathlib import Path
+from typing import List, Optional, Union
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# Arrow（可选）
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    ARROW_AVAILABLE = False
+
+# zstd（可选）
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+ARROW_MAGIC = b"ARROW1"
+PARQUET_MAGIC = b"PAR1"
+# pickle 编码的帧头：魔数 + 1 字节压缩方式
+FRAME_MAGIC = b"TAF1"
+_COMPRESS_ZSTD = b"z"
+_COMPRESS_ZLIB = b"d"
+
+ZSTD_LEVEL = 3
+PICKLE_PROTOCOL = 5
+
+# 各编码写文件时使用的扩展名，同时作为文件缓存元数据中的 file_format
+FILE_EXTENSIONS = {"arrow": "arrow", "pickle": "pkl"}
+
+Payload = Union[bytes, bytearray, memoryview]
+
+
+def available_codecs() -> List[str]:
+    """当前环境可用的编码"""
+    return (["arrow"] if ARROW_AVAILABLE else []) + ["pickle"]
+
+
+def get_default_codec() -> str:
+    """默认编码（TA_CACHE_CODEC），指定的编码不可用时退回 pickle"""
+    configured = os.getenv("TA_CACHE_CODEC", "auto").strip().lower()
+    if configured == "pickle":
+        return "pickle"
+    if configured not in ("auto", "arrow"):
+        logger.warning(f"⚠️ 未知的缓存编码 TA_CACHE_CODEC={configured}，使用自动选择")
+    return "arrow" if ARROW_AVAILABLE else "pickle"
+
+
+# ---- 编码 ----
+
+def _encode_arrow(df: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(df, preserve_index=None)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _encode_pickle(df: pd.DataFrame) -> bytes:
+    raw = pickle.dumps(df, protocol=PICKLE_PROTOCOL)
+    if ZSTD_AVAILABLE:
+        return FRAME_MAGIC + _COMPRESS_ZSTD + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return FRAME_MAGIC + _COMPRESS_ZLIB + zlib.compress(raw, 6)
+
+
+def encode_frame(df: pd.DataFrame, codec: Optional[str] = None, allow_pickle: bool = True) -> bytes:
+    """
+    将 DataFrame 编码为二进制
+
+    Args:
+        df: 待编码数据
+        codec: arrow / pickle，None 时使用默认编码
+        allow_pickle: 为 False 时只使用 arrow 编码，无法编码时抛出 ValueError（共享存储使用）
+
+    Returns:
+        编码后的字节串（自带格式魔数，解码时无需额外说明格式）
+    """
+    codec = "arrow" if not allow_pickle else (codec or get_default_codec())
+    if codec == "arrow" and ARROW_AVAILABLE:
+        try:
+            return _encode_arrow(df)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            if not allow_pickle:
+                raise ValueError(f"数据无法转换为 Arrow: {e}") from e
+            logger.debug(f"数据无法转换为 Arrow，改用 pickle 编码: {e}")
+    if not allow_pickle:
+        raise ValueError("未安装 pyarrow，无法使用 Arrow 编码")
+    return _encode_pickle(df)
+
+
+# ---- 解码 ----
+
+def frame_codec(payload: Payload) -> Optional[str]:
+    """按魔数识别二进制负载的编码，无法识别时返回 None"""
+    head = bytes(payload[:6])
+    if head.startswith(ARROW_MAGIC):
+        return "arrow"
+    if head.startswith(FRAME_MAGIC):
+        return "pickle"
+    if head.startswith(PARQUET_MAGIC):
+        return "parquet"
+    if head[:1] == b"\x80":
+        return "legacy_pickle"
+    return None
+
+
+def _require_arrow(codec: str) -> None:
+    if not ARROW_AVAILABLE:
+        raise RuntimeError(f"缓存条目为 {codec} 格式，需要安装 pyarrow 才能读取")
+
+
+def _decode_pickle_frame(payload: Payload) -> pd.DataFrame:
+    body = memoryview(payload)[len(FRAME_MAGIC) + 1:]
+    method = bytes(payload[len(FRAME_MAGIC):len(FRAME_MAGIC) + 1])
+    if method == _COMPRESS_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("缓存条目使用 zstd 压缩，需要安装 zstandard 才能读取")
+        raw = zstandard.ZstdDecompressor().decompress(body)
+    elif method == _COMPRESS_ZLIB:
+        raw = zlib.decompress(body)
+    else:
+        raise ValueError(f"未知的压缩方式: {method!r}")
+    return pickle.loads(raw)
+
+
+def decode_frame(payload: Union[Payload, str], json_orient: Optional[str] = None,
+                 allow_pickle: bool = True) -> pd.DataFrame:
+    """
+    解码缓存数据为 DataFrame
+
+    Args:
+        payload: encode_frame 的输出；兼容历史条目：DataFrame.to_json 字符串、裸 pickle 字节串
+        json_orient: 历史 JSON 条目写入时使用的 orient
+        allow_pickle: 为 False 时拒绝 pickle 格式的条目（抛出 ValueError），用于读取共享存储
+
+    Returns:
+        DataFrame
+    """
+    if isinstance(payload, str):
+        return pd.read_json(io.StringIO(payload), orient=json_orient)
+
+    codec = frame_codec(payload)
+    if not allow_pickle and codec in ("pickle", "legacy_pickle"):
+        raise ValueError("拒绝反序列化 pickle 格式的缓存条目（共享存储只接受 Arrow / JSON 格式）")
+    if codec == "arrow":
+        _require_arrow(codec)
+        return pa.ipc.open_file(pa.py_buffer(payload)).read_all().to_pandas()
+    if codec == "pickle":
+        return _decode_pickle_frame(payload)
+    if codec == "parquet":
+        _require_arrow(codec)
+        import pyarrow.parquet as pq
+        return pq.read_table(pa.BufferReader(payload)).to_pandas()
+    if codec == "legacy_pickle":
+        return pickle.loads(payload)
+    return pd.read_json(io.StringIO(bytes(payload).decode("utf-8")), orient=json_orient)
+
+
+# ---- 文件 ----
+
+def write_payload(path: Union[str, Path], payload: bytes) -> None:
+    """原子写入编码后的数据（先写临时文件再替换），并发读取方不会读到半个文件"""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def write_frame(path: Union[str, Path], df: pd.DataFrame, codec: Optional[str] = None) -> str:
+    """
+    编码并原子写入 DataFrame 文件
+
+    Returns:
+        实际使用的编码（数据无法转换为 Arrow 时为 pickle）
+    """
+    payload = encode_frame(df, codec)
+    write_payload(path, payload)
+    return frame_codec(payload)
+
+
+def read_frame(path: Union[str, Path], memory_map: bool = True) -> pd.DataFrame:
+    """
+    读取 DataFrame 文件
+
+    Arrow 文件默认通过内存映射读取，不把整个文件复制进 Python 内存；
+    历史的 .csv 文件按写入时的 to_csv(index=True) 格式解析。
+    """
+    path = Path(path)
+    if path.suffix == ".csv":
+        return pd.read_csv(path, index_col=0)
+
+    with open(path, "rb") as f:
+        head = f.read(len(ARROW_MAGIC))
+    if head.startswith(ARROW_MAGIC) and memory_map:
+        _require_arrow("arrow")
+        with pa.memory_map(str(path), "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+    return decode_frame(path.read_bytes())
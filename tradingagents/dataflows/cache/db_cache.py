@@ -19,6 +19,8 @@ import pandas as pd
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
+from .codec import decode_frame, encode_frame, frame_codec
+
 # MongoDB
 try:
     from pymongo import MongoClient
@@ -70,6 +72,8 @@ class DatabaseCacheManager:
         self.mongodb_client = None
         self.mongodb_db = None
         self.redis_client = None
+        # DataFrame 以二进制存入 Redis，需要不做 decode 的客户端
+        self.redis_binary_client = None
 
         self._init_mongodb()
         self._init_redis()
@@ -126,12 +130,20 @@ class DatabaseCacheManager:
             )
             # 测试连接
             self.redis_client.ping()
+            self.redis_binary_client = redis.from_url(
+                self.redis_url,
+                db=self.redis_db,
+                socket_timeout=5,
+                socket_connect_timeout=5,
+                decode_responses=False
+            )
 
             logger.info(f"✅ Redis连接成功: {self.redis_url}")
 
         except Exception as e:
             logger.error(f"❌ Redis连接失败: {e}")
             self.redis_client = None
+            self.redis_binary_client = None
 
     def _create_mongodb_indexes(self):
         """创建MongoDB索引"""
@@ -226,10 +238,17 @@ class DatabaseCacheManager:
             "updated_at": datetime.now(ZoneInfo(get_timezone_name()))
         }
 
-        # 处理数据格式
+        # 处理数据格式：DataFrame 以 Arrow 列式二进制保存（保留列类型与索引）；
+        # Redis / MongoDB 为共享存储，不使用 pickle，无法转换为 Arrow 时沿用 JSON
         if isinstance(data, pd.DataFrame):
-            doc["data"] = data.to_json(orient='records', date_format='iso')
-            doc["data_format"] = "dataframe_json"
+            try:
+                doc["data"] = encode_frame(data, allow_pickle=False)
+                doc["data_format"] = "dataframe_binary"
+                doc["codec"] = frame_codec(doc["data"])
+            except ValueError as e:
+                logger.debug(f"股票数据改用 JSON 保存: {e}")
+                doc["data"] = data.to_json(orient='records', date_format='iso')
+                doc["data_format"] = "dataframe_json"
         else:
             doc["data"] = str(data)
             doc["data_format"] = "text"
@@ -246,39 +265,55 @@ class DatabaseCacheManager:
         # 保存到Redis（快速缓存，6小时过期）
         if self.redis_client:
             try:
-                redis_data = {
-                    "data": doc["data"],
-                    "data_format": doc["data_format"],
-                    "symbol": symbol,
-                    "data_source": data_source,
-                    "created_at": doc["created_at"].isoformat()
-                }
-                self.redis_client.setex(
-                    cache_key,
-                    6 * 3600,  # 6小时过期
-                    json.dumps(redis_data, ensure_ascii=False)
-                )
+                self._cache_stock_doc_to_redis(cache_key, doc)
                 logger.info(f"⚡ 股票数据已缓存到Redis: {symbol} -> {cache_key}")
             except Exception as e:
                 logger.error(f"⚠️ Redis缓存失败: {e}")
 
         return cache_key
 
+    def _cache_stock_doc_to_redis(self, cache_key: str, doc: Dict[str, Any], ttl_seconds: int = 6 * 3600):
+        """
+        写入股票数据到Redis
+
+        DataFrame 直接以编码后的二进制作为值（自带格式魔数）；文本数据沿用 JSON 包装。
+        """
+        if doc["data_format"] == "dataframe_binary":
+            self.redis_binary_client.setex(cache_key, ttl_seconds, bytes(doc["data"]))
+            return
+
+        redis_data = {
+            "data": doc["data"],
+            "data_format": doc["data_format"],
+            "symbol": doc["symbol"],
+            "data_source": doc["data_source"],
+            "created_at": doc["created_at"].isoformat()
+        }
+        self.redis_client.setex(cache_key, ttl_seconds, json.dumps(redis_data, ensure_ascii=False))
+
+    @staticmethod
+    def _decode_stock_data(data: Any, data_format: str) -> Union[pd.DataFrame, str]:
+        """按 data_format 还原股票数据，兼容旧的 dataframe_json 条目；不接受 pickle 格式"""
+        if data_format == "dataframe_binary":
+            return decode_frame(bytes(data), allow_pickle=False)
+        if data_format == "dataframe_json":
+            return decode_frame(data, json_orient='records')
+        return data
+
     def load_stock_data(self, cache_key: str) -> Optional[Union[pd.DataFrame, str]]:
         """从Redis或MongoDB加载股票数据"""
 
         # 首先尝试从Redis加载（更快）
         if self.redis_client:
             try:
-                redis_data = self.redis_client.get(cache_key)
+                redis_data = self.redis_binary_client.get(cache_key)
                 if redis_data:
-                    data_dict = json.loads(redis_data)
                     logger.info(f"⚡ 从Redis加载数据: {cache_key}")
+                    if frame_codec(redis_data):
+                        return decode_frame(redis_data, allow_pickle=False)
 
-                    if data_dict["data_format"] == "dataframe_json":
-                        return pd.read_json(data_dict["data"], orient='records')
-                    else:
-                        return data_dict["data"]
+                    data_dict = json.loads(redis_data.decode('utf-8'))
+                    return self._decode_stock_data(data_dict["data"], data_dict["data_format"])
             except Exception as e:
                 logger.error(f"⚠️ Redis加载失败: {e}")
 
@@ -290,30 +325,18 @@ class DatabaseCacheManager:
 
                 if doc:
                     logger.info(f"💾 从MongoDB加载数据: {cache_key}")
+                    # 先解码：格式不受信任（如 pickle）的条目不回填 Redis
+                    data = self._decode_stock_data(doc["data"], doc["data_format"])
 
                     # 同时更新到Redis缓存
                     if self.redis_client:
                         try:
-                            redis_data = {
-                                "data": doc["data"],
-                                "data_format": doc["data_format"],
-                                "symbol": doc["symbol"],
-                                "data_source": doc["data_source"],
-                                "created_at": doc["created_at"].isoformat()
-                            }
-                            self.redis_client.setex(
-                                cache_key,
-                                6 * 3600,
-                                json.dumps(redis_data, ensure_ascii=False)
-                            )
+                            self._cache_stock_doc_to_redis(cache_key, doc)
                             logger.info(f"⚡ 数据已同步到Redis缓存")
                         except Exception as e:
                             logger.error(f"⚠️ Redis同步失败: {e}")
 
-                    if doc["data_format"] == "dataframe_json":
-                        return pd.read_json(doc["data"], orient='records')
-                    else:
-                        return doc["data"]
+                    return data
 
             except Exception as e:
                 logger.error(f"⚠️ MongoDB加载失败: {e}")
@@ -563,6 +586,8 @@ class DatabaseCacheManager:
 
         if self.redis_client:
             self.redis_client.close()
+            if self.redis_binary_client is not None:
+                self.redis_binary_client.close()
             logger.info(f"🔒 Redis连接已关闭")
 
 
@@ -17,6 +17,10 @@ import hashlib
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
+from .codec import FILE_EXTENSIONS, encode_frame, frame_codec, read_frame, write_payload
+from .metadata_index import CacheMetadataIndex
+from tradingagents.config.runtime_settings import get_cache_dir
+
 
 class StockDataCache:
     """股票数据缓存管理器 - 支持美股和A股数据缓存优化"""
@@ -28,6 +32,7 @@ class StockDataCache:
         Args:
             cache_dir: 缓存目录路径，默认为 tradingagents/dataflows/data_cache
         """
+        self._default_cache_dir = cache_dir is None
         if cache_dir is None:
             # 获取当前文件所在目录
             current_dir = Path(__file__).parent
@@ -51,6 +56,9 @@ class StockDataCache:
                         self.china_fundamentals_dir, self.metadata_dir]:
             dir_path.mkdir(exist_ok=True)
 
+        # 元数据索引（SQLite），首次启用时从 *_meta.json 一次性迁移
+        self.metadata_index = self._init_metadata_index()
+
         # 缓存配置 - 针对不同市场设置不同的TTL
         self.cache_config = {
             'us_stock_data': {
@@ -97,6 +105,50 @@ class StockDataCache:
         logger.info(f"   美股数据: ✅ 已配置")
         logger.info(f"   A股数据: ✅ 已配置")
 
+    def _metadata_index_path(self) -> Path:
+        """
+        元数据索引文件路径
+
+        显式指定缓存目录时放在其 metadata 子目录下；使用默认缓存目录（位于包目录内）时
+        放在配置的缓存目录（TRADINGAGENTS_CACHE_DIR，默认 <数据目录>/cache）下，按元数据目录区分文件
+        """
+        if not self._default_cache_dir:
+            return self.metadata_dir / "metadata_index.sqlite3"
+        digest = hashlib.md5(str(self.metadata_dir.resolve()).encode('utf-8')).hexdigest()[:12]
+        return get_cache_dir("metadata_index", f"metadata_index_{digest}.sqlite3")
+
+    def _init_metadata_index(self) -> Optional[CacheMetadataIndex]:
+        """初始化元数据索引，失败时返回 None 并回退到逐文件扫描"""
+        try:
+            index = CacheMetadataIndex(self._metadata_index_path())
+            if not index.is_migrated():
+                index.migrate_from_metadata_dir(self.metadata_dir)
+            return index
+        except Exception as e:
+            logger.warning(f"⚠️ 缓存元数据索引不可用，回退到文件扫描: {e}")
+            return None
+
+    def _active_metadata_index(self) -> Optional[CacheMetadataIndex]:
+        """
+        可用于查找的元数据索引
+
+        索引文件丢失时重新打开；元数据目录有索引之外的变更时先按目录扫描重新同步；
+        仍不可用时返回 None，调用方回退到逐文件扫描
+        """
+        if self.metadata_index is None:
+            return None
+        try:
+            if not self.metadata_index.index_path.exists():
+                self.metadata_index.close()
+                self.metadata_index = self._init_metadata_index()
+            elif self.metadata_index.is_stale(self.metadata_dir):
+                logger.info("🗂️ 缓存元数据目录有索引之外的变更，重新同步索引")
+                self.metadata_index.migrate_from_metadata_dir(self.metadata_dir)
+            return self.metadata_index
+        except Exception as e:
+            logger.warning(f"⚠️ 缓存元数据索引不可用，回退到文件扫描: {e}")
+            return None
+
     def _determine_market_type(self, symbol: str) -> str:
         """根据股票代码确定市场类型"""
         import re
@@ -213,12 +265,40 @@ class StockDataCache:
         metadata_path = self._get_metadata_path(cache_key)
         metadata_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
         metadata['cached_at'] = datetime.now().isoformat()
-        
+        data_file = Path(metadata.get('file_path', ''))
+        if data_file.is_file():
+            metadata['file_size'] = data_file.stat().st_size
+        
+        index = self.metadata_index
+        # 写入前已有其他进程的变更时不标记同步，留给下次查找时重新同步
+        index_in_sync = False
+        if index is not None:
+            try:
+                index_in_sync = not index.is_stale(self.metadata_dir)
+            except Exception:
+                index_in_sync = False
+
         with open(metadata_path, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+        if index is not None:
+            try:
+                index.upsert(cache_key, metadata)
+                if index_in_sync:
+                    index.mark_synced(self.metadata_dir)
+            except Exception as e:
+                logger.warning(f"⚠️ 更新缓存元数据索引失败: {e}")
     
     def _load_metadata(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """加载元数据"""
+        if self.metadata_index is not None:
+            try:
+                metadata = self.metadata_index.get(cache_key)
+                if metadata:
+                    return metadata
+            except Exception as e:
+                logger.warning(f"⚠️ 读取缓存元数据索引失败: {e}")
+
         metadata_path = self._get_metadata_path(cache_key)
         if not metadata_path.exists():
             return None
@@ -300,12 +380,15 @@ class StockDataCache:
                                            source=data_source,
                                            market=market_type)
 
-        # 保存数据
+        # 保存数据：DataFrame 以列式二进制保存（保留列类型与索引，读取时内存映射）
         if isinstance(data, pd.DataFrame):
-            cache_path = self._get_cache_path("stock_data", cache_key, "csv", symbol)
+            payload = encode_frame(data)
+            file_format = frame_codec(payload)
+            cache_path = self._get_cache_path("stock_data", cache_key, FILE_EXTENSIONS[file_format], symbol)
             cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
-            data.to_csv(cache_path, index=True)
+            write_payload(cache_path, payload)
         else:
+            file_format = 'txt'
             cache_path = self._get_cache_path("stock_data", cache_key, "txt", symbol)
             cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
             with open(cache_path, 'w', encoding='utf-8') as f:
@@ -320,7 +403,7 @@ class StockDataCache:
             'end_date': end_date,
             'data_source': data_source,
             'file_path': str(cache_path),
-            'file_format': 'csv' if isinstance(data, pd.DataFrame) else 'txt',
+            'file_format': file_format,
             'content_length': len(content_to_check)
         }
         self._save_metadata(cache_key, metadata)
@@ -342,8 +425,9 @@ class StockDataCache:
             return None
         
         try:
-            if metadata['file_format'] == 'csv':
-                return pd.read_csv(cache_path, index_col=0)
+            if metadata['file_format'] == 'csv' or metadata['file_format'] in FILE_EXTENSIONS:
+                # 兼容旧的 CSV 缓存文件
+                return read_frame(cache_path)
             else:
                 with open(cache_path, 'r', encoding='utf-8') as f:
                     return f.read()
@@ -388,6 +472,21 @@ class StockDataCache:
             return search_key
 
         # 如果没有精确匹配，查找部分匹配（相同股票代码的其他缓存）
+        index = self._active_metadata_index()
+        if index is not None:
+            cache_key = index.find_latest(
+                symbol, 'stock_data', market_type, data_source,
+                min_cached_at=datetime.now() - timedelta(hours=max_age_hours)
+            )
+            if cache_key and self.is_cache_valid(cache_key, max_age_hours, symbol, 'stock_data'):
+                desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
+                logger.info(f"📋 找到部分匹配的{desc}: {symbol} -> {cache_key}")
+                return cache_key
+
+            desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
+            logger.error(f"❌ 未找到有效的{desc}缓存: {symbol}")
+            return None
+
         for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
             try:
                 with open(metadata_file, 'r', encoding='utf-8') as f:
@@ -529,6 +628,21 @@ class StockDataCache:
             max_age_hours = self.cache_config.get(cache_type, {}).get('ttl_hours', 24)
         
         # 查找匹配的缓存
+        index = self._active_metadata_index()
+        if index is not None:
+            cache_key = index.find_latest(
+                symbol, 'fundamentals', market_type, data_source,
+                min_cached_at=datetime.now() - timedelta(hours=max_age_hours)
+            )
+            if cache_key and self.is_cache_valid(cache_key, max_age_hours, symbol, 'fundamentals'):
+                desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
+                logger.info(f"🎯 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_key}")
+                return cache_key
+
+            desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
+            logger.error(f"❌ 未找到有效的{desc}缓存: {symbol} ({data_source})")
+            return None
+
         for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
             try:
                 with open(metadata_file, 'r', encoding='utf-8') as f:
@@ -555,6 +669,24 @@ class StockDataCache:
         """清理过期缓存"""
         cutoff_time = datetime.now() - timedelta(days=max_age_days)
         cleared_count = 0
+
+        index = self._active_metadata_index()
+        if index is not None:
+            expired = index.find_expired(cutoff_time)
+            for entry in expired:
+                try:
+                    data_file = Path(entry.get('file_path') or '')
+                    if data_file.is_file():
+                        data_file.unlink()
+                    metadata_path = self._get_metadata_path(entry['cache_key'])
+                    if metadata_path.exists():
+                        metadata_path.unlink()
+                    cleared_count += 1
+                except Exception as e:
+                    logger.warning(f"⚠️ 清理缓存时出错: {e}")
+            index.delete([entry['cache_key'] for entry in expired])
+            logger.info(f"🧹 已清理 {cleared_count} 个过期缓存文件")
+            return
         
         for metadata_file in self.metadata_dir.glob("*_meta.json"):
             try:
@@ -593,7 +725,20 @@ class StockDataCache:
 
         # 统计有元数据的缓存文件
         metadata_files_count = 0
-        for metadata_file in self.metadata_dir.glob("*_meta.json"):
+        index = self._active_metadata_index()
+        if index is not None:
+            counts = index.count_by_data_type()
+            stats['stock_data_count'] = counts.get('stock_data', 0)
+            stats['news_count'] = counts.get('news', 0)
+            stats['fundamentals_count'] = counts.get('fundamentals', 0)
+            stats['total_files'] = sum(counts.values())
+            size_summary = index.size_summary()
+            total_size_bytes = size_summary['total_size']
+            stats['skipped_count'] = size_summary['skipped_count']
+            metadata_files_count = stats['total_files']
+
+        metadata_files = self.metadata_dir.glob("*_meta.json") if index is None else []
+        for metadata_file in metadata_files:
             try:
                 with open(metadata_file, 'r', encoding='utf-8') as f:
                     metadata = json.load(f)
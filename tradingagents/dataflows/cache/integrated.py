@@ -8,7 +8,7 @@
 import os
 import logging
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, Optional, Union
 import pandas as pd
 
 # 导入统一日志系统
@@ -16,6 +16,8 @@ from tradingagents.utils.logging_init import setup_dataflow_logging
 
 # 导入原有缓存系统
 from .file_cache import StockDataCache
+from .l1_cache import L1Cache
+from .range_cache import RangeCoverageCache
 
 # 导入自适应缓存系统
 try:
@@ -27,6 +29,17 @@ except ImportError as e:
     import logging
     logging.getLogger(__name__).debug(f"自适应缓存不可用: {e}")
 
+# 进程内 L1 缓存配置
+L1_CACHE_ENABLED = os.getenv("TA_L1_CACHE_ENABLED", "true").lower() == "true"
+L1_CACHE_MAX_MB = int(os.getenv("TA_L1_CACHE_MAX_MB", "256"))
+L1_CACHE_MAX_ENTRIES = int(os.getenv("TA_L1_CACHE_MAX_ENTRIES", "4096"))
+# L1 条目不知道下层条目已存在多久，用上限控制最长可能多保留的时间
+L1_CACHE_MAX_TTL_SECONDS = int(os.getenv("TA_L1_CACHE_MAX_TTL_SECONDS", "600"))
+
+# 缓存接口中的数据类型 -> cache_config / ttl_settings 中的类型名
+_TTL_DATA_TYPES = {"stock_data": "stock_data", "news_data": "news", "fundamentals_data": "fundamentals"}
+
+
 class IntegratedCacheManager:
     """集成缓存管理器 - 智能选择缓存策略"""
     
@@ -51,6 +64,12 @@ class IntegratedCacheManager:
                 self.use_adaptive = False
         else:
             self.logger.info("自适应缓存系统不可用，使用传统文件缓存")
+
+        # 进程内 L1 缓存：保存解码后的对象，同一进程内的重复读取不再访问 Redis/MongoDB/文件
+        self.l1_cache = L1Cache(L1_CACHE_MAX_MB * 1024 * 1024, L1_CACHE_MAX_ENTRIES) if L1_CACHE_ENABLED else None
+
+        # K线区间覆盖缓存：按股票维护合并后的日线序列，经本管理器持久化
+        self.range_cache = RangeCoverageCache(self)
         
         # 显示当前配置
         self._log_cache_status()
@@ -70,6 +89,52 @@ class IntegratedCacheManager:
         else:
             self.logger.info("📁 使用传统文件缓存系统")
     
+    def _l1_ttl_seconds(self, data_type: str, symbol: Optional[str] = None) -> float:
+        """
+        L1 条目的 TTL：取当前缓存系统 cache_config 中该数据类型的 TTL（不超过 L1 上限）
+
+        只知道缓存键、不知道股票代码时取各市场中最短的 TTL。
+        """
+        ttl_type = _TTL_DATA_TYPES.get(data_type, data_type)
+        markets = [self.legacy_cache._determine_market_type(symbol)] if symbol else ["china", "us"]
+        if self.use_adaptive:
+            ttl_settings = self.adaptive_cache.cache_config.get("ttl_settings", {})
+            ttl = min(ttl_settings.get(f"{market}_{ttl_type}", 7200) for market in markets)
+        else:
+            ttl = min(self.legacy_cache.cache_config.get(f"{market}_{ttl_type}", {}).get("ttl_hours", 24) * 3600
+                      for market in markets)
+        return min(ttl, L1_CACHE_MAX_TTL_SECONDS)
+
+    def _l1_put(self, cache_key: str, data: Any, data_type: str, symbol: str) -> None:
+        if self.l1_cache is not None and cache_key:
+            self.l1_cache.put(cache_key, data, self._l1_ttl_seconds(data_type, symbol))
+
+    def _l1_load(self, cache_key: str, data_type: str, loader) -> Optional[Any]:
+        """经 L1 读取：命中直接返回，未命中时由一个调用方从下层缓存加载（并发未命中合并）"""
+        if self.l1_cache is None:
+            return loader(cache_key)
+        return self.l1_cache.get_or_load(cache_key, lambda: loader(cache_key), self._l1_ttl_seconds(data_type))
+
+    def get_or_fetch(self, cache_key: str, fetcher: Callable[[], Any], data_type: str = "stock_data",
+                     symbol: Optional[str] = None,
+                     cacheable: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """
+        经 L1 获取数据，未命中时调用 fetcher 从数据源获取（fetcher 自行保存到下层缓存）
+
+        fetcher 在 L1 的在途 future 中执行：下层缓存也未命中时，同一个键的并发请求只访问一次数据源，
+        其余调用方等待同一结果。cacheable 判定为 False 的结果（如错误提示）不写入 L1。
+
+        Args:
+            cache_key: 请求键（包含影响结果的全部参数）
+            fetcher: 无参获取函数
+            data_type: 数据类型，决定 L1 条目的 TTL
+            symbol: 股票代码，用于识别市场
+            cacheable: 结果是否可缓存的判定函数
+        """
+        if self.l1_cache is None:
+            return fetcher()
+        return self.l1_cache.get_or_load(cache_key, fetcher, self._l1_ttl_seconds(data_type, symbol), cacheable)
+
     def save_stock_data(self, symbol: str, data: Any, start_date: str = None, 
                        end_date: str = None, data_source: str = "default") -> str:
         """
@@ -87,7 +152,7 @@ class IntegratedCacheManager:
         """
         if self.use_adaptive:
             # 使用自适应缓存系统
-            return self.adaptive_cache.save_data(
+            cache_key = self.adaptive_cache.save_data(
                 symbol=symbol,
                 data=data,
                 start_date=start_date or "",
@@ -97,13 +162,15 @@ class IntegratedCacheManager:
             )
         else:
             # 使用传统缓存系统
-            return self.legacy_cache.save_stock_data(
+            cache_key = self.legacy_cache.save_stock_data(
                 symbol=symbol,
                 data=data,
                 start_date=start_date,
                 end_date=end_date,
                 data_source=data_source
             )
+        self._l1_put(cache_key, data, "stock_data", symbol)
+        return cache_key
     
     def load_stock_data(self, cache_key: str) -> Optional[Any]:
         """
@@ -117,10 +184,10 @@ class IntegratedCacheManager:
         """
         if self.use_adaptive:
             # 使用自适应缓存系统
-            return self.adaptive_cache.load_data(cache_key)
+            return self._l1_load(cache_key, "stock_data", self.adaptive_cache.load_data)
         else:
             # 使用传统缓存系统
-            return self.legacy_cache.load_stock_data(cache_key)
+            return self._l1_load(cache_key, "stock_data", self.legacy_cache.load_stock_data)
     
     def find_cached_stock_data(self, symbol: str, start_date: str = None, 
                               end_date: str = None, data_source: str = "default") -> Optional[str]:
@@ -137,14 +204,13 @@ class IntegratedCacheManager:
             缓存键或None
         """
         if self.use_adaptive:
-            # 使用自适应缓存系统
-            return self.adaptive_cache.find_cached_data(
-                symbol=symbol,
-                start_date=start_date or "",
-                end_date=end_date or "",
-                data_source=data_source,
-                data_type="stock_data"
+            # 使用自适应缓存系统：查找需要加载数据判断有效性，经 L1 加载后紧接着的 load_stock_data 直接命中
+            cache_key = self.adaptive_cache._get_cache_key(
+                symbol, start_date or "", end_date or "", data_source, "stock_data"
             )
+            if self._l1_load(cache_key, "stock_data", self.adaptive_cache.load_data) is not None:
+                return cache_key
+            return None
         else:
             # 使用传统缓存系统
             return self.legacy_cache.find_cached_stock_data(
@@ -154,43 +220,68 @@ class IntegratedCacheManager:
                 data_source=data_source
             )
     
+    def get_stock_data_range(self, symbol: str, start_date: str, end_date: str, fetcher,
+                             period: str = "daily") -> pd.DataFrame:
+        """
+        按日期区间获取K线：已缓存的部分直接切片，只对未覆盖的头尾日期调用 fetcher
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            fetcher: 数据源获取函数，签名 fetcher(symbol, start_date, end_date)
+            period: 数据周期
+
+        Returns:
+            pd.DataFrame: 请求区间内的数据，获取失败时为空
+        """
+        return self.range_cache.get_range(symbol, start_date, end_date, fetcher, period=period)
+
+    def invalidate_stock_data_range(self, symbol: str, period: str = "daily") -> None:
+        """丢弃某只股票的区间缓存序列（如已知发生除权除息）"""
+        self.range_cache.invalidate(symbol, period)
+
     def save_news_data(self, symbol: str, data: Any, data_source: str = "default") -> str:
         """保存新闻数据"""
         if self.use_adaptive:
-            return self.adaptive_cache.save_data(
+            cache_key = self.adaptive_cache.save_data(
                 symbol=symbol,
                 data=data,
                 data_source=data_source,
                 data_type="news_data"
             )
         else:
-            return self.legacy_cache.save_news_data(symbol, data, data_source)
+            cache_key = self.legacy_cache.save_news_data(symbol, data, data_source)
+        self._l1_put(cache_key, data, "news_data", symbol)
+        return cache_key
     
     def load_news_data(self, cache_key: str) -> Optional[Any]:
         """加载新闻数据"""
         if self.use_adaptive:
-            return self.adaptive_cache.load_data(cache_key)
+            return self._l1_load(cache_key, "news_data", self.adaptive_cache.load_data)
         else:
-            return self.legacy_cache.load_news_data(cache_key)
+            return self._l1_load(cache_key, "news_data", self.legacy_cache.load_news_data)
     
     def save_fundamentals_data(self, symbol: str, data: Any, data_source: str = "default") -> str:
         """保存基本面数据"""
         if self.use_adaptive:
-            return self.adaptive_cache.save_data(
+            cache_key = self.adaptive_cache.save_data(
                 symbol=symbol,
                 data=data,
                 data_source=data_source,
                 data_type="fundamentals_data"
             )
         else:
-            return self.legacy_cache.save_fundamentals_data(symbol, data, data_source)
+            cache_key = self.legacy_cache.save_fundamentals_data(symbol, data, data_source)
+        self._l1_put(cache_key, data, "fundamentals_data", symbol)
+        return cache_key
     
     def load_fundamentals_data(self, cache_key: str) -> Optional[Any]:
         """加载基本面数据"""
         if self.use_adaptive:
-            return self.adaptive_cache.load_data(cache_key)
+            return self._l1_load(cache_key, "fundamentals_data", self.adaptive_cache.load_data)
         else:
-            return self.legacy_cache.load_fundamentals_data(cache_key)
+            return self._l1_load(cache_key, "fundamentals_data", self.legacy_cache.load_fundamentals_data)
 
     def find_cached_fundamentals_data(self, symbol: str, data_source: str = None,
                                      max_age_hours: int = None) -> Optional[str]:
@@ -243,6 +334,7 @@ class IntegratedCacheManager:
             stats['backend_info']['database_available'] = self.db_manager.is_database_available()
             stats['backend_info']['mongodb_available'] = self.db_manager.is_mongodb_available()
             stats['backend_info']['redis_available'] = self.db_manager.is_redis_available()
+            stats['l1_cache'] = self.l1_cache.stats() if self.l1_cache is not None else None
 
             return stats
         else:
@@ -259,6 +351,7 @@ class IntegratedCacheManager:
             stats['backend_info']['database_available'] = False
             stats['backend_info']['mongodb_available'] = False
             stats['backend_info']['redis_available'] = False
+            stats['l1_cache'] = self.l1_cache.stats() if self.l1_cache is not None else None
 
             return stats
     
@@ -267,6 +360,9 @@ class IntegratedCacheManager:
         if self.use_adaptive:
             self.adaptive_cache.clear_expired_cache()
 
+        if self.l1_cache is not None:
+            self.l1_cache.purge_expired()
+
         # 总是清理传统缓存
         self.legacy_cache.clear_expired_cache()
 
@@ -282,6 +378,10 @@ class IntegratedCacheManager:
         """
         cleared_count = 0
 
+        # 0. 清空进程内 L1 缓存，避免继续返回下层已删除的数据
+        if self.l1_cache is not None:
+            self.l1_cache.clear()
+
         # 1. 清理 Redis 缓存
         if self.use_adaptive and self.db_manager.is_redis_available():
             try:
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+进程内 L1 缓存
+放在 Redis / MongoDB / 文件缓存之前，保存已解码的对象：
+- 按估算字节数限制容量的 LRU，超出时淘汰最久未使用的条目
+- 每个条目有自己的 TTL（由调用方按数据类型传入）
+- 同一个键的并发未命中合并为一次加载（single-flight），其余调用方等待其结果
+- 命中/未命中/淘汰等计数供缓存统计接口展示
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 等待在途加载的最长时间（秒）
+LOAD_WAIT_TIMEOUT_SECONDS = 60
+
+_MB = 1024 * 1024
+
+
+def estimate_size(value: Any) -> int:
+    """估算对象占用的字节数（DataFrame 按 deep memory_usage 计算）"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _copy_value(value: Any) -> Any:
+    """DataFrame/Series 返回副本，避免调用方修改缓存中的对象"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    return value
+
+
+class L1Cache:
+    """按字节数限制容量、带 TTL 与 single-flight 的进程内 LRU 缓存"""
+
+    def __init__(self, max_bytes: int = 256 * _MB, max_entries: int = 4096):
+        """
+        Args:
+            max_bytes: 缓存对象估算总字节数上限
+            max_entries: 条目数上限
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        # key -> (value, size, expires_at)
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._size = 0
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "rejected": 0,
+        }
+
+    # ---- 内部操作（调用方持有锁） ----
+
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, size, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self._size -= size
+            self._counters["expirations"] += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: str, value: Any, ttl_seconds: float) -> None:
+        size = estimate_size(value)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= old[1]
+        if size > self.max_bytes:
+            self._counters["rejected"] += 1
+            return
+        self._entries[key] = (value, size, time.monotonic() + ttl_seconds)
+        self._size += size
+        while self._size > self.max_bytes or len(self._entries) > self.max_entries:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            self._counters["evictions"] += 1
+
+    # ---- 公共接口 ----
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，未命中或已过期时返回 None"""
+        with self._lock:
+            hit, value = self._lookup(key)
+            self._counters["hits" if hit else "misses"] += 1
+        return _copy_value(value) if hit else None
+
+    def put(self, key: str, value: Any, ttl_seconds: float) -> None:
+        """写入缓存；None 与 TTL 非正的条目不缓存"""
+        if value is None or ttl_seconds <= 0:
+            return
+        value = _copy_value(value)
+        with self._lock:
+            self._store(key, value, ttl_seconds)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl_seconds: float,
+                    cacheable: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """
+        读取缓存，未命中时调用 loader 加载并缓存
+
+        同一个键的并发未命中只调用一次 loader，其余调用方等待同一结果；
+        loader 返回 None 或 cacheable 判定为 False 的结果只交给在途调用方，不缓存。
+        """
+        with self._lock:
+            hit, value = self._lookup(key)
+            if hit:
+                self._counters["hits"] += 1
+                return _copy_value(value)
+            self._counters["misses"] += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self._counters["loads"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            return _copy_value(future.result(timeout=LOAD_WAIT_TIMEOUT_SECONDS))
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            if value is not None and ttl_seconds > 0 and (cacheable is None or cacheable(value)):
+                self._store(key, value, ttl_seconds)
+        future.set_result(value)
+        return _copy_value(value)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size -= entry[1]
+
+    def purge_expired(self) -> int:
+        """删除已过期的条目，返回删除数量"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (_, _, expires_at) in self._entries.items() if now >= expires_at]
+            for key in expired:
+                self._size -= self._entries.pop(key)[1]
+            self._counters["expirations"] += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "size_mb": round(self._size / _MB, 2),
+                "max_size_mb": round(self.max_bytes / _MB, 2),
+                "max_entries": self.max_entries,
+            }
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+文件缓存元数据索引
+使用单个 SQLite 数据库索引 StockDataCache 的元数据，避免每次查找都遍历并解析全部 *_meta.json
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 索引列（其余元数据字段完整保存在 metadata_json 中）
+_INDEXED_FIELDS = (
+    'symbol', 'data_type', 'market_type', 'data_source',
+    'start_date', 'end_date', 'cached_at', 'file_path',
+    'file_format', 'content_length', 'file_size',
+)
+
+
+class CacheMetadataIndex:
+    """基于 SQLite 的缓存元数据索引
+
+    以 (symbol, data_type, market_type, data_source, cached_at) 建立复合索引，
+    查找、过期清理和统计均通过 B-Tree 索引完成，复杂度为 O(log n)。
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, index_path: Path):
+        """
+        初始化元数据索引
+
+        Args:
+            index_path: SQLite 索引文件路径
+        """
+        self.index_path = Path(index_path)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    def _init_schema(self):
+        """创建表结构和索引"""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_metadata (
+                    cache_key      TEXT PRIMARY KEY,
+                    symbol         TEXT,
+                    data_type      TEXT,
+                    market_type    TEXT,
+                    data_source    TEXT,
+                    start_date     TEXT,
+                    end_date       TEXT,
+                    cached_at      TEXT,
+                    file_path      TEXT,
+                    file_format    TEXT,
+                    content_length INTEGER,
+                    file_size      INTEGER,
+                    metadata_json  TEXT
+                )
+            """)
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cache_lookup
+                ON cache_metadata (symbol, data_type, market_type, data_source, cached_at)
+            """)
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cache_cached_at
+                ON cache_metadata (cached_at)
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS index_info (
+                    key   TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            """)
+
+    def _get_info(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM index_info WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    @staticmethod
+    def _to_row(cache_key: str, metadata: Dict[str, Any]) -> tuple:
+        values = [metadata.get(field) for field in _INDEXED_FIELDS]
+        return (cache_key, *values, json.dumps(metadata, ensure_ascii=False, default=str))
+
+    def upsert(self, cache_key: str, metadata: Dict[str, Any]):
+        """写入或更新一条元数据"""
+        placeholders = ', '.join(['?'] * (len(_INDEXED_FIELDS) + 2))
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO cache_metadata "
+                f"(cache_key, {', '.join(_INDEXED_FIELDS)}, metadata_json) VALUES ({placeholders})",
+                self._to_row(cache_key, metadata)
+            )
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """按缓存键读取元数据"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT metadata_json FROM cache_metadata WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        if not row:
+            return None
+        try:
+            return json.loads(row['metadata_json'])
+        except (TypeError, ValueError):
+            return None
+
+    def delete(self, cache_keys: List[str]):
+        """删除若干条元数据"""
+        if not cache_keys:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM cache_metadata WHERE cache_key = ?",
+                [(key,) for key in cache_keys]
+            )
+
+    def find_latest(self, symbol: str, data_type: str, market_type: str,
+                    data_source: Optional[str] = None,
+                    min_cached_at: Optional[datetime] = None) -> Optional[str]:
+        """
+        查找最新的匹配缓存
+
+        Args:
+            symbol: 股票代码
+            data_type: 数据类型（stock_data / news / fundamentals）
+            market_type: 市场类型（china / us）
+            data_source: 数据源，None 表示不限
+            min_cached_at: 最早缓存时间，早于此时间的条目视为过期
+
+        Returns:
+            cache_key: 命中的缓存键，未命中返回 None
+        """
+        sql = ("SELECT cache_key FROM cache_metadata "
+               "WHERE symbol = ? AND data_type = ? AND market_type = ?")
+        params: List[Any] = [symbol, data_type, market_type]
+        if data_source is not None:
+            sql += " AND data_source = ?"
+            params.append(data_source)
+        if min_cached_at is not None:
+            sql += " AND cached_at >= ?"
+            params.append(min_cached_at.isoformat())
+        sql += " ORDER BY cached_at DESC LIMIT 1"
+
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return row['cache_key'] if row else None
+
+    def find_expired(self, cutoff_time: datetime) -> List[Dict[str, Any]]:
+        """查找缓存时间早于 cutoff_time 的条目"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT cache_key, file_path FROM cache_metadata WHERE cached_at < ?",
+                (cutoff_time.isoformat(),)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        """索引条目总数"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_metadata").fetchone()[0]
+
+    def count_by_data_type(self) -> Dict[str, int]:
+        """按数据类型统计条目数"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data_type, COUNT(*) AS cnt FROM cache_metadata GROUP BY data_type"
+            ).fetchall()
+        return {row['data_type'] or 'unknown': row['cnt'] for row in rows}
+
+    def size_summary(self) -> Dict[str, int]:
+        """统计数据文件总大小以及没有实际文件（被跳过）的条目数"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(file_size), 0) AS total_size, "
+                "SUM(CASE WHEN file_size IS NULL THEN 1 ELSE 0 END) AS skipped "
+                "FROM cache_metadata"
+            ).fetchone()
+        return {'total_size': row['total_size'] or 0, 'skipped_count': row['skipped'] or 0}
+
+    @staticmethod
+    def _dir_mtime(metadata_dir: Path) -> str:
+        return str(Path(metadata_dir).stat().st_mtime_ns)
+
+    def is_stale(self, metadata_dir: Path) -> bool:
+        """
+        索引是否可能与元数据目录不一致
+
+        索引文件被删除，或元数据目录在上次同步后有索引之外的增删（如未启用索引的旧版本进程写入、手工清理）
+        """
+        if not self.index_path.exists():
+            return True
+        with self._lock:
+            recorded = self._get_info('metadata_dir_mtime')
+        return recorded != self._dir_mtime(metadata_dir)
+
+    def mark_synced(self, metadata_dir: Path):
+        """记录元数据目录当前状态（本进程的写入已同步到索引）"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO index_info (key, value) VALUES (?, ?)",
+                ('metadata_dir_mtime', self._dir_mtime(metadata_dir))
+            )
+
+    def is_migrated(self) -> bool:
+        """是否已完成从 *_meta.json 的迁移"""
+        with self._lock:
+            return self._get_info('migrated_at') is not None
+
+    def migrate_from_metadata_dir(self, metadata_dir: Path) -> int:
+        """
+        从 *_meta.json 文件迁移元数据；索引过期时也用于重新同步（删除元数据文件已不存在的条目）
+
+        Args:
+            metadata_dir: 元数据目录
+
+        Returns:
+            int: 迁移的条目数
+        """
+        rows = []
+        dir_mtime = self._dir_mtime(metadata_dir)
+        for metadata_file in Path(metadata_dir).glob("*_meta.json"):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                cache_key = metadata_file.name[:-len("_meta.json")]
+                if 'file_size' not in metadata:
+                    data_file = Path(metadata.get('file_path', ''))
+                    if data_file.is_file():
+                        metadata['file_size'] = data_file.stat().st_size
+                rows.append(self._to_row(cache_key, metadata))
+            except Exception as e:
+                logger.warning(f"⚠️ 迁移元数据失败 {metadata_file.name}: {e}")
+
+        placeholders = ', '.join(['?'] * (len(_INDEXED_FIELDS) + 2))
+        with self._lock, self._conn:
+            # 已存在的条目以索引为准，不覆盖迁移前写入的新数据
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO cache_metadata "
+                f"(cache_key, {', '.join(_INDEXED_FIELDS)}, metadata_json) VALUES ({placeholders})",
+                rows
+            )
+            present = {row[0] for row in rows}
+            missing = [
+                (key,) for (key,) in self._conn.execute("SELECT cache_key FROM cache_metadata").fetchall()
+                if key not in present
+            ]
+            self._conn.executemany("DELETE FROM cache_metadata WHERE cache_key = ?", missing)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO index_info (key, value) VALUES (?, ?)",
+                ('migrated_at', datetime.now().isoformat())
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO index_info (key, value) VALUES (?, ?)",
+                ('metadata_dir_mtime', dir_mtime)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO index_info (key, value) VALUES (?, ?)",
+                ('schema_version', str(self.SCHEMA_VERSION))
+            )
+
+        logger.info(f"🗂️ 缓存元数据索引迁移完成: {len(rows)} 条")
+        return len(rows)
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
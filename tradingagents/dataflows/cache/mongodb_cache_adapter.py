@@ -347,6 +347,42 @@ class MongoDBCacheAdapter:
             logger.warning(f"⚠️ 获取行情数据失败: {e}")
             return None
 
+    def get_indicator_snapshot(self, symbol: str, as_of: str = None) -> Optional[Dict[str, Any]]:
+        """
+        获取预计算的技术指标快照（stock_indicators_daily，日线同步后生成）
+
+        Args:
+            symbol: 股票代码
+            as_of: 截止交易日 YYYY-MM-DD，None 表示最新
+
+        Returns:
+            快照文档（MA/EMA/MACD/RSI/BOLL/ATR/KDJ 等），未找到返回 None
+        """
+        if not self.use_app_cache or self.db is None:
+            return None
+
+        try:
+            code6 = str(symbol).zfill(6)
+            collection = self.db.stock_indicators_daily
+            query = {"symbol": code6}
+            if as_of:
+                query["trade_date"] = {"$lte": as_of}
+
+            # 按数据源优先级查询
+            for src in self._get_data_source_priority(code6):
+                doc = collection.find_one({**query, "data_source": src}, {"_id": 0, "state": 0},
+                                          sort=[("trade_date", -1)])
+                if doc:
+                    logger.debug(f"✅ 从MongoDB获取指标快照: {symbol} {doc.get('trade_date')}, 数据源: {src}")
+                    return doc
+
+            logger.debug(f"📊 MongoDB中未找到指标快照: {symbol}")
+            return None
+
+        except Exception as e:
+            logger.warning(f"⚠️ 获取指标快照失败: {e}")
+            return None
+
 
 # 全局实例
 _mongodb_cache_adapter = None
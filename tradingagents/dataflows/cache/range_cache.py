@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+日期区间感知的K线缓存
+按股票维护一条合并后的日线时间序列，任意 [start, end] 请求优先从已缓存部分切片，
+只对未覆盖的头部/尾部日期调用数据源
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 请求区间与已覆盖区间相距超过该天数时，不再拼接中间空档，直接以新区间重建序列
+MAX_BRIDGE_DAYS = 370
+# 紧邻已覆盖区间的缺口获取失败或返回为空时，在该时间内（秒）不再重复请求同一缺口；空缺口不记入覆盖区间
+EMPTY_GAP_TTL_SECONDS = float(os.getenv("TA_RANGE_CACHE_EMPTY_TTL_SECONDS", "300"))
+# 获取缺口时向已覆盖区间多取的天数，用重叠K线的收盘价检测复权因子是否变化
+OVERLAP_DAYS = 7
+# 重叠K线收盘价的相对偏差超过该值即认为复权因子已变化（除权除息后前复权价格整体改变）
+ADJUST_TOLERANCE = 1e-4
+
+DateRange = Tuple[pd.Timestamp, pd.Timestamp]
+
+
+class RangeCoverageCache:
+    """K线区间覆盖缓存
+
+    每个 (symbol, period) 维护一条连续的已覆盖区间 [covered_start, covered_end] 和对应的合并序列。
+    序列通过底层缓存管理器（StockDataCache / IntegratedCacheManager）持久化，
+    使用固定的缓存键（不含日期），因此滑动窗口分析可以复用同一条序列。
+
+    覆盖区间只扩展到数据源实际返回的日期；获取缺口时与已缓存序列重叠几天，
+    重叠K线收盘价不一致（前复权序列遇到新的除权除息）时丢弃旧序列并整段重新获取。
+    """
+
+    def __init__(self, cache_manager: Any = None):
+        """
+        初始化区间缓存
+
+        Args:
+            cache_manager: 底层缓存管理器，None 时仅在进程内缓存
+        """
+        self.cache_manager = cache_manager
+        self._series: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self._coverage: Dict[Tuple[str, str], DateRange] = {}
+        self._empty_gaps: Dict[Tuple[str, str], Dict[DateRange, float]] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def _source_tag(period: str) -> str:
+        return f"range_{period}"
+
+    def _get_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    @staticmethod
+    def _normalize(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """确保 date 列为 datetime 并按日期排序去重"""
+        if df is None or df.empty or 'date' not in df.columns:
+            return pd.DataFrame()
+        out = df.copy()
+        out['date'] = pd.to_datetime(out['date'])
+        out = out.drop_duplicates(subset='date', keep='last').sort_values('date')
+        return out.reset_index(drop=True)
+
+    def _load_persisted(self, symbol: str, period: str) -> None:
+        """从底层缓存加载已持久化的序列，覆盖区间按序列首尾日期保守估计"""
+        key = (symbol, period)
+        if key in self._series or self.cache_manager is None:
+            return
+        try:
+            cache_key = self.cache_manager.find_cached_stock_data(
+                symbol=symbol, start_date=None, end_date=None,
+                data_source=self._source_tag(period)
+            )
+            if not cache_key:
+                return
+            df = self._normalize(self.cache_manager.load_stock_data(cache_key))
+            if df.empty:
+                return
+            self._series[key] = df
+            self._set_coverage(key, df['date'].iloc[0], df['date'].iloc[-1])
+            logger.debug(f"📦 [区间缓存] 加载{symbol}序列: {len(df)}条")
+        except Exception as e:
+            logger.warning(f"⚠️ [区间缓存] 加载{symbol}序列失败: {e}")
+
+    def _set_coverage(self, key: Tuple[str, str], start: pd.Timestamp, end: pd.Timestamp) -> None:
+        """记录覆盖区间；当天的K线在收盘前可能变化，覆盖区间最多记到昨天"""
+        yesterday = pd.Timestamp(datetime.now().date() - timedelta(days=1))
+        end = min(end, yesterday)
+        if end >= start:
+            self._coverage[key] = (start, end)
+        else:
+            self._coverage.pop(key, None)
+
+    def _persist(self, symbol: str, period: str, df: pd.DataFrame) -> None:
+        if self.cache_manager is None:
+            return
+        try:
+            self.cache_manager.save_stock_data(
+                symbol, df, None, None, self._source_tag(period)
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ [区间缓存] 保存{symbol}序列失败: {e}")
+
+    @staticmethod
+    def missing_ranges(start: pd.Timestamp, end: pd.Timestamp,
+                       coverage: Optional[DateRange]) -> List[DateRange]:
+        """
+        计算请求区间中未被覆盖的部分
+
+        Args:
+            start: 请求开始日期
+            end: 请求结束日期
+            coverage: 已覆盖区间，None 表示没有缓存
+
+        Returns:
+            需要从数据源获取的日期区间列表（头部和/或尾部）
+        """
+        if coverage is None:
+            return [(start, end)]
+
+        covered_start, covered_end = coverage
+        one_day = pd.Timedelta(days=1)
+
+        # 与已覆盖区间相距太远，不拼接
+        if (start - covered_end).days > MAX_BRIDGE_DAYS or (covered_start - end).days > MAX_BRIDGE_DAYS:
+            return [(start, end)]
+
+        gaps = []
+        if start < covered_start:
+            gaps.append((start, covered_start - one_day))
+        if end > covered_end:
+            gaps.append((covered_end + one_day, end))
+        return gaps
+
+    def get_range(self, symbol: str, start_date: str, end_date: str,
+                  fetcher: Callable[[str, str, str], Optional[pd.DataFrame]],
+                  period: str = "daily") -> pd.DataFrame:
+        """
+        获取 [start_date, end_date] 的K线数据，只对缺口调用 fetcher
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            fetcher: 数据源获取函数，签名 fetcher(symbol, start_date, end_date)，
+                     返回带 date 列的标准化 DataFrame
+            period: 数据周期
+
+        Returns:
+            pd.DataFrame: 请求区间内的数据，获取失败时为空
+        """
+        key = (symbol, period)
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize()
+
+        with self._get_lock(key):
+            self._load_persisted(symbol, period)
+            coverage = self._coverage.get(key)
+            gaps = self.missing_ranges(start, end, coverage)
+
+            if coverage is not None and gaps == [(start, end)]:
+                # 与旧序列不相连，重建
+                self._drop(key)
+                coverage = None
+
+            gaps = [gap for gap in gaps if not self._recently_empty(key, gap)]
+            if not gaps:
+                logger.info(f"🎯 [区间缓存] {symbol} {start.date()}~{end.date()} 完全命中")
+            elif not self._fill_gaps(symbol, period, gaps, fetcher):
+                logger.info(f"🔁 [区间缓存] {symbol} 复权因子已变化，丢弃旧序列并重新获取 {start.date()}~{end.date()}")
+                self._drop(key)
+                self._fill_gaps(symbol, period, [(start, end)], fetcher)
+
+            series = self._series.get(key, pd.DataFrame())
+            if series.empty:
+                return pd.DataFrame()
+            mask = (series['date'] >= start) & (series['date'] <= end)
+            return series.loc[mask].reset_index(drop=True)
+
+    def _fill_gaps(self, symbol: str, period: str, gaps: List[DateRange],
+                   fetcher: Callable[[str, str, str], Optional[pd.DataFrame]]) -> bool:
+        """
+        获取缺口并合并到序列
+
+        Returns:
+            bool: 重叠K线与已缓存序列不一致（复权因子变化）时返回 False，此时序列未修改
+        """
+        key = (symbol, period)
+        coverage = self._coverage.get(key)
+        series = self._series.get(key)
+        fetched = []
+        for gap_start, gap_end in gaps:
+            fetch_start, fetch_end = gap_start, gap_end
+            if coverage is not None:
+                # 向已覆盖区间多取几天，用于检测复权因子变化
+                if gap_end < coverage[0]:
+                    fetch_end = min(coverage[1], gap_end + pd.Timedelta(days=OVERLAP_DAYS))
+                else:
+                    fetch_start = max(coverage[0], gap_start - pd.Timedelta(days=OVERLAP_DAYS))
+            fetch_start_str = fetch_start.strftime('%Y-%m-%d')
+            fetch_end_str = fetch_end.strftime('%Y-%m-%d')
+            logger.info(f"🔄 [区间缓存] {symbol} 获取缺口 {fetch_start_str} ~ {fetch_end_str}")
+            try:
+                df = self._normalize(fetcher(symbol, fetch_start_str, fetch_end_str))
+            except Exception as e:
+                logger.warning(f"⚠️ [区间缓存] {symbol} 获取缺口失败: {e}")
+                df = pd.DataFrame()
+
+            if coverage is not None and not df.empty:
+                if self._adjustment_changed(series, df, coverage):
+                    return False
+                df = df[(df['date'] < coverage[0]) | (df['date'] > coverage[1])]
+            if df.empty:
+                if coverage is not None:
+                    # 空缺口（节假日、停牌或获取失败）不记入覆盖区间，短时间内不重复请求
+                    self._empty_gaps.setdefault(key, {})[(gap_start, gap_end)] = time.monotonic() + EMPTY_GAP_TTL_SECONDS
+                # 首次获取即失败时不记录覆盖区间
+                continue
+            fetched.append(df)
+
+        if not fetched:
+            return True
+
+        merged = self._normalize(pd.concat([p for p in [series] + fetched if p is not None and not p.empty],
+                                           ignore_index=True))
+        # 覆盖区间只扩展到数据源实际返回的日期
+        returned_start = min(df['date'].iloc[0] for df in fetched)
+        returned_end = max(df['date'].iloc[-1] for df in fetched)
+        new_start = min(returned_start, coverage[0]) if coverage else returned_start
+        new_end = max(returned_end, coverage[1]) if coverage else returned_end
+        self._set_coverage(key, new_start, new_end)
+        self._series[key] = merged
+        self._persist(symbol, period, merged)
+        return True
+
+    def _recently_empty(self, key: Tuple[str, str], gap: DateRange) -> bool:
+        """该缺口最近是否获取为空（未过期则跳过）"""
+        expires_at = self._empty_gaps.get(key, {}).get(gap)
+        if expires_at is None:
+            return False
+        if expires_at > time.monotonic():
+            return True
+        self._empty_gaps[key].pop(gap, None)
+        return False
+
+    @staticmethod
+    def _adjustment_changed(series: Optional[pd.DataFrame], df: pd.DataFrame, coverage: DateRange) -> bool:
+        """比对重叠日期（已覆盖区间内）的收盘价，判断复权因子是否变化"""
+        if series is None or series.empty or 'close' not in series.columns or 'close' not in df.columns:
+            return False
+        overlap = df[(df['date'] >= coverage[0]) & (df['date'] <= coverage[1])]
+        if overlap.empty:
+            return False
+        joined = overlap[['date', 'close']].merge(series[['date', 'close']], on='date', suffixes=('_new', '_old'))
+        new_close = pd.to_numeric(joined['close_new'], errors='coerce')
+        old_close = pd.to_numeric(joined['close_old'], errors='coerce')
+        valid = new_close.notna() & old_close.notna() & (old_close != 0)
+        if not valid.any():
+            return False
+        deviation = ((new_close[valid] - old_close[valid]).abs() / old_close[valid].abs()).max()
+        return bool(deviation > ADJUST_TOLERANCE)
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        self._series.pop(key, None)
+        self._coverage.pop(key, None)
+        self._empty_gaps.pop(key, None)
+
+    def invalidate(self, symbol: str, period: str = "daily") -> None:
+        """丢弃某只股票的进程内序列（持久化的序列仍保留）"""
+        key = (symbol, period)
+        with self._get_lock(key):
+            self._drop(key)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+全市场实时行情快照缓存
+AKShare 的实时行情接口（stock_zh_a_spot_em / stock_zh_a_spot / stock_hk_spot）每次返回整张全市场表，
+单只股票查询也需要下载全表。这里按接口维护进程级快照：
+- 每个刷新周期内最多下载一次全表
+- 并发刷新合并为同一个在途请求（single-flight），其余调用方等待其结果
+- 按代码建立字典索引，单只/批量查询为 O(1) 查找
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 快照名称
+A_SHARE_SPOT_EM = "a_share_spot_em"  # 东方财富 A股全市场
+A_SHARE_SPOT_SINA = "a_share_spot_sina"  # 新浪财经 A股全市场
+HK_SPOT = "hk_spot"  # 新浪财经 港股全市场
+
+# 刷新周期（秒），可通过环境变量调整
+A_SHARE_SPOT_TTL_SECONDS = float(os.getenv("TA_SPOT_SNAPSHOT_TTL_SECONDS", "30"))
+HK_SPOT_TTL_SECONDS = float(os.getenv("TA_HK_SPOT_SNAPSHOT_TTL_SECONDS", "600"))
+
+# 等待在途刷新的最长时间（秒）
+REFRESH_WAIT_TIMEOUT_SECONDS = 60
+
+
+def normalize_a_share_code(code: Any) -> str:
+    """A股代码标准化：去掉 sh/sz/bj 等交易所前缀，补齐6位"""
+    digits = ''.join(ch for ch in str(code).strip() if ch.isdigit())
+    return digits.zfill(6) if digits else str(code).strip()
+
+
+class SpotSnapshot:
+    """单个全市场行情接口的进程级快照"""
+
+    def __init__(
+        self,
+        name: str,
+        fetcher: Callable[[], Optional[pd.DataFrame]],
+        ttl_seconds: float,
+        key_column: str = "代码",
+        key_normalizer: Optional[Callable[[Any], str]] = None,
+    ):
+        """
+        Args:
+            name: 快照名称（用于日志）
+            fetcher: 拉取全表的函数（同步阻塞）
+            ttl_seconds: 刷新周期
+            key_column: 用作索引的代码列
+            key_normalizer: 代码标准化函数，None 时按字符串原样索引
+        """
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self._fetcher = fetcher
+        self._key_column = key_column
+        self._key_normalizer = key_normalizer or (lambda value: str(value).strip())
+        self._frame: Optional[pd.DataFrame] = None
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._inflight: Optional[Future] = None
+        self.refresh_count = 0
+
+    def _is_fresh(self, max_age: Optional[float]) -> bool:
+        if self._frame is None:
+            return False
+        limit = self.ttl_seconds if max_age is None else max_age
+        return time.monotonic() - self._fetched_at < limit
+
+    def _ensure_fresh(self, max_age: Optional[float] = None) -> None:
+        """快照过期时刷新；并发调用只触发一次下载"""
+        with self._lock:
+            if self._is_fresh(max_age):
+                return
+            future = self._inflight
+            leader = future is None
+            if leader:
+                future = self._inflight = Future()
+
+        if not leader:
+            future.result(timeout=REFRESH_WAIT_TIMEOUT_SECONDS)
+            return
+
+        try:
+            started = time.monotonic()
+            df = self._fetcher()
+            if df is None or df.empty:
+                raise ValueError(f"{self.name} 全市场快照为空")
+            index = self._build_index(df)
+            with self._lock:
+                self._frame = df
+                self._index = index
+                self._fetched_at = time.monotonic()
+                self._inflight = None
+                self.refresh_count += 1
+            logger.info(f"🔄 [行情快照] {self.name} 已刷新: {len(index)}条, 耗时 {time.monotonic() - started:.2f}秒")
+            future.set_result(True)
+        except BaseException as e:
+            with self._lock:
+                self._inflight = None
+            future.set_exception(e)
+            raise
+
+    def _build_index(self, df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        if self._key_column not in df.columns:
+            raise KeyError(f"{self.name} 缺少代码列: {self._key_column}")
+        keys = [self._key_normalizer(value) for value in df[self._key_column].tolist()]
+        return dict(zip(keys, df.to_dict("records")))
+
+    def get_frame(self, max_age: Optional[float] = None) -> pd.DataFrame:
+        """返回全表（共享对象，调用方不得修改）"""
+        self._ensure_fresh(max_age)
+        return self._frame
+
+    def get_row(self, code: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """按代码返回单行（字典，列名与接口原始列名一致）"""
+        self._ensure_fresh(max_age)
+        return self._index.get(self._key_normalizer(code))
+
+    def get_rows(self, codes: Iterable[str], max_age: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """按代码批量返回，键为调用方传入的原始代码，未找到的代码不出现在结果中"""
+        self._ensure_fresh(max_age)
+        index = self._index
+        result = {}
+        for code in codes:
+            row = index.get(self._key_normalizer(code))
+            if row is not None:
+                result[code] = row
+        return result
+
+    async def aget_frame(self, max_age: Optional[float] = None) -> pd.DataFrame:
+        return await asyncio.to_thread(self.get_frame, max_age)
+
+    async def aget_row(self, code: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        if self._is_fresh(max_age):
+            return self._index.get(self._key_normalizer(code))
+        return await asyncio.to_thread(self.get_row, code, max_age)
+
+    async def aget_rows(self, codes: Iterable[str], max_age: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        codes = list(codes)
+        if self._is_fresh(max_age):
+            return self.get_rows(codes, max_age)
+        return await asyncio.to_thread(self.get_rows, codes, max_age)
+
+    def invalidate(self) -> None:
+        """使快照失效，下次访问时重新下载"""
+        with self._lock:
+            self._fetched_at = 0.0
+            self._frame = None
+            self._index = {}
+
+
+def _fetch_a_share_spot_em() -> pd.DataFrame:
+    import akshare as ak
+    return ak.stock_zh_a_spot_em()
+
+
+def _fetch_a_share_spot_sina() -> pd.DataFrame:
+    import akshare as ak
+    return ak.stock_zh_a_spot()
+
+
+def _fetch_hk_spot() -> pd.DataFrame:
+    import akshare as ak
+    return ak.stock_hk_spot()
+
+
+_SNAPSHOT_FACTORIES: Dict[str, Callable[[], SpotSnapshot]] = {
+    A_SHARE_SPOT_EM: lambda: SpotSnapshot(
+        A_SHARE_SPOT_EM, _fetch_a_share_spot_em, A_SHARE_SPOT_TTL_SECONDS, key_normalizer=normalize_a_share_code
+    ),
+    A_SHARE_SPOT_SINA: lambda: SpotSnapshot(
+        A_SHARE_SPOT_SINA, _fetch_a_share_spot_sina, A_SHARE_SPOT_TTL_SECONDS, key_normalizer=normalize_a_share_code
+    ),
+    HK_SPOT: lambda: SpotSnapshot(HK_SPOT, _fetch_hk_spot, HK_SPOT_TTL_SECONDS),
+}
+
+_snapshots: Dict[str, SpotSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_spot_snapshot(name: str) -> SpotSnapshot:
+    """获取进程级共享的行情快照"""
+    with _snapshots_lock:
+        snapshot = _snapshots.get(name)
+        if snapshot is None:
+            if name not in _SNAPSHOT_FACTORIES:
+                raise KeyError(f"未知的行情快照: {name}")
+            snapshot = _snapshots[name] = _SNAPSHOT_FACTORIES[name]()
+        return snapshot
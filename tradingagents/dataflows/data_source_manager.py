@@ -5,8 +5,9 @@
 """
 
 import os
+import threading
 import time
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 from enum import Enum
 import warnings
 import pandas as pd
@@ -51,8 +52,31 @@ class USDataSource(Enum):
     FINNHUB = DataSourceCode.FINNHUB  # Finnhub（备用数据源）
 
 
+_stock_fetcher = None
+_stock_fetcher_lock = threading.Lock()
 
 
+def get_stock_fetcher():
+    """
+    股票数据源共用的对冲请求执行器（进程内共享线程池与各数据源的延迟/错误统计）
+
+    DataSourceManager 可能被多次实例化，共享同一个执行器，避免每个实例各自创建线程池且从不关闭
+    """
+    global _stock_fetcher
+    if _stock_fetcher is None:
+        with _stock_fetcher_lock:
+            if _stock_fetcher is None:
+                from tradingagents.config.runtime_settings import get_float, get_int
+                from .hedged_fetch import HedgedFetcher
+                _stock_fetcher = HedgedFetcher(
+                    budget_seconds=get_float("TA_HEDGE_BUDGET_SECONDS", "ta_hedge_budget_seconds", 2.0),
+                    total_timeout=get_float("TA_HEDGE_TOTAL_TIMEOUT_SECONDS", "ta_hedge_total_timeout_seconds", 60.0),
+                    max_workers=get_int("TA_HEDGE_MAX_WORKERS", "ta_hedge_max_workers", 16),
+                    max_inflight_per_source=get_int(
+                        "TA_HEDGE_MAX_INFLIGHT_PER_SOURCE", "ta_hedge_max_inflight_per_source", 4),
+                )
+    return _stock_fetcher
+
 
 class DataSourceManager:
     """数据源管理器"""
@@ -77,11 +101,25 @@ class DataSourceManager:
         except Exception as e:
             logger.warning(f"⚠️ 统一缓存管理器初始化失败: {e}")
 
+        # K线区间覆盖缓存：只对未缓存的头尾日期调用数据源；集成缓存管理器自带区间缓存，各实例共享
+        self.range_cache = None
+        if self.cache_enabled:
+            self.range_cache = getattr(self.cache_manager, "range_cache", None)
+            if self.range_cache is None:
+                from .cache.range_cache import RangeCoverageCache
+                self.range_cache = RangeCoverageCache(self.cache_manager)
+
+        # 对冲请求：数据源超过延迟预算仍未返回时，并行启动下一个优先级的数据源
+        from tradingagents.config.runtime_settings import get_bool
+        self.hedge_enabled = get_bool("TA_HEDGED_FETCH_ENABLED", "ta_hedged_fetch_enabled", False)
+        self.hedged_fetcher = get_stock_fetcher() if self.hedge_enabled else None
+
         logger.info(f"📊 数据源管理器初始化完成")
         logger.info(f"   MongoDB缓存: {'✅ 已启用' if self.use_mongodb_cache else '❌ 未启用'}")
         logger.info(f"   统一缓存: {'✅ 已启用' if self.cache_enabled else '❌ 未启用'}")
         logger.info(f"   默认数据源: {self.default_source.value}")
         logger.info(f"   可用数据源: {[s.value for s in self.available_sources]}")
+        logger.info(f"   对冲请求: {'✅ 已启用' if self.hedge_enabled else '❌ 未启用'}")
 
     def _check_mongodb_enabled(self) -> bool:
         """检查是否启用MongoDB缓存"""
@@ -90,7 +128,7 @@ class DataSourceManager:
 
     def _get_data_source_priority_order(self, symbol: Optional[str] = None) -> List[ChinaDataSource]:
         """
-        从数据库获取数据源优先级顺序（用于降级）
+        从配置快照获取数据源优先级顺序（用于降级）
 
         Args:
             symbol: 股票代码，用于识别市场类型（A股/美股/港股）
@@ -102,37 +140,13 @@ class DataSourceManager:
         market_category = self._identify_market_category(symbol)
 
         try:
-            # 🔥 从数据库读取数据源配置（使用同步客户端）
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-            config_collection = db.system_configs
-
-            # 获取最新的激活配置
-            config_data = config_collection.find_one(
-                {"is_active": True},
-                sort=[("version", -1)]
-            )
-
-            if config_data and config_data.get('data_source_configs'):
-                data_source_configs = config_data.get('data_source_configs', [])
+            # 🔥 从进程内配置快照读取数据源配置（启动时加载，配置变更时自动刷新，热路径无数据库访问）
+            from app.core.config_snapshot import get_config_snapshot
+            snapshot = get_config_snapshot()
 
-                # 🔥 过滤出启用的数据源，并按市场分类过滤
-                enabled_sources = []
-                for ds in data_source_configs:
-                    if not ds.get('enabled', True):
-                        continue
-
-                    # 检查数据源是否属于当前市场分类
-                    market_categories = ds.get('market_categories', [])
-                    if market_categories and market_category:
-                        # 如果数据源配置了市场分类，只选择匹配的数据源
-                        if market_category not in market_categories:
-                            continue
-
-                    enabled_sources.append(ds)
-
-                # 按优先级排序（数字越大优先级越高）
-                enabled_sources.sort(key=lambda x: x.get('priority', 0), reverse=True)
+            if snapshot.data_source_configs:
+                # 🔥 启用的数据源，按市场分类过滤，按优先级排序（数字越大优先级越高）
+                enabled_sources = snapshot.enabled_data_sources(market_category)
 
                 # 转换为 ChinaDataSource 枚举（使用统一编码）
                 source_mapping = {
@@ -151,14 +165,14 @@ class DataSourceManager:
                             result.append(source)
 
                 if result:
-                    logger.info(f"✅ [数据源优先级] 市场={market_category or '全部'}, 从数据库读取: {[s.value for s in result]}")
+                    logger.debug(f"✅ [数据源优先级] 市场={market_category or '全部'}, 从配置快照读取: {[s.value for s in result]}")
                     return result
                 else:
                     logger.warning(f"⚠️ [数据源优先级] 市场={market_category or '全部'}, 数据库配置中没有可用的数据源，使用默认顺序")
             else:
                 logger.warning("⚠️ [数据源优先级] 数据库中没有数据源配置，使用默认顺序")
         except Exception as e:
-            logger.warning(f"⚠️ [数据源优先级] 从数据库读取失败: {e}，使用默认顺序")
+            logger.warning(f"⚠️ [数据源优先级] 读取配置快照失败: {e}，使用默认顺序")
 
         # 🔥 回退到默认顺序（兼容性）
         # 默认顺序：AKShare > Tushare > BaoStock
@@ -221,6 +235,79 @@ class DataSourceManager:
 
         return source_mapping.get(env_source, ChinaDataSource.AKSHARE)
 
+    # ==================== 并发请求合并 ====================
+
+    def _single_flight(self, data_type: str, symbol: Optional[str], args: tuple,
+                       fetch: Callable[[], Any], is_valid: Callable[[Any], bool]) -> Any:
+        """
+        同一请求的并发调用只访问一次数据源（经集成缓存 L1 的在途 future）
+
+        多个分析师并行请求同一只股票时，缓存全部未命中也只有一个调用方执行 fetch（含保存缓存），
+        其余调用方等待其结果。文件缓存策略下没有 L1，直接调用 fetch。
+
+        Args:
+            data_type: stock_data / fundamentals_data / news_data，决定 L1 条目的 TTL
+            symbol: 股票代码
+            args: 影响结果的请求参数
+            fetch: 实际获取函数
+            is_valid: 结果质量检查，不通过的结果不写入 L1
+        """
+        get_or_fetch = getattr(self.cache_manager, "get_or_fetch", None) if self.cache_enabled else None
+        if get_or_fetch is None:
+            return fetch()
+        cache_key = ":".join(["fetch", data_type, self.current_source.name, *(str(a) for a in args)])
+        return get_or_fetch(cache_key, fetch, data_type=data_type, symbol=symbol, cacheable=is_valid)
+
+    # ==================== 对冲请求 ====================
+
+    def _hedged_fetch(self, kind: str, symbol: Optional[str],
+                      fetchers: Dict[ChinaDataSource, Callable[[], Any]],
+                      is_valid: Callable[[Any], bool],
+                      include_current: bool = True) -> tuple[Any, str | None]:
+        """
+        按数据源优先级执行对冲请求
+
+        Args:
+            kind: 数据类型，用于区分延迟统计
+            symbol: 股票代码，用于识别市场并读取优先级配置
+            fetchers: 各数据源的无参获取函数
+            is_valid: 质量检查函数
+            include_current: 是否包含当前数据源（降级路径中当前数据源已失败，不再包含）
+
+        Returns:
+            tuple: (结果, 实际使用的数据源名称)，全部失败时为 (None, None)
+        """
+        order = self._get_data_source_priority_order(symbol)
+        if include_current:
+            order = [self.current_source] + [s for s in order if s != self.current_source]
+        else:
+            order = [s for s in order if s != self.current_source]
+
+        candidates = [(source.value.value, fetchers[source]) for source in order if source in fetchers]
+        if not candidates:
+            return None, None
+        return self.hedged_fetcher.fetch(kind, candidates, is_valid)
+
+    def get_source_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各数据源的延迟/错误直方图（仅对冲请求模式下记录）"""
+        if self.hedged_fetcher is None:
+            return {}
+        return self.hedged_fetcher.stats.snapshot()
+
+    @staticmethod
+    def _is_valid_stock_data(result: Any) -> bool:
+        return bool(result) and "❌" not in result and "错误" not in result
+
+    def _stock_data_fetchers(self, symbol: str, start_date: str, end_date: str,
+                             period: str) -> Dict[ChinaDataSource, Callable[[], str]]:
+        return {
+            ChinaDataSource.MONGODB: lambda: self._get_mongodb_data(
+                symbol, start_date, end_date, period, allow_fallback=False)[0],
+            ChinaDataSource.TUSHARE: lambda: self._get_tushare_data(symbol, start_date, end_date, period),
+            ChinaDataSource.AKSHARE: lambda: self._get_akshare_data(symbol, start_date, end_date, period),
+            ChinaDataSource.BAOSTOCK: lambda: self._get_baostock_data(symbol, start_date, end_date, period),
+        }
+
     # ==================== Tushare数据接口 ====================
 
     def get_china_stock_data_tushare(self, symbol: str, start_date: str, end_date: str) -> str:
@@ -264,6 +351,23 @@ class DataSourceManager:
                        'event_type': 'fundamentals_fetch_start'
                    })
 
+        return self._single_flight(
+            'fundamentals_data', symbol, (symbol,),
+            lambda: self._fetch_fundamentals_data(symbol), self._is_valid_fundamentals,
+        )
+
+    def _fetch_fundamentals_data(self, symbol: str) -> str:
+        """get_fundamentals_data 的实际获取逻辑：当前数据源 → 降级 / 对冲请求"""
+        if self.hedge_enabled:
+            result, actual_source = self._hedged_fetch(
+                'fundamentals', symbol, self._fundamentals_fetchers(symbol), self._is_valid_fundamentals,
+            )
+            if result:
+                logger.info(f"✅ [数据来源: {actual_source}] 对冲请求成功获取基本面数据: {symbol}")
+                return result
+            logger.warning(f"⚠️ [数据来源: 生成分析] 所有数据源失败，生成基本分析: {symbol}")
+            return self._generate_fundamentals_analysis(symbol)
+
         start_time = time.time()
 
         try:
@@ -348,6 +452,23 @@ class DataSourceManager:
                        'event_type': 'news_fetch_start'
                    })
 
+        return self._single_flight(
+            'news_data', symbol, (symbol, hours_back, limit),
+            lambda: self._fetch_news_data(symbol, hours_back, limit), self._is_valid_news,
+        )
+
+    def _fetch_news_data(self, symbol: Optional[str], hours_back: int, limit: int) -> List[Dict[str, Any]]:
+        """get_news_data 的实际获取逻辑：当前数据源 → 降级 / 对冲请求"""
+        if self.hedge_enabled:
+            result, actual_source = self._hedged_fetch(
+                'news', symbol, self._news_fetchers(symbol, hours_back, limit), self._is_valid_news,
+            )
+            if result:
+                logger.info(f"✅ [数据来源: {actual_source}] 对冲请求成功获取新闻数据: {symbol or '市场新闻'} ({len(result)}条)")
+                return result
+            logger.warning(f"⚠️ [数据来源: 所有数据源失败] 无法获取新闻: {symbol or '市场新闻'}")
+            return []
+
         start_time = time.time()
 
         try:
@@ -703,11 +824,14 @@ class DataSourceManager:
             if 'date' in data.columns:
                 data = data.sort_values('date')
 
-            # 计算移动平均线
-            data['ma5'] = data['close'].rolling(window=5, min_periods=1).mean()
-            data['ma10'] = data['close'].rolling(window=10, min_periods=1).mean()
-            data['ma20'] = data['close'].rolling(window=20, min_periods=1).mean()
-            data['ma60'] = data['close'].rolling(window=60, min_periods=1).mean()
+            # 最近两根K线有预计算快照时直接使用快照中的 MA/MACD/BOLL（按完整回溯窗口计算），否则现算
+            snapshot_used = self._apply_indicator_snapshots(data, symbol)
+            if not snapshot_used:
+                # 计算移动平均线
+                data['ma5'] = data['close'].rolling(window=5, min_periods=1).mean()
+                data['ma10'] = data['close'].rolling(window=10, min_periods=1).mean()
+                data['ma20'] = data['close'].rolling(window=20, min_periods=1).mean()
+                data['ma60'] = data['close'].rolling(window=60, min_periods=1).mean()
 
             # 计算RSI（相对强弱指标）- 同花顺风格：使用中国式SMA（EMA with adjust=True）
             # 参考：https://blog.csdn.net/u011218867/article/details/117427927
@@ -740,20 +864,21 @@ class DataSourceManager:
             rs14 = gain14 / loss14.replace(0, np.nan)
             data['rsi14'] = 100 - (100 / (1 + rs14))
 
-            # 计算MACD
-            ema12 = data['close'].ewm(span=12, adjust=False).mean()
-            ema26 = data['close'].ewm(span=26, adjust=False).mean()
-            data['macd_dif'] = ema12 - ema26
-            data['macd_dea'] = data['macd_dif'].ewm(span=9, adjust=False).mean()
-            data['macd'] = (data['macd_dif'] - data['macd_dea']) * 2
+            if not snapshot_used:
+                # 计算MACD
+                ema12 = data['close'].ewm(span=12, adjust=False).mean()
+                ema26 = data['close'].ewm(span=26, adjust=False).mean()
+                data['macd_dif'] = ema12 - ema26
+                data['macd_dea'] = data['macd_dif'].ewm(span=9, adjust=False).mean()
+                data['macd'] = (data['macd_dif'] - data['macd_dea']) * 2
 
-            # 计算布林带
-            data['boll_mid'] = data['close'].rolling(window=20, min_periods=1).mean()
-            std = data['close'].rolling(window=20, min_periods=1).std()
-            data['boll_upper'] = data['boll_mid'] + 2 * std
-            data['boll_lower'] = data['boll_mid'] - 2 * std
+                # 计算布林带
+                data['boll_mid'] = data['close'].rolling(window=20, min_periods=1).mean()
+                std = data['close'].rolling(window=20, min_periods=1).std()
+                data['boll_upper'] = data['boll_mid'] + 2 * std
+                data['boll_lower'] = data['boll_mid'] - 2 * std
 
-            logger.info(f"✅ [技术指标] 技术指标计算完成")
+            logger.info(f"✅ [技术指标] 技术指标计算完成{'（MA/MACD/BOLL 取自指标快照）' if snapshot_used else ''}")
 
             # 🔧 只保留最后3-5天的数据用于展示（减少token消耗）
             display_rows = min(5, len(data))
@@ -908,6 +1033,39 @@ class DataSourceManager:
             logger.error(f"❌ 格式化数据响应失败: {e}", exc_info=True)
             return f"❌ 格式化{symbol}数据失败: {e}"
 
+    # 指标快照字段 -> 格式化报告使用的列名（MACD 柱按通达信/同花顺习惯乘以2）
+    _SNAPSHOT_COLUMNS = {
+        'ma5': 'ma5', 'ma10': 'ma10', 'ma20': 'ma20', 'ma60': 'ma60',
+        'dif': 'macd_dif', 'dea': 'macd_dea',
+        'boll_mid': 'boll_mid', 'boll_upper': 'boll_upper', 'boll_lower': 'boll_lower',
+    }
+
+    def _apply_indicator_snapshots(self, data: pd.DataFrame, symbol: str) -> bool:
+        """
+        用预计算的指标快照填充最近两根K线的 MA/MACD/BOLL（金叉/死叉判断需要前一根）
+
+        Returns:
+            bool: 两根K线的快照都存在且交易日一致时返回 True，否则不修改 data
+        """
+        if 'date' not in data.columns or len(data) < 2:
+            return False
+        try:
+            bar_dates = [pd.to_datetime(d).strftime('%Y-%m-%d') for d in data['date'].iloc[-2:]]
+            snapshots = [self.get_latest_indicators(symbol, as_of=d, compute_if_missing=False) for d in bar_dates]
+            if any(snap.get('trade_date') != d for snap, d in zip(snapshots, bar_dates)):
+                return False
+            if any(snap.get(field) is None for snap in snapshots for field in self._SNAPSHOT_COLUMNS):
+                return False
+        except Exception as e:
+            logger.debug(f"读取指标快照失败 {symbol}: {e}")
+            return False
+
+        for field, column in self._SNAPSHOT_COLUMNS.items():
+            data[column] = np.nan
+            data.iloc[-2:, data.columns.get_loc(column)] = [float(snap[field]) for snap in snapshots]
+        data['macd'] = (data['macd_dif'] - data['macd_dea']) * 2
+        return True
+
     def get_stock_dataframe(self, symbol: str, start_date: str = None, end_date: str = None, period: str = "daily") -> pd.DataFrame:
         """
         获取股票数据的 DataFrame 接口，支持多数据源和自动降级
@@ -923,6 +1081,74 @@ class DataSourceManager:
         """
         logger.info(f"📊 [DataFrame接口] 获取股票数据: {symbol} ({start_date} 到 {end_date})")
 
+        if self.range_cache is not None and start_date and end_date:
+            try:
+                return self.range_cache.get_range(
+                    symbol, start_date, end_date,
+                    fetcher=lambda s, start, end: self._fetch_stock_dataframe(s, start, end, period),
+                    period=period
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ [DataFrame接口] 区间缓存失败，直接获取: {e}")
+
+        return self._fetch_stock_dataframe(symbol, start_date, end_date, period)
+
+    def get_latest_indicators(self, symbol: str, as_of: str = None, compute_if_missing: bool = True) -> Dict[str, Any]:
+        """
+        获取最新交易日的技术指标（MA/EMA/MACD/RSI/BOLL/ATR/KDJ）
+
+        优先读取日线同步后预计算的 stock_indicators_daily 快照；没有快照时按近220天K线现算。
+
+        Args:
+            symbol: 股票代码
+            as_of: 截止交易日 YYYY-MM-DD，None 表示最新
+            compute_if_missing: 没有快照时是否现算，False 时返回空字典
+
+        Returns:
+            Dict: 指标字典（含 trade_date），无数据时为空字典
+        """
+        from tradingagents.dataflows.cache.mongodb_cache_adapter import get_mongodb_cache_adapter
+        snapshot = get_mongodb_cache_adapter().get_indicator_snapshot(symbol, as_of=as_of)
+        if snapshot:
+            return snapshot
+        if not compute_if_missing:
+            return {}
+
+        from datetime import datetime, timedelta
+        from tradingagents.tools.analysis.indicators import STANDARD_SPECS, compute_many
+
+        end_date = as_of or datetime.now().strftime('%Y-%m-%d')
+        start_date = (datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=220)).strftime('%Y-%m-%d')
+        df = self.get_stock_dataframe(symbol, start_date, end_date)
+        if df is None or df.empty:
+            return {}
+
+        last = compute_many(df, STANDARD_SPECS).iloc[-1]
+        result = {"symbol": symbol}
+        if 'date' in df.columns:
+            result["trade_date"] = pd.to_datetime(last['date']).strftime('%Y-%m-%d')
+        for key, value in last.items():
+            if key == 'date':
+                continue
+            try:
+                result[key] = None if pd.isna(value) else float(value)
+            except (TypeError, ValueError):
+                continue
+        return result
+
+    def _fetch_stock_dataframe(self, symbol: str, start_date: str = None, end_date: str = None, period: str = "daily") -> pd.DataFrame:
+        """
+        从数据源获取股票 DataFrame（不经过区间缓存），按当前数据源和可用数据源顺序降级
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            period: 数据周期（daily/weekly/monthly）
+
+        Returns:
+            pd.DataFrame: 标准化后的股票数据，所有数据源失败时为空
+        """
         try:
             # 尝试当前数据源
             df = None
@@ -1058,6 +1284,16 @@ class DataSourceManager:
         logger.info(f"🔍 [股票代码追踪] 股票代码字符: {list(str(symbol))}")
         logger.info(f"🔍 [股票代码追踪] 当前数据源: {self.current_source.value}")
 
+        return self._single_flight(
+            'stock_data', symbol, (symbol, start_date, end_date, period),
+            lambda: self._fetch_stock_data(symbol, start_date, end_date, period), self._is_valid_stock_data,
+        )
+
+    def _fetch_stock_data(self, symbol: str, start_date: str = None, end_date: str = None, period: str = "daily") -> str:
+        """get_stock_data 的实际获取逻辑：当前数据源 → 降级 / 对冲请求"""
+        if self.hedge_enabled:
+            return self._get_stock_data_hedged(symbol, start_date, end_date, period)
+
         start_time = time.time()
 
         try:
@@ -1118,7 +1354,7 @@ class DataSourceManager:
                               })
 
                 # 数据质量异常时也尝试降级到其他数据源
-                fallback_result = self._try_fallback_sources(symbol, start_date, end_date)
+                fallback_result, _ = self._try_fallback_sources(symbol, start_date, end_date, period)
                 if fallback_result and "❌" not in fallback_result and "错误" not in fallback_result:
                     logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取数据: {symbol}")
                     return fallback_result
@@ -1138,12 +1374,42 @@ class DataSourceManager:
                             'error': str(e),
                             'event_type': 'data_fetch_exception'
                         }, exc_info=True)
-            return self._try_fallback_sources(symbol, start_date, end_date)
+            fallback_result, _ = self._try_fallback_sources(symbol, start_date, end_date, period)
+            return fallback_result
+
+    def _get_stock_data_hedged(self, symbol: str, start_date: str, end_date: str, period: str = "daily") -> str:
+        """对冲请求模式获取股票数据：当前数据源超过延迟预算后并行启动下一个数据源"""
+        start_time = time.time()
+        result, actual_source = self._hedged_fetch(
+            'stock_data', symbol,
+            self._stock_data_fetchers(symbol, start_date, end_date, period),
+            self._is_valid_stock_data,
+        )
+        duration = time.time() - start_time
+
+        if result:
+            logger.info(f"✅ [数据来源: {actual_source}] 对冲请求成功获取股票数据: {symbol} ({len(result)}字符, 耗时{duration:.2f}秒)",
+                       extra={
+                           'symbol': symbol,
+                           'data_source': actual_source,
+                           'actual_source': actual_source,
+                           'requested_source': self.current_source.value,
+                           'duration': duration,
+                           'event_type': 'data_fetch_success'
+                       })
+            return result
+
+        logger.error(f"❌ [数据来源: 所有数据源失败] 对冲请求无法获取{period}数据: {symbol} (耗时{duration:.2f}秒)")
+        return f"❌ 所有数据源都无法获取{symbol}的{period}数据"
 
-    def _get_mongodb_data(self, symbol: str, start_date: str, end_date: str, period: str = "daily") -> tuple[str, str | None]:
+    def _get_mongodb_data(self, symbol: str, start_date: str, end_date: str, period: str = "daily",
+                          allow_fallback: bool = True) -> tuple[str, str | None]:
         """
         从MongoDB获取多周期数据 - 包含技术指标计算
 
+        Args:
+            allow_fallback: MongoDB无数据或异常时是否自动降级到其他数据源（对冲请求模式下为False）
+
         Returns:
             tuple[str, str | None]: (结果字符串, 实际使用的数据源名称)
         """
@@ -1172,11 +1438,15 @@ class DataSourceManager:
                 return result, "mongodb"
             else:
                 # MongoDB没有数据（adapter内部已记录详细的数据源信息），降级到其他数据源
+                if not allow_fallback:
+                    return f"❌ MongoDB未找到{symbol}的{period}数据", None
                 logger.info(f"🔄 [MongoDB] 未找到{period}数据: {symbol}，开始尝试备用数据源")
                 return self._try_fallback_sources(symbol, start_date, end_date, period)
 
         except Exception as e:
             logger.error(f"❌ [数据来源: MongoDB异常] 获取{period}数据失败: {symbol}, 错误: {e}")
+            if not allow_fallback:
+                return f"❌ MongoDB获取{symbol}的{period}数据失败: {e}", None
             # MongoDB异常，降级到其他数据源
             return self._try_fallback_sources(symbol, start_date, end_date, period)
 
@@ -1388,6 +1658,17 @@ class DataSourceManager:
         """
         logger.info(f"🔄 [{self.current_source.value}] 失败，尝试备用数据源获取{period}数据: {symbol}")
 
+        if self.hedge_enabled:
+            result, actual_source = self._hedged_fetch(
+                'stock_data', symbol,
+                self._stock_data_fetchers(symbol, start_date, end_date, period),
+                self._is_valid_stock_data, include_current=False,
+            )
+            if result:
+                return result, actual_source
+            logger.error(f"❌ [所有数据源失败] 无法获取{period}数据: {symbol}")
+            return f"❌ 所有数据源都无法获取{symbol}的{period}数据", None
+
         # 🔥 从数据库获取数据源优先级顺序（根据股票代码识别市场）
         # 注意：不包含MongoDB，因为MongoDB是最高优先级，如果失败了就不再尝试
         fallback_order = self._get_data_source_priority_order(symbol)
@@ -1500,6 +1781,17 @@ class DataSourceManager:
                 logger.error(f"❌ [数据来源: MongoDB异常] 获取股票信息失败: {e}", exc_info=True)
 
 
+        if self.hedge_enabled:
+            result, actual_source = self._hedged_fetch(
+                'stock_info', symbol, self._stock_info_fetchers(symbol),
+                self._stock_info_validator(symbol),
+            )
+            if result:
+                logger.info(f"✅ [数据来源: {actual_source}-股票信息] 对冲请求成功获取: {symbol}")
+                return result
+            logger.error(f"❌ 所有数据源都无法获取{symbol}的股票信息")
+            return {'symbol': symbol, 'name': f'股票{symbol}', 'source': 'unknown'}
+
         # 首先尝试当前数据源
         try:
             if self.current_source == ChinaDataSource.TUSHARE:
@@ -1593,10 +1885,40 @@ class DataSourceManager:
             logger.error(f"❌ 获取股票数据失败: {e}")
             return f"❌ 获取股票数据失败: {str(e)}\n\n💡 建议：\n1. 检查网络连接\n2. 确认股票代码格式正确\n3. 检查数据源配置"
 
+    @staticmethod
+    def _stock_info_validator(symbol: str) -> Callable[[Any], bool]:
+        """股票信息质量检查：名称有效且不是占位名称"""
+        return lambda result: isinstance(result, dict) and bool(result.get('name')) \
+            and result['name'] != f'股票{symbol}'
+
+    def _stock_info_fetchers(self, symbol: str) -> Dict[ChinaDataSource, Callable[[], Dict]]:
+        return {
+            ChinaDataSource.TUSHARE: lambda: self._get_tushare_stock_info(symbol),
+            ChinaDataSource.AKSHARE: lambda: self._get_akshare_stock_info(symbol),
+            ChinaDataSource.BAOSTOCK: lambda: self._get_baostock_stock_info(symbol),
+        }
+
+    def _get_tushare_stock_info(self, symbol: str) -> Dict:
+        """使用Tushare获取股票基本信息"""
+        from .interface import get_china_stock_info_tushare
+        info_str = get_china_stock_info_tushare(symbol)
+        return self._parse_stock_info_string(info_str, symbol)
+
     def _try_fallback_stock_info(self, symbol: str) -> Dict:
         """尝试使用备用数据源获取股票基本信息"""
         logger.error(f"🔄 {self.current_source.value}失败，尝试备用数据源获取股票信息...")
 
+        if self.hedge_enabled:
+            result, actual_source = self._hedged_fetch(
+                'stock_info', symbol, self._stock_info_fetchers(symbol),
+                self._stock_info_validator(symbol), include_current=False,
+            )
+            if result:
+                logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取股票信息: {actual_source}")
+                return result
+            logger.error(f"❌ 所有数据源都无法获取{symbol}的股票信息")
+            return {'symbol': symbol, 'name': f'股票{symbol}', 'source': 'unknown'}
+
         # 获取所有可用数据源
         available_sources = self.available_sources.copy()
 
@@ -1708,7 +2030,7 @@ class DataSourceManager:
     def _get_baostock_stock_info(self, symbol: str) -> Dict:
         """使用BaoStock获取股票基本信息"""
         try:
-            import baostock as bs
+            from .providers.china.baostock_session import BaoStockQueryError, get_baostock_session_pool
 
             # 转换股票代码格式
             if symbol.startswith('6'):
@@ -1716,27 +2038,13 @@ class DataSourceManager:
             else:
                 bs_code = f"sz.{symbol}"
 
-            # 登录BaoStock
-            lg = bs.login()
-            if lg.error_code != '0':
-                logger.error(f"❌ [股票信息] BaoStock登录失败: {lg.error_msg}")
-                return {'symbol': symbol, 'name': f'股票{symbol}', 'source': 'baostock'}
-
-            # 查询股票基本信息
-            rs = bs.query_stock_basic(code=bs_code)
-            if rs.error_code != '0':
-                bs.logout()
-                logger.error(f"❌ [股票信息] BaoStock查询失败: {rs.error_msg}")
+            # 通过共享会话池查询股票基本信息（会话未登录时自动登录）
+            try:
+                data_list, _ = get_baostock_session_pool().query_sync("query_stock_basic", code=bs_code)
+            except BaoStockQueryError as e:
+                logger.error(f"❌ [股票信息] BaoStock查询失败: {e.error_msg}")
                 return {'symbol': symbol, 'name': f'股票{symbol}', 'source': 'baostock'}
 
-            # 解析结果
-            data_list = []
-            while (rs.error_code == '0') & rs.next():
-                data_list.append(rs.get_row_data())
-
-            # 登出
-            bs.logout()
-
             if data_list:
                 # BaoStock返回格式: [code, code_name, ipoDate, outDate, type, status]
                 info = {'symbol': symbol, 'source': 'baostock'}
@@ -1785,8 +2093,8 @@ class DataSourceManager:
 
     # ==================== 基本面数据获取方法 ====================
 
-    def _get_mongodb_fundamentals(self, symbol: str) -> str:
-        """从 MongoDB 获取财务数据"""
+    def _get_mongodb_fundamentals(self, symbol: str, allow_fallback: bool = True) -> str:
+        """从 MongoDB 获取财务数据（allow_fallback=False 时不自动降级，直接返回错误信息）"""
         logger.debug(f"📊 [MongoDB] 调用参数: symbol={symbol}")
 
         try:
@@ -1809,7 +2117,7 @@ class DataSourceManager:
                         return self._format_financial_data(symbol, financial_dict_list)
                     else:
                         logger.warning(f"⚠️ [数据来源: MongoDB] 财务数据为空: {symbol}，降级到其他数据源")
-                        return self._try_fallback_fundamentals(symbol)
+                        return self._try_fallback_fundamentals(symbol) if allow_fallback else f"❌ MongoDB未找到{symbol}的财务数据"
                 # 如果是列表
                 elif isinstance(financial_data, list) and len(financial_data) > 0:
                     logger.info(f"✅ [数据来源: MongoDB-财务数据] 成功获取: {symbol} ({len(financial_data)}条记录)")
@@ -1822,16 +2130,16 @@ class DataSourceManager:
                     return self._format_financial_data(symbol, financial_dict_list)
                 else:
                     logger.warning(f"⚠️ [数据来源: MongoDB] 未找到财务数据: {symbol}，降级到其他数据源")
-                    return self._try_fallback_fundamentals(symbol)
+                    return self._try_fallback_fundamentals(symbol) if allow_fallback else f"❌ MongoDB未找到{symbol}的财务数据"
             else:
                 logger.warning(f"⚠️ [数据来源: MongoDB] 未找到财务数据: {symbol}，降级到其他数据源")
                 # MongoDB 没有数据，降级到其他数据源
-                return self._try_fallback_fundamentals(symbol)
+                return self._try_fallback_fundamentals(symbol) if allow_fallback else f"❌ MongoDB未找到{symbol}的财务数据"
 
         except Exception as e:
             logger.error(f"❌ [数据来源: MongoDB异常] 获取财务数据失败: {e}", exc_info=True)
             # MongoDB 异常，降级到其他数据源
-            return self._try_fallback_fundamentals(symbol)
+            return self._try_fallback_fundamentals(symbol) if allow_fallback else f"❌ MongoDB未找到{symbol}的财务数据"
 
     def _get_tushare_fundamentals(self, symbol: str) -> str:
         """从 Tushare 获取基本面数据 - 暂时不可用，需要实现"""
@@ -2016,10 +2324,32 @@ class DataSourceManager:
             logger.error(f"❌ 生成基本面分析失败: {e}")
             return f"❌ 生成{symbol}基本面分析失败: {e}"
 
+    @staticmethod
+    def _is_valid_fundamentals(result: Any) -> bool:
+        return bool(result) and "❌" not in result
+
+    def _fundamentals_fetchers(self, symbol: str) -> Dict[ChinaDataSource, Callable[[], str]]:
+        return {
+            ChinaDataSource.MONGODB: lambda: self._get_mongodb_fundamentals(symbol, allow_fallback=False),
+            ChinaDataSource.TUSHARE: lambda: self._get_tushare_fundamentals(symbol),
+            ChinaDataSource.AKSHARE: lambda: self._get_akshare_fundamentals(symbol),
+        }
+
     def _try_fallback_fundamentals(self, symbol: str) -> str:
         """基本面数据降级处理"""
         logger.error(f"🔄 {self.current_source.value}失败，尝试备用数据源获取基本面...")
 
+        if self.hedge_enabled:
+            result, actual_source = self._hedged_fetch(
+                'fundamentals', symbol, self._fundamentals_fetchers(symbol),
+                self._is_valid_fundamentals, include_current=False,
+            )
+            if result:
+                logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取基本面: {actual_source}")
+                return result
+            logger.warning(f"⚠️ [数据来源: 生成分析] 所有数据源失败，生成基本分析: {symbol}")
+            return self._generate_fundamentals_analysis(symbol)
+
         # 🔥 从数据库获取数据源优先级顺序（根据股票代码识别市场）
         fallback_order = self._get_data_source_priority_order(symbol)
 
@@ -2050,8 +2380,9 @@ class DataSourceManager:
         logger.warning(f"⚠️ [数据来源: 生成分析] 所有数据源失败，生成基本分析: {symbol}")
         return self._generate_fundamentals_analysis(symbol)
 
-    def _get_mongodb_news(self, symbol: str, hours_back: int, limit: int) -> List[Dict[str, Any]]:
-        """从MongoDB获取新闻数据"""
+    def _get_mongodb_news(self, symbol: str, hours_back: int, limit: int,
+                          allow_fallback: bool = True) -> List[Dict[str, Any]]:
+        """从MongoDB获取新闻数据（allow_fallback=False 时不自动降级）"""
         try:
             from tradingagents.dataflows.cache.mongodb_cache_adapter import get_mongodb_cache_adapter
             adapter = get_mongodb_cache_adapter()
@@ -2064,11 +2395,11 @@ class DataSourceManager:
                 return news_data
             else:
                 logger.warning(f"⚠️ [数据来源: MongoDB] 未找到新闻: {symbol or '市场新闻'}，降级到其他数据源")
-                return self._try_fallback_news(symbol, hours_back, limit)
+                return self._try_fallback_news(symbol, hours_back, limit) if allow_fallback else []
 
         except Exception as e:
             logger.error(f"❌ [数据来源: MongoDB] 获取新闻失败: {e}")
-            return self._try_fallback_news(symbol, hours_back, limit)
+            return self._try_fallback_news(symbol, hours_back, limit) if allow_fallback else []
 
     def _get_tushare_news(self, symbol: str, hours_back: int, limit: int) -> List[Dict[str, Any]]:
         """从Tushare获取新闻数据"""
@@ -2092,10 +2423,32 @@ class DataSourceManager:
             logger.error(f"❌ [数据来源: AKShare] 获取新闻失败: {e}")
             return []
 
+    @staticmethod
+    def _is_valid_news(result: Any) -> bool:
+        return bool(result) and len(result) > 0
+
+    def _news_fetchers(self, symbol: str, hours_back: int, limit: int) -> Dict[ChinaDataSource, Callable[[], List[Dict[str, Any]]]]:
+        return {
+            ChinaDataSource.MONGODB: lambda: self._get_mongodb_news(symbol, hours_back, limit, allow_fallback=False),
+            ChinaDataSource.TUSHARE: lambda: self._get_tushare_news(symbol, hours_back, limit),
+            ChinaDataSource.AKSHARE: lambda: self._get_akshare_news(symbol, hours_back, limit),
+        }
+
     def _try_fallback_news(self, symbol: str, hours_back: int, limit: int) -> List[Dict[str, Any]]:
         """新闻数据降级处理"""
         logger.error(f"🔄 {self.current_source.value}失败，尝试备用数据源获取新闻...")
 
+        if self.hedge_enabled:
+            result, actual_source = self._hedged_fetch(
+                'news', symbol, self._news_fetchers(symbol, hours_back, limit),
+                self._is_valid_news, include_current=False,
+            )
+            if result:
+                logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取新闻: {actual_source}")
+                return result
+            logger.warning(f"⚠️ [数据来源: 所有数据源失败] 无法获取新闻: {symbol or '市场新闻'}")
+            return []
+
         # 🔥 从数据库获取数据源优先级顺序（根据股票代码识别市场）
         fallback_order = self._get_data_source_priority_order(symbol)
 
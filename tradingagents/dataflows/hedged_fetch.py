@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+数据源对冲请求（hedged request）
+按优先级依次启动数据源：当前数据源在延迟预算内没有返回可用结果时，并行启动下一个数据源，
+取第一个通过质量检查的结果，其余请求取消或忽略。
+需要合并多个数据源结果时（如新闻聚合），gather 同时启动所有数据源，按完成顺序产出结果，
+超过各自截止时间仍未返回的数据源记为超时，不再等待。
+同时按数据源维护延迟/错误直方图，用于自适应调整优先级顺序。
+
+被放弃的请求无法取消，会继续占用工作线程直到返回。为避免少数卡住的数据源占满线程池：
+每个数据源同时运行（含排队）的请求数有上限，达到上限时跳过该数据源；
+延迟预算从请求实际开始运行时计时，在线程池中排队的时间不会触发新的对冲请求。
+"""
+
+import bisect
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 延迟直方图分桶上界（秒），最后一个桶为 +inf
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+# 样本数少于该值时不参与自适应排序，保持配置的优先级
+MIN_SAMPLES_FOR_ADAPT = 5
+
+# 错误率超过该值的数据源在自适应排序中被降级
+ERROR_RATE_DEMOTE_THRESHOLD = 0.5
+
+# 请求排队等待工作线程时，检查其是否已开始运行的间隔（秒）
+START_POLL_SECONDS = 0.05
+
+
+class SourceLatencyHistogram:
+    """单个数据源的延迟/错误直方图"""
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.success_count = 0
+        self.error_count = 0
+        self.total_latency = 0.0
+
+    @property
+    def samples(self) -> int:
+        return self.success_count + self.error_count
+
+    @property
+    def error_rate(self) -> float:
+        return self.error_count / self.samples if self.samples else 0.0
+
+    def observe(self, latency: float, ok: bool) -> None:
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.total_latency += latency
+        if ok:
+            self.success_count += 1
+        else:
+            self.error_count += 1
+
+    def quantile(self, q: float) -> float:
+        """按分桶上界估算延迟分位数，没有样本时返回0"""
+        if not self.samples:
+            return 0.0
+        target = q * self.samples
+        cumulative = 0
+        for i, count in enumerate(self.bucket_counts):
+            cumulative += count
+            if cumulative >= target:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float('inf')
+        return float('inf')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'samples': self.samples,
+            'success': self.success_count,
+            'errors': self.error_count,
+            'error_rate': round(self.error_rate, 4),
+            'avg_latency': round(self.total_latency / self.samples, 4) if self.samples else 0.0,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'buckets': {
+                (f"le_{b}" if i < len(LATENCY_BUCKETS) else "le_inf"): c
+                for i, (b, c) in enumerate(zip(LATENCY_BUCKETS + (None,), self.bucket_counts))
+            },
+        }
+
+
+class SourceStats:
+    """按 (数据类型, 数据源) 维护直方图，线程安全"""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], SourceLatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, kind: str, source: str, latency: float, ok: bool) -> None:
+        with self._lock:
+            key = (kind, source)
+            if key not in self._histograms:
+                self._histograms[key] = SourceLatencyHistogram()
+            self._histograms[key].observe(latency, ok)
+
+    def get(self, kind: str, source: str) -> Optional[SourceLatencyHistogram]:
+        with self._lock:
+            return self._histograms.get((kind, source))
+
+    def rank(self, kind: str, sources: Sequence[str], budget: float) -> List[str]:
+        """
+        自适应排序：在配置优先级的基础上，把错误率过高、p90 超出延迟预算的数据源往后排
+
+        样本不足的数据源视为健康；排序是稳定的，健康程度相同时保持配置顺序。
+        """
+        def penalty(source: str) -> Tuple[int, int]:
+            hist = self.get(kind, source)
+            if hist is None or hist.samples < MIN_SAMPLES_FOR_ADAPT:
+                return (0, 0)
+            return (int(hist.error_rate > ERROR_RATE_DEMOTE_THRESHOLD),
+                    int(hist.quantile(0.9) > budget))
+
+        return sorted(sources, key=penalty)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {f"{kind}:{source}": hist.to_dict()
+                    for (kind, source), hist in self._histograms.items()}
+
+
+@dataclass
+class SourceOutcome:
+    """gather 中单个数据源的结果"""
+    source: str
+    status: str  # ok / invalid / error / timeout / busy（该数据源在途请求已达上限，未启动）
+    elapsed: float
+    result: Any = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'status': self.status, 'elapsed': round(self.elapsed, 3), 'error': self.error}
+
+
+class HedgedFetcher:
+    """对冲请求执行器
+
+    Args:
+        budget_seconds: 单个数据源的延迟预算，超过后并行启动下一个数据源
+        total_timeout: 整体超时，超过后放弃所有仍在运行的请求
+        stats: 数据源统计，None 时新建
+        max_workers: 线程池大小
+        max_inflight_per_source: 单个数据源同时运行（含排队、已被放弃仍未返回）的请求数上限，None 表示不限制
+    """
+
+    def __init__(self, budget_seconds: float = 2.0, total_timeout: float = 60.0,
+                 stats: Optional[SourceStats] = None, max_workers: int = 8,
+                 max_inflight_per_source: Optional[int] = None):
+        self.budget_seconds = budget_seconds
+        self.total_timeout = total_timeout
+        self.stats = stats or SourceStats()
+        self.max_inflight_per_source = max_inflight_per_source
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedged-fetch")
+        self._inflight: Dict[str, int] = {}
+        self._inflight_lock = threading.Lock()
+
+    def inflight(self) -> Dict[str, int]:
+        """各数据源当前在途的请求数"""
+        with self._inflight_lock:
+            return {source: count for source, count in self._inflight.items() if count}
+
+    def _release(self, source: str) -> None:
+        with self._inflight_lock:
+            self._inflight[source] -= 1
+
+    def _submit(self, source: str, fn: Callable[..., Any], *args) -> Optional[Tuple[Future, Dict[str, float]]]:
+        """
+        提交请求到线程池
+
+        Returns:
+            (future, 开始时间记录)，开始运行后记录中写入 'at'；该数据源在途请求已达上限时返回 None
+        """
+        with self._inflight_lock:
+            count = self._inflight.get(source, 0)
+            if self.max_inflight_per_source is not None and count >= self.max_inflight_per_source:
+                return None
+            self._inflight[source] = count + 1
+
+        started: Dict[str, float] = {}
+
+        def run():
+            started['at'] = time.perf_counter()
+            return fn(*args)
+
+        try:
+            future = self._executor.submit(run)
+        except Exception:
+            self._release(source)
+            raise
+        # 正常返回、异常或排队时被取消都会触发回调
+        future.add_done_callback(lambda _: self._release(source))
+        return future, started
+
+    def _timed_call(self, kind: str, source: str, func: Callable[[], Any],
+                    is_valid: Callable[[Any], bool]) -> Tuple[Any, bool]:
+        """在工作线程中执行并记录延迟；返回 (结果, 是否通过质量检查)"""
+        start = time.perf_counter()
+        ok = False
+        result = None
+        try:
+            result = func()
+            ok = bool(is_valid(result))
+        except Exception as e:
+            logger.warning(f"⚠️ [对冲请求] {kind}@{source} 异常: {e}")
+        finally:
+            self.stats.observe(kind, source, time.perf_counter() - start, ok)
+        return result, ok
+
+    def _run_source(self, kind: str, source: str, func: Callable[[], Any],
+                    is_valid: Callable[[Any], bool]) -> SourceOutcome:
+        """在工作线程中执行并记录延迟，返回带状态的结果"""
+        start = time.perf_counter()
+        result = None
+        error = None
+        try:
+            result = func()
+            status = 'ok' if is_valid(result) else 'invalid'
+        except Exception as e:
+            status = 'error'
+            error = str(e)
+            logger.warning(f"⚠️ [并发请求] {kind}@{source} 异常: {e}")
+        elapsed = time.perf_counter() - start
+        self.stats.observe(kind, source, elapsed, status == 'ok')
+        return SourceOutcome(source, status, elapsed, result, error)
+
+    def gather(self, kind: str, candidates: Sequence[Tuple[str, Callable[[], Any]]],
+               is_valid: Callable[[Any], bool] = bool,
+               deadlines: Optional[Dict[str, float]] = None) -> Iterator[SourceOutcome]:
+        """
+        同时启动所有数据源，按完成顺序逐个产出结果
+
+        Args:
+            kind: 数据类型，用于区分统计
+            candidates: [(数据源名称, 无参调用)]
+            is_valid: 质量检查函数，未通过的结果状态为 invalid
+            deadlines: 各数据源的截止时间（秒，从启动时算起），未配置的使用 total_timeout
+
+        Yields:
+            SourceOutcome；超过截止时间仍未返回的数据源产出 timeout，其结果被忽略
+        """
+        deadlines = deadlines or {}
+        start = time.perf_counter()
+        pending: Dict[Future, str] = {}
+        busy = []
+        for source, func in candidates:
+            submitted = self._submit(source, self._run_source, kind, source, func, is_valid)
+            if submitted is None:
+                busy.append(source)
+            else:
+                pending[submitted[0]] = source
+        limits = {source: deadlines.get(source, self.total_timeout) for source in pending.values()}
+
+        for source in busy:
+            logger.warning(f"🚧 [并发请求] {kind}@{source} 在途请求已达上限{self.max_inflight_per_source}，跳过")
+            yield SourceOutcome(source, 'busy', 0.0, error="too many in-flight requests")
+
+        try:
+            while pending:
+                elapsed = time.perf_counter() - start
+                for future, source in list(pending.items()):
+                    if not future.done() and elapsed >= limits[source]:
+                        del pending[future]
+                        future.cancel()
+                        logger.warning(f"⏰ [并发请求] {kind}@{source} 超过截止时间{limits[source]}s，不再等待")
+                        yield SourceOutcome(source, 'timeout', elapsed)
+                if not pending:
+                    break
+
+                timeout = max(0.0, min(limits[source] for source in pending.values()) - elapsed)
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def fetch(self, kind: str, candidates: Sequence[Tuple[str, Callable[[], Any]]],
+              is_valid: Callable[[Any], bool], adapt: bool = True) -> Tuple[Any, Optional[str]]:
+        """
+        按优先级执行对冲请求
+
+        Args:
+            kind: 数据类型（stock_data/stock_info/fundamentals/news），用于区分统计
+            candidates: [(数据源名称, 无参调用)]，按配置优先级排列
+            is_valid: 质量检查函数
+            adapt: 是否根据历史统计调整顺序
+
+        Returns:
+            (第一个通过质量检查的结果, 数据源名称)；全部失败时为 (None, None)
+        """
+        funcs = dict(candidates)
+        order = [name for name, _ in candidates]
+        if adapt:
+            ranked = self.stats.rank(kind, order, self.budget_seconds)
+            if ranked != order:
+                logger.info(f"📊 [对冲请求] {kind} 自适应顺序: {order} → {ranked}")
+            order = ranked
+
+        pending: Dict[Future, str] = {}
+        deadline = time.perf_counter() + self.total_timeout
+        next_index = 0
+        # 最近启动的请求的开始时间记录，延迟预算从其实际开始运行时计算
+        last_started: Dict[str, float] = {}
+
+        def launch_next() -> None:
+            """启动下一个未达在途上限的数据源；全部达到上限时不启动"""
+            nonlocal next_index, last_started
+            while next_index < len(order):
+                source = order[next_index]
+                next_index += 1
+                submitted = self._submit(source, self._timed_call, kind, source, funcs[source], is_valid)
+                if submitted is None:
+                    logger.warning(f"🚧 [对冲请求] {kind}@{source} 在途请求已达上限{self.max_inflight_per_source}，跳过")
+                    continue
+                if next_index > 1:
+                    logger.info(f"🔀 [对冲请求] {kind} 启动数据源 {source}")
+                future, last_started = submitted
+                pending[future] = source
+                return
+
+        try:
+            while next_index < len(order) or pending:
+                if not pending:
+                    # 前面的数据源都已失败，立即启动下一个
+                    launch_next()
+                    if not pending:
+                        break
+
+                now = time.perf_counter()
+                remaining = deadline - now
+                if remaining <= 0:
+                    logger.warning(f"⏰ [对冲请求] {kind} 整体超时，放弃: {list(pending.values())}")
+                    break
+                if next_index >= len(order):
+                    timeout = remaining
+                elif 'at' in last_started:
+                    # 还有未启动的数据源时只等待一个延迟预算（从最近的请求开始运行时算起）
+                    timeout = max(0.0, min(self.budget_seconds - (now - last_started['at']), remaining))
+                else:
+                    # 最近的请求仍在排队，排队时间不计入延迟预算
+                    timeout = min(START_POLL_SECONDS, remaining)
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    started_at = last_started.get('at')
+                    if next_index < len(order) and started_at is not None \
+                            and time.perf_counter() - started_at >= self.budget_seconds:
+                        logger.info(f"⏱️ [对冲请求] {kind} {list(pending.values())} 超过延迟预算{self.budget_seconds}s")
+                        launch_next()
+                    continue
+
+                for future in done:
+                    source = pending.pop(future)
+                    result, ok = future.result()
+                    if ok:
+                        logger.info(f"✅ [对冲请求] {kind} 采用数据源 {source} 的结果")
+                        return result, source
+                    logger.warning(f"⚠️ [对冲请求] {kind}@{source} 未通过质量检查")
+        finally:
+            # 未启动的请求直接取消，已在运行的请求结果被忽略
+            for future in pending:
+                future.cancel()
+
+        return None, None
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -742,39 +742,34 @@ def get_stock_stats_indicators_window(
     curr_date = datetime.strptime(curr_date, "%Y-%m-%d")
     before = curr_date - relativedelta(days=look_back_days)
 
+    # 行情只加载一次、指标只计算一次，再按窗口逐日输出（包装后的数据帧按 symbol+日期 缓存复用）
+    data_dir = os.path.join(DATA_DIR, "market_data", "price_data")
     if not online:
-        # read from YFin data
-        data = pd.read_csv(
-            os.path.join(
-                DATA_DIR,
-                f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-            )
-        )
-        data["Date"] = pd.to_datetime(data["Date"], utc=True)
-        dates_in_df = data["Date"].astype(str).str[:10]
-
-        ind_string = ""
-        while curr_date >= before:
-            # only do the trading dates
-            if curr_date.strftime("%Y-%m-%d") in dates_in_df.values:
-                indicator_value = get_stockstats_indicator(
-                    symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-                )
-
-                ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
-
-            curr_date = curr_date - relativedelta(days=1)
+        window = StockstatsUtils.get_stock_stats_window(
+            symbol, [indicator], end_date, look_back_days, data_dir, online=False
+        )[indicator]
     else:
-        # online gathering
-        ind_string = ""
-        while curr_date >= before:
-            indicator_value = get_stockstats_indicator(
-                symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
+        try:
+            window = StockstatsUtils.get_stock_stats_window(
+                symbol, [indicator], end_date, look_back_days, data_dir, online=True
+            )[indicator]
+        except Exception as e:
+            print(
+                f"Error getting stockstats indicator data for indicator {indicator} on {end_date}: {e}"
             )
-
-            ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
-
-            curr_date = curr_date - relativedelta(days=1)
+            window = None
+
+    ind_string = ""
+    while curr_date >= before:
+        date_str = curr_date.strftime("%Y-%m-%d")
+        if window is not None and date_str in window:
+            ind_string += f"{date_str}: {window[date_str]}\n"
+        elif online:
+            # 在线模式逐日输出，非交易日与单日接口保持一致
+            indicator_value = "" if window is None else "N/A: Not a trading day (weekend or holiday)"
+            ind_string += f"{date_str}: {indicator_value}\n"
+
+        curr_date = curr_date - relativedelta(days=1)
 
     result_str = (
         f"## {indicator} values from {before.strftime('%Y-%m-%d')} to {end_date}:\n\n"
@@ -41,6 +41,24 @@ except ImportError:
     ChineseFinanceDataAggregator = None
     CHINESE_FINANCE_AVAILABLE = False
 
+# 导入新闻全文检索索引
+try:
+    from .search_index import NewsSearchIndex, get_news_search_index
+    NEWS_SEARCH_INDEX_AVAILABLE = True
+except ImportError:
+    NewsSearchIndex = None
+    get_news_search_index = None
+    NEWS_SEARCH_INDEX_AVAILABLE = False
+
+# 导入新闻近似去重
+try:
+    from .near_duplicate import NearDuplicateDetector, drop_near_duplicates
+    NEWS_NEAR_DUPLICATE_AVAILABLE = True
+except ImportError:
+    NearDuplicateDetector = None
+    drop_near_duplicates = None
+    NEWS_NEAR_DUPLICATE_AVAILABLE = False
+
 __all__ = [
     # Google News
     'getNewsData',
@@ -59,5 +77,15 @@ __all__ = [
     # Chinese Finance
     'ChineseFinanceDataAggregator',
     'CHINESE_FINANCE_AVAILABLE',
+
+    # News Search Index
+    'NewsSearchIndex',
+    'get_news_search_index',
+    'NEWS_SEARCH_INDEX_AVAILABLE',
+
+    # News Near-Duplicate Detection
+    'NearDuplicateDetector',
+    'drop_near_duplicates',
+    'NEWS_NEAR_DUPLICATE_AVAILABLE',
 ]
 
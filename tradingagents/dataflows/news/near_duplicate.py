@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+新闻近似重复检测（MinHash + LSH）
+同一条新闻经新浪、东方财富、财联社等转载后标题和正文常被改写（加来源前缀、换标点、删改个别句子），
+按标题精确去重只能去掉完全相同的标题，转载稿全部进入新闻分析师的提示词。
+这里对 标题 + 正文 做近似重复聚类：
+- 分片：归一化（NFKC、小写、去标点）后，中文按单字、英文/数字按整词切分，取连续 3 个词元为一个分片
+- MinHash：64 个固定种子的哈希函数估计分片集合的 Jaccard 相似度
+- LSH：签名分为 16 段（每段 4 行），任一段相同即为候选，再用签名估计的相似度确认；
+  每条新闻只与同桶候选比较，一批新闻的聚类为 O(n)
+- 签名与分段键可存入 stock_news（dup_signature / dup_bands），入库时与近期已入库新闻比对，分配 cluster_id
+"""
+
+import hashlib
+import os
+import re
+import unicodedata
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+
+NEWS_DEDUP_ENABLED = os.getenv("TA_NEWS_DEDUP_ENABLED", "true").lower() == "true"
+# 判为近似重复的最小 Jaccard 相似度（MinHash 估计值）
+NEWS_DEDUP_THRESHOLD = float(os.getenv("TA_NEWS_DEDUP_THRESHOLD", "0.6"))
+# 入库时与多长时间内（按发布时间）已入库的新闻比对（小时）
+NEWS_DEDUP_WINDOW_HOURS = float(os.getenv("TA_NEWS_DEDUP_WINDOW_HOURS", "72"))
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+# 大于 2^32 的素数；系数 a < 2^31、分片哈希 < 2^32，a*x + b 不会溢出 uint64
+_PRIME = np.uint64(4294967311)
+# 固定种子：签名会写入 MongoDB，必须跨进程、跨版本保持一致
+_rng = np.random.default_rng(20240301)
+_PERM_A = _rng.integers(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[一-鿿]")
+
+# (MinHash 签名, LSH 分段键)
+Fingerprint = Tuple[np.ndarray, List[str]]
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """归一化后的词元 n-gram 集合（中文单字、英文/数字整词）"""
+    tokens = _TOKEN_RE.findall(unicodedata.normalize("NFKC", text or "").lower())
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """文本的 MinHash 签名（uint32 × NUM_PERM），无有效词元时返回 None"""
+    grams = shingles(text)
+    if not grams:
+        return None
+    hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams))
+    return ((np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray, scope: str = "") -> List[str]:
+    """
+    LSH 分段键
+
+    Args:
+        signature: MinHash 签名
+        scope: 分组（如股票代码），不同分组的新闻不会落入同一个桶
+    """
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(signature[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).hexdigest()
+        keys.append(f"{scope}:{band:x}{digest}")
+    return keys
+
+
+def fingerprint(text: str, scope: str = "") -> Optional[Fingerprint]:
+    """签名与分段键，无有效词元时返回 None"""
+    signature = minhash(text)
+    if signature is None:
+        return None
+    return signature, band_keys(signature, scope)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """两个签名估计的 Jaccard 相似度"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def news_text(news: Any) -> str:
+    """参与比对的文本：标题 + 正文（无正文时用摘要），支持字典与 NewsItem"""
+    if isinstance(news, dict):
+        title = news.get("title") or ""
+        body = news.get("content") or news.get("summary") or ""
+    else:
+        title = getattr(news, "title", "") or ""
+        body = getattr(news, "content", "") or ""
+    return f"{title} {body}"
+
+
+def estimate_tokens(text: str) -> int:
+    """估算文本进入提示词后的 token 数（安装 tiktoken 时按 cl100k_base 计数，否则按每 2 个字符 1 个 token）"""
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE:
+        try:
+            return len(_encoding().encode(text, disallowed_special=()))
+        except Exception:
+            pass
+    return max(1, len(text) // 2)
+
+
+_ENCODING = None
+
+
+def _encoding():
+    global _ENCODING
+    if _ENCODING is None:
+        _ENCODING = tiktoken.get_encoding("cl100k_base")
+    return _ENCODING
+
+
+class NearDuplicateDetector:
+    """
+    增量近似重复聚类
+
+    逐条加入新闻，与已加入新闻中同桶的候选比较，相似度达到阈值即归入相似度最高的候选所在的簇；
+    先加入的新闻为簇的代表。已入库的新闻可通过 register 带着原有 cluster_id 预先加入。
+    """
+
+    def __init__(self, threshold: float = NEWS_DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self._buckets: Dict[str, List[int]] = {}
+        self._signatures: List[np.ndarray] = []
+        self._clusters: List[str] = []
+        self.duplicate_count = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def register(self, fp: Fingerprint, cluster_id: str) -> None:
+        """加入已有簇归属的新闻（如已入库的新闻），不做比对"""
+        self._append(fp, cluster_id)
+
+    def add(self, fp: Optional[Fingerprint]) -> Tuple[str, bool]:
+        """
+        加入一条新闻
+
+        Returns:
+            (簇 id, 是否为已加入新闻的近似重复)；fp 为 None 时返回 ("", False)
+        """
+        if fp is None:
+            return "", False
+        signature, keys = fp
+        match = self._best_match(signature, keys)
+        if match is None:
+            cluster_id = hashlib.blake2b(signature.tobytes() + keys[0].encode("utf-8"), digest_size=8).hexdigest()
+        else:
+            cluster_id = self._clusters[match]
+            self.duplicate_count += 1
+        self._append(fp, cluster_id)
+        return cluster_id, match is not None
+
+    def add_text(self, text: str, scope: str = "") -> Tuple[str, bool]:
+        return self.add(fingerprint(text, scope))
+
+    def _append(self, fp: Fingerprint, cluster_id: str) -> None:
+        signature, keys = fp
+        docno = len(self._signatures)
+        self._signatures.append(signature)
+        self._clusters.append(cluster_id)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(docno)
+
+    def _best_match(self, signature: np.ndarray, keys: Sequence[str]) -> Optional[int]:
+        candidates = set()
+        for key in keys:
+            candidates.update(self._buckets.get(key, ()))
+        best, best_score = None, self.threshold
+        for docno in sorted(candidates):
+            score = similarity(signature, self._signatures[docno])
+            if score > best_score or (score == best_score and best is None):
+                best, best_score = docno, score
+        return best
+
+
+def cluster_news(news_list: Iterable[Any], text_of: Callable[[Any], str] = news_text,
+                 scope_of: Optional[Callable[[Any], str]] = None,
+                 threshold: float = NEWS_DEDUP_THRESHOLD) -> List[Tuple[str, bool]]:
+    """一批新闻的 (簇 id, 是否重复)，与输入顺序一一对应，每簇第一条为代表"""
+    detector = NearDuplicateDetector(threshold)
+    return [detector.add_text(text_of(news), scope_of(news) if scope_of else "") for news in news_list]
+
+
+def drop_near_duplicates(news_list: List[Any], text_of: Callable[[Any], str] = news_text,
+                         scope_of: Optional[Callable[[Any], str]] = None,
+                         threshold: float = NEWS_DEDUP_THRESHOLD) -> List[Any]:
+    """去掉近似重复的新闻，每簇保留最先出现的一条；未启用时原样返回"""
+    if not NEWS_DEDUP_ENABLED or len(news_list) < 2:
+        return news_list
+    assignments = cluster_news(news_list, text_of, scope_of, threshold)
+    unique = [news for news, (_, duplicate) in zip(news_list, assignments) if not duplicate]
+    if len(unique) < len(news_list):
+        logger.debug(f"[新闻去重] 近似重复 {len(news_list) - len(unique)} 条，保留 {len(unique)} 条")
+    return unique
+
+
+def dedup_savings(news_list: List[Any], text_of: Callable[[Any], str] = news_text,
+                  scope_of: Optional[Callable[[Any], str]] = None,
+                  threshold: float = NEWS_DEDUP_THRESHOLD) -> Dict[str, Any]:
+    """按标题精确去重与近似去重后的新闻数、估算 token 数对比"""
+    texts = [text_of(news) for news in news_list]
+    scopes = [scope_of(news) if scope_of else "" for news in news_list]
+
+    exact_seen = set()
+    exact_keep = []
+    for news, text, scope in zip(news_list, texts, scopes):
+        title = news.get("title", "") if isinstance(news, dict) else getattr(news, "title", "")
+        key = (scope, (title or "").lower().strip())
+        if key not in exact_seen:
+            exact_seen.add(key)
+            exact_keep.append(text)
+
+    detector = NearDuplicateDetector(threshold)
+    near_keep = [text for text, scope in zip(texts, scopes) if not detector.add_text(text, scope)[1]]
+
+    total_tokens = sum(estimate_tokens(text) for text in texts)
+    exact_tokens = sum(estimate_tokens(text) for text in exact_keep)
+    near_tokens = sum(estimate_tokens(text) for text in near_keep)
+    return {
+        "news": len(texts),
+        "after_exact_title": len(exact_keep),
+        "after_near_duplicate": len(near_keep),
+        "tokens": total_tokens,
+        "tokens_after_exact_title": exact_tokens,
+        "tokens_after_near_duplicate": near_tokens,
+        "tokens_saved_vs_exact_title": exact_tokens - near_tokens,
+        "saved_ratio_vs_exact_title": round((exact_tokens - near_tokens) / exact_tokens, 4) if exact_tokens else 0.0,
+        "token_counter": "tiktoken:cl100k_base" if TIKTOKEN_AVAILABLE else "chars/2",
+    }
@@ -2,6 +2,9 @@
 """
 实时新闻数据获取工具
 解决新闻滞后性问题
+
+各新闻源并发获取，每个新闻源有独立的截止时间，超时的新闻源不再等待；
+先返回的新闻源结果即时合并去重，最终按发布时间排序。
 """
 
 import requests
@@ -9,18 +12,52 @@ import json
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional, Tuple
+import threading
 import time
 import os
 from dataclasses import dataclass
 
 # 导入日志模块
 from tradingagents.config.runtime_settings import get_timezone_name
+from tradingagents.dataflows.hedged_fetch import HedgedFetcher
+from tradingagents.dataflows.news.near_duplicate import NEWS_DEDUP_ENABLED, NearDuplicateDetector, news_text
 
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
 
+# 单个新闻源的截止时间（秒）：超过后不再等待该新闻源，同时作为 HTTP 请求超时
+NEWS_SOURCE_DEADLINE_SECONDS = float(os.getenv("TA_NEWS_SOURCE_DEADLINE_SECONDS", "10"))
+# 按优先级取单一新闻源时（统一新闻工具），当前新闻源超过该时间仍无可用结果则并行启动下一个；
+# 应大于单个新闻源的截止时间，只对确实卡住的新闻源对冲，不打乱正常情况下的优先级
+NEWS_HEDGE_BUDGET_SECONDS = float(os.getenv("TA_NEWS_HEDGE_BUDGET_SECONDS", "15"))
+# 单一新闻源的整体超时（统一新闻工具中可能调用大模型，比普通新闻源更慢）
+NEWS_HEDGE_TOTAL_TIMEOUT_SECONDS = float(os.getenv("TA_NEWS_HEDGE_TOTAL_TIMEOUT_SECONDS", "60"))
+
+_news_fetchers: Dict[str, HedgedFetcher] = {}
+_news_fetchers_lock = threading.Lock()
+
+
+def get_news_fetcher(pool: str = "sources") -> HedgedFetcher:
+    """
+    新闻源共用的并发执行器（共享线程池与各新闻源的延迟/错误统计）
+
+    Args:
+        pool: 线程池名称。sources 用于直接请求新闻源；tools 用于统一新闻工具调用新闻工具，
+            工具内部还会使用 sources 线程池，分开避免嵌套提交耗尽同一线程池
+    """
+    if pool not in _news_fetchers:
+        with _news_fetchers_lock:
+            if pool not in _news_fetchers:
+                _news_fetchers[pool] = HedgedFetcher(
+                    budget_seconds=NEWS_HEDGE_BUDGET_SECONDS,
+                    total_timeout=NEWS_HEDGE_TOTAL_TIMEOUT_SECONDS,
+                    max_workers=16,
+                )
+    return _news_fetchers[pool]
+
+
 
 @dataclass
 class NewsItem:
@@ -34,10 +71,74 @@ class NewsItem:
     relevance_score: float
 
 
+class NewsMerger:
+    """
+    增量去重：各新闻源的结果到达即合并
+
+    按标题（忽略大小写与首尾空白）去重，标题过短的新闻丢弃；
+    启用近似去重（TA_NEWS_DEDUP_ENABLED）时，标题 + 正文近似重复的转载稿同样视为重复。
+    重复时保留优先级更高（priority 更小）的新闻源，与到达顺序无关。
+    """
+
+    def __init__(self, near_duplicate: bool = NEWS_DEDUP_ENABLED):
+        self._by_cluster: Dict[str, Tuple[int, int, NewsItem]] = {}
+        self._title_clusters: Dict[str, str] = {}
+        self._detector = NearDuplicateDetector() if near_duplicate else None
+        self.received = 0
+        self.duplicate_count = 0
+        self.near_duplicate_count = 0
+        self.short_title_count = 0
+
+    def add(self, news_items: List[NewsItem], priority: int = 0) -> None:
+        for item in news_items:
+            self.received += 1
+            title_key = item.title.lower().strip()
+
+            # 检查标题长度
+            if len(title_key) <= 10:
+                logger.debug(f"[新闻去重] 跳过标题过短的新闻: '{item.title}'，来源: {item.source}")
+                self.short_title_count += 1
+                continue
+
+            # 检查是否重复：先按标题，再按标题 + 正文近似比对
+            cluster_id = self._title_clusters.get(title_key)
+            if cluster_id is None:
+                cluster_id = title_key
+                if self._detector is not None:
+                    detected, near = self._detector.add_text(news_text(item))
+                    cluster_id = detected or title_key
+                    if near:
+                        self.near_duplicate_count += 1
+                self._title_clusters[title_key] = cluster_id
+
+            current = self._by_cluster.get(cluster_id)
+            if current is not None:
+                logger.debug(f"[新闻去重] 检测到重复新闻: '{item.title[:50]}...'，来源: {item.source}")
+                self.duplicate_count += 1
+                if priority >= current[0]:
+                    continue
+
+            self._by_cluster[cluster_id] = (priority, self.received, item)
+
+    def items(self) -> List[NewsItem]:
+        """去重后的新闻（按新闻源优先级、到达顺序排列）"""
+        return [item for _, _, item in sorted(self._by_cluster.values(), key=lambda entry: entry[:2])]
+
+
 class RealtimeNewsAggregator:
     """实时新闻聚合器"""
 
-    def __init__(self):
+    # 中文财经 RSS 源
+    CHINESE_RSS_SOURCES = [
+        "https://www.cls.cn/api/sw?app=CailianpressWeb&os=web&sv=7.7.5",
+        # 可以添加更多RSS源
+    ]
+
+    def __init__(self, source_deadline: float = NEWS_SOURCE_DEADLINE_SECONDS):
+        """
+        Args:
+            source_deadline: 单个新闻源的截止时间（秒），同时作为 HTTP 请求超时
+        """
         self.headers = {
             'User-Agent': 'TradingAgents-CN/1.0'
         }
@@ -47,10 +148,32 @@ class RealtimeNewsAggregator:
         self.alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY')
         self.newsapi_key = os.getenv('NEWSAPI_KEY')
 
+        self.source_deadline = source_deadline
+        # 最近一次聚合各新闻源的状态、耗时与新闻数
+        self.last_source_timings: Dict[str, Dict[str, Any]] = {}
+
+    def _news_sources(self, ticker: str, hours_back: int) -> List[Tuple[str, Callable[[], List[NewsItem]]]]:
+        """按优先级排列的新闻源：专业API > 新闻API > 中文财经新闻（未配置密钥的跳过）"""
+        sources = []
+        if self.finnhub_key:
+            sources.append(("FinnHub", lambda: self._get_finnhub_realtime_news(ticker, hours_back)))
+        if self.alpha_vantage_key:
+            sources.append(("Alpha Vantage", lambda: self._get_alpha_vantage_news(ticker, hours_back)))
+        if self.newsapi_key:
+            sources.append(("NewsAPI", lambda: self._get_newsapi_news(ticker, hours_back)))
+        else:
+            logger.info(f"[新闻聚合器] NewsAPI 密钥未配置，跳过此新闻源")
+        sources.append(("东方财富", lambda: self._get_eastmoney_news(ticker, hours_back)))
+        for i, rss_url in enumerate(self.CHINESE_RSS_SOURCES):
+            name = "财联社RSS" if i == 0 else f"RSS{i + 1}"
+            sources.append((name, lambda url=rss_url: self._parse_rss_feed(url, ticker, hours_back)))
+        return sources
+
     def get_realtime_stock_news(self, ticker: str, hours_back: int = 6, max_news: int = 10) -> List[NewsItem]:
         """
         获取实时股票新闻
-        优先级：专业API > 新闻API > 搜索引擎
+        各新闻源并发获取，超过截止时间的新闻源被忽略；标题重复时按优先级保留：专业API > 新闻API > 中文财经新闻
+        各新闻源的状态与耗时记录在 last_source_timings
 
         Args:
             ticker: 股票代码
@@ -59,73 +182,32 @@ class RealtimeNewsAggregator:
         """
         logger.info(f"[新闻聚合器] 开始获取 {ticker} 的实时新闻，回溯时间: {hours_back}小时")
         start_time = datetime.now(ZoneInfo(get_timezone_name()))
-        all_news = []
 
-        # 1. FinnHub实时新闻 (最高优先级)
-        logger.info(f"[新闻聚合器] 尝试从 FinnHub 获取 {ticker} 的新闻")
-        finnhub_start = datetime.now(ZoneInfo(get_timezone_name()))
-        finnhub_news = self._get_finnhub_realtime_news(ticker, hours_back)
-        finnhub_time = (datetime.now(ZoneInfo(get_timezone_name())) - finnhub_start).total_seconds()
-
-        if finnhub_news:
-            logger.info(f"[新闻聚合器] 成功从 FinnHub 获取 {len(finnhub_news)} 条新闻，耗时: {finnhub_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] FinnHub 未返回新闻，耗时: {finnhub_time:.2f}秒")
-
-        all_news.extend(finnhub_news)
-
-        # 2. Alpha Vantage新闻
-        logger.info(f"[新闻聚合器] 尝试从 Alpha Vantage 获取 {ticker} 的新闻")
-        av_start = datetime.now(ZoneInfo(get_timezone_name()))
-        av_news = self._get_alpha_vantage_news(ticker, hours_back)
-        av_time = (datetime.now(ZoneInfo(get_timezone_name())) - av_start).total_seconds()
-
-        if av_news:
-            logger.info(f"[新闻聚合器] 成功从 Alpha Vantage 获取 {len(av_news)} 条新闻，耗时: {av_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] Alpha Vantage 未返回新闻，耗时: {av_time:.2f}秒")
-
-        all_news.extend(av_news)
-
-        # 3. NewsAPI (如果配置了)
-        if self.newsapi_key:
-            logger.info(f"[新闻聚合器] 尝试从 NewsAPI 获取 {ticker} 的新闻")
-            newsapi_start = datetime.now(ZoneInfo(get_timezone_name()))
-            newsapi_news = self._get_newsapi_news(ticker, hours_back)
-            newsapi_time = (datetime.now(ZoneInfo(get_timezone_name())) - newsapi_start).total_seconds()
-
-            if newsapi_news:
-                logger.info(f"[新闻聚合器] 成功从 NewsAPI 获取 {len(newsapi_news)} 条新闻，耗时: {newsapi_time:.2f}秒")
+        # 所有新闻源并发获取，先返回的结果即时合并去重
+        sources = self._news_sources(ticker, hours_back)
+        priority = {name: i for i, (name, _) in enumerate(sources)}
+        deadlines = {name: self.source_deadline for name in priority}
+        logger.info(f"[新闻聚合器] 并发获取 {len(sources)} 个新闻源: {list(priority)}，单源截止时间: {self.source_deadline}秒")
+
+        merger = NewsMerger()
+        timings = {}
+        for outcome in get_news_fetcher().gather("realtime_news", sources, is_valid=bool, deadlines=deadlines):
+            news = outcome.result or []
+            timings[outcome.source] = {**outcome.to_dict(), 'count': len(news)}
+            if news:
+                logger.info(f"[新闻聚合器] 成功从 {outcome.source} 获取 {len(news)} 条新闻，耗时: {outcome.elapsed:.2f}秒")
+                merger.add(news, priority[outcome.source])
+            elif outcome.status == 'timeout':
+                logger.warning(f"[新闻聚合器] {outcome.source} 超过截止时间 {self.source_deadline}秒，忽略其结果")
             else:
-                logger.info(f"[新闻聚合器] NewsAPI 未返回新闻，耗时: {newsapi_time:.2f}秒")
-
-            all_news.extend(newsapi_news)
-        else:
-            logger.info(f"[新闻聚合器] NewsAPI 密钥未配置，跳过此新闻源")
-
-        # 4. 中文财经新闻源
-        logger.info(f"[新闻聚合器] 尝试获取 {ticker} 的中文财经新闻")
-        chinese_start = datetime.now(ZoneInfo(get_timezone_name()))
-        chinese_news = self._get_chinese_finance_news(ticker, hours_back)
-        chinese_time = (datetime.now(ZoneInfo(get_timezone_name())) - chinese_start).total_seconds()
-
-        if chinese_news:
-            logger.info(f"[新闻聚合器] 成功获取 {len(chinese_news)} 条中文财经新闻，耗时: {chinese_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] 未获取到中文财经新闻，耗时: {chinese_time:.2f}秒")
-
-        all_news.extend(chinese_news)
-
-        # 去重和排序
-        logger.info(f"[新闻聚合器] 开始对 {len(all_news)} 条新闻进行去重和排序")
-        dedup_start = datetime.now(ZoneInfo(get_timezone_name()))
-        unique_news = self._deduplicate_news(all_news)
-        sorted_news = sorted(unique_news, key=lambda x: x.publish_time, reverse=True)
-        dedup_time = (datetime.now(ZoneInfo(get_timezone_name())) - dedup_start).total_seconds()
+                logger.info(f"[新闻聚合器] {outcome.source} 未返回新闻，耗时: {outcome.elapsed:.2f}秒")
+        self.last_source_timings = timings
 
-        # 记录去重结果
-        removed_count = len(all_news) - len(unique_news)
-        logger.info(f"[新闻聚合器] 新闻去重完成，移除了 {removed_count} 条重复新闻，剩余 {len(sorted_news)} 条，耗时: {dedup_time:.2f}秒")
+        # 排序
+        sorted_news = sorted(merger.items(), key=lambda x: x.publish_time, reverse=True)
+        logger.info(f"[新闻聚合器] 新闻去重完成，收到 {merger.received} 条，移除重复 {merger.duplicate_count} 条"
+                    f"（其中近似重复 {merger.near_duplicate_count} 条）、"
+                    f"标题过短 {merger.short_title_count} 条，剩余 {len(sorted_news)} 条")
 
         # 记录总体情况
         total_time = (datetime.now(ZoneInfo(get_timezone_name())) - start_time).total_seconds()
@@ -163,7 +245,7 @@ class RealtimeNewsAggregator:
                 'token': self.finnhub_key
             }
 
-            response = requests.get(url, params=params, headers=self.headers)
+            response = requests.get(url, params=params, headers=self.headers, timeout=self.source_deadline)
             response.raise_for_status()
 
             news_data = response.json()
@@ -208,7 +290,7 @@ class RealtimeNewsAggregator:
                 'limit': 50
             }
 
-            response = requests.get(url, params=params, headers=self.headers)
+            response = requests.get(url, params=params, headers=self.headers, timeout=self.source_deadline)
             response.raise_for_status()
 
             data = response.json()
@@ -268,7 +350,7 @@ class RealtimeNewsAggregator:
                 'apiKey': self.newsapi_key
             }
 
-            response = requests.get(url, params=params, headers=self.headers)
+            response = requests.get(url, params=params, headers=self.headers, timeout=self.source_deadline)
             response.raise_for_status()
 
             data = response.json()
@@ -300,136 +382,98 @@ class RealtimeNewsAggregator:
             logger.error(f"NewsAPI新闻获取失败: {e}")
             return []
 
-    def _get_chinese_finance_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
-        """获取中文财经新闻"""
-        # 集成中文财经新闻API：财联社、东方财富等
-        logger.info(f"[中文财经新闻] 开始获取 {ticker} 的中文财经新闻，回溯时间: {hours_back}小时")
-        start_time = datetime.now(ZoneInfo(get_timezone_name()))
-
+    def _get_eastmoney_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
+        """获取东方财富个股新闻（通过 AKShare）"""
+        news_items = []
         try:
-            news_items = []
+            logger.info(f"[中文财经新闻] 尝试通过 AKShare Provider 获取新闻")
+            from tradingagents.dataflows.providers.china.akshare import AKShareProvider
 
-            # 1. 尝试使用AKShare获取东方财富个股新闻
-            try:
-                logger.info(f"[中文财经新闻] 尝试通过 AKShare Provider 获取新闻")
-                from tradingagents.dataflows.providers.china.akshare import AKShareProvider
-
-                provider = AKShareProvider()
-
-                # 处理股票代码格式
-                # 如果是美股代码，不使用东方财富新闻
-                if '.' in ticker and any(suffix in ticker for suffix in ['.US', '.N', '.O', '.NYSE', '.NASDAQ']):
-                    logger.info(f"[中文财经新闻] 检测到美股代码 {ticker}，跳过东方财富新闻获取")
-                else:
-                    # 处理A股和港股代码
-                    clean_ticker = ticker.replace('.SH', '').replace('.SZ', '').replace('.SS', '')\
-                                    .replace('.HK', '').replace('.XSHE', '').replace('.XSHG', '')
-
-                    # 获取东方财富新闻
-                    logger.info(f"[中文财经新闻] 开始获取 {clean_ticker} 的东方财富新闻")
-                    em_start_time = datetime.now(ZoneInfo(get_timezone_name()))
-                    news_df = provider.get_stock_news_sync(symbol=clean_ticker)
-
-                    if not news_df.empty:
-                        logger.info(f"[中文财经新闻] 东方财富返回 {len(news_df)} 条新闻数据，开始处理")
-                        processed_count = 0
-                        skipped_count = 0
-                        error_count = 0
-
-                        # 转换为NewsItem格式
-                        for _, row in news_df.iterrows():
-                            try:
-                                # 解析时间
-                                time_str = row.get('时间', '')
-                                if time_str:
-                                    # 尝试解析时间格式，可能是'2023-01-01 12:34:56'格式
-                                    try:
-                                        publish_time = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S').replace(tzinfo=ZoneInfo(get_timezone_name()))
-                                    except:
-                                        # 尝试其他可能的格式
-                                        try:
-                                            publish_time = datetime.strptime(time_str, '%Y-%m-%d').replace(tzinfo=ZoneInfo(get_timezone_name()))
-                                        except:
-                                            logger.warning(f"[中文财经新闻] 无法解析时间格式: {time_str}，使用当前时间")
-                                            publish_time = datetime.now(ZoneInfo(get_timezone_name()))
-                                else:
-                                    logger.warning(f"[中文财经新闻] 新闻时间为空，使用当前时间")
-                                    publish_time = datetime.now(ZoneInfo(get_timezone_name()))
-
-                                # 检查时效性
-                                if publish_time < datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back):
-                                    skipped_count += 1
-                                    continue
-
-                                # 评估紧急程度
-                                title = row.get('标题', '')
-                                content = row.get('内容', '')
-                                urgency = self._assess_news_urgency(title, content)
-
-                                news_items.append(NewsItem(
-                                    title=title,
-                                    content=content,
-                                    source='东方财富',
-                                    publish_time=publish_time,
-                                    url=row.get('链接', ''),
-                                    urgency=urgency,
-                                    relevance_score=self._calculate_relevance(title, ticker)
-                                ))
-                                processed_count += 1
-                            except Exception as item_e:
-                                logger.error(f"[中文财经新闻] 处理东方财富新闻项目失败: {item_e}")
-                                error_count += 1
-                                continue
+            provider = AKShareProvider()
 
-                        em_time = (datetime.now(ZoneInfo(get_timezone_name())) - em_start_time).total_seconds()
-                        logger.info(f"[中文财经新闻] 东方财富新闻处理完成，成功: {processed_count}条，跳过: {skipped_count}条，错误: {error_count}条，耗时: {em_time:.2f}秒")
-            except Exception as ak_e:
-                logger.error(f"[中文财经新闻] 获取东方财富新闻失败: {ak_e}")
-
-            # 2. 财联社RSS (如果可用)
-            logger.info(f"[中文财经新闻] 开始获取财联社RSS新闻")
-            rss_start_time = datetime.now(ZoneInfo(get_timezone_name()))
-            rss_sources = [
-                "https://www.cls.cn/api/sw?app=CailianpressWeb&os=web&sv=7.7.5",
-                # 可以添加更多RSS源
-            ]
+            # 处理股票代码格式
+            # 如果是美股代码，不使用东方财富新闻
+            if '.' in ticker and any(suffix in ticker for suffix in ['.US', '.N', '.O', '.NYSE', '.NASDAQ']):
+                logger.info(f"[中文财经新闻] 检测到美股代码 {ticker}，跳过东方财富新闻获取")
+            else:
+                # 处理A股和港股代码
+                clean_ticker = ticker.replace('.SH', '').replace('.SZ', '').replace('.SS', '')\
+                                .replace('.HK', '').replace('.XSHE', '').replace('.XSHG', '')
 
-            rss_success_count = 0
-            rss_error_count = 0
-            total_rss_items = 0
+                # 获取东方财富新闻
+                logger.info(f"[中文财经新闻] 开始获取 {clean_ticker} 的东方财富新闻")
+                em_start_time = datetime.now(ZoneInfo(get_timezone_name()))
+                news_df = provider.get_stock_news_sync(symbol=clean_ticker)
 
-            for rss_url in rss_sources:
-                try:
-                    logger.info(f"[中文财经新闻] 尝试解析RSS源: {rss_url}")
-                    rss_item_start = datetime.now(ZoneInfo(get_timezone_name()))
-                    items = self._parse_rss_feed(rss_url, ticker, hours_back)
-                    rss_item_time = (datetime.now(ZoneInfo(get_timezone_name())) - rss_item_start).total_seconds()
-
-                    if items:
-                        logger.info(f"[中文财经新闻] 成功从RSS源获取 {len(items)} 条新闻，耗时: {rss_item_time:.2f}秒")
-                        news_items.extend(items)
-                        total_rss_items += len(items)
-                        rss_success_count += 1
-                    else:
-                        logger.info(f"[中文财经新闻] RSS源未返回相关新闻，耗时: {rss_item_time:.2f}秒")
-                except Exception as rss_e:
-                    logger.error(f"[中文财经新闻] 解析RSS源失败: {rss_e}")
-                    rss_error_count += 1
-                    continue
+                if not news_df.empty:
+                    logger.info(f"[中文财经新闻] 东方财富返回 {len(news_df)} 条新闻数据，开始处理")
+                    processed_count = 0
+                    skipped_count = 0
+                    error_count = 0
+
+                    # 转换为NewsItem格式
+                    for _, row in news_df.iterrows():
+                        try:
+                            # 解析时间
+                            time_str = row.get('时间', '')
+                            if time_str:
+                                # 尝试解析时间格式，可能是'2023-01-01 12:34:56'格式
+                                try:
+                                    publish_time = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S').replace(tzinfo=ZoneInfo(get_timezone_name()))
+                                except:
+                                    # 尝试其他可能的格式
+                                    try:
+                                        publish_time = datetime.strptime(time_str, '%Y-%m-%d').replace(tzinfo=ZoneInfo(get_timezone_name()))
+                                    except:
+                                        logger.warning(f"[中文财经新闻] 无法解析时间格式: {time_str}，使用当前时间")
+                                        publish_time = datetime.now(ZoneInfo(get_timezone_name()))
+                            else:
+                                logger.warning(f"[中文财经新闻] 新闻时间为空，使用当前时间")
+                                publish_time = datetime.now(ZoneInfo(get_timezone_name()))
+
+                            # 检查时效性
+                            if publish_time < datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back):
+                                skipped_count += 1
+                                continue
 
-            # 记录RSS获取总结
-            rss_total_time = (datetime.now(ZoneInfo(get_timezone_name())) - rss_start_time).total_seconds()
-            logger.info(f"[中文财经新闻] RSS新闻获取完成，成功源: {rss_success_count}个，失败源: {rss_error_count}个，获取新闻: {total_rss_items}条，总耗时: {rss_total_time:.2f}秒")
+                            # 评估紧急程度
+                            title = row.get('标题', '')
+                            content = row.get('内容', '')
+                            urgency = self._assess_news_urgency(title, content)
+
+                            news_items.append(NewsItem(
+                                title=title,
+                                content=content,
+                                source='东方财富',
+                                publish_time=publish_time,
+                                url=row.get('链接', ''),
+                                urgency=urgency,
+                                relevance_score=self._calculate_relevance(title, ticker)
+                            ))
+                            processed_count += 1
+                        except Exception as item_e:
+                            logger.error(f"[中文财经新闻] 处理东方财富新闻项目失败: {item_e}")
+                            error_count += 1
+                            continue
+
+                    em_time = (datetime.now(ZoneInfo(get_timezone_name())) - em_start_time).total_seconds()
+                    logger.info(f"[中文财经新闻] 东方财富新闻处理完成，成功: {processed_count}条，跳过: {skipped_count}条，错误: {error_count}条，耗时: {em_time:.2f}秒")
+        except Exception as ak_e:
+            logger.error(f"[中文财经新闻] 获取东方财富新闻失败: {ak_e}")
+        return news_items
 
-            # 记录中文财经新闻获取总结
-            total_time = (datetime.now(ZoneInfo(get_timezone_name())) - start_time).total_seconds()
-            logger.info(f"[中文财经新闻] {ticker} 的中文财经新闻获取完成，总共获取 {len(news_items)} 条新闻，总耗时: {total_time:.2f}秒")
+    def _get_chinese_finance_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
+        """获取中文财经新闻（东方财富 + 财联社RSS）"""
+        logger.info(f"[中文财经新闻] 开始获取 {ticker} 的中文财经新闻，回溯时间: {hours_back}小时")
+        start_time = datetime.now(ZoneInfo(get_timezone_name()))
 
-            return news_items
+        news_items = self._get_eastmoney_news(ticker, hours_back)
+        for rss_url in self.CHINESE_RSS_SOURCES:
+            news_items.extend(self._parse_rss_feed(rss_url, ticker, hours_back))
 
-        except Exception as e:
-            logger.error(f"[中文财经新闻] 中文财经新闻获取失败: {e}")
-            return []
+        total_time = (datetime.now(ZoneInfo(get_timezone_name())) - start_time).total_seconds()
+        logger.info(f"[中文财经新闻] {ticker} 的中文财经新闻获取完成，总共获取 {len(news_items)} 条新闻，总耗时: {total_time:.2f}秒")
+        return news_items
 
     def _parse_rss_feed(self, rss_url: str, ticker: str, hours_back: int) -> List[NewsItem]:
         """解析RSS源"""
@@ -442,7 +486,10 @@ class RealtimeNewsAggregator:
             import feedparser
 
             logger.info(f"[RSS解析] 尝试获取RSS源内容")
-            feed = feedparser.parse(rss_url)
+            # 由 requests 下载（带超时），feedparser 只负责解析
+            response = requests.get(rss_url, headers=self.headers, timeout=self.source_deadline)
+            response.raise_for_status()
+            feed = feedparser.parse(response.content)
 
             if not feed or not feed.entries:
                 logger.warning(f"[RSS解析] RSS源未返回有效内容")
@@ -569,39 +616,18 @@ class RealtimeNewsAggregator:
         return 0.3  # 默认相关性
 
     def _deduplicate_news(self, news_items: List[NewsItem]) -> List[NewsItem]:
-        """去重新闻"""
+        """去重新闻（标题相同或近似重复时保留先出现的新闻）"""
         logger.info(f"[新闻去重] 开始对 {len(news_items)} 条新闻进行去重处理")
         start_time = datetime.now(ZoneInfo(get_timezone_name()))
 
-        seen_titles = set()
-        unique_news = []
-        duplicate_count = 0
-        short_title_count = 0
-
-        for item in news_items:
-            # 简单的标题去重
-            title_key = item.title.lower().strip()
-
-            # 检查标题长度
-            if len(title_key) <= 10:
-                logger.debug(f"[新闻去重] 跳过标题过短的新闻: '{item.title}'，来源: {item.source}")
-                short_title_count += 1
-                continue
-
-            # 检查是否重复
-            if title_key in seen_titles:
-                logger.debug(f"[新闻去重] 检测到重复新闻: '{item.title[:50]}...'，来源: {item.source}")
-                duplicate_count += 1
-                continue
-
-            # 添加到结果集
-            seen_titles.add(title_key)
-            unique_news.append(item)
+        merger = NewsMerger()
+        merger.add(news_items)
+        unique_news = merger.items()
 
         # 记录去重结果
         time_taken = (datetime.now(ZoneInfo(get_timezone_name())) - start_time).total_seconds()
         logger.info(f"[新闻去重] 去重完成，原始新闻: {len(news_items)}条，去重后: {len(unique_news)}条，")
-        logger.info(f"[新闻去重] 去除重复: {duplicate_count}条，标题过短: {short_title_count}条，耗时: {time_taken:.2f}秒")
+        logger.info(f"[新闻去重] 去除重复: {merger.duplicate_count}条（其中近似重复 {merger.near_duplicate_count} 条），标题过短: {merger.short_title_count}条，耗时: {time_taken:.2f}秒")
 
         return unique_news
 
@@ -636,7 +662,15 @@ class RealtimeNewsAggregator:
 
         report = f"# {ticker} 实时新闻分析报告\n\n"
         report += f"📅 生成时间: {datetime.now(ZoneInfo(get_timezone_name())).strftime('%Y-%m-%d %H:%M:%S')}\n"
-        report += f"📊 新闻总数: {len(news_items)}条\n\n"
+        report += f"📊 新闻总数: {len(news_items)}条\n"
+        if self.last_source_timings:
+            status_text = {'timeout': '超时', 'error': '失败', 'busy': '繁忙跳过'}
+            source_parts = [
+                f"{source} {status_text.get(t['status'], str(t['count']) + '条')} {t['elapsed']:.1f}s"
+                for source, t in self.last_source_timings.items()
+            ]
+            report += f"📡 新闻源: {' | '.join(source_parts)}\n"
+        report += "\n"
 
         if high_urgency:
             report += "## 🚨 紧急新闻\n\n"
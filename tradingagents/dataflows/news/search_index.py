@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+新闻全文检索索引
+MongoDB $text 不做中文分词，整句中文被当作一个词，搜索“茅台”匹配不到“贵州茅台发布年报”。
+这里在进程内维护 stock_news 的倒排索引（标题 + 摘要 + 正文）：
+- 分词：安装 jieba 时使用搜索引擎模式分词，否则按中文二元组切分；英文/数字按整词
+- 股票代码别名：sh600519 / 600519.SH / 600519.SS 统一为 600519，文档的 symbol/symbols 也作为词项
+- 拼音别名：同时安装 jieba 与 pypinyin 时，为中文词增加全拼与首字母词项（maotai / mt）
+- BM25 排序，支持按股票代码、发布时间过滤
+- 随 NewsDataService 保存新闻增量更新；其他进程写入的新闻按 updated_at 水位线从 MongoDB 追平，
+  其他进程删除的新闻按 TA_NEWS_INDEX_RECONCILE_SECONDS 周期与 MongoDB 的键集合对账后移除
+- 快照持久化到磁盘（默认 <数据目录>/news_index），进程重启后加载快照再追平，无需全量重建
+- 异步追平时分词、建索引与快照写入在线程中执行，不阻塞事件循环
+"""
+
+import asyncio
+import functools
+import heapq
+import math
+import os
+import pickle
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from tradingagents.config.runtime_settings import get_data_dir
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+try:
+    import jieba
+    jieba.setLogLevel(60)
+    JIEBA_AVAILABLE = True
+except ImportError:
+    jieba = None
+    JIEBA_AVAILABLE = False
+
+try:
+    from pypinyin import lazy_pinyin, Style
+    PYPINYIN_AVAILABLE = True
+except ImportError:
+    lazy_pinyin = None
+    Style = None
+    PYPINYIN_AVAILABLE = False
+
+
+NEWS_INDEX_ENABLED = os.getenv("TA_NEWS_INDEX_ENABLED", "true").lower() == "true"
+NEWS_INDEX_PATH = os.getenv("TA_NEWS_INDEX_PATH") or str(get_data_dir("news_index", "stock_news.idx"))
+# 从 MongoDB 追平其他进程写入的最小间隔（秒）
+NEWS_INDEX_REFRESH_SECONDS = float(os.getenv("TA_NEWS_INDEX_REFRESH_SECONDS", "60"))
+# 与 MongoDB 对账（移除其他进程已删除的新闻）的间隔（秒）；加载快照后总是先对账一次
+NEWS_INDEX_RECONCILE_SECONDS = float(os.getenv("TA_NEWS_INDEX_RECONCILE_SECONDS", "3600"))
+# 关键词过滤时交给 MongoDB 的候选文档数上限
+NEWS_INDEX_MAX_CANDIDATES = int(os.getenv("TA_NEWS_INDEX_MAX_CANDIDATES", "1000"))
+
+# 快照格式版本，结构变化时递增，旧快照会被丢弃并重建
+SNAPSHOT_VERSION = 1
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 标题词频权重
+TITLE_WEIGHT = 2
+# 追平时水位线向前回看的时长，覆盖其他进程先取时间、后提交的写入
+CATCH_UP_OVERLAP = timedelta(seconds=60)
+
+# 追平时从 MongoDB 读取的字段
+INDEX_FIELDS = ("symbol", "symbols", "title", "summary", "content", "url", "publish_time", "updated_at")
+# 对账时只读取唯一键字段
+KEY_PROJECTION = {"_id": 0, "url": 1, "title": 1, "publish_time": 1}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[a-z]{2,4})?|[一-鿿]+")
+_CODE_RE = re.compile(r"(?:sh|sz|bj)?(\d{6}|\d{5})(?:\.(?:sh|sz|ss|bj|hk|xshg|xshe))?")
+_STOPWORDS = frozenset("的了在是和与及等对将于也而或")
+
+# (url, title, publish_time) —— 与 stock_news 的唯一索引一致
+NewsKey = Tuple[str, str, Optional[datetime]]
+
+
+def tokenizer_name() -> str:
+    if JIEBA_AVAILABLE:
+        return "jieba+pinyin" if PYPINYIN_AVAILABLE else "jieba"
+    return "bigram"
+
+
+def _normalize_code(token: str) -> Optional[str]:
+    match = _CODE_RE.fullmatch(token)
+    return match.group(1) if match else None
+
+
+def _cjk_terms(run: str) -> List[str]:
+    if JIEBA_AVAILABLE:
+        return [word for word in jieba.lcut_for_search(run) if word not in _STOPWORDS]
+    if len(run) == 1:
+        return [] if run in _STOPWORDS else [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+@functools.lru_cache(maxsize=65536)
+def _pinyin_aliases(word: str) -> Tuple[str, str]:
+    """中文词的全拼与首字母（同一词反复出现，缓存结果）"""
+    return "".join(lazy_pinyin(word)), "".join(lazy_pinyin(word, style=Style.FIRST_LETTER))
+
+
+def tokenize(text: str, with_aliases: bool = False) -> List[str]:
+    """
+    分词（索引与查询使用同一套规则）
+
+    Args:
+        text: 原始文本
+        with_aliases: 是否为中文词追加拼音别名（仅建索引时使用）
+    """
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKC", text).lower()
+    terms: List[str] = []
+    for token in _TOKEN_RE.findall(text):
+        if token[0] >= "一":
+            words = _cjk_terms(token)
+            terms.extend(words)
+            if with_aliases and JIEBA_AVAILABLE and PYPINYIN_AVAILABLE:
+                for word in words:
+                    if len(word) >= 2:
+                        terms.extend(_pinyin_aliases(word))
+            continue
+        code = _normalize_code(token)
+        if code:
+            terms.append(code)
+        elif "." in token:
+            terms.extend(part for part in token.split(".") if len(part) > 1)
+        elif len(token) > 1 or token.isdigit():
+            terms.append(token)
+    return terms
+
+
+def _naive_utc(value: Any) -> Optional[datetime]:
+    """统一为 naive UTC 时间（stock_news.publish_time 以 naive datetime 存储）"""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def news_key(doc: Dict[str, Any]) -> NewsKey:
+    published = doc.get("publish_time")
+    if isinstance(published, datetime):
+        # MongoDB 时间精度为毫秒，截断后与查询返回的文档一致
+        published = published.replace(microsecond=published.microsecond // 1000 * 1000)
+    return doc.get("url") or "", doc.get("title") or "", published
+
+
+def _doc_symbols(doc: Dict[str, Any]) -> Set[str]:
+    symbols = set(doc.get("symbols") or [])
+    if doc.get("symbol"):
+        symbols.add(doc["symbol"])
+    return {str(s) for s in symbols if s}
+
+
+class NewsSearchIndex:
+    """stock_news 的进程内倒排索引，BM25 排序"""
+
+    def __init__(self, path: Optional[str] = NEWS_INDEX_PATH, refresh_seconds: float = NEWS_INDEX_REFRESH_SECONDS,
+                 reconcile_seconds: float = NEWS_INDEX_RECONCILE_SECONDS):
+        """
+        Args:
+            path: 快照文件路径，None 表示不持久化
+            refresh_seconds: 从 MongoDB 追平的最小间隔
+            reconcile_seconds: 与 MongoDB 对账的最小间隔
+        """
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.reconcile_seconds = reconcile_seconds
+        self.tokenizer = tokenizer_name()
+        self._lock = threading.RLock()
+        self._reset()
+        self.ready = False
+        self._dirty = False
+        self._last_refresh = 0.0
+        self._last_reconcile: Optional[float] = None
+        self._refreshing = False
+        self._loaded = False
+
+    def _reset(self) -> None:
+        self._next_docno = 0
+        self._keys: Dict[int, NewsKey] = {}
+        self._docnos: Dict[NewsKey, int] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._forward: Dict[int, Dict[str, int]] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._total_len = 0
+        self._publish: Dict[int, Optional[datetime]] = {}
+        self._doc_symbols: Dict[int, Set[str]] = {}
+        self._by_symbol: Dict[str, Set[int]] = {}
+        self.watermark: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    # ---- 增删 ----
+
+    def _remove_docno(self, docno: int) -> None:
+        for term in self._forward.pop(docno):
+            postings = self._postings[term]
+            del postings[docno]
+            if not postings:
+                del self._postings[term]
+        self._total_len -= self._doc_len.pop(docno)
+        for symbol in self._doc_symbols.pop(docno):
+            docs = self._by_symbol[symbol]
+            docs.discard(docno)
+            if not docs:
+                del self._by_symbol[symbol]
+        del self._docnos[self._keys.pop(docno)]
+        del self._publish[docno]
+
+    def add_documents(self, docs: Iterable[Dict[str, Any]], track_watermark: bool = False) -> int:
+        """
+        新增或更新文档（按 url + title + publish_time 去重）
+
+        Args:
+            docs: stock_news 文档
+            track_watermark: 是否推进 updated_at 水位线（仅从 MongoDB 追平时推进，
+                本进程保存的新闻推进水位线会跳过其他进程更早写入的文档）
+
+        Returns:
+            写入的文档数
+        """
+        count = 0
+        with self._lock:
+            for doc in docs:
+                key = news_key(doc)
+                if not key[0] and not key[1]:
+                    continue
+                old = self._docnos.get(key)
+                if old is not None:
+                    self._remove_docno(old)
+
+                symbols = _doc_symbols(doc)
+                tf = Counter(tokenize(doc.get("title") or "", with_aliases=True))
+                for term in tf:
+                    tf[term] *= TITLE_WEIGHT
+                tf.update(tokenize(doc.get("summary") or "", with_aliases=True))
+                tf.update(tokenize(doc.get("content") or "", with_aliases=True))
+                for symbol in symbols:
+                    tf.update(tokenize(symbol))
+
+                docno = self._next_docno
+                self._next_docno += 1
+                self._keys[docno] = key
+                self._docnos[key] = docno
+                self._forward[docno] = dict(tf)
+                length = sum(tf.values())
+                self._doc_len[docno] = length
+                self._total_len += length
+                self._publish[docno] = _naive_utc(key[2])
+                self._doc_symbols[docno] = symbols
+                for symbol in symbols:
+                    self._by_symbol.setdefault(symbol, set()).add(docno)
+                for term, freq in tf.items():
+                    self._postings.setdefault(term, {})[docno] = freq
+
+                updated_at = _naive_utc(doc.get("updated_at")) if track_watermark else None
+                if updated_at and (self.watermark is None or updated_at > self.watermark):
+                    self.watermark = updated_at
+                count += 1
+            if count:
+                self._dirty = True
+        return count
+
+    def remove(self, keys: Iterable[NewsKey]) -> int:
+        removed = 0
+        with self._lock:
+            for key in keys:
+                docno = self._docnos.get(key)
+                if docno is not None:
+                    self._remove_docno(docno)
+                    removed += 1
+            if removed:
+                self._dirty = True
+        return removed
+
+    def remove_before(self, cutoff: datetime) -> int:
+        """删除发布时间早于 cutoff 的文档（与 delete_old_news 同步）"""
+        cutoff = _naive_utc(cutoff)
+        with self._lock:
+            expired = [self._keys[docno] for docno, published in self._publish.items()
+                       if published is not None and published < cutoff]
+            return self.remove(expired)
+
+    # ---- 检索 ----
+
+    def search(
+        self,
+        query: str,
+        symbols: Optional[Iterable[str]] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: int = 20,
+    ) -> List[Tuple[NewsKey, float]]:
+        """
+        BM25 检索
+
+        Args:
+            query: 查询文本（中文、英文、股票代码、拼音均可）
+            symbols: 只返回涉及这些股票代码的新闻（symbol 或 symbols 字段）
+            start_time / end_time: 发布时间范围（闭区间）
+            limit: 返回数量
+
+        Returns:
+            [(news_key, score)]，按得分降序
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        start_time = _naive_utc(start_time)
+        end_time = _naive_utc(end_time)
+
+        with self._lock:
+            n_docs = len(self._keys)
+            if not n_docs:
+                return []
+            allowed = None
+            if symbols:
+                allowed = set()
+                for symbol in symbols:
+                    allowed |= self._by_symbol.get(str(symbol), set())
+                if not allowed:
+                    return []
+
+            doc_len = self._doc_len
+            base = BM25_K1 * (1 - BM25_B)
+            slope = BM25_K1 * BM25_B * n_docs / self._total_len
+            scores: Dict[int, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                weight = math.log(1 + (n_docs - df + 0.5) / (df + 0.5)) * (BM25_K1 + 1)
+                if allowed is not None:
+                    postings = {docno: postings[docno] for docno in allowed if docno in postings}
+                for docno, freq in postings.items():
+                    scores[docno] = scores.get(docno, 0.0) + weight * freq / (freq + base + slope * doc_len[docno])
+
+            if start_time or end_time:
+                publish = self._publish
+                scores = {
+                    docno: score for docno, score in scores.items()
+                    if publish[docno] is not None
+                    and (start_time is None or publish[docno] >= start_time)
+                    and (end_time is None or publish[docno] <= end_time)
+                }
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(self._keys[docno], round(score, 4)) for docno, score in top]
+
+    @staticmethod
+    def keys_filter(keys: Iterable[NewsKey]) -> Dict[str, Any]:
+        """把检索结果转换为 MongoDB 查询条件（命中唯一索引）"""
+        return {"$or": [{"url": url, "title": title, "publish_time": published}
+                        for url, title, published in keys]}
+
+    # ---- 从 MongoDB 追平 ----
+
+    def _catch_up_query(self) -> Dict[str, Any]:
+        # 重复读到的文档按键覆盖，回看只多做少量重复工作
+        return {"updated_at": {"$gte": self.watermark - CATCH_UP_OVERLAP}} if self.watermark else {}
+
+    def _refresh_due(self, force: bool) -> bool:
+        return force or not self.ready or time.monotonic() - self._last_refresh >= self.refresh_seconds
+
+    def _reconcile_due(self) -> bool:
+        return self._last_reconcile is None or time.monotonic() - self._last_reconcile >= self.reconcile_seconds
+
+    def reconcile(self, present: Set[NewsKey], before_docno: int) -> int:
+        """
+        移除 MongoDB 中已不存在的文档（其他进程删除的新闻）
+
+        Args:
+            present: MongoDB 中现有新闻的键
+            before_docno: 开始读取键集合前的文档编号，之后写入索引的文档不参与对账
+        """
+        with self._lock:
+            stale = [key for docno, key in self._keys.items() if docno < before_docno and key not in present]
+        removed = self.remove(stale)
+        self._last_reconcile = time.monotonic()
+        if removed:
+            logger.info(f"🔎 新闻索引对账移除 {removed} 条已删除的新闻，剩余 {len(self)} 条")
+        return removed
+
+    def _finish_refresh(self, count: int, started: float, rebuilt: bool) -> None:
+        self.ready = True
+        self._last_refresh = time.monotonic()
+        if rebuilt:
+            # 全量构建的结果与 MongoDB 一致，无需马上对账
+            self._last_reconcile = self._last_refresh
+        if count:
+            logger.info(f"🔎 新闻索引追平 {count} 条，共 {len(self)} 条，耗时 {time.monotonic() - started:.2f}s")
+        self.save_if_dirty()
+
+    def refresh(self, collection, force: bool = False, batch_size: int = 1000) -> int:
+        """从 MongoDB（同步 PyMongo 集合）追平索引"""
+        if self._refreshing or not self._refresh_due(force):
+            return 0
+        self._refreshing = True
+        try:
+            self.load()
+            started = time.monotonic()
+            rebuilt = self.watermark is None
+            reconcile = not rebuilt and self._reconcile_due()
+            before_docno = self._next_docno
+            projection = {field: 1 for field in INDEX_FIELDS}
+            cursor = collection.find(self._catch_up_query(), projection).sort("updated_at", 1).batch_size(batch_size)
+            count = 0
+            batch = []
+            for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    count += self.add_documents(batch, track_watermark=True)
+                    batch = []
+            count += self.add_documents(batch, track_watermark=True)
+            if reconcile:
+                present = {news_key(doc) for doc in collection.find({}, KEY_PROJECTION).batch_size(batch_size)}
+                self.reconcile(present, before_docno)
+            self._finish_refresh(count, started, rebuilt)
+            return count
+        finally:
+            self._refreshing = False
+
+    async def refresh_async(self, collection, force: bool = False, batch_size: int = 1000) -> int:
+        """
+        从 MongoDB（Motor 异步集合）追平索引
+
+        分词建索引、加载与保存快照在线程中执行；已有追平在进行时直接返回 0（调用方按 ready 决定是否使用索引）
+        """
+        if self._refreshing or not self._refresh_due(force):
+            return 0
+        self._refreshing = True
+        try:
+            await asyncio.to_thread(self.load)
+            started = time.monotonic()
+            rebuilt = self.watermark is None
+            reconcile = not rebuilt and self._reconcile_due()
+            before_docno = self._next_docno
+            projection = {field: 1 for field in INDEX_FIELDS}
+            cursor = collection.find(self._catch_up_query(), projection).sort("updated_at", 1).batch_size(batch_size)
+            count = 0
+            batch = []
+            async for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    count += await asyncio.to_thread(self.add_documents, batch, True)
+                    batch = []
+            count += await asyncio.to_thread(self.add_documents, batch, True)
+            if reconcile:
+                present = set()
+                async for doc in collection.find({}, KEY_PROJECTION).batch_size(batch_size):
+                    present.add(news_key(doc))
+                await asyncio.to_thread(self.reconcile, present, before_docno)
+            await asyncio.to_thread(self._finish_refresh, count, started, rebuilt)
+            return count
+        finally:
+            self._refreshing = False
+
+    def clear(self) -> None:
+        """清空索引，下次追平时从 MongoDB 全量重建（不再加载旧快照）"""
+        with self._lock:
+            self._reset()
+            self.ready = False
+            self._dirty = True
+            self._loaded = True
+
+    # ---- 快照 ----
+
+    def load(self) -> bool:
+        """加载磁盘快照（每个实例只尝试一次）；分词器或格式版本不一致时丢弃"""
+        with self._lock:
+            if self._loaded:
+                return False
+            self._loaded = True
+            if not self.path or not os.path.exists(self.path):
+                return False
+            try:
+                with open(self.path, "rb") as f:
+                    state = pickle.load(f)
+            except Exception as e:
+                logger.warning(f"⚠️ 新闻索引快照读取失败，将从 MongoDB 重建: {e}")
+                return False
+            if state.get("version") != SNAPSHOT_VERSION or state.get("tokenizer") != self.tokenizer:
+                logger.info(f"🔎 新闻索引快照格式或分词器已变化（{state.get('tokenizer')} -> {self.tokenizer}），将重建")
+                return False
+            self._reset()
+            for name in ("_next_docno", "_keys", "_forward", "_doc_len", "_publish", "_doc_symbols", "watermark"):
+                setattr(self, name, state[name])
+            self._docnos = {key: docno for docno, key in self._keys.items()}
+            # 快照之后其他进程可能删除了新闻，下次追平时先对账
+            self._last_reconcile = None
+            self._total_len = sum(self._doc_len.values())
+            for docno, tf in self._forward.items():
+                for term, freq in tf.items():
+                    self._postings.setdefault(term, {})[docno] = freq
+            for docno, symbols in self._doc_symbols.items():
+                for symbol in symbols:
+                    self._by_symbol.setdefault(symbol, set()).add(docno)
+            logger.info(f"🔎 已加载新闻索引快照: {len(self)} 条，水位线 {self.watermark}")
+            return True
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            state = {
+                "version": SNAPSHOT_VERSION,
+                "tokenizer": self.tokenizer,
+                "_next_docno": self._next_docno,
+                "_keys": self._keys,
+                "_forward": self._forward,
+                "_doc_len": self._doc_len,
+                "_publish": self._publish,
+                "_doc_symbols": self._doc_symbols,
+                "watermark": self.watermark,
+            }
+            payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+            self._dirty = False
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.path)
+
+    def save_if_dirty(self) -> None:
+        if self._dirty:
+            try:
+                self.save()
+            except OSError as e:
+                logger.warning(f"⚠️ 新闻索引快照保存失败: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": len(self._keys),
+                "terms": len(self._postings),
+                "symbols": len(self._by_symbol),
+                "tokenizer": self.tokenizer,
+                "ready": self.ready,
+                "watermark": self.watermark.isoformat() if self.watermark else None,
+            }
+
+
+_news_index: Optional[NewsSearchIndex] = None
+_news_index_lock = threading.Lock()
+
+
+def get_news_search_index() -> Optional[NewsSearchIndex]:
+    """获取全局新闻索引；TA_NEWS_INDEX_ENABLED=false 时返回 None"""
+    global _news_index
+    if not NEWS_INDEX_ENABLED:
+        return None
+    if _news_index is None:
+        with _news_index_lock:
+            if _news_index is None:
+                _news_index = NewsSearchIndex()
+    return _news_index
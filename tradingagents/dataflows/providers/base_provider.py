@@ -1,8 +1,9 @@
 """
 统一股票数据提供器基类
 """
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List, Union
+from typing import Callable, Optional, Dict, Any, List, Union
 from datetime import datetime, date
 import logging
 import pandas as pd
@@ -13,6 +14,9 @@ class BaseStockDataProvider(ABC):
     股票数据提供器基类
     定义了所有数据源提供器的统一接口
     """
+
+    # 共享速率限制器的数据源名称（tushare/akshare/baostock），None 表示不限流
+    rate_limit_source: Optional[str] = None
     
     def __init__(self, provider_name: str):
         """
@@ -45,6 +49,31 @@ class BaseStockDataProvider(ABC):
     def is_available(self) -> bool:
         """检查数据源是否可用"""
         return self.connected
+
+    # ==================== 速率限制 ====================
+
+    async def _acquire_rate_limit(self):
+        """
+        等待数据源的共享速率限制许可
+
+        优先级通道取自调用上下文：分析流程默认走交互式通道，批量同步任务由 bulk_lane 切换到批量通道。
+        应用层（app.core.rate_limiter）不可用时不限流。
+        """
+        if not self.rate_limit_source:
+            return
+        try:
+            from app.core.rate_limiter import get_rate_limiter
+            limiter = get_rate_limiter(self.rate_limit_source)
+        except Exception as e:
+            self.logger.debug(f"速率限制器不可用，跳过限流: {e}")
+            return
+        if limiter is not None:
+            await limiter.acquire()
+
+    async def _call_api(self, func: Callable, *args, **kwargs):
+        """经速率限制后在线程中执行同步的数据源接口调用"""
+        await self._acquire_rate_limit()
+        return await asyncio.to_thread(func, *args, **kwargs)
     
     # ==================== 核心数据接口 ====================
     
@@ -9,6 +9,7 @@ from typing import Dict, Any, List, Optional, Union
 import pandas as pd
 
 from ..base_provider import BaseStockDataProvider
+from ...cache.spot_snapshot import A_SHARE_SPOT_EM, A_SHARE_SPOT_SINA, get_spot_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,8 @@ class AKShareProvider(BaseStockDataProvider):
     - 财务数据
     - 港股数据支持
     """
+
+    rate_limit_source = "akshare"
     
     def __init__(self):
         super().__init__("AKShare")
@@ -38,118 +41,20 @@ class AKShareProvider(BaseStockDataProvider):
         try:
             import akshare as ak
             import requests
-            import time
+            from .akshare_http import get_akshare_http_client
 
-            # 尝试导入 curl_cffi，如果可用则使用它来绕过反爬虫
-            try:
-                from curl_cffi import requests as curl_requests
-                use_curl_cffi = True
-                logger.info("🔧 检测到 curl_cffi，将使用它来模拟真实浏览器 TLS 指纹")
-            except ImportError:
-                use_curl_cffi = False
-                logger.warning("⚠️ curl_cffi 未安装，将使用标准 requests（可能被反爬虫拦截）")
-                logger.warning("   建议安装: pip install curl-cffi")
-
-            # 修复AKShare的bug：设置requests的默认headers，并添加请求延迟
-            # AKShare的stock_news_em()函数没有设置必要的headers，导致API返回空响应
+            # AKShare内部直接调用 requests.get（如 stock_news_em() 未设置必要的headers，导致API返回空响应），
+            # 将其路由到按主机池化的HTTP客户端：复用长连接、补齐浏览器headers、按主机令牌桶限速
             if not hasattr(requests, '_akshare_headers_patched'):
-                original_get = requests.get
-                last_request_time = {'time': 0}  # 使用字典以便在闭包中修改
-
-                def patched_get(url, **kwargs):
-                    """
-                    包装requests.get方法，自动添加必要的headers和请求延迟
-                    修复AKShare stock_news_em()函数缺少headers的问题
-                    如果可用，使用 curl_cffi 模拟真实浏览器 TLS 指纹
-                    """
-                    # 添加请求延迟，避免被反爬虫封禁
-                    # 只对东方财富网的请求添加延迟
-                    if 'eastmoney.com' in url:
-                        current_time = time.time()
-                        time_since_last_request = current_time - last_request_time['time']
-                        if time_since_last_request < 0.5:  # 至少间隔0.5秒
-                            time.sleep(0.5 - time_since_last_request)
-                        last_request_time['time'] = time.time()
-
-                    # 如果是东方财富网的请求，且 curl_cffi 可用，使用它来绕过反爬虫
-                    if use_curl_cffi and 'eastmoney.com' in url:
-                        try:
-                            # 使用 curl_cffi 模拟 Chrome 120 的 TLS 指纹
-                            # 注意：使用 impersonate 时，不要传递自定义 headers，让 curl_cffi 自动设置
-                            curl_kwargs = {
-                                'timeout': kwargs.get('timeout', 10),
-                                'impersonate': "chrome120"  # 模拟 Chrome 120
-                            }
+                http_client = get_akshare_http_client()
+                http_client.install()
 
-                            # 只传递非 headers 的参数
-                            if 'params' in kwargs:
-                                curl_kwargs['params'] = kwargs['params']
-                            # 不传递 headers，让 impersonate 自动设置
-                            if 'data' in kwargs:
-                                curl_kwargs['data'] = kwargs['data']
-                            if 'json' in kwargs:
-                                curl_kwargs['json'] = kwargs['json']
-
-                            response = curl_requests.get(url, **curl_kwargs)
-                            # curl_cffi 的响应对象已经兼容 requests.Response
-                            return response
-                        except Exception as e:
-                            # curl_cffi 失败，回退到标准 requests
-                            error_msg = str(e)
-                            # 忽略 TLS 库错误和 400 错误的详细日志（这是 Docker 环境的已知问题）
-                            if 'invalid library' not in error_msg and '400' not in error_msg:
-                                logger.warning(f"⚠️ curl_cffi 请求失败，回退到标准 requests: {e}")
-
-                    # 标准 requests 请求（非东方财富网，或 curl_cffi 不可用/失败）
-                    # 设置浏览器请求头
-                    if 'headers' not in kwargs or kwargs['headers'] is None:
-                        kwargs['headers'] = {
-                            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                            'Accept-Encoding': 'gzip, deflate, br',
-                            'Referer': 'https://www.eastmoney.com/',
-                            'Connection': 'keep-alive',
-                        }
-                    elif isinstance(kwargs['headers'], dict):
-                        # 如果已有headers，确保包含必要的字段
-                        if 'User-Agent' not in kwargs['headers']:
-                            kwargs['headers']['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                        if 'Referer' not in kwargs['headers']:
-                            kwargs['headers']['Referer'] = 'https://www.eastmoney.com/'
-                        if 'Accept' not in kwargs['headers']:
-                            kwargs['headers']['Accept'] = 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-                        if 'Accept-Language' not in kwargs['headers']:
-                            kwargs['headers']['Accept-Language'] = 'zh-CN,zh;q=0.9,en;q=0.8'
-
-                    # 添加重试机制（最多3次）
-                    max_retries = 3
-                    for attempt in range(max_retries):
-                        try:
-                            return original_get(url, **kwargs)
-                        except Exception as e:
-                            # 检查是否是SSL错误
-                            error_str = str(e)
-                            is_ssl_error = ('SSL' in error_str or 'ssl' in error_str or
-                                          'UNEXPECTED_EOF_WHILE_READING' in error_str)
-
-                            if is_ssl_error and attempt < max_retries - 1:
-                                # SSL错误，等待后重试
-                                wait_time = 0.5 * (attempt + 1)  # 递增等待时间
-                                time.sleep(wait_time)
-                                continue
-                            else:
-                                # 非SSL错误或已达到最大重试次数，直接抛出
-                                raise
-
-                # 应用patch
-                requests.get = patched_get
-                requests._akshare_headers_patched = True
-
-                if use_curl_cffi:
-                    logger.info("🔧 已修复AKShare的headers问题，使用 curl_cffi 模拟真实浏览器（Chrome 120）")
+                if http_client.use_curl_cffi:
+                    logger.info("🔧 已接入AKShare连接池，东方财富请求使用 curl_cffi 模拟真实浏览器（Chrome 120）")
                 else:
-                    logger.info("🔧 已修复AKShare的headers问题，并添加请求延迟（0.5秒）")
+                    logger.warning("⚠️ curl_cffi 未安装，将使用标准 requests（可能被反爬虫拦截）")
+                    logger.warning("   建议安装: pip install curl-cffi")
+                    logger.info("🔧 已接入AKShare连接池，并按主机限速")
 
             self.ak = ak
             self.connected = True
@@ -178,10 +83,9 @@ class AKShareProvider(BaseStockDataProvider):
             新闻 DataFrame 或 None
         """
         try:
-            from curl_cffi import requests as curl_requests
             import json
             import time
-            import os
+            from .akshare_http import get_akshare_http_client
 
             # 标准化股票代码
             symbol_6 = symbol.zfill(6)
@@ -213,13 +117,8 @@ class AKShareProvider(BaseStockDataProvider):
                 "_": str(int(time.time() * 1000))
             }
 
-            # 使用 curl_cffi 发送请求
-            response = curl_requests.get(
-                url,
-                params=params,
-                timeout=10,
-                impersonate="chrome120"
-            )
+            # 通过共享连接池发送请求（curl_cffi 会话，与 AKShare 请求共用东方财富限速）
+            response = get_akshare_http_client().get(url, params=params, timeout=10)
 
             if response.status_code != 200:
                 self.logger.error(f"❌ {symbol} 东方财富网 API 返回错误: {response.status_code}")
@@ -325,7 +224,7 @@ class AKShareProvider(BaseStockDataProvider):
             def fetch_stock_list():
                 return self.ak.stock_info_a_code_name()
 
-            stock_df = await asyncio.to_thread(fetch_stock_list)
+            stock_df = await self._call_api(fetch_stock_list)
 
             if stock_df is None or stock_df.empty:
                 logger.warning("⚠️ AKShare股票列表为空")
@@ -407,7 +306,7 @@ class AKShareProvider(BaseStockDataProvider):
             return self.ak.stock_info_a_code_name()
 
         try:
-            stock_list = await asyncio.to_thread(fetch_stock_list)
+            stock_list = await self._call_api(fetch_stock_list)
             if stock_list is not None and not stock_list.empty:
                 self._stock_list_cache = stock_list
                 self._cache_time = datetime.now()
@@ -426,7 +325,7 @@ class AKShareProvider(BaseStockDataProvider):
                 return self.ak.stock_individual_info_em(symbol=code)
 
             try:
-                stock_info = await asyncio.to_thread(fetch_individual_info)
+                stock_info = await self._call_api(fetch_individual_info)
 
                 if stock_info is not None and not stock_info.empty:
                     # 解析信息
@@ -554,9 +453,10 @@ class AKShareProvider(BaseStockDataProvider):
     
     async def get_batch_stock_quotes(self, codes: List[str]) -> Dict[str, Dict[str, Any]]:
         """
-        批量获取股票实时行情（优化版：一次获取全市场快照）
+        批量获取股票实时行情（优化版：读取进程级全市场快照）
 
-        优先使用新浪财经接口（更稳定），失败时回退到东方财富接口
+        优先使用新浪财经接口（更稳定），失败时回退到东方财富接口；
+        快照在刷新周期内共享，并发请求只触发一次全表下载
 
         Args:
             codes: 股票代码列表
@@ -576,106 +476,70 @@ class AKShareProvider(BaseStockDataProvider):
                 logger.debug(f"📊 批量获取 {len(codes)} 只股票的实时行情... (尝试 {attempt + 1}/{max_retries})")
 
                 # 优先使用新浪财经接口（更稳定，不容易被封）
-                def fetch_spot_data_sina():
-                    import time
-                    time.sleep(0.3)  # 添加延迟避免频率限制
-                    return self.ak.stock_zh_a_spot()
-
+                # 快照按代码索引（已去掉 sh/sz/bj 前缀），直接按代码查找
                 try:
-                    spot_df = await asyncio.to_thread(fetch_spot_data_sina)
-                    data_source = "sina"
+                    rows = await get_spot_snapshot(A_SHARE_SPOT_SINA).aget_rows(codes)
                     logger.debug("✅ 使用新浪财经接口获取数据")
                 except Exception as e:
                     logger.warning(f"⚠️ 新浪财经接口失败: {e}，尝试东方财富接口...")
                     # 回退到东方财富接口
-                    def fetch_spot_data_em():
-                        import time
-                        time.sleep(0.5)
-                        return self.ak.stock_zh_a_spot_em()
-                    spot_df = await asyncio.to_thread(fetch_spot_data_em)
-                    data_source = "eastmoney"
+                    rows = await get_spot_snapshot(A_SHARE_SPOT_EM).aget_rows(codes)
                     logger.debug("✅ 使用东方财富接口获取数据")
 
-                if spot_df is None or spot_df.empty:
-                    logger.warning("⚠️ 全市场快照为空")
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(retry_delay)
-                        continue
-                    return {}
-
                 # 构建代码到行情的映射
                 quotes_map = {}
                 codes_set = set(codes)
 
-                # 构建代码映射表（支持带前缀的代码匹配）
-                # 例如：sh600000 -> 600000, sz000001 -> 000001
-                code_mapping = {}
-                for code in codes:
-                    code_mapping[code] = code  # 原始代码
-                    # 添加可能的前缀变体
-                    for prefix in ['sh', 'sz', 'bj']:
-                        code_mapping[f"{prefix}{code}"] = code
-
-                for _, row in spot_df.iterrows():
-                    raw_code = str(row.get("代码", ""))
-
-                    # 尝试匹配代码（支持带前缀和不带前缀）
-                    matched_code = None
-                    if raw_code in code_mapping:
-                        matched_code = code_mapping[raw_code]
-                    elif raw_code in codes_set:
-                        matched_code = raw_code
-
-                    if matched_code:
-                        quotes_data = {
-                            "name": str(row.get("名称", f"股票{matched_code}")),
-                            "price": self._safe_float(row.get("最新价", 0)),
-                            "change": self._safe_float(row.get("涨跌额", 0)),
-                            "change_percent": self._safe_float(row.get("涨跌幅", 0)),
-                            "volume": self._safe_int(row.get("成交量", 0)),
-                            "amount": self._safe_float(row.get("成交额", 0)),
-                            "open": self._safe_float(row.get("今开", 0)),
-                            "high": self._safe_float(row.get("最高", 0)),
-                            "low": self._safe_float(row.get("最低", 0)),
-                            "pre_close": self._safe_float(row.get("昨收", 0)),
-                            # 🔥 新增：财务指标字段
-                            "turnover_rate": self._safe_float(row.get("换手率", None)),  # 换手率（%）
-                            "volume_ratio": self._safe_float(row.get("量比", None)),  # 量比
-                            "pe": self._safe_float(row.get("市盈率-动态", None)),  # 动态市盈率
-                            "pb": self._safe_float(row.get("市净率", None)),  # 市净率
-                            "total_mv": self._safe_float(row.get("总市值", None)),  # 总市值（元）
-                            "circ_mv": self._safe_float(row.get("流通市值", None)),  # 流通市值（元）
-                        }
+                for matched_code, row in rows.items():
+                    quotes_data = {
+                        "name": str(row.get("名称", f"股票{matched_code}")),
+                        "price": self._safe_float(row.get("最新价", 0)),
+                        "change": self._safe_float(row.get("涨跌额", 0)),
+                        "change_percent": self._safe_float(row.get("涨跌幅", 0)),
+                        "volume": self._safe_int(row.get("成交量", 0)),
+                        "amount": self._safe_float(row.get("成交额", 0)),
+                        "open": self._safe_float(row.get("今开", 0)),
+                        "high": self._safe_float(row.get("最高", 0)),
+                        "low": self._safe_float(row.get("最低", 0)),
+                        "pre_close": self._safe_float(row.get("昨收", 0)),
+                        # 🔥 新增：财务指标字段
+                        "turnover_rate": self._safe_float(row.get("换手率", None)),  # 换手率（%）
+                        "volume_ratio": self._safe_float(row.get("量比", None)),  # 量比
+                        "pe": self._safe_float(row.get("市盈率-动态", None)),  # 动态市盈率
+                        "pb": self._safe_float(row.get("市净率", None)),  # 市净率
+                        "total_mv": self._safe_float(row.get("总市值", None)),  # 总市值（元）
+                        "circ_mv": self._safe_float(row.get("流通市值", None)),  # 流通市值（元）
+                    }
 
-                        # 转换为标准化字典（使用匹配后的代码）
-                        quotes_map[matched_code] = {
-                            "code": matched_code,
-                            "symbol": matched_code,
-                            "name": quotes_data.get("name", f"股票{matched_code}"),
-                            "price": float(quotes_data.get("price", 0)),
-                            "change": float(quotes_data.get("change", 0)),
-                            "change_percent": float(quotes_data.get("change_percent", 0)),
-                            "volume": int(quotes_data.get("volume", 0)),
-                            "amount": float(quotes_data.get("amount", 0)),
-                            "open_price": float(quotes_data.get("open", 0)),
-                            "high_price": float(quotes_data.get("high", 0)),
-                            "low_price": float(quotes_data.get("low", 0)),
-                            "pre_close": float(quotes_data.get("pre_close", 0)),
-                            # 🔥 新增：财务指标字段
-                            "turnover_rate": quotes_data.get("turnover_rate"),  # 换手率（%）
-                            "volume_ratio": quotes_data.get("volume_ratio"),  # 量比
-                            "pe": quotes_data.get("pe"),  # 动态市盈率
-                            "pe_ttm": quotes_data.get("pe"),  # TTM市盈率（与动态市盈率相同）
-                            "pb": quotes_data.get("pb"),  # 市净率
-                            "total_mv": quotes_data.get("total_mv") / 1e8 if quotes_data.get("total_mv") else None,  # 总市值（转换为亿元）
-                            "circ_mv": quotes_data.get("circ_mv") / 1e8 if quotes_data.get("circ_mv") else None,  # 流通市值（转换为亿元）
-                            # 扩展字段
-                            "full_symbol": self._get_full_symbol(matched_code),
-                            "market_info": self._get_market_info(matched_code),
-                            "data_source": "akshare",
-                            "last_sync": datetime.now(timezone.utc),
-                            "sync_status": "success"
-                        }
+                    # 转换为标准化字典（使用匹配后的代码）
+                    quotes_map[matched_code] = {
+                        "code": matched_code,
+                        "symbol": matched_code,
+                        "name": quotes_data.get("name", f"股票{matched_code}"),
+                        "price": float(quotes_data.get("price", 0)),
+                        "change": float(quotes_data.get("change", 0)),
+                        "change_percent": float(quotes_data.get("change_percent", 0)),
+                        "volume": int(quotes_data.get("volume", 0)),
+                        "amount": float(quotes_data.get("amount", 0)),
+                        "open_price": float(quotes_data.get("open", 0)),
+                        "high_price": float(quotes_data.get("high", 0)),
+                        "low_price": float(quotes_data.get("low", 0)),
+                        "pre_close": float(quotes_data.get("pre_close", 0)),
+                        # 🔥 新增：财务指标字段
+                        "turnover_rate": quotes_data.get("turnover_rate"),  # 换手率（%）
+                        "volume_ratio": quotes_data.get("volume_ratio"),  # 量比
+                        "pe": quotes_data.get("pe"),  # 动态市盈率
+                        "pe_ttm": quotes_data.get("pe"),  # TTM市盈率（与动态市盈率相同）
+                        "pb": quotes_data.get("pb"),  # 市净率
+                        "total_mv": quotes_data.get("total_mv") / 1e8 if quotes_data.get("total_mv") else None,  # 总市值（转换为亿元）
+                        "circ_mv": quotes_data.get("circ_mv") / 1e8 if quotes_data.get("circ_mv") else None,  # 流通市值（转换为亿元）
+                        # 扩展字段
+                        "full_symbol": self._get_full_symbol(matched_code),
+                        "market_info": self._get_market_info(matched_code),
+                        "data_source": "akshare",
+                        "last_sync": datetime.now(timezone.utc),
+                        "sync_status": "success"
+                    }
 
                 found_count = len(quotes_map)
                 missing_count = len(codes) - found_count
@@ -723,7 +587,7 @@ class AKShareProvider(BaseStockDataProvider):
             def fetch_bid_ask():
                 return self.ak.stock_bid_ask_em(symbol=code)
 
-            bid_ask_df = await asyncio.to_thread(fetch_bid_ask)
+            bid_ask_df = await self._call_api(fetch_bid_ask)
 
             # 🔥 打印原始返回数据
             logger.info(f"📊 stock_bid_ask_em 返回数据类型: {type(bid_ask_df)}")
@@ -799,40 +663,31 @@ class AKShareProvider(BaseStockDataProvider):
     async def _get_realtime_quotes_data(self, code: str) -> Dict[str, Any]:
         """获取实时行情数据"""
         try:
-            # 方法1: 获取A股实时行情
-            def fetch_spot_data():
-                return self.ak.stock_zh_a_spot_em()
-
+            # 方法1: 从共享的A股全市场快照中按代码查找
             try:
-                spot_df = await asyncio.to_thread(fetch_spot_data)
-
-                if spot_df is not None and not spot_df.empty:
-                    # 查找对应股票
-                    stock_data = spot_df[spot_df['代码'] == code]
+                row = await get_spot_snapshot(A_SHARE_SPOT_EM).aget_row(code)
 
-                    if not stock_data.empty:
-                        row = stock_data.iloc[0]
-
-                        # 解析行情数据
-                        return {
-                            "name": str(row.get("名称", f"股票{code}")),
-                            "price": self._safe_float(row.get("最新价", 0)),
-                            "change": self._safe_float(row.get("涨跌额", 0)),
-                            "change_percent": self._safe_float(row.get("涨跌幅", 0)),
-                            "volume": self._safe_int(row.get("成交量", 0)),
-                            "amount": self._safe_float(row.get("成交额", 0)),
-                            "open": self._safe_float(row.get("今开", 0)),
-                            "high": self._safe_float(row.get("最高", 0)),
-                            "low": self._safe_float(row.get("最低", 0)),
-                            "pre_close": self._safe_float(row.get("昨收", 0)),
-                            # 🔥 新增：财务指标字段
-                            "turnover_rate": self._safe_float(row.get("换手率", None)),  # 换手率（%）
-                            "volume_ratio": self._safe_float(row.get("量比", None)),  # 量比
-                            "pe": self._safe_float(row.get("市盈率-动态", None)),  # 动态市盈率
-                            "pb": self._safe_float(row.get("市净率", None)),  # 市净率
-                            "total_mv": self._safe_float(row.get("总市值", None)),  # 总市值（元）
-                            "circ_mv": self._safe_float(row.get("流通市值", None)),  # 流通市值（元）
-                        }
+                if row is not None:
+                    # 解析行情数据
+                    return {
+                        "name": str(row.get("名称", f"股票{code}")),
+                        "price": self._safe_float(row.get("最新价", 0)),
+                        "change": self._safe_float(row.get("涨跌额", 0)),
+                        "change_percent": self._safe_float(row.get("涨跌幅", 0)),
+                        "volume": self._safe_int(row.get("成交量", 0)),
+                        "amount": self._safe_float(row.get("成交额", 0)),
+                        "open": self._safe_float(row.get("今开", 0)),
+                        "high": self._safe_float(row.get("最高", 0)),
+                        "low": self._safe_float(row.get("最低", 0)),
+                        "pre_close": self._safe_float(row.get("昨收", 0)),
+                        # 🔥 新增：财务指标字段
+                        "turnover_rate": self._safe_float(row.get("换手率", None)),  # 换手率（%）
+                        "volume_ratio": self._safe_float(row.get("量比", None)),  # 量比
+                        "pe": self._safe_float(row.get("市盈率-动态", None)),  # 动态市盈率
+                        "pb": self._safe_float(row.get("市净率", None)),  # 市净率
+                        "total_mv": self._safe_float(row.get("总市值", None)),  # 总市值（元）
+                        "circ_mv": self._safe_float(row.get("流通市值", None)),  # 流通市值（元）
+                    }
             except Exception as e:
                 logger.debug(f"获取{code}A股实时行情失败: {e}")
 
@@ -841,7 +696,7 @@ class AKShareProvider(BaseStockDataProvider):
                 return self.ak.stock_zh_a_hist(symbol=code, period="daily", adjust="")
 
             try:
-                hist_df = await asyncio.to_thread(fetch_individual_spot)
+                hist_df = await self._call_api(fetch_individual_spot)
                 if hist_df is not None and not hist_df.empty:
                     # 取最新一天的数据作为当前行情
                     latest_row = hist_df.iloc[-1]
@@ -940,7 +795,7 @@ class AKShareProvider(BaseStockDataProvider):
                     adjust="qfq"  # 前复权
                 )
 
-            hist_df = await asyncio.to_thread(fetch_historical_data)
+            hist_df = await self._call_api(fetch_historical_data)
 
             if hist_df is None or hist_df.empty:
                 logger.warning(f"⚠️ {code}历史数据为空")
@@ -1020,7 +875,7 @@ class AKShareProvider(BaseStockDataProvider):
                 def fetch_financial_abstract():
                     return self.ak.stock_financial_abstract(symbol=code)
 
-                main_indicators = await asyncio.to_thread(fetch_financial_abstract)
+                main_indicators = await self._call_api(fetch_financial_abstract)
                 if main_indicators is not None and not main_indicators.empty:
                     financial_data['main_indicators'] = main_indicators.to_dict('records')
                     logger.debug(f"✅ {code}主要财务指标获取成功")
@@ -1032,7 +887,7 @@ class AKShareProvider(BaseStockDataProvider):
                 def fetch_balance_sheet():
                     return self.ak.stock_balance_sheet_by_report_em(symbol=code)
 
-                balance_sheet = await asyncio.to_thread(fetch_balance_sheet)
+                balance_sheet = await self._call_api(fetch_balance_sheet)
                 if balance_sheet is not None and not balance_sheet.empty:
                     financial_data['balance_sheet'] = balance_sheet.to_dict('records')
                     logger.debug(f"✅ {code}资产负债表获取成功")
@@ -1044,7 +899,7 @@ class AKShareProvider(BaseStockDataProvider):
                 def fetch_income_statement():
                     return self.ak.stock_profit_sheet_by_report_em(symbol=code)
 
-                income_statement = await asyncio.to_thread(fetch_income_statement)
+                income_statement = await self._call_api(fetch_income_statement)
                 if income_statement is not None and not income_statement.empty:
                     financial_data['income_statement'] = income_statement.to_dict('records')
                     logger.debug(f"✅ {code}利润表获取成功")
@@ -1056,7 +911,7 @@ class AKShareProvider(BaseStockDataProvider):
                 def fetch_cash_flow():
                     return self.ak.stock_cash_flow_sheet_by_report_em(symbol=code)
 
-                cash_flow = await asyncio.to_thread(fetch_cash_flow)
+                cash_flow = await self._call_api(fetch_cash_flow)
                 if cash_flow is not None and not cash_flow.empty:
                     financial_data['cash_flow'] = cash_flow.to_dict('records')
                     logger.debug(f"✅ {code}现金流量表获取成功")
@@ -1219,7 +1074,7 @@ class AKShareProvider(BaseStockDataProvider):
                     try:
                         from curl_cffi import requests as curl_requests
                         self.logger.debug(f"🐳 检测到 Docker 环境，使用 curl_cffi 直接调用 API")
-                        news_df = await asyncio.to_thread(
+                        news_df = await self._call_api(
                             self._get_stock_news_direct,
                             symbol=symbol_6,
                             limit=limit
@@ -1240,7 +1095,7 @@ class AKShareProvider(BaseStockDataProvider):
                 if news_df is None:
                     for attempt in range(max_retries):
                         try:
-                            news_df = await asyncio.to_thread(
+                            news_df = await self._call_api(
                                 ak.stock_news_em,
                                 symbol=symbol_6
                             )
@@ -1317,7 +1172,7 @@ class AKShareProvider(BaseStockDataProvider):
 
                 try:
                     # 获取财经新闻
-                    news_df = await asyncio.to_thread(
+                    news_df = await self._call_api(
                         ak.news_cctv,
                         limit=limit
                     )
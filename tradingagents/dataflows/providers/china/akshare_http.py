@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+AKShare HTTP 客户端层
+
+AKShare 内部直接调用 requests.get。这里把 requests.get 路由到按主机管理的连接池：
+- 每个主机一个长连接会话（keep-alive / 连接复用）；东方财富在 curl_cffi 可用时使用浏览器指纹会话（支持 HTTP/2）
+- 按域名规则的令牌桶限速：调用方各自预约发送时刻后在自己的线程/协程里等待，
+  不再有全局串行点，不同主机之间互不阻塞
+- 统计每个主机的请求数、连接复用率与限速等待时间
+
+限速规则通过环境变量 TA_AKSHARE_HOST_RATES 配置，格式 "域名=每秒请求数[/突发数]"，逗号分隔，
+例如 "eastmoney.com=2,sina.com.cn=5/5"。域名按后缀匹配，同一规则下的子域名共享一个令牌桶。
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 默认限速：东方财富每秒2次（与原先0.5秒最小间隔一致）
+DEFAULT_HOST_RATES = "eastmoney.com=2"
+HTTP_POOL_SIZE = int(os.getenv("TA_AKSHARE_HTTP_POOL_SIZE", "16"))
+SSL_MAX_RETRIES = 3
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Referer': 'https://www.eastmoney.com/',
+    'Connection': 'keep-alive',
+}
+
+
+def parse_host_rates(spec: str) -> Dict[str, Tuple[float, float]]:
+    """解析 "域名=速率[/突发]" 配置"""
+    rates: Dict[str, Tuple[float, float]] = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        host, value = item.split("=", 1)
+        rate_str, _, burst_str = value.partition("/")
+        try:
+            rate = float(rate_str)
+            burst = float(burst_str) if burst_str else 1.0
+        except ValueError:
+            logger.warning(f"⚠️ 忽略无效的限速配置: {item}")
+            continue
+        if rate > 0:
+            rates[host.strip().lower()] = (rate, max(1.0, burst))
+    return rates
+
+
+class TokenBucket:
+    """令牌桶限速器
+
+    采用预约方式：在锁内扣减令牌并计算本次请求的发送时刻，锁外等待，
+    因此同一主机的并发请求会按速率均匀排开，而不是串行地互相阻塞。
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """预约一个令牌，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class _HostMetrics:
+    __slots__ = ("requests", "errors", "wait_seconds", "connections")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.wait_seconds = 0.0
+        self.connections = 0
+
+
+class AKShareHttpClient:
+    """按主机池化的 HTTP 客户端"""
+
+    def __init__(self, host_rates: Optional[Dict[str, Tuple[float, float]]] = None,
+                 pool_size: int = HTTP_POOL_SIZE, use_curl_cffi: Optional[bool] = None):
+        if host_rates is None:
+            host_rates = parse_host_rates(os.getenv("TA_AKSHARE_HOST_RATES", DEFAULT_HOST_RATES))
+        self.pool_size = pool_size
+        self._buckets = {suffix: TokenBucket(rate, burst) for suffix, (rate, burst) in host_rates.items()}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._curl_local = threading.local()
+        self._metrics: Dict[str, _HostMetrics] = {}
+        self._lock = threading.Lock()
+        self._original_get = None
+
+        if use_curl_cffi is None:
+            try:
+                from curl_cffi import requests as curl_requests  # noqa: F401
+                use_curl_cffi = True
+            except ImportError:
+                use_curl_cffi = False
+        self.use_curl_cffi = use_curl_cffi
+
+    # ---- 限速 ----
+
+    def _bucket_for(self, host: str) -> Optional[TokenBucket]:
+        for suffix, bucket in self._buckets.items():
+            if host == suffix or host.endswith("." + suffix):
+                return bucket
+        return None
+
+    def _metrics_for(self, host: str) -> _HostMetrics:
+        metrics = self._metrics.get(host)
+        if metrics is None:
+            with self._lock:
+                metrics = self._metrics.setdefault(host, _HostMetrics())
+        return metrics
+
+    # ---- 会话 ----
+
+    def _session_for(self, host: str) -> requests.Session:
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._sessions[host] = session
+        return session
+
+    def _curl_session_for(self, host: str):
+        """curl_cffi 会话不是线程安全的，按线程、按主机各持有一个"""
+        sessions = getattr(self._curl_local, "sessions", None)
+        if sessions is None:
+            sessions = self._curl_local.sessions = {}
+        session = sessions.get(host)
+        if session is None:
+            from curl_cffi import requests as curl_requests
+            session = sessions[host] = curl_requests.Session(impersonate="chrome120")
+            self._metrics_for(host).connections += 1
+        return session
+
+    @staticmethod
+    def _pool_connections(session: requests.Session) -> int:
+        """统计 urllib3 连接池累计新建的连接数"""
+        total = 0
+        for adapter in set(session.adapters.values()):
+            pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+            if pools is None:
+                continue
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                total += getattr(pool, "num_connections", 0) if pool is not None else 0
+        return total
+
+    @staticmethod
+    def _with_browser_headers(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        headers = kwargs.get('headers')
+        if headers is None:
+            kwargs['headers'] = dict(BROWSER_HEADERS)
+        elif isinstance(headers, dict):
+            for key in ('User-Agent', 'Referer', 'Accept', 'Accept-Language'):
+                headers.setdefault(key, BROWSER_HEADERS[key])
+        return kwargs
+
+    # ---- 请求 ----
+
+    def _send(self, host: str, url: str, kwargs: Dict[str, Any]):
+        if self.use_curl_cffi and 'eastmoney.com' in host:
+            # 使用 impersonate 时不传自定义 headers，由 curl_cffi 按浏览器指纹设置
+            curl_kwargs = {'timeout': kwargs.get('timeout', 10)}
+            for key in ('params', 'data', 'json'):
+                if key in kwargs:
+                    curl_kwargs[key] = kwargs[key]
+            try:
+                return self._curl_session_for(host).get(url, **curl_kwargs)
+            except Exception as e:
+                error_msg = str(e)
+                # 忽略 TLS 库错误和 400 错误的详细日志（Docker 环境的已知问题）
+                if 'invalid library' not in error_msg and '400' not in error_msg:
+                    logger.warning(f"⚠️ curl_cffi 请求失败，回退到标准 requests: {e}")
+
+        session = self._session_for(host)
+        kwargs = self._with_browser_headers(kwargs)
+        for attempt in range(SSL_MAX_RETRIES):
+            before = self._pool_connections(session)
+            try:
+                return session.get(url, **kwargs)
+            except Exception as e:
+                error_str = str(e)
+                is_ssl_error = 'SSL' in error_str or 'ssl' in error_str or 'UNEXPECTED_EOF_WHILE_READING' in error_str
+                if is_ssl_error and attempt < SSL_MAX_RETRIES - 1:
+                    time.sleep(0.5 * (attempt + 1))
+                    continue
+                raise
+            finally:
+                self._metrics_for(host).connections += self._pool_connections(session) - before
+
+    def get(self, url: str, **kwargs):
+        """同步 GET：按主机限速后通过池化会话发送"""
+        host = (urlparse(url).hostname or "").lower()
+        metrics = self._metrics_for(host)
+        bucket = self._bucket_for(host)
+        if bucket is not None:
+            metrics.wait_seconds += bucket.acquire()
+        metrics.requests += 1
+        try:
+            return self._send(host, url, kwargs)
+        except Exception:
+            metrics.errors += 1
+            raise
+
+    async def aget(self, url: str, **kwargs):
+        """异步 GET：在事件循环中等待令牌，再把阻塞请求放到线程中执行"""
+        host = (urlparse(url).hostname or "").lower()
+        metrics = self._metrics_for(host)
+        bucket = self._bucket_for(host)
+        if bucket is not None:
+            metrics.wait_seconds += await bucket.acquire_async()
+        metrics.requests += 1
+        try:
+            return await asyncio.to_thread(self._send, host, url, kwargs)
+        except Exception:
+            metrics.errors += 1
+            raise
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """按主机返回请求数、错误数、连接复用率与累计限速等待时间"""
+        result = {}
+        for host, m in list(self._metrics.items()):
+            reused = max(0, m.requests - m.connections)
+            result[host] = {
+                "requests": m.requests,
+                "errors": m.errors,
+                "connections": m.connections,
+                "reuse_ratio": round(reused / m.requests, 4) if m.requests else 0.0,
+                "wait_seconds": round(m.wait_seconds, 3),
+            }
+        return result
+
+    # ---- 接入 AKShare ----
+
+    def install(self) -> None:
+        """将 requests.get 路由到本客户端（AKShare 内部使用 requests.get）"""
+        if getattr(requests.get, "_akshare_http_client", None) is not None:
+            return
+        self._original_get = requests.get
+
+        def pooled_get(url, params=None, **kwargs):
+            if params is not None:
+                kwargs['params'] = params
+            return self.get(url, **kwargs)
+
+        pooled_get._akshare_http_client = self
+        requests.get = pooled_get
+        requests._akshare_headers_patched = True
+
+    def uninstall(self) -> None:
+        if self._original_get is not None and getattr(requests.get, "_akshare_http_client", None) is self:
+            requests.get = self._original_get
+            self._original_get = None
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
+
+_http_client: Optional[AKShareHttpClient] = None
+_http_client_lock = threading.Lock()
+
+
+def get_akshare_http_client() -> AKShareHttpClient:
+    """获取进程级共享的 AKShare HTTP 客户端"""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = AKShareHttpClient()
+    return _http_client
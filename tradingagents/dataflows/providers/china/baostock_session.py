@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+BaoStock长连接会话池
+
+BaoStock 的登录态与 socket 保存在 baostock 模块的全局变量中，协议本身不是线程安全的，
+因此每个会话都绑定到一个专用执行单元上串行执行查询：
+- 单会话：一个专用线程（进程内共享同一登录态）
+- 多会话：每个会话一个子进程（各自独立的 socket 与登录态）
+
+查询在会话所在的线程/进程内完成登录、分页读取与结果收集，空闲过久时主动重新登录（保活），
+遇到未登录/网络类错误时自动重新登录并重试一次。
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 会话失效类错误码：未登录、网络错误/断开/超时
+SESSION_ERROR_CODES = frozenset({
+    "10001001",
+    "10002001", "10002002", "10002003", "10002004",
+    "10002005", "10002006", "10002007", "10002008",
+})
+
+# 空闲超过该时长后，下一次查询前主动重新登录（服务端会回收长时间空闲的会话）
+SESSION_IDLE_RELOGIN_SECONDS = 600
+
+# 会话所在线程/进程内的登录状态
+_session_state = {"logged_in": False, "last_used": 0.0}
+
+
+class BaoStockQueryError(Exception):
+    """BaoStock查询返回非0错误码"""
+
+    def __init__(self, error_code: str, error_msg: str):
+        super().__init__(error_code, error_msg)
+        self.error_code = error_code
+        self.error_msg = error_msg
+
+    def __str__(self) -> str:
+        return f"[{self.error_code}] {self.error_msg}"
+
+
+def _login() -> None:
+    import baostock as bs
+
+    lg = bs.login()
+    if lg.error_code != "0":
+        _session_state["logged_in"] = False
+        raise BaoStockQueryError(lg.error_code, f"登录失败: {lg.error_msg}")
+    _session_state["logged_in"] = True
+    _session_state["last_used"] = time.monotonic()
+
+
+def _logout() -> None:
+    import baostock as bs
+
+    if _session_state["logged_in"]:
+        try:
+            bs.logout()
+        except Exception as e:
+            logger.debug(f"BaoStock登出失败: {e}")
+    _session_state["logged_in"] = False
+
+
+def _fetch(method: str, kwargs: Dict[str, Any]) -> Tuple[str, str, List[List[str]], List[str]]:
+    import baostock as bs
+
+    rs = getattr(bs, method)(**kwargs)
+    if rs.error_code != "0":
+        return rs.error_code, rs.error_msg, [], []
+    # rs.next() 会按页继续从 socket 读取，必须在会话所在线程/进程内读完
+    rows = []
+    while (rs.error_code == "0") & rs.next():
+        rows.append(rs.get_row_data())
+    if rs.error_code != "0":
+        return rs.error_code, rs.error_msg, [], []
+    return "0", "", rows, list(rs.fields)
+
+
+def execute_query(method: str, kwargs: Dict[str, Any]) -> Tuple[List[List[str]], List[str]]:
+    """在会话所在的线程/进程内执行一次查询，返回 (rows, fields)"""
+    idle = time.monotonic() - _session_state["last_used"]
+    if not _session_state["logged_in"] or idle > SESSION_IDLE_RELOGIN_SECONDS:
+        _login()
+
+    for attempt in range(2):
+        try:
+            error_code, error_msg, rows, fields = _fetch(method, kwargs)
+        except Exception as e:
+            error_code, error_msg = "10002001", str(e)
+        if error_code == "0":
+            _session_state["last_used"] = time.monotonic()
+            return rows, fields
+        if error_code not in SESSION_ERROR_CODES or attempt:
+            break
+        logger.info(f"🔄 BaoStock会话失效({error_code})，重新登录后重试: {method}")
+        _session_state["logged_in"] = False
+        _login()
+
+    raise BaoStockQueryError(error_code, f"查询失败: {error_msg}")
+
+
+def _worker_init() -> None:
+    """子进程会话初始化：提前登录"""
+    try:
+        _login()
+    except Exception as e:
+        logger.warning(f"⚠️ BaoStock会话进程登录失败，将在首次查询时重试: {e}")
+
+
+class BaoStockSessionPool:
+    """BaoStock会话池，按会话串行、跨会话并行地执行查询"""
+
+    def __init__(self, sessions: int = 1):
+        self.sessions = max(1, int(sessions))
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.sessions == 1:
+                        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="baostock-session")
+                    else:
+                        # spawn：避免在已有事件循环/线程的父进程中 fork
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.sessions,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=_worker_init,
+                        )
+                    logger.info(f"🔧 BaoStock会话池已启动: {self.sessions}个会话")
+        return self._executor
+
+    def query_sync(self, method: str, **kwargs) -> Tuple[List[List[str]], List[str]]:
+        """同步执行查询（如 bs.query_history_k_data_plus），返回 (rows, fields)"""
+        return self._get_executor().submit(execute_query, method, kwargs).result()
+
+    async def query(self, method: str, **kwargs) -> Tuple[List[List[str]], List[str]]:
+        """异步执行查询，返回 (rows, fields)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), execute_query, method, kwargs)
+
+    def close(self) -> None:
+        """登出并关闭会话池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        if isinstance(executor, ThreadPoolExecutor):
+            try:
+                executor.submit(_logout).result(timeout=10)
+            except Exception as e:
+                logger.debug(f"BaoStock会话登出失败: {e}")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+_session_pools: Dict[int, BaoStockSessionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_baostock_session_pool(sessions: int = 1) -> BaoStockSessionPool:
+    """按会话数获取共享的会话池（同一进程内单会话池全局唯一）"""
+    sessions = max(1, int(sessions))
+    with _pools_lock:
+        pool = _session_pools.get(sessions)
+        if pool is None:
+            pool = _session_pools[sessions] = BaoStockSessionPool(sessions)
+        return pool
@@ -2,7 +2,7 @@
 统一的Tushare数据提供器
 合并app层和tradingagents层的所有优势功能
 """
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Union, Callable, Awaitable, Tuple
 from datetime import datetime, date, timedelta
 import pandas as pd
 import asyncio
@@ -10,6 +10,7 @@ import logging
 
 from ..base_provider import BaseStockDataProvider
 from tradingagents.config.providers_config import get_provider_config
+from tradingagents.dataflows.news.near_duplicate import drop_near_duplicates
 
 # 尝试导入tushare
 try:
@@ -21,12 +22,57 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# 财务报表类型 -> (单股票接口, 名称)
+FINANCIAL_STATEMENT_APIS = {
+    'income_statement': ('income', '利润表'),
+    'balance_sheet': ('balancesheet', '资产负债表'),
+    'cashflow_statement': ('cashflow', '现金流量表'),
+    'financial_indicators': ('fina_indicator', '财务指标'),
+    'main_business': ('fina_mainbz', '主营业务构成'),
+}
+
+# 财务报表类型 -> 按报告期获取全市场数据的 VIP 接口
+PERIOD_STATEMENT_APIS = {
+    'income_statement': 'income_vip',
+    'balance_sheet': 'balancesheet_vip',
+    'cashflow_statement': 'cashflow_vip',
+    'financial_indicators': 'fina_indicator_vip',
+}
+
+# VIP 接口单次返回的最大记录数（分页大小）
+PERIOD_PAGE_SIZE = 5000
+
+# 前复权时需要换算的价格列（成交量、涨跌幅不变）
+QFQ_PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'pre_close', 'change')
+
+
+def to_qfq_cross_section(df: pd.DataFrame, factors: pd.Series, base_factors: pd.Series) -> pd.DataFrame:
+    """
+    把未复权的全市场日线截面换算为前复权价格
+
+    与 pro_bar(adj='qfq') 一致：价格 × 当日复权因子 / 基准日复权因子，保留两位小数。
+    基准日为本次同步的最后一个交易日，缺少复权因子的股票保持原价。
+
+    Args:
+        df: get_daily_by_trade_date 返回的截面（含 symbol 列）
+        factors: 截面当日的复权因子（symbol -> adj_factor）
+        base_factors: 基准日的复权因子（symbol -> adj_factor）
+    """
+    ratio = (df['symbol'].map(factors) / df['symbol'].map(base_factors)).fillna(1.0)
+    out = df.copy()
+    for col in QFQ_PRICE_COLUMNS:
+        if col in out.columns:
+            out[col] = (pd.to_numeric(out[col], errors='coerce') * ratio).round(2)
+    return out
+
 
 class TushareProvider(BaseStockDataProvider):
     """
     统一的Tushare数据提供器
     合并app层和tradingagents层的所有优势功能
     """
+
+    rate_limit_source = "tushare"
     
     def __init__(self):
         super().__init__("Tushare")
@@ -196,7 +242,7 @@ class TushareProvider(BaseStockDataProvider):
                     # 测试连接（异步）- 使用超时
                     try:
                         test_data = await asyncio.wait_for(
-                            asyncio.to_thread(
+                            self._call_api(
                                 self.api.stock_basic,
                                 list_status='L',
                                 limit=1
@@ -226,7 +272,7 @@ class TushareProvider(BaseStockDataProvider):
                     # 测试连接（异步）- 使用超时
                     try:
                         test_data = await asyncio.wait_for(
-                            asyncio.to_thread(
+                            self._call_api(
                                 self.api.stock_basic,
                                 list_status='L',
                                 limit=1
@@ -304,7 +350,7 @@ class TushareProvider(BaseStockDataProvider):
                     return None  # Tushare不支持美股
             
             # 获取数据
-            df = await asyncio.to_thread(self.api.stock_basic, **params)
+            df = await self._call_api(self.api.stock_basic, **params)
             
             if df is None or df.empty:
                 return None
@@ -331,7 +377,7 @@ class TushareProvider(BaseStockDataProvider):
             if symbol:
                 # 获取单个股票信息
                 ts_code = self._normalize_ts_code(symbol)
-                df = await asyncio.to_thread(
+                df = await self._call_api(
                     self.api.stock_basic,
                     ts_code=ts_code,
                     fields='ts_code,symbol,name,area,industry,market,exchange,list_date,is_hs,act_name,act_ent_type'
@@ -372,7 +418,7 @@ class TushareProvider(BaseStockDataProvider):
             end_date = datetime.now().strftime('%Y%m%d')
             start_date = (datetime.now() - timedelta(days=3)).strftime('%Y%m%d')
 
-            df = await asyncio.to_thread(
+            df = await self._call_api(
                 self.api.daily,
                 ts_code=ts_code,
                 start_date=start_date,
@@ -427,7 +473,7 @@ class TushareProvider(BaseStockDataProvider):
         try:
             # 使用通配符一次性获取全市场行情
             # 3*.SZ: 创业板  6*.SH: 上交所  0*.SZ: 深交所主板  9*.BJ: 北交所
-            df = await asyncio.to_thread(
+            df = await self._call_api(
                 self.api.rt_k,
                 ts_code='3*.SZ,6*.SH,0*.SZ,9*.BJ'
             )
@@ -548,7 +594,7 @@ class TushareProvider(BaseStockDataProvider):
 
             # 使用 ts.pro_bar() 函数获取前复权数据
             # 注意：pro_bar 是 tushare 模块的函数，不是 api 对象的方法
-            df = await asyncio.to_thread(
+            df = await self._call_api(
                 ts.pro_bar,
                 ts_code=ts_code,
                 api=self.api,  # 传入 api 对象
@@ -601,7 +647,7 @@ class TushareProvider(BaseStockDataProvider):
         
         try:
             date_str = trade_date.replace('-', '')
-            df = await asyncio.to_thread(
+            df = await self._call_api(
                 self.api.daily_basic,
                 trade_date=date_str,
                 fields='ts_code,total_mv,circ_mv,pe,pb,turnover_rate,volume_ratio,pe_ttm,pb_mrq'
@@ -628,7 +674,7 @@ class TushareProvider(BaseStockDataProvider):
                 check_date = (today - timedelta(days=delta)).strftime('%Y%m%d')
                 
                 try:
-                    df = await asyncio.to_thread(
+                    df = await self._call_api(
                         self.api.daily_basic,
                         trade_date=check_date,
                         fields='ts_code',
@@ -648,9 +694,105 @@ class TushareProvider(BaseStockDataProvider):
         except Exception as e:
             self.logger.error(f"❌ 查找最新交易日期失败: {e}")
             return None
-    
+
+    async def get_trade_calendar(self, start_date: Union[str, date], end_date: Union[str, date] = None) -> Optional[List[str]]:
+        """
+        获取区间内的交易日列表
+
+        Returns:
+            List[str]: 升序的交易日 (YYYY-MM-DD)，接口失败时返回 None
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            start_str = self._format_date(start_date)
+            end_str = self._format_date(end_date) if end_date else datetime.now().strftime('%Y%m%d')
+            df = await self._call_api(
+                self.api.trade_cal,
+                exchange='SSE',
+                start_date=start_str,
+                end_date=end_str,
+                is_open='1',
+                fields='cal_date'
+            )
+            if df is None:
+                return None
+
+            days = sorted(str(d) for d in df['cal_date'].tolist()) if not df.empty else []
+            return [f"{d[:4]}-{d[4:6]}-{d[6:8]}" for d in days]
+
+        except Exception as e:
+            self.logger.error(f"❌ 获取交易日历失败 {start_date}~{end_date}: {e}")
+            return None
+
+    async def get_daily_by_trade_date(self, trade_date: Union[str, date]) -> Optional[pd.DataFrame]:
+        """
+        按交易日获取全市场日线截面（一次调用返回当日所有股票）
+
+        注意：daily 接口返回未复权价格，与 pro_bar 前复权历史一起保存前需用
+        get_adj_factor_by_trade_date 和 to_qfq_cross_section 换算为前复权价格。
+
+        Returns:
+            DataFrame: 含 symbol 列、以 date 为索引的标准化数据；当日无数据时返回 None
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            date_str = self._format_date(trade_date)
+            df = await self._call_api(self.api.daily, trade_date=date_str)
+
+            if df is None or df.empty:
+                self.logger.warning(f"⚠️ 全市场日线为空: trade_date={date_str}")
+                return None
+
+            df['symbol'] = df['ts_code'].str.split('.').str[0]
+            df = self._standardize_historical_data(df)
+
+            self.logger.info(f"✅ 获取全市场日线截面: {trade_date} {len(df)}条记录")
+            return df
+
+        except Exception as e:
+            if self._is_rate_limit_error(str(e)):
+                self.logger.error(f"❌ 获取全市场日线失败（限流）trade_date={trade_date}: {e}")
+                raise
+            self.logger.error(f"❌ 获取全市场日线失败 trade_date={trade_date}: {e}")
+            return None
+
+    async def get_adj_factor_by_trade_date(self, trade_date: Union[str, date]) -> Optional[pd.Series]:
+        """
+        按交易日获取全市场复权因子（一次调用返回当日所有股票）
+
+        Returns:
+            Series: symbol -> adj_factor；当日无数据时返回 None
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            date_str = self._format_date(trade_date)
+            df = await self._call_api(self.api.adj_factor, trade_date=date_str)
+
+            if df is None or df.empty:
+                self.logger.warning(f"⚠️ 全市场复权因子为空: trade_date={date_str}")
+                return None
+
+            return pd.Series(
+                pd.to_numeric(df['adj_factor'], errors='coerce').values,
+                index=df['ts_code'].str.split('.').str[0],
+            ).dropna()
+
+        except Exception as e:
+            if self._is_rate_limit_error(str(e)):
+                self.logger.error(f"❌ 获取全市场复权因子失败（限流）trade_date={trade_date}: {e}")
+                raise
+            self.logger.error(f"❌ 获取全市场复权因子失败 trade_date={trade_date}: {e}")
+            return None
+
     async def get_financial_data(self, symbol: str, report_type: str = "quarterly",
-                                period: str = None, limit: int = 4) -> Optional[Dict[str, Any]]:
+                                period: str = None, limit: int = 4,
+                                acquire: Optional[Callable[[], Awaitable[Any]]] = None) -> Optional[Dict[str, Any]]:
         """
         获取财务数据
 
@@ -659,6 +801,7 @@ class TushareProvider(BaseStockDataProvider):
             report_type: 报告类型 (quarterly/annual)
             period: 指定报告期 (YYYYMMDD格式)，为空则获取最新数据
             limit: 获取记录数量，默认4条（最近4个季度）
+            acquire: 每次接口调用前等待的限流回调，默认使用共享速率限制器（通道取自调用上下文）
 
         Returns:
             财务数据字典，包含利润表、资产负债表、现金流量表和财务指标
@@ -680,77 +823,12 @@ class TushareProvider(BaseStockDataProvider):
             if period:
                 query_params['period'] = period
 
-            financial_data = {}
-
-            # 1. 获取利润表数据 (income statement)
-            try:
-                income_df = await asyncio.to_thread(
-                    self.api.income,
-                    **query_params
-                )
-                if income_df is not None and not income_df.empty:
-                    financial_data['income_statement'] = income_df.to_dict('records')
-                    self.logger.debug(f"✅ {ts_code} 利润表数据获取成功: {len(income_df)} 条记录")
-                else:
-                    self.logger.debug(f"⚠️ {ts_code} 利润表数据为空")
-            except Exception as e:
-                self.logger.warning(f"❌ 获取{ts_code}利润表数据失败: {e}")
-
-            # 2. 获取资产负债表数据 (balance sheet)
-            try:
-                balance_df = await asyncio.to_thread(
-                    self.api.balancesheet,
-                    **query_params
-                )
-                if balance_df is not None and not balance_df.empty:
-                    financial_data['balance_sheet'] = balance_df.to_dict('records')
-                    self.logger.debug(f"✅ {ts_code} 资产负债表数据获取成功: {len(balance_df)} 条记录")
-                else:
-                    self.logger.debug(f"⚠️ {ts_code} 资产负债表数据为空")
-            except Exception as e:
-                self.logger.warning(f"❌ 获取{ts_code}资产负债表数据失败: {e}")
-
-            # 3. 获取现金流量表数据 (cash flow statement)
-            try:
-                cashflow_df = await asyncio.to_thread(
-                    self.api.cashflow,
-                    **query_params
-                )
-                if cashflow_df is not None and not cashflow_df.empty:
-                    financial_data['cashflow_statement'] = cashflow_df.to_dict('records')
-                    self.logger.debug(f"✅ {ts_code} 现金流量表数据获取成功: {len(cashflow_df)} 条记录")
-                else:
-                    self.logger.debug(f"⚠️ {ts_code} 现金流量表数据为空")
-            except Exception as e:
-                self.logger.warning(f"❌ 获取{ts_code}现金流量表数据失败: {e}")
-
-            # 4. 获取财务指标数据 (financial indicators)
-            try:
-                indicator_df = await asyncio.to_thread(
-                    self.api.fina_indicator,
-                    **query_params
-                )
-                if indicator_df is not None and not indicator_df.empty:
-                    financial_data['financial_indicators'] = indicator_df.to_dict('records')
-                    self.logger.debug(f"✅ {ts_code} 财务指标数据获取成功: {len(indicator_df)} 条记录")
-                else:
-                    self.logger.debug(f"⚠️ {ts_code} 财务指标数据为空")
-            except Exception as e:
-                self.logger.warning(f"❌ 获取{ts_code}财务指标数据失败: {e}")
-
-            # 5. 获取主营业务构成数据 (可选)
-            try:
-                mainbz_df = await asyncio.to_thread(
-                    self.api.fina_mainbz,
-                    **query_params
-                )
-                if mainbz_df is not None and not mainbz_df.empty:
-                    financial_data['main_business'] = mainbz_df.to_dict('records')
-                    self.logger.debug(f"✅ {ts_code} 主营业务构成数据获取成功: {len(mainbz_df)} 条记录")
-                else:
-                    self.logger.debug(f"⚠️ {ts_code} 主营业务构成数据为空")
-            except Exception as e:
-                self.logger.debug(f"获取{ts_code}主营业务构成数据失败: {e}")  # 主营业务数据不是必需的，保持debug级别
+            # 五类报表并发获取（每次接口调用前经过限流回调）
+            results = await asyncio.gather(*(
+                self._fetch_financial_statement(ts_code, key, query_params, acquire)
+                for key in FINANCIAL_STATEMENT_APIS
+            ))
+            financial_data = {key: records for key, records in results if records}
 
             if financial_data:
                 # 标准化财务数据
@@ -765,6 +843,116 @@ class TushareProvider(BaseStockDataProvider):
             self.logger.error(f"❌ 获取Tushare财务数据失败 symbol={symbol}: {e}")
             return None
 
+    async def _fetch_financial_statement(
+        self,
+        ts_code: str,
+        key: str,
+        query_params: Dict[str, Any],
+        acquire: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """获取单类财务报表，失败时返回空列表"""
+        api_name, label = FINANCIAL_STATEMENT_APIS[key]
+        try:
+            await (acquire or self._acquire_rate_limit)()
+            df = await asyncio.to_thread(getattr(self.api, api_name), **query_params)
+            if df is not None and not df.empty:
+                self.logger.debug(f"✅ {ts_code} {label}数据获取成功: {len(df)} 条记录")
+                return key, df.to_dict('records')
+            self.logger.debug(f"⚠️ {ts_code} {label}数据为空")
+        except Exception as e:
+            if key == 'main_business':
+                self.logger.debug(f"获取{ts_code}{label}数据失败: {e}")  # 主营业务数据不是必需的，保持debug级别
+            else:
+                self.logger.warning(f"❌ 获取{ts_code}{label}数据失败: {e}")
+        return key, []
+
+    async def _fetch_period_statement(
+        self,
+        api_name: str,
+        period: str,
+        acquire: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> pd.DataFrame:
+        """分页拉取某报告期全市场的单类报表（VIP 接口）"""
+        frames = []
+        offset = 0
+        while True:
+            await (acquire or self._acquire_rate_limit)()
+            df = await asyncio.to_thread(
+                getattr(self.api, api_name), period=period, limit=PERIOD_PAGE_SIZE, offset=offset
+            )
+            if df is None or df.empty:
+                break
+            frames.append(df)
+            if len(df) < PERIOD_PAGE_SIZE:
+                break
+            offset += PERIOD_PAGE_SIZE
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        # 同一报告期可能有更正前后多条记录，优先保留最新（update_flag=1）的一条
+        if 'update_flag' in df.columns:
+            df = df.sort_values('update_flag', ascending=False, kind='stable')
+        return df.drop_duplicates(subset=['ts_code', 'end_date'], keep='first')
+
+    async def get_financial_data_for_period(
+        self,
+        period: str,
+        acquire: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        按报告期获取全市场财务数据（需要Tushare VIP接口权限）
+
+        每类报表按报告期一次性拉取全市场数据，API 调用次数与股票数量无关。
+        为计算 TTM，利润表额外拉取去年同期与上一年报两期。主营业务构成数据量大且非必需，不在此模式中获取。
+
+        Args:
+            period: 报告期 (YYYYMMDD)，如 20250630
+            acquire: 每次接口调用前等待的限流回调，默认使用共享速率限制器（通道取自调用上下文）
+
+        Returns:
+            {ts_code: 标准化财务数据}，结构与 get_financial_data 一致
+        """
+        if not self.is_available():
+            return {}
+
+        period = period.replace('-', '')
+        income_periods = [period]
+        if period[4:] != '1231':
+            last_year = str(int(period[:4]) - 1)
+            income_periods += [last_year + period[4:], last_year + '1231']
+
+        tasks = [self._fetch_period_statement(PERIOD_STATEMENT_APIS['income_statement'], p, acquire) for p in income_periods]
+        tasks += [self._fetch_period_statement(PERIOD_STATEMENT_APIS[key], period, acquire)
+                  for key in ('balance_sheet', 'cashflow_statement', 'financial_indicators')]
+        frames = await asyncio.gather(*tasks)
+        income_df = pd.concat(frames[:len(income_periods)], ignore_index=True)
+        period_frames = dict(zip(('balance_sheet', 'cashflow_statement', 'financial_indicators'),
+                                 frames[len(income_periods):]))
+
+        grouped: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        if not income_df.empty:
+            income_df = income_df.sort_values('end_date', ascending=False, kind='stable')
+            for ts_code, records in income_df.groupby('ts_code', sort=False):
+                # 仅为本期有利润表的股票保留历史期（用于 TTM）
+                if (records['end_date'] == period).any():
+                    grouped.setdefault(ts_code, {})['income_statement'] = records.to_dict('records')
+        for key, df in period_frames.items():
+            if df.empty:
+                continue
+            for ts_code, records in df.groupby('ts_code', sort=False):
+                grouped.setdefault(ts_code, {})[key] = records.to_dict('records')
+
+        result = {}
+        for ts_code, financial_data in grouped.items():
+            standardized = self._standardize_tushare_financial_data(financial_data, ts_code)
+            if standardized.get('report_period') is None:
+                standardized['report_period'] = period
+                standardized['report_type'] = self._determine_report_type(period)
+            result[ts_code] = standardized
+
+        self.logger.info(f"✅ 报告期 {period} 全市场财务数据获取完成: {len(result)} 只股票")
+        return result
+
     async def get_stock_news(self, symbol: str = None, limit: int = 10,
                            hours_back: int = 24, src: str = None) -> Optional[List[Dict[str, Any]]]:
         """
@@ -820,7 +1008,7 @@ class TushareProvider(BaseStockDataProvider):
                     self.logger.debug(f"📰 尝试从 {source} 获取新闻...")
 
                     # 获取新闻数据
-                    news_df = await asyncio.to_thread(
+                    news_df = await self._call_api(
                         self.api.news,
                         src=source,
                         start_date=start_date,
@@ -949,7 +1137,7 @@ class TushareProvider(BaseStockDataProvider):
         ])
 
     def _deduplicate_news(self, news_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """新闻去重"""
+        """新闻去重（标题相同，或标题 + 正文近似重复的多源转载稿）"""
         seen_titles = set()
         unique_news = []
 
@@ -959,7 +1147,7 @@ class TushareProvider(BaseStockDataProvider):
                 seen_titles.add(title)
                 unique_news.append(news)
 
-        return unique_news
+        return drop_near_duplicates(unique_news)
 
     def _analyze_news_sentiment(self, content: str, title: str) -> str:
         """分析新闻情绪"""
@@ -1065,7 +1253,7 @@ class TushareProvider(BaseStockDataProvider):
                 query_params['end_date'] = end_period
 
             # 获取利润表数据作为主要数据源
-            income_df = await asyncio.to_thread(
+            income_df = await self._call_api(
                 self.api.income,
                 **query_params
             )
@@ -1118,7 +1306,7 @@ class TushareProvider(BaseStockDataProvider):
             ts_code = self._normalize_ts_code(symbol)
 
             # 仅获取财务指标
-            indicator_df = await asyncio.to_thread(
+            indicator_df = await self._call_api(
                 self.api.fina_indicator,
                 ts_code=ts_code,
                 limit=limit
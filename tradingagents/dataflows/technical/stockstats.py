@@ -1,10 +1,18 @@
 import pandas as pd
 import yfinance as yf
 from stockstats import wrap
-from typing import Annotated
+from typing import Annotated, Any, Dict, List
+from collections import OrderedDict
 import os
+import threading
 from tradingagents.config.config_manager import config_manager
 
+# 已包装的 stockstats 数据帧缓存：(symbol, 截止日期, 数据目录, online) -> StockDataFrame
+# stockstats 按需把指标列追加到帧上，同一次分析中的多个指标调用可复用已加载和已计算的结果
+WRAPPED_CACHE_MAX_ENTRIES = 32
+_wrapped_cache: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+_wrapped_cache_lock = threading.RLock()
+
 def get_config():
     """兼容性包装函数"""
     return config_manager.load_settings()
@@ -29,8 +37,63 @@ class StockstatsUtils:
             "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
         ] = False,
     ):
-        df = None
-        data = None
+        curr_date = pd.to_datetime(curr_date).strftime("%Y-%m-%d")
+        df = StockstatsUtils._load_wrapped(symbol, curr_date, data_dir, online)
+
+        with _wrapped_cache_lock:
+            df[indicator]  # trigger stockstats to calculate the indicator
+        matching_rows = df[df["Date"].str.startswith(curr_date)]
+
+        if not matching_rows.empty:
+            indicator_value = matching_rows[indicator].values[0]
+            return indicator_value
+        else:
+            return "N/A: Not a trading day (weekend or holiday)"
+
+    @staticmethod
+    def get_stock_stats_window(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        indicators: Annotated[List[str], "stockstats indicator names"],
+        curr_date: Annotated[str, "curr date for retrieving stock price data, YYYY-mm-dd"],
+        look_back_days: Annotated[int, "how many days to look back"],
+        data_dir: Annotated[str, "directory where the stock data is stored."],
+        online: Annotated[bool, "whether to use online tools to fetch data"] = False,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        一次性获取回溯窗口内多个指标的取值
+
+        行情只加载并包装一次，每个指标在整段序列上只计算一次，然后截取窗口。
+
+        Returns:
+            {indicator: {YYYY-mm-dd: value}}，只包含窗口内的交易日
+        """
+        end = pd.to_datetime(curr_date)
+        start = (end - pd.DateOffset(days=look_back_days)).strftime("%Y-%m-%d")
+        end = end.strftime("%Y-%m-%d")
+        df = StockstatsUtils._load_wrapped(symbol, end, data_dir, online)
+
+        with _wrapped_cache_lock:
+            dates = df["Date"].astype(str).str[:10]
+            in_window = (dates >= start) & (dates <= end)
+            result = {}
+            for indicator in indicators:
+                values = df[indicator][in_window.values]
+                window = {}
+                # 同一交易日有多行时与单日接口一致，取第一行
+                for date, value in zip(dates[in_window], values):
+                    window.setdefault(date, value)
+                result[indicator] = window
+        return result
+
+    @staticmethod
+    def _load_wrapped(symbol: str, curr_date: str, data_dir: str, online: bool) -> pd.DataFrame:
+        """加载行情并用 stockstats 包装，按 (symbol, 截止日期) 缓存在内存中"""
+        key = (symbol, curr_date, data_dir, bool(online))
+        with _wrapped_cache_lock:
+            df = _wrapped_cache.get(key)
+            if df is not None:
+                _wrapped_cache.move_to_end(key)
+                return df
 
         if not online:
             try:
@@ -46,7 +109,6 @@ class StockstatsUtils:
         else:
             # Get today's date as YYYY-mm-dd to add to cache
             today_date = pd.Timestamp.today()
-            curr_date = pd.to_datetime(curr_date)
 
             end_date = today_date
             start_date = today_date - pd.DateOffset(years=15)
@@ -79,13 +141,16 @@ class StockstatsUtils:
 
             df = wrap(data)
             df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-            curr_date = curr_date.strftime("%Y-%m-%d")
 
-        df[indicator]  # trigger stockstats to calculate the indicator
-        matching_rows = df[df["Date"].str.startswith(curr_date)]
+        with _wrapped_cache_lock:
+            _wrapped_cache[key] = df
+            _wrapped_cache.move_to_end(key)
+            while len(_wrapped_cache) > WRAPPED_CACHE_MAX_ENTRIES:
+                _wrapped_cache.popitem(last=False)
+        return df
 
-        if not matching_rows.empty:
-            indicator_value = matching_rows[indicator].values[0]
-            return indicator_value
-        else:
-            return "N/A: Not a trading day (weekend or holiday)"
+    @staticmethod
+    def clear_cache() -> None:
+        """清空已包装数据帧缓存"""
+        with _wrapped_cache_lock:
+            _wrapped_cache.clear()
@@ -1,6 +1,8 @@
 # TradingAgents/graph/setup.py
 
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Tuple
+from langchain_core.runnables import RunnableConfig
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, StateGraph, START
 from langgraph.prebuilt import ToolNode
@@ -16,6 +18,19 @@ from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
 
 
+# 并行模式下每个分析师子图写回主图的状态字段（报告 + 工具调用计数）
+ANALYST_OUTPUT_KEYS = {
+    "market": ("market_report", "market_tool_call_count"),
+    "social": ("sentiment_report", "sentiment_tool_call_count"),
+    "news": ("news_report", "news_tool_call_count"),
+    "fundamentals": ("fundamentals_report", "fundamentals_tool_call_count"),
+}
+
+# 并行分析师节点的执行区间 {node_name: (start, end)} 记录在本次运行 config["configurable"] 的该键下，
+# 同一个图并发运行多次时各次运行的区间互不覆盖
+NODE_SPANS_KEY = "node_spans"
+
+
 class GraphSetup:
     """Handles the setup and configuration of the agent graph."""
 
@@ -48,8 +63,60 @@ class GraphSetup:
         self.config = config or {}
         self.react_llm = react_llm
 
+        # 并行模式下的分析师节点名
+        self.parallel_analyst_nodes = set()
+
+    @staticmethod
+    def attach_node_spans(config: Dict[str, Any]) -> Dict[str, Tuple[float, float]]:
+        """为一次运行的 config 挂上新的执行区间字典，返回该字典（time.time() 时间戳）"""
+        spans: Dict[str, Tuple[float, float]] = {}
+        config.setdefault("configurable", {})[NODE_SPANS_KEY] = spans
+        return spans
+
+    def _build_analyst_subgraph(self, analyst_type: str, analyst_node, tool_node, delete_node):
+        """构建单个分析师的独立子图：analyst → tools → Msg Clear
+
+        子图拥有独立的 messages 通道，多个分析师并行执行时工具调用历史不会交织。
+        """
+        analyst_name = f"{analyst_type.capitalize()} Analyst"
+        tools_name = f"tools_{analyst_type}"
+        clear_name = f"Msg Clear {analyst_type.capitalize()}"
+
+        subgraph = StateGraph(AgentState)
+        subgraph.add_node(analyst_name, analyst_node)
+        subgraph.add_node(tools_name, tool_node)
+        subgraph.add_node(clear_name, delete_node)
+        subgraph.add_edge(START, analyst_name)
+        subgraph.add_conditional_edges(
+            analyst_name,
+            getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
+            [tools_name, clear_name],
+        )
+        subgraph.add_edge(tools_name, analyst_name)
+        subgraph.add_edge(clear_name, END)
+        return subgraph.compile()
+
+    def _create_parallel_analyst_node(self, analyst_type: str, subgraph):
+        """包装分析师子图为主图节点，只把该分析师的报告字段写回主图"""
+        node_name = f"{analyst_type.capitalize()} Analyst"
+        output_keys = ANALYST_OUTPUT_KEYS[analyst_type]
+
+        def run_analyst(state, config: RunnableConfig):
+            start = time.time()
+            try:
+                result = subgraph.invoke(dict(state), config)
+            finally:
+                end = time.time()
+                spans = (config or {}).get("configurable", {}).get(NODE_SPANS_KEY)
+                if spans is not None:
+                    spans[node_name] = (start, end)
+                logger.info(f"⏱️ [并行分析师] {node_name} 耗时: {end - start:.2f}秒")
+            return {key: result[key] for key in output_keys if key in result}
+
+        return run_analyst
+
     def setup_graph(
-        self, selected_analysts=["market", "social", "news", "fundamentals"]
+        self, selected_analysts=["market", "social", "news", "fundamentals"], parallel_analysts=None
     ):
         """Set up and compile the agent workflow graph.
 
@@ -59,7 +126,12 @@ class GraphSetup:
                 - "social": Social media analyst
                 - "news": News analyst
                 - "fundamentals": Fundamentals analyst
+            parallel_analysts (bool): Fan the analysts out from START concurrently and
+                join them before "Bull Researcher". Defaults to config["parallel_analysts"].
         """
+        if parallel_analysts is None:
+            parallel_analysts = self.config.get("parallel_analysts", False)
+
         if len(selected_analysts) == 0:
             raise ValueError("Trading Agents Graph Setup Error: no analysts selected!")
 
@@ -160,12 +232,24 @@ class GraphSetup:
         workflow = StateGraph(AgentState)
 
         # Add analyst nodes to the graph
-        for analyst_type, node in analyst_nodes.items():
-            workflow.add_node(f"{analyst_type.capitalize()} Analyst", node)
-            workflow.add_node(
-                f"Msg Clear {analyst_type.capitalize()}", delete_nodes[analyst_type]
-            )
-            workflow.add_node(f"tools_{analyst_type}", tool_nodes[analyst_type])
+        self.parallel_analyst_nodes = set()
+        if parallel_analysts:
+            # 并行模式：每个分析师作为独立子图节点，从 START 同时扇出
+            for analyst_type, node in analyst_nodes.items():
+                subgraph = self._build_analyst_subgraph(
+                    analyst_type, node, tool_nodes[analyst_type], delete_nodes[analyst_type]
+                )
+                node_name = f"{analyst_type.capitalize()} Analyst"
+                workflow.add_node(node_name, self._create_parallel_analyst_node(analyst_type, subgraph))
+                self.parallel_analyst_nodes.add(node_name)
+            logger.info(f"🔀 [并行分析师] 启用并行模式: {sorted(self.parallel_analyst_nodes)}")
+        else:
+            for analyst_type, node in analyst_nodes.items():
+                workflow.add_node(f"{analyst_type.capitalize()} Analyst", node)
+                workflow.add_node(
+                    f"Msg Clear {analyst_type.capitalize()}", delete_nodes[analyst_type]
+                )
+                workflow.add_node(f"tools_{analyst_type}", tool_nodes[analyst_type])
 
         # Add other nodes
         workflow.add_node("Bull Researcher", bull_researcher_node)
@@ -178,12 +262,19 @@ class GraphSetup:
         workflow.add_node("Risk Judge", risk_manager_node)
 
         # Define edges
-        # Start with the first analyst
-        first_analyst = selected_analysts[0]
-        workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
+        if parallel_analysts:
+            # Fan out from START and join before Bull Researcher
+            analyst_names = [f"{a.capitalize()} Analyst" for a in selected_analysts]
+            for analyst_name in analyst_names:
+                workflow.add_edge(START, analyst_name)
+            workflow.add_edge(analyst_names, "Bull Researcher")
+        else:
+            # Start with the first analyst
+            first_analyst = selected_analysts[0]
+            workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
 
         # Connect analysts in sequence
-        for i, analyst_type in enumerate(selected_analysts):
+        for i, analyst_type in enumerate(selected_analysts if not parallel_analysts else []):
             current_analyst = f"{analyst_type.capitalize()} Analyst"
             current_tools = f"tools_{analyst_type}"
             current_clear = f"Msg Clear {analyst_type.capitalize()}"
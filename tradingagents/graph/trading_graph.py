@@ -905,8 +905,13 @@ class TradingAgentsGraph:
         # 保存task_id用于后续保存性能数据
         self._current_task_id = task_id
 
+        # 并行分析师节点的执行区间相互重叠，不参与顺序计时，改用节点自身记录的区间
+        parallel_nodes = self.graph_setup.parallel_analyst_nodes
+
         # 根据是否有进度回调选择不同的stream_mode
         args = self.propagator.get_graph_args(use_progress_callback=bool(progress_callback))
+        # 本次运行独立的执行区间字典，并发的 propagate() 互不覆盖
+        node_spans = self.graph_setup.attach_node_spans(args["config"])
 
         if self.debug:
             # Debug mode with tracing and progress updates
@@ -915,7 +920,7 @@ class TradingAgentsGraph:
             for chunk in self.graph.stream(init_agent_state, **args):
                 # 记录节点计时
                 for node_name in chunk.keys():
-                    if not node_name.startswith('__'):
+                    if not node_name.startswith('__') and node_name not in parallel_nodes:
                         # 如果有上一个节点，记录其结束时间
                         if current_node_name and current_node_start:
                             elapsed = time.time() - current_node_start
@@ -959,7 +964,7 @@ class TradingAgentsGraph:
                 for chunk in self.graph.stream(init_agent_state, **args):
                     # 记录节点计时
                     for node_name in chunk.keys():
-                        if not node_name.startswith('__'):
+                        if not node_name.startswith('__') and node_name not in parallel_nodes:
                             # 如果有上一个节点，记录其结束时间
                             if current_node_name and current_node_start:
                                 elapsed = time.time() - current_node_start
@@ -989,7 +994,7 @@ class TradingAgentsGraph:
                 for chunk in self.graph.stream(init_agent_state, **args):
                     # 记录节点计时
                     for node_name in chunk.keys():
-                        if not node_name.startswith('__'):
+                        if not node_name.startswith('__') and node_name not in parallel_nodes:
                             # 如果有上一个节点，记录其结束时间
                             if current_node_name and current_node_start:
                                 elapsed = time.time() - current_node_start
@@ -1014,6 +1019,10 @@ class TradingAgentsGraph:
             node_timings[current_node_name] = elapsed
             logger.info(f"⏱️ [{current_node_name}] 耗时: {elapsed:.2f}秒")
 
+        # 合并并行分析师节点的实际执行区间
+        for node_name, (span_start, span_end) in node_spans.items():
+            node_timings[node_name] = span_end - span_start
+
         # 计算总时间
         total_elapsed = time.time() - total_start_time
 
@@ -1029,6 +1038,20 @@ class TradingAgentsGraph:
 
         # 构建性能数据
         performance_data = self._build_performance_data(node_timings, total_elapsed)
+        if node_spans:
+            wall_time = max(end for _, end in node_spans.values()) - min(start for start, _ in node_spans.values())
+            performance_data["parallel_analysts"] = {
+                "wall_time": round(wall_time, 2),
+                "spans": {
+                    name: {
+                        "start_offset": round(start - total_start_time, 2),
+                        "end_offset": round(end - total_start_time, 2),
+                    }
+                    for name, (start, end) in node_spans.items()
+                },
+            }
+            logger.info(f"🔀 [并行分析师] 分析师阶段墙钟耗时: {wall_time:.2f}秒 "
+                        f"(各分析师累计 {sum(e - s for s, e in node_spans.values()):.2f}秒)")
 
         # 将性能数据添加到状态中
         final_state['performance_metrics'] = performance_data
@@ -15,6 +15,21 @@ class IndicatorSpec:
 
 SUPPORTED = {"ma", "ema", "macd", "rsi", "boll", "atr", "kdj"}
 
+# 标准指标集：选股面板、日线指标快照（stock_indicators_daily）与数据层共用同一份定义
+STANDARD_SPECS = [
+    IndicatorSpec("ma", {"n": 5}),
+    IndicatorSpec("ma", {"n": 10}),
+    IndicatorSpec("ma", {"n": 20}),
+    IndicatorSpec("ma", {"n": 60}),
+    IndicatorSpec("ema", {"n": 12}),
+    IndicatorSpec("ema", {"n": 26}),
+    IndicatorSpec("macd"),
+    IndicatorSpec("rsi", {"n": 14}),
+    IndicatorSpec("boll", {"n": 20, "k": 2}),
+    IndicatorSpec("atr", {"n": 14}),
+    IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
+]
+
 
 def _require_cols(df: pd.DataFrame, cols: Iterable[str]):
     missing = [c for c in cols if c not in df.columns]
@@ -269,6 +284,161 @@ def compute_many(df: pd.DataFrame, specs: List[IndicatorSpec]) -> pd.DataFrame:
     return out
 
 
+def _spec_key(s: IndicatorSpec):
+    p = s.params or {}
+    return (s.name.lower(), tuple(sorted(p.items())))
+
+
+def rolling_panel(df: pd.DataFrame, n: int, min_periods: int, how: str = "mean") -> pd.DataFrame:
+    """
+    宽表逐列滚动统计（等价于 df.rolling(n, min_periods).<how>()）
+
+    pandas 对宽表的 rolling 会逐列调用，数千列时开销很大；这里在列之间插入 n-1 行 NaN
+    后按列展平为一条序列，只调用一次 rolling，窗口不会跨越到相邻列。
+    """
+    n = int(n)
+    n_rows, n_cols = df.shape
+    pad = n - 1
+    arr = np.full((n_rows + pad, n_cols), np.nan)
+    arr[pad:] = df.to_numpy(dtype=float)
+    flat = pd.Series(arr.ravel(order="F"))
+    rolled = getattr(flat.rolling(window=n, min_periods=int(min_periods)), how)()
+    out = rolled.to_numpy().reshape((n_rows + pad, n_cols), order="F")[pad:]
+    return pd.DataFrame(out, index=df.index, columns=df.columns)
+
+
+def ewm_panel(df: pd.DataFrame, alpha: float) -> pd.DataFrame:
+    """
+    宽表逐列 ewm(alpha, adjust=False).mean()，按 bar 递推、每步同时更新所有列
+
+    与 pandas 的递推一致：首个有效值作为初值；中间的 NaN 沿用上一值，但权重继续衰减。
+    """
+    values = df.to_numpy(dtype=float)
+    out = np.full_like(values, np.nan)
+    if values.size == 0:
+        return pd.DataFrame(out, index=df.index, columns=df.columns)
+    alpha = float(alpha)
+    weighted = values[0].copy()
+    old_wt = np.ones(values.shape[1])
+    out[0] = weighted
+    for i in range(1, values.shape[0]):
+        cur = values[i]
+        is_obs = ~np.isnan(cur)
+        started = ~np.isnan(weighted)
+        old_wt = np.where(started, old_wt * (1 - alpha), old_wt)
+        update = started & is_obs & (weighted != cur)
+        blended = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        weighted = np.where(update, blended, weighted)
+        old_wt = np.where(started & is_obs, 1.0, old_wt)
+        weighted = np.where(~started & is_obs, cur, weighted)
+        out[i] = weighted
+    return pd.DataFrame(out, index=df.index, columns=df.columns)
+
+
+def atr_panel(high: pd.DataFrame, low: pd.DataFrame, close: pd.DataFrame, n: int = 14) -> pd.DataFrame:
+    """面板版 atr：high/low/close 为 (bar × symbol) DataFrame，结果与逐列调用 atr 一致"""
+    prev_close = close.shift(1)
+    # fmax 忽略 NaN，等价于 concat(...).max(axis=1)
+    tr = np.fmax(np.fmax((high - low).abs(), (high - prev_close).abs()), (low - prev_close).abs())
+    return rolling_panel(tr, n, n, "mean")
+
+
+def kdj_panel(high: pd.DataFrame, low: pd.DataFrame, close: pd.DataFrame,
+              n: int = 9, m1: int = 3, m2: int = 3) -> Dict[str, pd.DataFrame]:
+    """面板版 kdj：按 bar 递推，每一步同时更新所有股票，结果与逐列调用 kdj 一致"""
+    lowest_low = rolling_panel(low, n, n, "min")
+    highest_high = rolling_panel(high, n, n, "max")
+    rsv = ((close - lowest_low) / (highest_high - lowest_low) * 100).replace([np.inf, -np.inf], np.nan)
+
+    values = rsv.to_numpy(dtype=float)
+    k = np.full_like(values, np.nan)
+    d = np.full_like(values, np.nan)
+    alpha_k = 1 / float(m1)
+    alpha_d = 1 / float(m2)
+    last_k = np.full(values.shape[1], 50.0)
+    last_d = np.full(values.shape[1], 50.0)
+    for i in range(values.shape[0]):
+        rv = values[i]
+        valid = ~np.isnan(rv)
+        curr_k = (1 - alpha_k) * last_k + alpha_k * rv
+        curr_d = (1 - alpha_d) * last_d + alpha_d * curr_k
+        k[i] = np.where(valid, curr_k, np.nan)
+        d[i] = np.where(valid, curr_d, np.nan)
+        last_k = np.where(valid, curr_k, last_k)
+        last_d = np.where(valid, curr_d, last_d)
+
+    k_df = pd.DataFrame(k, index=close.index, columns=close.columns)
+    d_df = pd.DataFrame(d, index=close.index, columns=close.columns)
+    return {"kdj_k": k_df, "kdj_d": d_df, "kdj_j": 3 * k_df - 2 * d_df}
+
+
+def compute_panel(panel: Dict[str, pd.DataFrame], specs: List[IndicatorSpec]) -> Dict[str, pd.DataFrame]:
+    """
+    面板版 compute_many：对所有股票同时计算指标
+
+    Args:
+        panel: {字段: (bar × symbol) DataFrame}，至少包含 close；每列是一只股票，
+               行按时间升序且末行对齐为各股票的最新一根K线（停牌等缺口不应出现在列中间）
+        specs: 指标规格
+
+    Returns:
+        新的字典，包含原字段与指标字段（列名与 compute_many 的输出列一致）
+    """
+    out = dict(panel)
+    seen = set()
+    for s in specs:
+        k = _spec_key(s)
+        if k in seen:
+            continue
+        seen.add(k)
+
+        name = s.name.lower()
+        params = s.params or {}
+        required = ["high", "low", "close"] if name in {"atr", "kdj"} else ["close"]
+        missing = [c for c in required if c not in out]
+        if missing:
+            raise ValueError(f"面板缺少必要字段: {missing}, 现有字段: {list(out)[:10]}...")
+        close = out["close"]
+
+        if name == "ma":
+            n = int(params.get("n", params.get("period", 20)))
+            out[f"ma{n}"] = rolling_panel(close, n, 1, "mean")
+        elif name == "ema":
+            n = int(params.get("n", params.get("period", 20)))
+            out[f"ema{n}"] = ewm_panel(close, 2.0 / (n + 1))
+        elif name == "macd":
+            fast = int(params.get("fast", 12))
+            slow = int(params.get("slow", 26))
+            signal = int(params.get("signal", 9))
+            dif = ewm_panel(close, 2.0 / (fast + 1)) - ewm_panel(close, 2.0 / (slow + 1))
+            dea = ewm_panel(dif, 2.0 / (signal + 1))
+            out.update({"dif": dif, "dea": dea, "macd_hist": dif - dea})
+        elif name == "rsi":
+            n = int(params.get("n", params.get("period", 14)))
+            delta = close.diff()
+            avg_gain = ewm_panel(delta.where(delta > 0, 0), 1 / float(n))
+            avg_loss = ewm_panel(-delta.where(delta < 0, 0), 1 / float(n))
+            rs = avg_gain / (avg_loss.replace(0, np.nan))
+            out[f"rsi{n}"] = 100 - (100 / (1 + rs))
+        elif name == "boll":
+            n = int(params.get("n", 20))
+            k_std = float(params.get("k", 2.0))
+            mid = rolling_panel(close, n, 1, "mean")
+            std = rolling_panel(close, n, 1, "std")
+            out.update({"boll_mid": mid, "boll_upper": mid + k_std * std, "boll_lower": mid - k_std * std})
+        elif name == "atr":
+            n = int(params.get("n", 14))
+            out[f"atr{n}"] = atr_panel(out["high"], out["low"], close, n=n)
+        elif name == "kdj":
+            out.update(kdj_panel(out["high"], out["low"], close,
+                                 n=int(params.get("n", 9)),
+                                 m1=int(params.get("m1", 3)),
+                                 m2=int(params.get("m2", 3))))
+        else:
+            raise ValueError(f"不支持的指标: {name}")
+    return out
+
+
 def last_values(df: pd.DataFrame, columns: List[str]) -> Dict[str, Any]:
     if df.empty:
         return {c: None for c in columns}
@@ -11,6 +11,9 @@ import re
 
 logger = logging.getLogger(__name__)
 
+# 调用大模型的新闻工具（按次计费、耗时长）：不参与对冲请求，只在其他新闻源都不可用时依次调用
+LLM_NEWS_TOOLS = frozenset({"get_global_news_openai"})
+
 class UnifiedNewsAnalyzer:
     """统一新闻分析器，整合所有新闻获取逻辑"""
     
@@ -135,12 +138,18 @@ class UnifiedNewsAnalyzer:
 
             news_items = []
             for query in query_list:
-                cursor = collection.find(query).sort('publish_time', -1).limit(max_news)
+                # 近似重复的多源转载稿只取每簇的代表，避免同一新闻在提示词中重复出现
+                query['is_duplicate'] = {'$ne': True}
+                cursor = collection.find(query, {'dup_signature': 0, 'dup_bands': 0}).sort('publish_time', -1).limit(max_news)
                 news_items = list(cursor)
                 if news_items:
                     logger.info(f"[统一新闻工具] 📊 使用查询 {query} 找到 {len(news_items)} 条新闻")
                     break
 
+            if not news_items:
+                # 未标注股票代码、但正文提到该股票的新闻，通过全文检索索引查找
+                news_items = self._search_news_index(collection, clean_code, thirty_days_ago, max_news)
+
             if not news_items:
                 logger.info(f"[统一新闻工具] 数据库中没有找到 {stock_code} 的新闻")
                 return ""
@@ -184,6 +193,36 @@ class UnifiedNewsAnalyzer:
             logger.error(traceback.format_exc())
             return ""
 
+    def _search_news_index(self, collection, clean_code: str, start_time: datetime, max_news: int) -> list:
+        """
+        用新闻全文检索索引按股票代码查找新闻（先查 start_time 之后，再不限时间）
+
+        Returns:
+            list: 按相关性排序的新闻文档，索引不可用时返回空列表
+        """
+        try:
+            from tradingagents.dataflows.news.search_index import get_news_search_index, news_key
+
+            index = get_news_search_index()
+            if index is None:
+                return []
+            index.refresh(collection)
+
+            for window_start in (start_time, None):
+                hits = index.search(clean_code, start_time=window_start, limit=max_news)
+                if not hits:
+                    continue
+                docs = list(collection.find(index.keys_filter(key for key, _ in hits)))
+                docs_by_key = {news_key(doc): doc for doc in docs}
+                news_items = [docs_by_key[key] for key, _ in hits
+                              if key in docs_by_key and not docs_by_key[key].get('is_duplicate')]
+                if news_items:
+                    logger.info(f"[统一新闻工具] 🔎 全文检索索引找到 {len(news_items)} 条提及 {clean_code} 的新闻")
+                    return news_items
+        except Exception as e:
+            logger.warning(f"[统一新闻工具] 全文检索索引查询失败: {e}")
+        return []
+
     def _sync_news_from_akshare(self, stock_code: str, max_news: int = 10) -> bool:
         """
         从AKShare同步新闻到数据库（同步方法）
@@ -318,50 +357,15 @@ class UnifiedNewsAnalyzer:
         except Exception as e:
             logger.warning(f"[统一新闻工具] 数据库新闻获取失败: {e}")
 
-        # 优先级1: 东方财富实时新闻
-        try:
-            if hasattr(self.toolkit, 'get_realtime_stock_news'):
-                logger.info(f"[统一新闻工具] 尝试东方财富实时新闻...")
-                # 使用LangChain工具的正确调用方式：.invoke()方法和字典参数
-                result = self.toolkit.get_realtime_stock_news.invoke({"ticker": stock_code, "curr_date": curr_date})
-                
-                # 🔍 详细记录东方财富返回的内容
-                logger.info(f"[统一新闻工具] 📊 东方财富返回内容长度: {len(result) if result else 0} 字符")
-                logger.info(f"[统一新闻工具] 📋 东方财富返回内容预览 (前500字符): {result[:500] if result else 'None'}")
-                
-                if result and len(result.strip()) > 100:
-                    logger.info(f"[统一新闻工具] ✅ 东方财富新闻获取成功: {len(result)} 字符")
-                    return self._format_news_result(result, "东方财富实时新闻", model_info)
-                else:
-                    logger.warning(f"[统一新闻工具] ⚠️ 东方财富新闻内容过短或为空")
-        except Exception as e:
-            logger.warning(f"[统一新闻工具] 东方财富新闻获取失败: {e}")
-        
-        # 优先级2: Google新闻（中文搜索）
-        try:
-            if hasattr(self.toolkit, 'get_google_news'):
-                logger.info(f"[统一新闻工具] 尝试Google新闻...")
-                query = f"{stock_code} 股票 新闻 财报 业绩"
-                # 使用LangChain工具的正确调用方式：.invoke()方法和字典参数
-                result = self.toolkit.get_google_news.invoke({"query": query, "curr_date": curr_date})
-                if result and len(result.strip()) > 50:
-                    logger.info(f"[统一新闻工具] ✅ Google新闻获取成功: {len(result)} 字符")
-                    return self._format_news_result(result, "Google新闻", model_info)
-        except Exception as e:
-            logger.warning(f"[统一新闻工具] Google新闻获取失败: {e}")
-        
-        # 优先级3: OpenAI全球新闻
-        try:
-            if hasattr(self.toolkit, 'get_global_news_openai'):
-                logger.info(f"[统一新闻工具] 尝试OpenAI全球新闻...")
-                # 使用LangChain工具的正确调用方式：.invoke()方法和字典参数
-                result = self.toolkit.get_global_news_openai.invoke({"curr_date": curr_date})
-                if result and len(result.strip()) > 50:
-                    logger.info(f"[统一新闻工具] ✅ OpenAI新闻获取成功: {len(result)} 字符")
-                    return self._format_news_result(result, "OpenAI全球新闻", model_info)
-        except Exception as e:
-            logger.warning(f"[统一新闻工具] OpenAI新闻获取失败: {e}")
-        
+        # 优先级1-3: 东方财富实时新闻 > Google新闻（中文搜索） > OpenAI全球新闻
+        result, source = self._fetch_first_available("news_a_share", [
+            ("东方财富实时新闻", "get_realtime_stock_news", {"ticker": stock_code, "curr_date": curr_date}, 100),
+            ("Google新闻", "get_google_news", {"query": f"{stock_code} 股票 新闻 财报 业绩", "curr_date": curr_date}, 50),
+            ("OpenAI全球新闻", "get_global_news_openai", {"curr_date": curr_date}, 50),
+        ])
+        if result:
+            return self._format_news_result(result, source, model_info)
+
         return "❌ 无法获取A股新闻数据，所有新闻源均不可用"
     
     def _get_hk_share_news(self, stock_code: str, max_news: int, model_info: str = "") -> str:
@@ -371,43 +375,15 @@ class UnifiedNewsAnalyzer:
         # 获取当前日期
         curr_date = datetime.now().strftime("%Y-%m-%d")
         
-        # 优先级1: Google新闻（港股搜索）
-        try:
-            if hasattr(self.toolkit, 'get_google_news'):
-                logger.info(f"[统一新闻工具] 尝试Google港股新闻...")
-                query = f"{stock_code} 港股 香港股票 新闻"
-                # 使用LangChain工具的正确调用方式：.invoke()方法和字典参数
-                result = self.toolkit.get_google_news.invoke({"query": query, "curr_date": curr_date})
-                if result and len(result.strip()) > 50:
-                    logger.info(f"[统一新闻工具] ✅ Google港股新闻获取成功: {len(result)} 字符")
-                    return self._format_news_result(result, "Google港股新闻", model_info)
-        except Exception as e:
-            logger.warning(f"[统一新闻工具] Google港股新闻获取失败: {e}")
-        
-        # 优先级2: OpenAI全球新闻
-        try:
-            if hasattr(self.toolkit, 'get_global_news_openai'):
-                logger.info(f"[统一新闻工具] 尝试OpenAI港股新闻...")
-                # 使用LangChain工具的正确调用方式：.invoke()方法和字典参数
-                result = self.toolkit.get_global_news_openai.invoke({"curr_date": curr_date})
-                if result and len(result.strip()) > 50:
-                    logger.info(f"[统一新闻工具] ✅ OpenAI港股新闻获取成功: {len(result)} 字符")
-                    return self._format_news_result(result, "OpenAI港股新闻", model_info)
-        except Exception as e:
-            logger.warning(f"[统一新闻工具] OpenAI港股新闻获取失败: {e}")
-        
-        # 优先级3: 实时新闻（如果支持港股）
-        try:
-            if hasattr(self.toolkit, 'get_realtime_stock_news'):
-                logger.info(f"[统一新闻工具] 尝试实时港股新闻...")
-                # 使用LangChain工具的正确调用方式：.invoke()方法和字典参数
-                result = self.toolkit.get_realtime_stock_news.invoke({"ticker": stock_code, "curr_date": curr_date})
-                if result and len(result.strip()) > 100:
-                    logger.info(f"[统一新闻工具] ✅ 实时港股新闻获取成功: {len(result)} 字符")
-                    return self._format_news_result(result, "实时港股新闻", model_info)
-        except Exception as e:
-            logger.warning(f"[统一新闻工具] 实时港股新闻获取失败: {e}")
-        
+        # 优先级1-3: Google新闻（港股搜索） > 实时新闻 > OpenAI全球新闻（大模型兜底）
+        result, source = self._fetch_first_available("news_hk_share", [
+            ("Google港股新闻", "get_google_news", {"query": f"{stock_code} 港股 香港股票 新闻", "curr_date": curr_date}, 50),
+            ("OpenAI港股新闻", "get_global_news_openai", {"curr_date": curr_date}, 50),
+            ("实时港股新闻", "get_realtime_stock_news", {"ticker": stock_code, "curr_date": curr_date}, 100),
+        ])
+        if result:
+            return self._format_news_result(result, source, model_info)
+
         return "❌ 无法获取港股新闻数据，所有新闻源均不可用"
     
     def _get_us_share_news(self, stock_code: str, max_news: int, model_info: str = "") -> str:
@@ -417,45 +393,71 @@ class UnifiedNewsAnalyzer:
         # 获取当前日期
         curr_date = datetime.now().strftime("%Y-%m-%d")
         
-        # 优先级1: OpenAI全球新闻
-        try:
-            if hasattr(self.toolkit, 'get_global_news_openai'):
-                logger.info(f"[统一新闻工具] 尝试OpenAI美股新闻...")
-                # 使用LangChain工具的正确调用方式：.invoke()方法和字典参数
-                result = self.toolkit.get_global_news_openai.invoke({"curr_date": curr_date})
-                if result and len(result.strip()) > 50:
-                    logger.info(f"[统一新闻工具] ✅ OpenAI美股新闻获取成功: {len(result)} 字符")
-                    return self._format_news_result(result, "OpenAI美股新闻", model_info)
-        except Exception as e:
-            logger.warning(f"[统一新闻工具] OpenAI美股新闻获取失败: {e}")
-        
-        # 优先级2: Google新闻（英文搜索）
-        try:
-            if hasattr(self.toolkit, 'get_google_news'):
-                logger.info(f"[统一新闻工具] 尝试Google美股新闻...")
-                query = f"{stock_code} stock news earnings financial"
-                # 使用LangChain工具的正确调用方式：.invoke()方法和字典参数
-                result = self.toolkit.get_google_news.invoke({"query": query, "curr_date": curr_date})
-                if result and len(result.strip()) > 50:
-                    logger.info(f"[统一新闻工具] ✅ Google美股新闻获取成功: {len(result)} 字符")
-                    return self._format_news_result(result, "Google美股新闻", model_info)
-        except Exception as e:
-            logger.warning(f"[统一新闻工具] Google美股新闻获取失败: {e}")
-        
-        # 优先级3: FinnHub新闻（如果可用）
-        try:
-            if hasattr(self.toolkit, 'get_finnhub_news'):
-                logger.info(f"[统一新闻工具] 尝试FinnHub美股新闻...")
-                # 使用LangChain工具的正确调用方式：.invoke()方法和字典参数
-                result = self.toolkit.get_finnhub_news.invoke({"symbol": stock_code, "max_results": min(max_news, 50)})
-                if result and len(result.strip()) > 50:
-                    logger.info(f"[统一新闻工具] ✅ FinnHub美股新闻获取成功: {len(result)} 字符")
-                    return self._format_news_result(result, "FinnHub美股新闻", model_info)
-        except Exception as e:
-            logger.warning(f"[统一新闻工具] FinnHub美股新闻获取失败: {e}")
-        
+        # 优先级1-3: Google新闻（英文搜索） > FinnHub新闻 > OpenAI全球新闻（大模型兜底）
+        result, source = self._fetch_first_available("news_us_share", [
+            ("OpenAI美股新闻", "get_global_news_openai", {"curr_date": curr_date}, 50),
+            ("Google美股新闻", "get_google_news", {"query": f"{stock_code} stock news earnings financial", "curr_date": curr_date}, 50),
+            ("FinnHub美股新闻", "get_finnhub_news", {"symbol": stock_code, "max_results": min(max_news, 50)}, 50),
+        ])
+        if result:
+            return self._format_news_result(result, source, model_info)
+
         return "❌ 无法获取美股新闻数据，所有新闻源均不可用"
     
+    def _fetch_first_available(self, kind: str, candidates: list) -> tuple:
+        """
+        按优先级获取第一个可用的新闻源结果
+
+        新闻源以对冲请求方式执行：当前新闻源失败或超过延迟预算仍未返回时，并行启动下一个，
+        采用最先返回可用结果的新闻源，单个慢新闻源不再阻塞整个工具调用。
+        按给定优先级启动（不按历史统计调整顺序）；调用大模型的工具（LLM_NEWS_TOOLS）不参与对冲，
+        只在其余新闻源都不可用时按顺序调用。
+
+        Args:
+            kind: 统计类别（按市场区分）
+            candidates: [(新闻源名称, 工具包属性名, 调用参数, 最少字符数)]，按优先级排列
+
+        Returns:
+            tuple: (新闻内容, 新闻源名称)，全部不可用时为 (None, None)
+        """
+        from tradingagents.dataflows.news.realtime_news import get_news_fetcher
+
+        calls = []
+        llm_calls = []
+        for source, tool_name, args, min_length in candidates:
+            if not hasattr(self.toolkit, tool_name):
+                continue
+
+            def call(source=source, tool=getattr(self.toolkit, tool_name), args=args, min_length=min_length):
+                logger.info(f"[统一新闻工具] 尝试{source}...")
+                start = datetime.now()
+                # 使用LangChain工具的正确调用方式：.invoke()方法和字典参数
+                result = tool.invoke(args)
+                elapsed = (datetime.now() - start).total_seconds()
+                logger.info(f"[统一新闻工具] 📊 {source}返回内容长度: {len(result) if result else 0} 字符，耗时: {elapsed:.2f}秒")
+                if result and len(result.strip()) > min_length:
+                    return result
+                logger.warning(f"[统一新闻工具] ⚠️ {source}内容过短或为空")
+                return None
+
+            (llm_calls if tool_name in LLM_NEWS_TOOLS else calls).append((source, call))
+
+        result, source = None, None
+        if calls:
+            result, source = get_news_fetcher("tools").fetch(kind, calls, is_valid=lambda r: r is not None, adapt=False)
+        for llm_source, call in llm_calls:
+            if result:
+                break
+            try:
+                result, source = call(), llm_source
+            except Exception as e:
+                logger.warning(f"[统一新闻工具] ⚠️ {llm_source}调用失败: {e}")
+        if result:
+            logger.info(f"[统一新闻工具] ✅ {source}获取成功: {len(result)} 字符")
+        else:
+            source = None
+        return result, source
+
     def _format_news_result(self, news_content: str, source: str, model_info: str = "") -> str:
         """格式化新闻结果"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -20,6 +20,9 @@ except ImportError:
     MONGODB_AVAILABLE = False
     logger.warning("pymongo未安装，MongoDB功能不可用")
 
+# 列表页字段（report_size / search_ngrams）与后端保存报告时的口径一致，否则报告列表检索不到
+from app.utils.report_search import build_report_list_fields
+
 
 class MongoDBReportManager:
     """MongoDB报告管理器"""
@@ -189,6 +192,7 @@ class MongoDBReportManager:
                 "created_at": timestamp,
                 "updated_at": timestamp
             }
+            document.update(build_report_list_fields(document))
 
             # 插入文档
             result = self.collection.insert_one(document)
@@ -372,6 +376,7 @@ class MongoDBReportManager:
                     update_data = {
                         "$set": {
                             "reports": {},
+                            **build_report_list_fields({**doc, "reports": {}}),
                             "updated_at": datetime.now()
                         }
                     }
@@ -407,8 +412,9 @@ class MongoDBReportManager:
                 logger.error("报告数据缺少analysis_id字段")
                 return False
 
-            # 添加保存时间戳
+            # 添加保存时间戳与列表页字段
             report_data['saved_at'] = datetime.now()
+            report_data.update(build_report_list_fields(report_data))
 
             # 使用upsert操作，如果存在则更新，不存在则插入
             result = self.collection.replace_one(